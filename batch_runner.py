@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Batch Runner for the ETL Batch Scripts
+
+This module spreads a batch of files across a process pool for the batch entry points
+(process_files.py, standalone_transformer.py and standalone_loader.py). Files are
+submitted largest first through a bounded queue, and the per-file result and timing
+are collected for the run summary.
+"""
+
+import os
+import time
+import logging
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional
+
+# Configure logging
+logger = logging.getLogger('batch_runner')
+
+# Default number of worker processes (1 keeps the original sequential behaviour)
+BATCH_WORKERS = int(os.getenv('ETL_BATCH_WORKERS', '1'))
+
+# Number of submitted-but-unfinished files allowed per worker
+QUEUE_DEPTH_PER_WORKER = int(os.getenv('ETL_BATCH_QUEUE_DEPTH', '2'))
+
+
+def add_worker_argument(parser):
+    """
+    Add the --workers option to an argument parser.
+
+    Args:
+        parser: argparse.ArgumentParser to extend
+    """
+    parser.add_argument('--workers', type=int, default=BATCH_WORKERS,
+                        help='Number of worker processes used to process files (default: ETL_BATCH_WORKERS, or 1)')
+
+
+def resolve_workers(workers: Optional[int] = None) -> int:
+    """
+    Resolve the number of worker processes of a batch run.
+
+    Args:
+        workers: Requested number of worker processes, or None for the ETL_BATCH_WORKERS default
+
+    Returns:
+        Number of worker processes (at least 1)
+    """
+    return max(1, BATCH_WORKERS if workers is None else workers)
+
+
+def _timed_call(worker_fn: Callable[[str], bool], file_path: str) -> Dict[str, Any]:
+    """
+    Run the worker function for one file and time it.
+
+    This runs inside the worker process, so it must stay a module-level function.
+
+    Args:
+        worker_fn: Function that processes a single file and returns True on success
+        file_path: Path to the file to process
+
+    Returns:
+        Per-file result dictionary
+    """
+    start_time = time.perf_counter()
+    error = None
+
+    try:
+        success = bool(worker_fn(file_path))
+    except Exception as e:
+        success = False
+        error = str(e)
+
+    return {
+        'file_path': file_path,
+        'success': success,
+        'seconds': time.perf_counter() - start_time,
+        'error': error
+    }
+
+
+class BatchRunner:
+    """
+    Runs a per-file worker function over a batch of files.
+    """
+
+    def __init__(self, worker_fn: Callable[[str], bool], workers: int = 1, max_pending: Optional[int] = None):
+        """
+        Initialize the batch runner.
+
+        Args:
+            worker_fn: Module-level function that processes one file and returns True on success
+            workers: Number of worker processes; 1 processes files in the current process
+            max_pending: Maximum number of files submitted to the pool at once
+        """
+        self.worker_fn = worker_fn
+        self.workers = max(1, workers)
+        self.max_pending = max_pending or self.workers * max(1, QUEUE_DEPTH_PER_WORKER)
+
+    @staticmethod
+    def order_by_size(file_paths: List[str]) -> List[str]:
+        """
+        Order files largest first so the longest jobs start early.
+
+        Args:
+            file_paths: Paths of the files to process
+
+        Returns:
+            Paths sorted by decreasing size
+        """
+        def file_size(file_path):
+            try:
+                return os.path.getsize(file_path)
+            except OSError:
+                return 0
+
+        return sorted(file_paths, key=file_size, reverse=True)
+
+    def run(self, file_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        Process the files and collect per-file results.
+
+        Args:
+            file_paths: Paths of the files to process
+
+        Returns:
+            List of result dictionaries with file_path, success, seconds and error
+        """
+        ordered_paths = self.order_by_size(file_paths)
+
+        if self.workers == 1 or len(ordered_paths) <= 1:
+            return [_timed_call(self.worker_fn, file_path) for file_path in ordered_paths]
+
+        logger.info(f"Processing {len(ordered_paths)} files with {self.workers} worker processes")
+
+        results = []
+        pending = {}
+        queue = iter(ordered_paths)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            while True:
+                # Keep the pool fed without queueing the whole batch up front
+                while len(pending) < self.max_pending:
+                    file_path = next(queue, None)
+                    if file_path is None:
+                        break
+                    future = executor.submit(_timed_call, self.worker_fn, file_path)
+                    pending[future] = (file_path, time.perf_counter())
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path, submitted_at = pending.pop(future)
+                    try:
+                        results.append(future.result())
+                    except Exception as e:
+                        # The worker process itself failed (e.g. it was killed)
+                        logger.error(f"Error processing file {file_path} in worker process: {e}")
+                        results.append({
+                            'file_path': file_path,
+                            'success': False,
+                            'seconds': time.perf_counter() - submitted_at,
+                            'error': str(e)
+                        })
+
+        return results
+
+    @staticmethod
+    def log_summary(results: List[Dict[str, Any]]):
+        """
+        Log the per-file timings and failures of a batch run.
+
+        Args:
+            results: Result dictionaries returned by run()
+        """
+        for result in results:
+            status = "success" if result['success'] else "failed"
+            logger.info(f"  {os.path.basename(result['file_path'])}: {status} in {result['seconds']:.2f}s")
+            if result['error']:
+                logger.error(f"  {os.path.basename(result['file_path'])}: {result['error']}")
+
+
+def run_batch(worker_fn: Callable[[str], bool], file_paths: List[str], workers: int = 1) -> int:
+    """
+    Process a batch of files and return the number of successful files.
+
+    Args:
+        worker_fn: Module-level function that processes one file and returns True on success
+        file_paths: Paths of the files to process
+        workers: Number of worker processes
+
+    Returns:
+        Number of files processed successfully
+    """
+    runner = BatchRunner(worker_fn, workers=workers)
+    results = runner.run(file_paths)
+
+    if runner.workers > 1:
+        BatchRunner.log_summary(results)
+
+    return sum(1 for result in results if result['success'])
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Compressed Input Support for the Extraction Agent
+
+This module detects gzip, bzip2 and xz compressed inputs from their magic bytes and opens
+them as decompressing streams, so compressed raw files are parsed directly without a
+temporary uncompressed copy. Compression extensions (.gz, .bz2, .xz) are stripped when
+deciding the data format and naming the outputs, e.g. sales.csv.gz is read as CSV and
+produces sales.json.
+"""
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+import logging
+from typing import IO, Optional
+
+# Configure logging
+logger = logging.getLogger('compressed_input')
+
+# Leading bytes of each supported compression format
+MAGIC_BYTES = {
+    'gzip': b'\x1f\x8b',
+    'bz2': b'BZh',
+    'xz': b'\xfd7zXZ\x00'
+}
+
+# Extensions that only describe the compression of a file
+COMPRESSION_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.bz2': 'bz2',
+    '.xz': 'xz'
+}
+
+# Typical size ratio of uncompressed to compressed tabular data, used to decide
+# whether a compressed file is large enough to be extracted in chunks
+COMPRESSION_RATIO_ESTIMATE = float(os.getenv('ETL_COMPRESSION_RATIO_ESTIMATE', '5'))
+
+_OPENERS = {
+    'gzip': gzip.open,
+    'bz2': bz2.open,
+    'xz': lzma.open
+}
+
+
+def detect_compression(file_path: str) -> Optional[str]:
+    """
+    Detect the compression format of a file from its magic bytes.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        'gzip', 'bz2', 'xz', or None if the file is not compressed
+    """
+    with open(file_path, 'rb') as f:
+        head = f.read(max(len(magic) for magic in MAGIC_BYTES.values()))
+
+    for compression, magic in MAGIC_BYTES.items():
+        if head.startswith(magic):
+            return compression
+
+    return None
+
+
+def strip_compression_extension(file_path: str) -> str:
+    """
+    Remove a trailing compression extension from a path.
+
+    Args:
+        file_path: Path or filename, e.g. 'sales.csv.gz'
+
+    Returns:
+        Path without the compression extension, e.g. 'sales.csv'
+    """
+    root, extension = os.path.splitext(file_path)
+    if extension.lower() in COMPRESSION_EXTENSIONS:
+        return root
+    return file_path
+
+
+def data_extension(file_path: str) -> str:
+    """
+    Get the extension describing the data format of a possibly compressed file.
+
+    Args:
+        file_path: Path to the file, e.g. 'sales.csv.gz'
+
+    Returns:
+        Lower-case data extension, e.g. '.csv'
+    """
+    return os.path.splitext(strip_compression_extension(file_path))[1].lower()
+
+
+def source_stem(file_path: str) -> str:
+    """
+    Get the filename of a source without its data and compression extensions.
+
+    Args:
+        file_path: Path to the file, e.g. 'raw/sales.csv.gz'
+
+    Returns:
+        Base name used for outputs, e.g. 'sales'
+    """
+    return os.path.splitext(strip_compression_extension(os.path.basename(file_path)))[0]
+
+
+def open_input(file_path: str, text: bool = False) -> IO:
+    """
+    Open a file for reading, decompressing it on the fly if it is compressed.
+
+    Args:
+        file_path: Path to the file
+        text: Whether to return a text stream instead of a binary one
+
+    Returns:
+        File object yielding the uncompressed content
+    """
+    compression = detect_compression(file_path)
+
+    if compression is None:
+        return open(file_path, 'r' if text else 'rb')
+
+    logger.info(f"Decompressing {compression} input while reading: {file_path}")
+    stream = _OPENERS[compression](file_path, 'rb')
+
+    if text:
+        return io.TextIOWrapper(stream)
+    return stream
+
+
+def estimated_size(file_path: str) -> int:
+    """
+    Estimate the uncompressed size of a file.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        File size in bytes, scaled by COMPRESSION_RATIO_ESTIMATE for compressed files
+    """
+    size = os.path.getsize(file_path)
+
+    if detect_compression(file_path) is not None:
+        return int(size * COMPRESSION_RATIO_ESTIMATE)
+    return size
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+User-Defined Transformations for the Transformation Stage
+
+This module compiles the transformations declared with a `type` in the transformations
+section of config/tags.yaml into vectorized column operations, so custom logic runs on
+whole arrays instead of in Python row loops:
+
+- expression: arithmetic expression over the column (`x`) and other columns, evaluated
+  with numexpr when it is installed and with NumPy otherwise
+- clip: limit values to a lower and/or upper bound
+- log: logarithm with an optional offset
+- bucket: assign values to bins
+- string_normalize: strip, re-case, collapse whitespace, remove accents and apply
+  regular expression replacements, once per distinct value
+
+Every type operates row by row, so chunked transformations give the same result as
+in-memory ones. New types are added with register_transform_type.
+"""
+
+import ast
+import re
+import logging
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+import numpy as np
+import pandas as pd
+
+# numexpr is optional; without it expressions are evaluated with NumPy
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# Configure logging
+logger = logging.getLogger('custom_transforms')
+
+# Transformations implemented by DataTransformer itself
+BUILTIN_TRANSFORMATIONS = ('date_standardization', 'one_hot_encoding', 'numeric_normalization')
+
+# Name of the transformed column inside expressions
+EXPRESSION_COLUMN = 'x'
+
+# Functions allowed in expressions; numexpr supports all of them under the same names
+EXPRESSION_FUNCTIONS = {
+    'abs': np.abs,
+    'sqrt': np.sqrt,
+    'exp': np.exp,
+    'expm1': np.expm1,
+    'log': np.log,
+    'log10': np.log10,
+    'log1p': np.log1p,
+    'sin': np.sin,
+    'cos': np.cos,
+    'tan': np.tan,
+    'arctan2': np.arctan2,
+    'where': np.where
+}
+
+# Expression syntax understood by both numexpr and NumPy
+EXPRESSION_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Compare, ast.Call, ast.Name, ast.Load, ast.Constant,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.Pow, ast.USub, ast.UAdd,
+    ast.BitAnd, ast.BitOr, ast.Invert,
+    ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.Eq, ast.NotEq
+)
+
+# Case conversions of string_normalize
+STRING_CASES = ('lower', 'upper', 'title', 'none')
+
+# Column function factories by transformation type (see register_transform_type)
+TRANSFORM_TYPES = {}
+
+
+class CustomTransform(NamedTuple):
+    """
+    One compiled user-defined transformation.
+    """
+
+    name: str
+    type: str
+    applies_to_tags: Tuple[str, ...]
+    # Called with the column to transform and the output columns (for expressions
+    # referring to other columns); returns the transformed column
+    function: Callable[[pd.Series, Any], pd.Series]
+    # Settings reported in the transformation metadata
+    metadata: Dict[str, Any]
+
+
+def register_transform_type(type_name: str):
+    """
+    Register a factory for a transformation type.
+
+    The factory is called with the name and settings of a configured transformation and
+    returns (column function, metadata); it raises ValueError for invalid settings.
+
+    Args:
+        type_name: Value of the `type` setting selecting the factory
+
+    Returns:
+        Decorator registering the factory
+    """
+    def decorator(factory):
+        TRANSFORM_TYPES[type_name] = factory
+        return factory
+    return decorator
+
+
+def is_custom_transformation(name: str, settings: Any) -> bool:
+    """
+    Check whether a configured transformation is a user-defined one.
+
+    Args:
+        name: Name of the transformation
+        settings: Settings of the transformation
+
+    Returns:
+        True if the transformation declares a type and is not built in
+    """
+    return name not in BUILTIN_TRANSFORMATIONS and isinstance(settings, dict) and 'type' in settings
+
+
+def compile_transform(name: str, settings: Dict[str, Any]) -> CustomTransform:
+    """
+    Compile one user-defined transformation.
+
+    Args:
+        name: Name of the transformation
+        settings: Settings of the transformation
+
+    Returns:
+        CustomTransform
+
+    Raises:
+        ValueError: If the type is unknown or the settings are invalid
+    """
+    type_name = settings['type']
+    factory = TRANSFORM_TYPES.get(type_name)
+    if factory is None:
+        raise ValueError(f"unknown type '{type_name}', expected one of: {', '.join(TRANSFORM_TYPES)}")
+
+    function, metadata = factory(name, settings)
+    return CustomTransform(name, type_name, tuple(settings.get('applies_to_tags') or ()), function, metadata)
+
+
+def compile_transforms(transformations: Dict[str, Any]) -> Tuple[CustomTransform, ...]:
+    """
+    Compile the user-defined transformations of a configuration, in configuration order.
+
+    Invalid transformations are logged and left out.
+
+    Args:
+        transformations: Transformations section of the tagging configuration
+
+    Returns:
+        Tuple of CustomTransform
+    """
+    compiled = []
+    for name, settings in transformations.items():
+        if not is_custom_transformation(name, settings):
+            continue
+        try:
+            compiled.append(compile_transform(name, settings))
+        except ValueError as e:
+            logger.warning(f"Skipping transformation {name}: {e}")
+    return tuple(compiled)
+
+
+def validate_transforms(transformations: Dict[str, Any]) -> List[str]:
+    """
+    Check the user-defined transformations of a configuration.
+
+    Args:
+        transformations: Transformations section of the tagging configuration
+
+    Returns:
+        List of problems found (empty if they are all valid)
+    """
+    errors = []
+    for name, settings in transformations.items():
+        if not is_custom_transformation(name, settings):
+            continue
+        try:
+            compile_transform(name, settings)
+        except ValueError as e:
+            errors.append(f"transformations.{name}: {e}")
+    return errors
+
+
+def _number(settings: Dict[str, Any], key: str, default: Any = None) -> Any:
+    """Get a numeric setting, raising ValueError if it is not a number."""
+    value = settings.get(key, default)
+    if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+        raise ValueError(f"{key} must be a number")
+    return value
+
+
+def _float_values(values: pd.Series) -> np.ndarray:
+    """Get a numeric column as a float array with NaN for missing values."""
+    if not pd.api.types.is_numeric_dtype(values) or pd.api.types.is_bool_dtype(values):
+        raise ValueError(f"column {values.name} is not numeric")
+    return values.to_numpy(dtype=float, na_value=np.nan)
+
+
+@register_transform_type('expression')
+def _expression(name: str, settings: Dict[str, Any]) -> Tuple[Callable, Dict[str, Any]]:
+    """
+    Evaluate an arithmetic expression.
+
+    `x` is the transformed column; other names refer to columns of the output as they
+    were before this transformation.
+    """
+    expression = settings.get('expression')
+    if not isinstance(expression, str) or not expression.strip():
+        raise ValueError("expression must be a non-empty string")
+
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"invalid expression: {e.msg}")
+
+    names = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, EXPRESSION_NODES):
+            raise ValueError(f"unsupported syntax in expression: {type(node).__name__}")
+        if isinstance(node, ast.Constant) and not isinstance(node.value, (int, float)):
+            raise ValueError(f"unsupported constant in expression: {node.value!r}")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in EXPRESSION_FUNCTIONS or node.keywords:
+                raise ValueError(f"unsupported function call in expression, allowed: {', '.join(EXPRESSION_FUNCTIONS)}")
+        elif isinstance(node, ast.Name):
+            names.add(node.id)
+
+    function_names = {node.func.id for node in ast.walk(tree) if isinstance(node, ast.Call)}
+    column_names = sorted(names - function_names - {EXPRESSION_COLUMN})
+    source = expression.strip()
+    code = compile(tree, f'<transformation {name}>', 'eval')
+
+    def evaluate(values: pd.Series, columns: Any) -> pd.Series:
+        arrays = {EXPRESSION_COLUMN: _float_values(values)}
+        for column in column_names:
+            try:
+                arrays[column] = _float_values(columns[column])
+            except KeyError:
+                raise ValueError(f"expression refers to unknown column {column}")
+
+        if numexpr is not None:
+            result = numexpr.evaluate(source, local_dict=arrays, global_dict={})
+        else:
+            with np.errstate(all='ignore'):
+                result = eval(code, {'__builtins__': {}, **EXPRESSION_FUNCTIONS}, arrays)
+
+        # Expressions without any column evaluate to a scalar
+        result = np.broadcast_to(result, len(values)).copy() if np.ndim(result) == 0 else result
+        return pd.Series(result, index=values.index, name=values.name)
+
+    return evaluate, {'expression': source, 'engine': 'numexpr' if numexpr is not None else 'numpy'}
+
+
+@register_transform_type('clip')
+def _clip(name: str, settings: Dict[str, Any]) -> Tuple[Callable, Dict[str, Any]]:
+    """Limit values to the lower and/or upper bound."""
+    lower = _number(settings, 'lower')
+    upper = _number(settings, 'upper')
+    if lower is None and upper is None:
+        raise ValueError("clip needs a lower and/or upper bound")
+    if lower is not None and upper is not None and lower > upper:
+        raise ValueError("lower must not be greater than upper")
+
+    def clip(values: pd.Series, columns: Any) -> pd.Series:
+        _float_values(values)
+        return values.clip(lower, upper)
+
+    return clip, {'lower': lower, 'upper': upper}
+
+
+@register_transform_type('log')
+def _log(name: str, settings: Dict[str, Any]) -> Tuple[Callable, Dict[str, Any]]:
+    """Take the logarithm of values plus an offset; values without a logarithm become NaN."""
+    base = settings.get('base', 'e')
+    if base != 'e':
+        base = _number(settings, 'base')
+        if base <= 0 or base == 1:
+            raise ValueError("base must be 'e' or a positive number other than 1")
+    offset = _number(settings, 'offset', 0)
+
+    def log(values: pd.Series, columns: Any) -> pd.Series:
+        shifted = _float_values(values) + offset
+        invalid = shifted <= 0
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if base == 'e':
+                result = np.log(shifted)
+            elif base == 10:
+                result = np.log10(shifted)
+            elif base == 2:
+                result = np.log2(shifted)
+            else:
+                result = np.log(shifted) / np.log(base)
+        result[invalid] = np.nan
+
+        invalid_count = int(invalid.sum())
+        if invalid_count:
+            logger.warning(f"Transformation {name}: {invalid_count} values of column {values.name} have no logarithm")
+
+        return pd.Series(result, index=values.index, name=values.name)
+
+    return log, {'base': base, 'offset': offset}
+
+
+@register_transform_type('bucket')
+def _bucket(name: str, settings: Dict[str, Any]) -> Tuple[Callable, Dict[str, Any]]:
+    """Replace values by the label of their bin; values outside every bin become missing."""
+    bins = settings.get('bins')
+    if (
+        not isinstance(bins, list)
+        or len(bins) < 2
+        or not all(isinstance(edge, (int, float)) and not isinstance(edge, bool) for edge in bins)
+    ):
+        raise ValueError("bins must be a list of at least two numbers")
+    if any(left >= right for left, right in zip(bins, bins[1:])):
+        raise ValueError("bins must be strictly increasing")
+
+    right = bool(settings.get('right', True))
+    include_lowest = bool(settings.get('include_lowest', True))
+
+    labels = settings.get('labels')
+    if labels is None:
+        labels = [str(interval) for interval in pd.IntervalIndex.from_breaks(bins, closed='right' if right else 'left')]
+    elif not isinstance(labels, list) or len(labels) != len(bins) - 1:
+        raise ValueError("labels must be a list with one label per bin")
+
+    # Missing values and values outside the bins have code -1, which selects the trailing NaN
+    lookup = np.array(list(labels) + [np.nan], dtype=object)
+
+    def bucket(values: pd.Series, columns: Any) -> pd.Series:
+        codes = pd.cut(_float_values(values), bins, right=right, include_lowest=include_lowest, labels=False)
+        codes = np.where(np.isnan(codes), -1, codes).astype(np.intp)
+        return pd.Series(lookup[codes], index=values.index, name=values.name)
+
+    return bucket, {'bins': bins, 'labels': list(labels)}
+
+
+@register_transform_type('string_normalize')
+def _string_normalize(name: str, settings: Dict[str, Any]) -> Tuple[Callable, Dict[str, Any]]:
+    """Normalize text values; each distinct value is normalized once."""
+    strip = bool(settings.get('strip', True))
+    collapse_whitespace = bool(settings.get('collapse_whitespace', True))
+    remove_accents = bool(settings.get('remove_accents', False))
+
+    case = settings.get('case', 'lower')
+    if case not in STRING_CASES:
+        raise ValueError(f"case must be one of: {', '.join(STRING_CASES)}")
+
+    replace = settings.get('replace') or {}
+    if not isinstance(replace, dict):
+        raise ValueError("replace must be a mapping of regular expressions to replacements")
+    replacements = []
+    for pattern, replacement in replace.items():
+        try:
+            replacements.append((re.compile(str(pattern)), str(replacement)))
+        except re.error as e:
+            raise ValueError(f"invalid regular expression {pattern!r}: {e}")
+
+    def normalize(values: pd.Series, columns: Any) -> pd.Series:
+        codes, uniques = pd.factorize(values)
+        text = pd.Series(uniques, dtype=object).astype(str)
+
+        if remove_accents:
+            text = text.str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+        for pattern, replacement in replacements:
+            text = text.str.replace(pattern, replacement, regex=True)
+        if collapse_whitespace:
+            text = text.str.replace(r'\s+', ' ', regex=True)
+        if strip:
+            text = text.str.strip()
+        if case != 'none':
+            text = getattr(text.str, case)()
+
+        # Missing values have code -1, which selects the trailing NaN
+        lookup = np.append(text.to_numpy(dtype=object), np.nan)
+        return pd.Series(lookup[codes], index=values.index, name=values.name)
+
+    return normalize, {'case': case, 'remove_accents': remove_accents, 'replacements': len(replacements)}
@@ -23,20 +23,25 @@ import json
 import csv
 import time
 import logging
+import argparse
 import datetime
 import re
+import io
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Union, Optional
+from typing import Dict, List, Any, Union, Optional, Iterator, Tuple
 
 # Check for required packages
 try:
     import pandas as pd
+    import numpy as np
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler, FileCreatedEvent
 except ImportError as e:
     print(f"Error: Required package not found: {e}")
     print("\nThis script requires the following packages:")
     print("  - pandas: For data manipulation")
+    print("  - numpy: For numerical operations")
     print("  - watchdog: For file monitoring")
     print("\nPlease install them using:")
     print("  pip install pandas watchdog")
@@ -44,6 +49,12 @@ except ImportError as e:
     print("  pip3 install pandas watchdog")
     exit(1)
 
+from payload_store import PayloadWriter, resolve_output_format
+from compressed_input import open_input, data_extension, source_stem, estimated_size
+from json_stream import JSONRecordStream
+from file_manifest import FileManifest, TailOffsetStore, process_and_record
+from file_queue import FileWorkQueue, add_queue_arguments, run_with_metrics, QUEUE_WORKERS, QUEUE_MAX_SIZE, DEBOUNCE_SECONDS
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -55,6 +66,26 @@ logger = logging.getLogger('extraction_agent')
 RAW_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'raw')
 PROCESSED_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'processed')
 
+# Files at or above this size are extracted in bounded-size chunks instead of
+# being loaded into memory in one go
+STREAMING_THRESHOLD_BYTES = int(os.getenv('ETL_STREAMING_THRESHOLD_MB', '256')) * 1024 * 1024
+CHUNK_SIZE = int(os.getenv('ETL_CHUNK_SIZE', '50000'))
+
+# Dicts nested deeper than this many levels are kept as JSON strings (unset = no limit)
+FLATTEN_MAX_DEPTH = int(os.getenv('ETL_FLATTEN_MAX_DEPTH', '0')) or None
+
+# Newline-delimited JSON is detected from the content, so these all parse as JSON
+JSON_EXTENSIONS = ['.json', '.jsonl', '.ndjson']
+SUPPORTED_EXTENSIONS = ['.csv'] + JSON_EXTENSIONS
+
+# In tail-follow mode, CSV files are treated as append-only logs and only the rows
+# appended since the last read are extracted
+TAIL_FOLLOW = os.getenv('ETL_TAIL_FOLLOW', 'false').lower() in ('1', 'true', 'yes')
+
+# At most this much of a followed file is parsed per batch, so the first read of a
+# large file (or a large backlog of appends) does not load it all at once
+TAIL_READ_BYTES = int(os.getenv('ETL_TAIL_READ_MB', '64')) * 1024 * 1024
+
 
 class DataExtractor:
     """
@@ -66,6 +97,9 @@ class DataExtractor:
         """
         Extract data from a file based on its extension.
         
+        Compressed files (gzip, bzip2, xz) are detected from their content and
+        decompressed while they are parsed; e.g. data.csv.gz is read as CSV.
+        
         Args:
             file_path: Path to the file to extract data from
             
@@ -75,15 +109,94 @@ class DataExtractor:
         Raises:
             ValueError: If the file format is not supported
         """
-        file_extension = os.path.splitext(file_path)[1].lower()
+        file_extension = data_extension(file_path)
         
         if file_extension == '.csv':
             return DataExtractor._extract_from_csv(file_path), 'csv'
-        elif file_extension == '.json':
+        elif file_extension in JSON_EXTENSIONS:
             return DataExtractor._extract_from_json(file_path), 'json'
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
     
+    @staticmethod
+    def should_stream(file_path: str) -> bool:
+        """
+        Decide whether a file is large enough to be extracted in chunks.
+        
+        Compressed files are judged by their estimated uncompressed size.
+        
+        Args:
+            file_path: Path to the file to check
+            
+        Returns:
+            bool: True if the file should be extracted in chunks
+        """
+        return estimated_size(file_path) >= STREAMING_THRESHOLD_BYTES
+    
+    @staticmethod
+    def extract_chunks_from_file(file_path: str, chunk_size: int = CHUNK_SIZE) -> Tuple[Iterator[pd.DataFrame], str]:
+        """
+        Extract data from a file as a stream of bounded-size DataFrame chunks.
+        
+        Args:
+            file_path: Path to the file to extract data from
+            chunk_size: Maximum number of rows per chunk
+            
+        Returns:
+            tuple: (Iterator of DataFrame chunks, source format)
+            
+        Raises:
+            ValueError: If the file format is not supported
+        """
+        file_extension = data_extension(file_path)
+        
+        if file_extension == '.csv':
+            return DataExtractor._extract_chunks_from_csv(file_path, chunk_size), 'csv'
+        elif file_extension in JSON_EXTENSIONS:
+            return DataExtractor._extract_chunks_from_json(file_path, chunk_size), 'json'
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+    
+    @staticmethod
+    def _extract_chunks_from_csv(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Extract data from a CSV file in chunks of at most chunk_size rows.
+        
+        Args:
+            file_path: Path to the CSV file
+            chunk_size: Maximum number of rows per chunk
+            
+        Yields:
+            DataFrame chunks of the extracted data
+        """
+        logger.info(f"Extracting data from CSV file in chunks of {chunk_size} rows: {file_path}")
+        try:
+            with open_input(file_path) as f, pd.read_csv(f, chunksize=chunk_size) as reader:
+                for chunk in reader:
+                    yield chunk
+        except Exception as e:
+            logger.error(f"Error extracting data from CSV file: {e}")
+            raise
+    
+    @staticmethod
+    def _extract_chunks_from_json(file_path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+        """
+        Extract data from a JSON file in batches of at most chunk_size records.
+        
+        Args:
+            file_path: Path to the JSON file
+            chunk_size: Maximum number of records per chunk
+            
+        Yields:
+            DataFrame chunks of the extracted data
+        """
+        logger.info(f"Extracting data from JSON file in chunks of {chunk_size} records: {file_path}")
+        try:
+            yield from JSONRecordStream(file_path, chunk_size).iter_batches()
+        except Exception as e:
+            logger.error(f"Error extracting data from JSON file: {e}")
+            raise
+    
     @staticmethod
     def _extract_from_csv(file_path: str) -> pd.DataFrame:
         """
@@ -98,7 +211,8 @@ class DataExtractor:
         logger.info(f"Extracting data from CSV file: {file_path}")
         try:
             # Read CSV file into a pandas DataFrame
-            df = pd.read_csv(file_path)
+            with open_input(file_path) as f:
+                df = pd.read_csv(f)
             return df
         except Exception as e:
             logger.error(f"Error extracting data from CSV file: {e}")
@@ -117,24 +231,17 @@ class DataExtractor:
         """
         logger.info(f"Extracting data from JSON file: {file_path}")
         try:
-            # Read JSON file into a pandas DataFrame
-            with open(file_path, 'r') as f:
-                data = json.load(f)
-            
-            # Handle different JSON structures
-            if isinstance(data, list):
-                # List of records
-                df = pd.DataFrame(data)
-            elif isinstance(data, dict):
-                if all(isinstance(data[key], dict) for key in data):
-                    # Dictionary of dictionaries
-                    df = pd.DataFrame.from_dict(data, orient='index')
-                else:
-                    # Single record
-                    df = pd.DataFrame([data])
+            # Parse the JSON file incrementally, one batch of records at a time
+            batches = list(JSONRecordStream(file_path).iter_batches())
+            
+            if not batches:
+                # Empty array
+                df = pd.DataFrame()
+            elif len(batches) == 1:
+                df = batches[0]
             else:
-                raise ValueError(f"Unsupported JSON structure in {file_path}")
-                
+                df = pd.concat(batches, ignore_index=True)
+            
             return df
         except Exception as e:
             logger.error(f"Error extracting data from JSON file: {e}")
@@ -157,15 +264,30 @@ class DataNormalizer:
         Returns:
             Normalized DataFrame
         """
+        normalized_df, _ = DataNormalizer.normalize_with_report(df)
+        return normalized_df
+    
+    @staticmethod
+    def normalize_with_report(df: pd.DataFrame, max_depth: Optional[int] = FLATTEN_MAX_DEPTH) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Normalize a DataFrame and report which nested columns were flattened.
+        
+        Args:
+            df: DataFrame to normalize
+            max_depth: Maximum number of dict levels to expand into columns
+            
+        Returns:
+            tuple: (Normalized DataFrame, flattening report)
+        """
         logger.info("Normalizing data")
         
         # Convert column names to snake_case
         df = DataNormalizer._convert_columns_to_snake_case(df)
         
         # Flatten nested structures if present
-        df = DataNormalizer._flatten_nested_structures(df)
+        df, report = NestedFlattener(max_depth).flatten(df)
         
-        return df
+        return df, report
     
     @staticmethod
     def _convert_columns_to_snake_case(df: pd.DataFrame) -> pd.DataFrame:
@@ -194,46 +316,148 @@ class DataNormalizer:
         return df_copy
     
     @staticmethod
-    def _flatten_nested_structures(df: pd.DataFrame) -> pd.DataFrame:
+    def _flatten_nested_structures(df: pd.DataFrame, max_depth: Optional[int] = FLATTEN_MAX_DEPTH) -> pd.DataFrame:
         """
         Flatten nested structures (dicts, lists) in the DataFrame.
         
         Args:
             df: DataFrame with potentially nested structures
+            max_depth: Maximum number of dict levels to expand into columns
             
         Returns:
             Flattened DataFrame
         """
-        # Check for columns with nested structures
-        nested_columns = []
-        for col in df.columns:
-            if df[col].apply(lambda x: isinstance(x, (dict, list))).any():
-                nested_columns.append(col)
+        flattened_df, _ = NestedFlattener(max_depth).flatten(df)
+        return flattened_df
+
+
+class NestedFlattener:
+    """
+    Flattens nested dict and list values in a single pass over the object columns.
+    
+    Each object column is scanned once to collect the full nested key schema, and
+    all of its flattened columns are then filled in one more pass over its values,
+    so nesting depth does not cause repeated passes over the whole DataFrame.
+    Nested keys are joined with '.' and prefixed with the source column name,
+    matching the column names pd.json_normalize produced previously.
+    """
+    
+    def __init__(self, max_depth: Optional[int] = None):
+        """
+        Initialize the flattener.
         
-        # If no nested structures, return the original DataFrame
-        if not nested_columns:
-            return df
+        Args:
+            max_depth: Maximum number of dict levels to expand into columns.
+                Dicts nested deeper are stored as JSON strings. None expands all levels.
+        """
+        self.max_depth = max_depth
+    
+    def flatten(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Flatten nested structures (dicts, lists) in the DataFrame.
         
-        # Process each column with nested structures
-        df_copy = df.copy()
-        for col in nested_columns:
-            # For columns with dictionaries
-            if df[col].apply(lambda x: isinstance(x, dict)).any():
-                # Convert the column to a DataFrame and add prefix
-                nested_df = pd.json_normalize(df_copy[col].tolist())
-                nested_df.columns = [f"{col}_{subcol}" for subcol in nested_df.columns]
+        Args:
+            df: DataFrame with potentially nested structures
+            
+        Returns:
+            tuple: (Flattened DataFrame, report of expanded and JSON-stringified columns)
+        """
+        report = {
+            'expanded_columns': [],
+            'stringified_columns': [],
+            'max_depth': self.max_depth
+        }
+        replaced_columns = {}
+        new_columns = {}
+        
+        for col in df.columns:
+            if df[col].dtype != object:
+                continue
+            
+            values = df[col].tolist()
+            has_dict = False
+            has_list = False
+            paths = {}
+            
+            # Scan the column once to find its nested key schema
+            for value in values:
+                if isinstance(value, dict):
+                    has_dict = True
+                    self._collect_paths(value, (), 1, paths)
+                elif isinstance(value, list):
+                    has_list = True
+            
+            if has_dict:
+                # Build all flattened columns for this source column in one pass
+                flat_values = {path: [np.nan] * len(values) for path in paths}
+                stringified_paths = set()
+                for row, value in enumerate(values):
+                    if isinstance(value, dict):
+                        self._fill_row(value, (), 1, row, flat_values, stringified_paths)
                 
-                # Drop the original column and join with the new columns
-                df_copy = df_copy.drop(columns=[col])
-                df_copy = pd.concat([df_copy.reset_index(drop=True), nested_df], axis=1)
+                for path, column_values in flat_values.items():
+                    name = f"{col}_{'.'.join(path)}"
+                    new_columns[name] = column_values
+                    if path in stringified_paths:
+                        report['stringified_columns'].append(name)
+                report['expanded_columns'].append(col)
             
-            # For columns with lists
-            elif df[col].apply(lambda x: isinstance(x, list)).any():
+            elif has_list:
                 # Convert lists to string representation
-                df_copy[col] = df_copy[col].apply(lambda x: json.dumps(x) if isinstance(x, list) else x)
+                replaced_columns[col] = [json.dumps(x) if isinstance(x, list) else x for x in values]
+                report['stringified_columns'].append(col)
+        
+        # If no nested structures, return the original DataFrame
+        if not replaced_columns and not new_columns:
+            return df, report
+        
+        # Assemble the output frame in a single allocation; expanded columns are
+        # dropped and their flattened columns appended at the end
+        expanded = set(report['expanded_columns'])
+        data = {}
+        for col in df.columns:
+            if col not in expanded:
+                data[col] = replaced_columns.get(col, df[col])
+        data.update(new_columns)
         
-        # Recursively flatten any newly created nested structures
-        return DataNormalizer._flatten_nested_structures(df_copy)
+        return pd.DataFrame(data, index=df.index), report
+    
+    def _collect_paths(self, value: Dict[str, Any], prefix: Tuple[str, ...], depth: int, paths: Dict[Tuple[str, ...], None]):
+        """Record the leaf key paths of a nested dict, in first-seen order."""
+        for key, sub_value in value.items():
+            path = prefix + (str(key),)
+            if self._expands(sub_value, depth):
+                self._collect_paths(sub_value, path, depth + 1, paths)
+            else:
+                paths.setdefault(path, None)
+    
+    def _fill_row(
+        self,
+        value: Dict[str, Any],
+        prefix: Tuple[str, ...],
+        depth: int,
+        row: int,
+        flat_values: Dict[Tuple[str, ...], List[Any]],
+        stringified_paths: set
+    ):
+        """Write the leaf values of one row's nested dict into the flattened columns."""
+        for key, sub_value in value.items():
+            path = prefix + (str(key),)
+            if self._expands(sub_value, depth):
+                self._fill_row(sub_value, path, depth + 1, row, flat_values, stringified_paths)
+            elif isinstance(sub_value, (dict, list)):
+                flat_values[path][row] = json.dumps(sub_value)
+                stringified_paths.add(path)
+            else:
+                flat_values[path][row] = sub_value
+    
+    def _expands(self, value: Any, depth: int) -> bool:
+        """Check whether a nested value is expanded into further columns."""
+        return (
+            isinstance(value, dict)
+            and bool(value)
+            and (self.max_depth is None or depth < self.max_depth)
+        )
 
 
 class MetadataManager:
@@ -242,7 +466,12 @@ class MetadataManager:
     """
     
     @staticmethod
-    def attach_metadata(df: pd.DataFrame, filename: str, source_format: str) -> Dict[str, Any]:
+    def attach_metadata(
+        df: pd.DataFrame,
+        filename: str,
+        source_format: str,
+        flatten_report: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Attach metadata to a dataset.
         
@@ -250,6 +479,7 @@ class MetadataManager:
             df: DataFrame containing the data
             filename: Name of the source file
             source_format: Format of the source file (CSV or JSON)
+            flatten_report: Report of the columns flattened during normalization
             
         Returns:
             Dictionary containing the data and metadata
@@ -257,14 +487,7 @@ class MetadataManager:
         logger.info(f"Attaching metadata to dataset from {filename}")
         
         # Create metadata
-        metadata = {
-            'filename': filename,
-            'timestamp': datetime.datetime.now().isoformat(),
-            'source_format': source_format,
-            'row_count': len(df),
-            'column_count': len(df.columns),
-            'columns': list(df.columns)
-        }
+        metadata = MetadataManager.create_metadata(df, filename, source_format, flatten_report)
         
         # Create payload with data and metadata
         payload = {
@@ -273,6 +496,123 @@ class MetadataManager:
         }
         
         return payload
+    
+    @staticmethod
+    def create_metadata(
+        df: pd.DataFrame,
+        filename: str,
+        source_format: str,
+        flatten_report: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Create the metadata for a dataset without building a payload.
+        
+        Args:
+            df: DataFrame containing the data
+            filename: Name of the source file
+            source_format: Format of the source file (CSV or JSON)
+            flatten_report: Report of the columns flattened during normalization
+            
+        Returns:
+            Dictionary containing the metadata
+        """
+        metadata = MetadataManager.build_metadata(filename, source_format, len(df), list(df.columns))
+        if flatten_report is not None:
+            metadata['flattening'] = flatten_report
+        return metadata
+    
+    @staticmethod
+    def build_metadata(filename: str, source_format: str, row_count: int, columns: List[str]) -> Dict[str, Any]:
+        """
+        Build the metadata block for a dataset.
+        
+        Args:
+            filename: Name of the source file
+            source_format: Format of the source file (CSV or JSON)
+            row_count: Number of rows in the dataset
+            columns: Column names of the dataset
+            
+        Returns:
+            Dictionary containing the metadata
+        """
+        return {
+            'filename': filename,
+            'timestamp': datetime.datetime.now().isoformat(),
+            'source_format': source_format,
+            'row_count': row_count,
+            'column_count': len(columns),
+            'columns': columns
+        }
+
+
+class IncrementalMetadata:
+    """
+    Accumulates dataset metadata one chunk at a time, so the final row count and
+    column list are known without holding the whole dataset in memory.
+    """
+    
+    def __init__(self, filename: str, source_format: str):
+        """
+        Initialize the accumulator.
+        
+        Args:
+            filename: Name of the source file
+            source_format: Format of the source file (CSV or JSON)
+        """
+        self.filename = filename
+        self.source_format = source_format
+        self.row_count = 0
+        self.columns = {}
+        self.flatten_report = None
+    
+    def update(self, df: pd.DataFrame):
+        """
+        Fold a chunk into the running metadata.
+        
+        Args:
+            df: DataFrame chunk that was written to the output
+        """
+        self.row_count += len(df)
+        
+        # Keep first-seen column order across chunks
+        for column in df.columns:
+            self.columns.setdefault(column, None)
+    
+    def add_flatten_report(self, report: Dict[str, Any]):
+        """
+        Merge a chunk's flattening report into the running metadata.
+        
+        Args:
+            report: Flattening report returned by DataNormalizer.normalize_with_report
+        """
+        if self.flatten_report is None:
+            self.flatten_report = {
+                'expanded_columns': [],
+                'stringified_columns': [],
+                'max_depth': report.get('max_depth')
+            }
+        
+        for key in ('expanded_columns', 'stringified_columns'):
+            for column in report.get(key, []):
+                if column not in self.flatten_report[key]:
+                    self.flatten_report[key].append(column)
+    
+    def to_metadata(self) -> Dict[str, Any]:
+        """
+        Build the final metadata block.
+        
+        Returns:
+            Dictionary containing the metadata
+        """
+        metadata = MetadataManager.build_metadata(
+            self.filename,
+            self.source_format,
+            self.row_count,
+            list(self.columns)
+        )
+        if self.flatten_report is not None:
+            metadata['flattening'] = self.flatten_report
+        return metadata
 
 
 class DataForwarder:
@@ -295,8 +635,8 @@ class DataForwarder:
         # Ensure the processed directory exists
         os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
         
-        # Get the base filename without extension
-        base_filename = os.path.splitext(os.path.basename(original_filename))[0]
+        # Get the base filename without data and compression extensions
+        base_filename = source_stem(original_filename)
         
         # Create the output filename
         output_filename = os.path.join(PROCESSED_DATA_DIR, f"{base_filename}.json")
@@ -309,6 +649,77 @@ class DataForwarder:
         
         return output_filename
     
+    @staticmethod
+    def forward_frame_to_processed(
+        df: pd.DataFrame,
+        metadata: Dict[str, Any],
+        original_filename: str,
+        output_format: str
+    ) -> str:
+        """
+        Forward processed data to the processed directory in a columnar format.
+        
+        The DataFrame is written column by column with the metadata embedded in
+        the same file, without converting rows to dictionaries.
+        
+        Args:
+            df: DataFrame containing the processed data
+            metadata: Metadata dictionary for the dataset
+            original_filename: Name of the original source file
+            output_format: Payload format, e.g. 'parquet' or 'npz'
+            
+        Returns:
+            Path to the saved file
+        """
+        # Ensure the processed directory exists
+        os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+        
+        # Get the base filename without data and compression extensions
+        base_filename = source_stem(original_filename)
+        
+        with PayloadWriter(os.path.join(PROCESSED_DATA_DIR, base_filename), output_format) as writer:
+            logger.info(f"Forwarding processed data to {writer.path}")
+            writer.write_chunk(df)
+            return writer.close(metadata)
+    
+    @staticmethod
+    def forward_stream_to_processed(
+        chunks: Iterator[pd.DataFrame],
+        metadata: IncrementalMetadata,
+        output_format: str = 'json'
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Forward a stream of processed chunks to the processed directory.
+        
+        Each chunk is appended to the output as soon as it arrives, and the metadata
+        block is written after the last chunk, so only one chunk is held in memory
+        at a time. JSON output has the same 'metadata' and 'data' keys as the
+        output of forward_to_processed.
+        
+        Args:
+            chunks: Iterator of normalized DataFrame chunks
+            metadata: Accumulator for the metadata of the streamed dataset
+            output_format: Payload format: 'json', 'parquet' or 'npz'
+            
+        Returns:
+            tuple: (Path to the saved file, metadata dictionary)
+        """
+        # Ensure the processed directory exists
+        os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
+        
+        # Get the base filename without data and compression extensions
+        base_filename = source_stem(metadata.filename)
+        
+        with PayloadWriter(os.path.join(PROCESSED_DATA_DIR, base_filename), output_format) as writer:
+            logger.info(f"Streaming processed data to {writer.path}")
+            
+            for chunk in chunks:
+                writer.write_chunk(chunk)
+                metadata.update(chunk)
+            
+            final_metadata = metadata.to_metadata()
+            return writer.close(final_metadata), final_metadata
+    
     @staticmethod
     def prepare_for_message_passing(payload: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -330,11 +741,96 @@ class DataForwarder:
         return payload
 
 
+class CSVTailReader:
+    """
+    Reads the rows appended to a CSV file since a given byte offset.
+    """
+    
+    @staticmethod
+    def read_new_rows(
+        file_path: str,
+        offset: int,
+        header: Optional[str],
+        max_bytes: int = TAIL_READ_BYTES
+    ) -> Tuple[Optional[pd.DataFrame], int, Optional[str]]:
+        """
+        Parse the complete lines written after the offset, up to about max_bytes.
+        
+        A trailing line without a newline is still being written and is left for the
+        next read. Quoted fields containing newlines are not supported in followed files.
+        Call again from the returned offset until it stops advancing to read the rest.
+        
+        Args:
+            file_path: Path to the CSV file
+            offset: Byte offset just past the last consumed line
+            header: Header line of the file, or None if it has not been read yet
+            max_bytes: Number of bytes to read, extended to the end of the last line
+            
+        Returns:
+            Tuple of (DataFrame of the new rows or None, new offset, header line)
+        """
+        with open(file_path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(max_bytes)
+            
+            # Finish the line the batch ends in rather than splitting it
+            if data and not data.endswith(b'\n'):
+                data += f.readline()
+        
+        # Only consume up to the last complete line
+        end = data.rfind(b'\n')
+        if end < 0:
+            return None, offset, header
+        
+        data = data[:end + 1]
+        new_offset = offset + end + 1
+        
+        if header is None:
+            header_end = data.find(b'\n')
+            header = data[:header_end].rstrip(b'\r').decode('utf-8-sig')
+            data = data[header_end + 1:]
+        
+        if not data.strip():
+            return None, new_offset, header
+        
+        df = pd.read_csv(io.BytesIO(header.encode('utf-8') + b'\n' + data))
+        return df, new_offset, header
+
+
 class FileEventHandler(FileSystemEventHandler):
     """
     Handles file system events for the watchdog observer.
     """
     
+    def __init__(
+        self,
+        workers: int = QUEUE_WORKERS,
+        queue_size: int = QUEUE_MAX_SIZE,
+        debounce_seconds: float = DEBOUNCE_SECONDS,
+        tail_follow: bool = TAIL_FOLLOW
+    ):
+        """
+        Initialize the file event handler.
+        
+        Args:
+            workers: Number of worker threads processing detected files
+            queue_size: Maximum number of detected files waiting to be processed
+            debounce_seconds: Interval between size checks of a detected file
+            tail_follow: Whether CSV files are followed as append-only logs
+        """
+        self.manifest = FileManifest('extraction')
+        self.tail_follow = tail_follow
+        self.tail_offsets = TailOffsetStore() if tail_follow else None
+        self._tail_locks = {}
+        self._tail_locks_guard = threading.Lock()
+        self.work_queue = FileWorkQueue(
+            self._process_tracked_file,
+            workers=workers,
+            max_size=queue_size,
+            debounce_seconds=debounce_seconds,
+            name='extraction'
+        )
+    
     def on_created(self, event):
         """
         Handle file creation events.
@@ -343,33 +839,125 @@ class FileEventHandler(FileSystemEventHandler):
             event: File system event
         """
         if not event.is_directory:
-            file_path = event.src_path
-            file_extension = os.path.splitext(file_path)[1].lower()
+            self._enqueue_file(event.src_path)
+    
+    def on_moved(self, event):
+        """
+        Handle file move events, e.g. files renamed into the directory once fully written.
+        
+        Args:
+            event: File system event
+        """
+        if not event.is_directory:
+            self._enqueue_file(event.dest_path)
+    
+    def on_modified(self, event):
+        """
+        Handle file modification events of followed append-only files.
+        
+        Args:
+            event: File system event
+        """
+        if not event.is_directory and self.is_followed(event.src_path):
+            logger.debug(f"Appended data detected: {event.src_path}")
             
-            # Only process CSV and JSON files
-            if file_extension in ['.csv', '.json']:
-                logger.info(f"New file detected: {file_path}")
-                self._process_file(file_path)
+            # Only complete lines are read, so there is no need to wait for the writer
+            self.work_queue.submit(event.src_path, wait_until_stable=False)
     
-    def _process_file(self, file_path: str):
+    def is_followed(self, file_path: str) -> bool:
+        """
+        Check whether a file is followed as an append-only log.
+        
+        Args:
+            file_path: Path to the file
+            
+        Returns:
+            True if tail-follow mode applies to the file
+        """
+        return self.tail_follow and os.path.splitext(file_path)[1].lower() == '.csv'
+    
+    def _enqueue_file(self, file_path: str):
+        """
+        Queue a supported file for processing by the worker threads.
+        
+        Args:
+            file_path: Path to the detected file
+        """
+        file_extension = data_extension(file_path)
+        
+        # Only process CSV and JSON files, optionally compressed
+        if file_extension in SUPPORTED_EXTENSIONS:
+            logger.info(f"New file detected: {file_path}")
+            self.work_queue.submit(file_path)
+    
+    def _process_tracked_file(self, file_path: str) -> bool:
+        """
+        Process a file and record it in the processed-file manifest on success.
+        
+        Args:
+            file_path: Path to the file to process
+            
+        Returns:
+            True if the file was processed successfully, False otherwise
+        """
+        # Followed files keep their own read offset; hashing them on every append
+        # would make each delta cost as much as the whole file
+        if self.is_followed(file_path):
+            return self._process_file(file_path)
+        
+        return process_and_record(self.manifest, self._process_file, file_path)
+    
+    def _process_file(self, file_path: str) -> bool:
         """
         Process a new file.
         
         Args:
             file_path: Path to the file to process
+            
+        Returns:
+            True if the file was processed successfully, False otherwise
         """
         try:
+            # Append-only files are read from the last processed offset
+            if self.is_followed(file_path):
+                return self._process_appended_rows(file_path)
+            
+            # Large files are streamed through the pipeline chunk by chunk
+            if DataExtractor.should_stream(file_path):
+                output_path = process_file_streaming(file_path)
+                logger.info(f"File processed successfully: {file_path} -> {output_path}")
+                return True
+            
             # Extract data from the file
             df, source_format = DataExtractor.extract_from_file(file_path)
             
             # Normalize the data
-            normalized_df = DataNormalizer.normalize(df)
+            normalized_df, flatten_report = DataNormalizer.normalize_with_report(df)
+            
+            # Large outputs are written in a columnar format without building records
+            output_format = resolve_output_format(file_path)
+            if output_format != 'json':
+                metadata = MetadataManager.create_metadata(
+                    normalized_df,
+                    os.path.basename(file_path),
+                    source_format,
+                    flatten_report
+                )
+                output_path = DataForwarder.forward_frame_to_processed(
+                    normalized_df,
+                    metadata,
+                    os.path.basename(file_path),
+                    output_format
+                )
+                logger.info(f"File processed successfully: {file_path} -> {output_path}")
+                return True
             
             # Attach metadata
             payload = MetadataManager.attach_metadata(
                 normalized_df, 
                 os.path.basename(file_path),
-                source_format
+                source_format,
+                flatten_report
             )
             
             # Prepare for message passing (future integration)
@@ -382,9 +970,145 @@ class FileEventHandler(FileSystemEventHandler):
             )
             
             logger.info(f"File processed successfully: {file_path} -> {output_path}")
+            return True
             
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
+            return False
+    
+    def _process_appended_rows(self, file_path: str) -> bool:
+        """
+        Extract the rows appended to a followed file since its last read.
+        
+        The first read of a file produces the regular processed output; later reads
+        produce delta files (<name>.delta_<seq>) whose metadata names the source in 'delta_of'.
+        
+        Args:
+            file_path: Path to the followed CSV file
+            
+        Returns:
+            True if the new rows were processed (or there were none)
+        """
+        with self._tail_locks_guard:
+            lock = self._tail_locks.setdefault(os.path.abspath(file_path), threading.Lock())
+        
+        with lock:
+            stat = os.stat(file_path)
+            state = self.tail_offsets.get(file_path)
+            
+            # A replaced or truncated file is read again from the start
+            if state is not None and (state['inode'] != stat.st_ino or stat.st_size < state['offset']):
+                logger.info(f"File was replaced or truncated, reading it from the start: {file_path}")
+                state = None
+            
+            offset = state['offset'] if state else 0
+            header = state['header'] if state else None
+            seq = start_seq = state['seq'] if state else 0
+            
+            # The backlog is read in bounded batches, each saved before the next is read
+            while True:
+                df, new_offset, header = CSVTailReader.read_new_rows(file_path, offset, header, TAIL_READ_BYTES)
+                
+                if df is None:
+                    if new_offset == offset:
+                        break
+                    self.tail_offsets.save(file_path, new_offset, header, stat.st_ino, seq)
+                    offset = new_offset
+                    continue
+                
+                output_path = self._forward_appended_rows(file_path, df, offset, new_offset, seq)
+                
+                # Only advance the offset once the rows have been written
+                self.tail_offsets.save(file_path, new_offset, header, stat.st_ino, seq + 1)
+                
+                logger.info(f"Processed {len(df)} new rows: {file_path} -> {output_path}")
+                offset, seq = new_offset, seq + 1
+            
+            if seq == start_seq:
+                logger.info(f"No new rows in {file_path}")
+            return True
+    
+    def _forward_appended_rows(self, file_path: str, df: pd.DataFrame, offset: int, new_offset: int, seq: int) -> str:
+        """
+        Normalize and forward one batch of rows read from a followed file.
+        
+        Args:
+            file_path: Path to the followed CSV file
+            df: Rows read from the byte range [offset, new_offset)
+            offset: Byte offset the batch starts at
+            new_offset: Byte offset just past the batch
+            seq: Sequence number of the batch (0 for the first read of the file)
+            
+        Returns:
+            Path to the forwarded file
+        """
+        # Normalize the new rows
+        normalized_df, flatten_report = DataNormalizer.normalize_with_report(df)
+        
+        filename = os.path.basename(file_path)
+        metadata = MetadataManager.create_metadata(normalized_df, filename, 'csv', flatten_report)
+        
+        output_name = filename
+        if seq > 0:
+            base_name, extension = os.path.splitext(filename)
+            output_name = f"{base_name}.delta_{seq:06d}{extension}"
+            metadata.update({
+                'delta_of': filename,
+                'delta_seq': seq,
+                'byte_range': [offset, new_offset]
+            })
+        
+        output_format = resolve_output_format()
+        if output_format == 'json':
+            payload = DataForwarder.prepare_for_message_passing({
+                'metadata': metadata,
+                'data': normalized_df.to_dict(orient='records')
+            })
+            return DataForwarder.forward_to_processed(payload, output_name)
+        
+        return DataForwarder.forward_frame_to_processed(
+            normalized_df,
+            metadata,
+            output_name,
+            output_format
+        )
+
+
+def process_file_streaming(file_path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    """
+    Extract, normalize and forward a file in bounded-size chunks.
+    
+    Peak memory depends on chunk_size rather than on the size of the file.
+    
+    Args:
+        file_path: Path to the file to process
+        chunk_size: Maximum number of rows per chunk
+        
+    Returns:
+        Path to the saved file
+    """
+    logger.info(f"Streaming file through the pipeline: {file_path}")
+    
+    # Extract data from the file lazily
+    chunks, source_format = DataExtractor.extract_chunks_from_file(file_path, chunk_size)
+    metadata = IncrementalMetadata(os.path.basename(file_path), source_format)
+    
+    def normalized_chunks():
+        # Normalize each chunk as it is read
+        for chunk in chunks:
+            normalized_chunk, flatten_report = DataNormalizer.normalize_with_report(chunk)
+            metadata.add_flatten_report(flatten_report)
+            yield normalized_chunk
+    
+    # Forward to processed directory, writing each chunk as it arrives
+    output_path, final_metadata = DataForwarder.forward_stream_to_processed(
+        normalized_chunks(),
+        metadata,
+        resolve_output_format(file_path, streaming=True)
+    )
+    
+    logger.info(f"Streamed {final_metadata['row_count']} rows to {output_path}")
+    return output_path
 
 
 class ExtractionAgent:
@@ -392,19 +1116,43 @@ class ExtractionAgent:
     Main class for the Extraction Agent.
     """
     
-    def __init__(self):
-        """Initialize the Extraction Agent."""
+    def __init__(
+        self,
+        workers: int = QUEUE_WORKERS,
+        queue_size: int = QUEUE_MAX_SIZE,
+        debounce_seconds: float = DEBOUNCE_SECONDS,
+        rebuild_manifest: bool = False,
+        tail_follow: bool = TAIL_FOLLOW
+    ):
+        """
+        Initialize the Extraction Agent.
+        
+        Args:
+            workers: Number of worker threads processing detected files
+            queue_size: Maximum number of detected files waiting to be processed
+            debounce_seconds: Interval between size checks of a detected file
+            rebuild_manifest: Forget previously processed files so existing files are all reprocessed
+            tail_follow: Whether CSV files are followed as append-only logs
+        """
         # Ensure the raw and processed directories exist
         os.makedirs(RAW_DATA_DIR, exist_ok=True)
         os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
         
         self.observer = Observer()
-        self.event_handler = FileEventHandler()
+        self.event_handler = FileEventHandler(workers, queue_size, debounce_seconds, tail_follow)
+        
+        if rebuild_manifest:
+            self.event_handler.manifest.clear()
+            if tail_follow:
+                self.event_handler.tail_offsets.clear()
     
     def start(self):
         """Start monitoring the raw data directory."""
         logger.info(f"Starting to monitor directory: {RAW_DATA_DIR}")
         
+        # Start the workers before the observer and the existing files queue anything
+        self.event_handler.work_queue.start()
+        
         # Schedule the observer to watch the raw data directory
         self.observer.schedule(self.event_handler, RAW_DATA_DIR, recursive=False)
         self.observer.start()
@@ -413,12 +1161,12 @@ class ExtractionAgent:
             # Process any existing files in the directory
             self._process_existing_files()
             
-            # Keep the main thread alive
-            while True:
-                time.sleep(1)
+            # Keep the main thread alive, reporting queue depth and latency
+            run_with_metrics(self.event_handler.work_queue)
         except KeyboardInterrupt:
             logger.info("Stopping the observer due to keyboard interrupt")
             self.observer.stop()
+            self.event_handler.work_queue.stop(wait=False)
         
         self.observer.join()
     
@@ -431,10 +1179,16 @@ class ExtractionAgent:
             
             # Only process files (not directories)
             if os.path.isfile(file_path):
-                file_extension = os.path.splitext(file_path)[1].lower()
+                file_extension = data_extension(file_path)
                 
-                # Only process CSV and JSON files
-                if file_extension in ['.csv', '.json']:
+                # Only process CSV and JSON files, optionally compressed
+                if file_extension in SUPPORTED_EXTENSIONS:
+                    # Skip files already processed in their current state; followed
+                    # files are always checked for rows appended while the agent was down
+                    if not self.event_handler.is_followed(file_path) and self.event_handler.manifest.is_processed(file_path):
+                        logger.info(f"Skipping unchanged file: {file_path}")
+                        continue
+                    
                     logger.info(f"Processing existing file: {file_path}")
                     
                     # Create a file created event and process it
@@ -444,10 +1198,24 @@ class ExtractionAgent:
 
 def main():
     """Main entry point for the Extraction Agent."""
+    parser = argparse.ArgumentParser(description='Extraction Agent')
+    add_queue_arguments(parser)
+    parser.add_argument('--rebuild-manifest', action='store_true',
+                        help='Ignore the processed-file manifest and reprocess all existing files')
+    parser.add_argument('--tail-follow', action='store_true', default=TAIL_FOLLOW,
+                        help='Follow CSV files as append-only logs and extract only appended rows')
+    args = parser.parse_args()
+    
     logger.info("Initializing Extraction Agent")
     
     # Create and start the extraction agent
-    agent = ExtractionAgent()
+    agent = ExtractionAgent(
+        workers=args.workers,
+        queue_size=args.queue_size,
+        debounce_seconds=args.debounce,
+        rebuild_manifest=args.rebuild_manifest,
+        tail_follow=args.tail_follow
+    )
     agent.start()
 
 
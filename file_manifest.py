@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Processed File Manifest for the Watchdog Agents
+
+This module keeps a persistent record of the files each agent has processed, so that
+restarting an agent does not reprocess its whole watched directory. Entries are keyed by
+agent and path and store the size, modification time and SHA-256 hash of the file at the
+time it was processed. A file whose size and modification time are unchanged is skipped
+with a single lookup; otherwise its content hash decides whether it is processed again.
+
+The same database also stores the read offsets of append-only files followed in
+tail-follow mode (see TailOffsetStore).
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# Configure logging
+logger = logging.getLogger('file_manifest')
+
+# Define paths
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+MANIFEST_PATH = os.getenv('ETL_MANIFEST_PATH', os.path.join(SCRIPT_DIR, 'logs', 'file_manifest.db'))
+
+# Read size used when hashing file contents
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+@contextmanager
+def _connect(db_path: str) -> Iterator[sqlite3.Connection]:
+    """
+    Open a connection to the manifest database, committing and closing it on exit.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Yields:
+        SQLite connection
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+class FileManifest:
+    """
+    Persistent manifest of the files processed by one agent.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, agent_name: str, db_path: str = MANIFEST_PATH):
+        """
+        Initialize the manifest and create its table if needed.
+
+        Args:
+            agent_name: Name of the agent owning the entries (e.g. 'extraction')
+            db_path: Path to the SQLite database file
+        """
+        self.agent_name = agent_name
+        self.db_path = db_path
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        with _connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS processed_files (
+                    agent TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    processed_at REAL NOT NULL,
+                    PRIMARY KEY (agent, path)
+                )
+                """
+            )
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """
+        Compute the SHA-256 hash of a file's contents.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Hex digest of the file contents
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint(file_path: str) -> Dict[str, Any]:
+        """
+        Capture the size, modification time and content hash of a file.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Dictionary with path, size, mtime_ns and content_hash
+        """
+        stat = os.stat(file_path)
+        return {
+            'path': os.path.abspath(file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'content_hash': FileManifest.hash_file(file_path)
+        }
+
+    def is_processed(self, file_path: str) -> bool:
+        """
+        Check whether the file was already processed in its current state.
+
+        Unchanged size and modification time are trusted without reading the file;
+        otherwise the content hash is compared.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            True if the file matches its manifest entry, False otherwise
+        """
+        path = os.path.abspath(file_path)
+
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+
+        with self._lock, _connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT size, mtime_ns, content_hash FROM processed_files WHERE agent = ? AND path = ?",
+                (self.agent_name, path)
+            ).fetchone()
+
+        if row is None:
+            return False
+
+        size, mtime_ns, content_hash = row
+        if stat.st_size == size and stat.st_mtime_ns == mtime_ns:
+            return True
+
+        # Files of a different size cannot have the same content
+        if stat.st_size != size:
+            return False
+
+        if self.hash_file(path) != content_hash:
+            return False
+
+        # Same content with a new modification time (e.g. touched or copied back)
+        with self._lock, _connect(self.db_path) as conn:
+            conn.execute(
+                "UPDATE processed_files SET mtime_ns = ? WHERE agent = ? AND path = ?",
+                (stat.st_mtime_ns, self.agent_name, path)
+            )
+        return True
+
+    def record(self, file_path: str, fingerprint: Optional[Dict[str, Any]] = None):
+        """
+        Record a file as processed.
+
+        Args:
+            file_path: Path to the file
+            fingerprint: Fingerprint taken before processing; computed now if omitted
+        """
+        if fingerprint is None:
+            fingerprint = self.fingerprint(file_path)
+
+        with self._lock, _connect(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO processed_files
+                    (agent, path, size, mtime_ns, content_hash, processed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    self.agent_name,
+                    os.path.abspath(file_path),
+                    fingerprint['size'],
+                    fingerprint['mtime_ns'],
+                    fingerprint['content_hash'],
+                    time.time()
+                )
+            )
+
+    def clear(self) -> int:
+        """
+        Remove all entries of this agent so every file is processed again.
+
+        Returns:
+            Number of removed entries
+        """
+        with self._lock, _connect(self.db_path) as conn:
+            cursor = conn.execute("DELETE FROM processed_files WHERE agent = ?", (self.agent_name,))
+            removed = cursor.rowcount
+
+        logger.info(f"Cleared {removed} manifest entries for {self.agent_name}")
+        return removed
+
+
+class TailOffsetStore:
+    """
+    Persistent read position of append-only files followed in tail-follow mode.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, db_path: str = MANIFEST_PATH):
+        """
+        Initialize the store and create its table if needed.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = db_path
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        with _connect(self.db_path) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tail_offsets (
+                    path TEXT PRIMARY KEY,
+                    byte_offset INTEGER NOT NULL,
+                    header TEXT,
+                    inode INTEGER NOT NULL,
+                    batch_seq INTEGER NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored read position of a file.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            Dictionary with offset, header, inode and seq, or None if the file is not tracked
+        """
+        with self._lock, _connect(self.db_path) as conn:
+            row = conn.execute(
+                "SELECT byte_offset, header, inode, batch_seq FROM tail_offsets WHERE path = ?",
+                (os.path.abspath(file_path),)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {'offset': row[0], 'header': row[1], 'inode': row[2], 'seq': row[3]}
+
+    def save(self, file_path: str, offset: int, header: Optional[str], inode: int, seq: int):
+        """
+        Store the read position of a file.
+
+        Args:
+            file_path: Path to the file
+            offset: Byte offset just past the last consumed line
+            header: Header line of the file
+            inode: Inode of the file, used to detect replaced files
+            seq: Number of batches emitted for the file so far
+        """
+        with self._lock, _connect(self.db_path) as conn:
+            conn.execute(
+                """
+                INSERT OR REPLACE INTO tail_offsets
+                    (path, byte_offset, header, inode, batch_seq, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                (os.path.abspath(file_path), offset, header, inode, seq, time.time())
+            )
+
+    def clear(self) -> int:
+        """
+        Forget all stored read positions so followed files are read from the start.
+
+        Returns:
+            Number of removed entries
+        """
+        with self._lock, _connect(self.db_path) as conn:
+            removed = conn.execute("DELETE FROM tail_offsets").rowcount
+
+        logger.info(f"Cleared {removed} tail-follow offsets")
+        return removed
+
+
+def process_and_record(manifest: FileManifest, process_fn, file_path: str, pass_fingerprint: bool = False) -> bool:
+    """
+    Process a file and record it in the manifest if processing succeeds.
+
+    The fingerprint is taken before processing, so it describes the content that was
+    processed even if the file is moved or rewritten afterwards.
+
+    Args:
+        manifest: Manifest to record the file in
+        process_fn: Function that processes the file and returns True on success
+        file_path: Path to the file
+        pass_fingerprint: Whether to call process_fn(file_path, fingerprint), so it can
+            reuse the content hash instead of reading the file again
+
+    Returns:
+        True if the file was processed successfully, False otherwise
+    """
+    try:
+        fingerprint = FileManifest.fingerprint(file_path)
+    except OSError as e:
+        logger.error(f"Error fingerprinting file {file_path}: {e}")
+        return False
+
+    success = process_fn(file_path, fingerprint) if pass_fingerprint else process_fn(file_path)
+
+    if success:
+        try:
+            manifest.record(file_path, fingerprint)
+        except Exception as e:
+            logger.error(f"Error recording file {file_path} in the manifest: {e}")
+
+    return success
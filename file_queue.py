@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+File Work Queue for the Watchdog Agents
+
+This module separates file event intake from file processing for the extraction,
+transformation and loading agents. The watchdog observer thread only enqueues paths;
+a pool of worker threads waits until each file has stopped growing and then processes it.
+Paths are deduplicated while they are waiting, and the queue is bounded so that a burst
+of events applies backpressure instead of growing without limit.
+"""
+
+import os
+import time
+import queue
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# Configure logging
+logger = logging.getLogger('file_queue')
+
+# Number of worker threads draining the queue
+QUEUE_WORKERS = int(os.getenv('ETL_QUEUE_WORKERS', '1'))
+
+# Maximum number of files waiting in the queue
+QUEUE_MAX_SIZE = int(os.getenv('ETL_QUEUE_MAX_SIZE', '1000'))
+
+# Interval between size checks while waiting for a file to stop growing
+DEBOUNCE_SECONDS = float(os.getenv('ETL_DEBOUNCE_SECONDS', '1.0'))
+
+# Longest time to wait for a file to stop growing before processing it anyway
+DEBOUNCE_MAX_SECONDS = float(os.getenv('ETL_DEBOUNCE_MAX_SECONDS', '300'))
+
+# Interval between queue metric log lines (0 disables them)
+METRICS_LOG_INTERVAL = float(os.getenv('ETL_QUEUE_METRICS_INTERVAL', '60'))
+
+
+def add_queue_arguments(parser):
+    """
+    Add the work queue options to an argument parser.
+
+    Args:
+        parser: argparse.ArgumentParser to extend
+    """
+    parser.add_argument('--workers', type=int, default=QUEUE_WORKERS,
+                        help='Number of worker threads processing detected files (default: 1)')
+    parser.add_argument('--queue-size', type=int, default=QUEUE_MAX_SIZE,
+                        help='Maximum number of detected files waiting to be processed')
+    parser.add_argument('--debounce', type=float, default=DEBOUNCE_SECONDS,
+                        help='Seconds between size checks while waiting for a file to be fully written')
+
+
+class FileWorkQueue:
+    """
+    Bounded, deduplicating queue of file paths drained by a pool of worker threads.
+    """
+
+    def __init__(
+        self,
+        process_fn: Callable[[str], Any],
+        workers: int = QUEUE_WORKERS,
+        max_size: int = QUEUE_MAX_SIZE,
+        debounce_seconds: float = DEBOUNCE_SECONDS,
+        name: str = 'file_queue'
+    ):
+        """
+        Initialize the work queue.
+
+        Args:
+            process_fn: Function called with the path of each file to process
+            workers: Number of worker threads
+            max_size: Maximum number of queued files; submit() blocks when full
+            debounce_seconds: Interval between size checks of a queued file
+            name: Name used for worker threads and log messages
+        """
+        self.process_fn = process_fn
+        self.workers = max(1, workers)
+        self.debounce_seconds = debounce_seconds
+        self.name = name
+
+        self._queue = queue.Queue(maxsize=max(1, max_size))
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._stop_event = threading.Event()
+
+        self._in_flight = 0
+        self._processed = 0
+        self._failed = 0
+        self._total_latency = 0.0
+        self._total_processing = 0.0
+        self._max_latency = 0.0
+        self._last_latency = None
+
+    def start(self):
+        """Start the worker threads."""
+        if self._threads:
+            return
+
+        self._stop_event.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+        logger.info(f"Started {self.workers} worker thread(s) for {self.name}")
+
+    def submit(self, file_path: str, wait_until_stable: bool = True) -> bool:
+        """
+        Queue a file for processing.
+
+        Args:
+            file_path: Path to the file
+            wait_until_stable: Whether to wait for the file to stop growing before processing it
+
+        Returns:
+            True if the file was queued, False if it was already waiting
+        """
+        file_path = os.path.abspath(file_path)
+
+        with self._lock:
+            if file_path in self._pending:
+                logger.debug(f"File already queued: {file_path}")
+                return False
+            self._pending.add(file_path)
+
+        if self._queue.full():
+            logger.warning(f"{self.name} queue is full ({self._queue.maxsize} files); waiting for space")
+
+        # Blocks the caller while the queue is full
+        self._queue.put((file_path, time.monotonic(), wait_until_stable))
+        return True
+
+    def join(self):
+        """Block until every queued file has been processed."""
+        self._queue.join()
+
+    def stop(self, wait: bool = True):
+        """
+        Stop the worker threads.
+
+        Args:
+            wait: Whether to finish the queued files before returning
+        """
+        if wait:
+            self._queue.join()
+
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=self.debounce_seconds + 1)
+        self._threads = []
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the current queue metrics.
+
+        Returns:
+            Dictionary with queue depth, in-flight count, counters and latencies in seconds
+        """
+        with self._lock:
+            completed = self._processed + self._failed
+            return {
+                'queue_depth': self._queue.qsize(),
+                'pending': len(self._pending),
+                'in_flight': self._in_flight,
+                'processed': self._processed,
+                'failed': self._failed,
+                'avg_latency': self._total_latency / completed if completed else None,
+                'avg_processing_time': self._total_processing / completed if completed else None,
+                'max_latency': self._max_latency if completed else None,
+                'last_latency': self._last_latency
+            }
+
+    def log_metrics(self):
+        """Log the current queue metrics."""
+        metrics = self.metrics()
+        avg_latency = f"{metrics['avg_latency']:.2f}s" if metrics['avg_latency'] is not None else 'n/a'
+        max_latency = f"{metrics['max_latency']:.2f}s" if metrics['max_latency'] is not None else 'n/a'
+        logger.info(
+            f"{self.name} queue: depth={metrics['queue_depth']} in_flight={metrics['in_flight']} "
+            f"processed={metrics['processed']} failed={metrics['failed']} "
+            f"avg_latency={avg_latency} max_latency={max_latency}"
+        )
+
+    def _wait_until_stable(self, file_path: str) -> bool:
+        """
+        Wait until the file size stops changing between two checks.
+
+        Args:
+            file_path: Path to the file
+
+        Returns:
+            True if the file is ready, False if it disappeared
+        """
+        deadline = time.monotonic() + DEBOUNCE_MAX_SECONDS
+        previous = None
+
+        while not self._stop_event.is_set():
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                return False
+
+            current = (stat.st_size, stat.st_mtime_ns)
+            if current == previous:
+                return True
+
+            if time.monotonic() >= deadline:
+                logger.warning(f"File still changing after {DEBOUNCE_MAX_SECONDS}s, processing anyway: {file_path}")
+                return True
+
+            previous = current
+            time.sleep(self.debounce_seconds)
+
+        return False
+
+    def _worker(self):
+        """Drain the queue until the queue is stopped."""
+        while not self._stop_event.is_set():
+            try:
+                file_path, enqueued_at, wait_until_stable = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                if wait_until_stable:
+                    ready = self._wait_until_stable(file_path)
+                else:
+                    ready = os.path.exists(file_path)
+
+                # New events for this path may be queued again from here on
+                with self._lock:
+                    self._pending.discard(file_path)
+                    if ready:
+                        self._in_flight += 1
+
+                if not ready:
+                    logger.info(f"File no longer available, skipping: {file_path}")
+                    continue
+
+                started_at = time.monotonic()
+                success = True
+                try:
+                    result = self.process_fn(file_path)
+                    success = result is not False
+                except Exception as e:
+                    success = False
+                    logger.error(f"Error processing file {file_path}: {e}")
+
+                finished_at = time.monotonic()
+                with self._lock:
+                    self._in_flight -= 1
+                    if success:
+                        self._processed += 1
+                    else:
+                        self._failed += 1
+                    latency = finished_at - enqueued_at
+                    self._total_latency += latency
+                    self._total_processing += finished_at - started_at
+                    self._max_latency = max(self._max_latency, latency)
+                    self._last_latency = latency
+            finally:
+                self._queue.task_done()
+
+
+def run_with_metrics(
+    work_queue: Optional[FileWorkQueue],
+    interval: float = METRICS_LOG_INTERVAL,
+    log_extra_metrics: Optional[Callable[[], Any]] = None
+):
+    """
+    Keep the calling thread alive, logging queue metrics periodically.
+
+    Args:
+        work_queue: Queue whose metrics are logged, or None
+        interval: Seconds between metric log lines (0 disables them)
+        log_extra_metrics: Function logging further metrics of the agent at the same interval
+    """
+    last_logged = time.monotonic()
+
+    while True:
+        time.sleep(1)
+
+        if work_queue is not None and interval > 0 and time.monotonic() - last_logged >= interval:
+            work_queue.log_metrics()
+            if log_extra_metrics is not None:
+                log_extra_metrics()
+            last_logged = time.monotonic()
@@ -0,0 +1,624 @@
+#!/usr/bin/env python3
+"""
+Fused Extract-Transform-Load Pipeline
+
+This script runs the extraction, transformation and loading stages on a raw file in a
+single process, passing the DataFrame from stage to stage in memory. The agents hand
+data off through data/processed and data/enriched, which costs a full serialize and
+parse cycle per stage; here those files are optional checkpoints.
+
+Files large enough to be extracted in chunks are never combined into one DataFrame:
+a first pass collects the statistics the transformations need, and a second pass
+transforms and loads one chunk at a time.
+
+Usage:
+    python fused_pipeline.py [FILE ...] [--checkpoint processed|enriched|all] [--no-load]
+                             [--fit-mode none|fit|apply] [--workers N] [--column-workers N]
+
+Without FILE arguments, all supported files in data/raw are processed.
+"""
+
+import os
+import sys
+import logging
+import argparse
+from contextlib import nullcontext
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger('fused_pipeline')
+
+try:
+    import pandas as pd
+
+    from etl_agent import (
+        DataExtractor,
+        DataNormalizer,
+        IncrementalMetadata,
+        MetadataManager as ExtractionMetadataManager,
+        DataForwarder as ProcessedForwarder,
+        SUPPORTED_EXTENSIONS,
+        RAW_DATA_DIR
+    )
+    from transformation_agent import (
+        DataLoader as ProcessedDataLoader,
+        TaggingSystem,
+        DataTransformer,
+        MetadataManager as EnrichmentMetadataManager,
+        DataForwarder as EnrichedForwarder,
+        ChunkedTransformation,
+        ColumnExecutor,
+        TransformationLogger,
+        TAGS_CONFIG_PATH,
+        ENRICHED_DATA_DIR,
+        FIT_MODES,
+        FIT_MODE,
+        COLUMN_WORKERS
+    )
+    from loading_agent import (
+        DatabaseManager,
+        SchemaInferrer,
+        LoadingLogger,
+        ENGINE_REGISTRY,
+        log_database_metrics
+    )
+    from payload_store import PayloadWriter, resolve_output_format, COLUMNAR_EXTENSIONS
+    from compressed_input import data_extension, source_stem
+    from batch_runner import run_batch, add_worker_argument
+    from file_manifest import FileManifest
+    from tag_config import TAG_CONFIG_REGISTRY
+except ImportError as e:
+    logger.error(f"Error importing pipeline components: {e}")
+    logger.error("Make sure you're running this script from the etl_agent directory")
+    sys.exit(1)
+
+# Stages whose output can be written as a checkpoint file
+CHECKPOINT_STAGES = ['processed', 'enriched']
+
+# Checkpoints written by default, e.g. 'processed,enriched' (empty = none)
+DEFAULT_CHECKPOINTS = [
+    stage.strip() for stage in os.getenv('ETL_PIPELINE_CHECKPOINTS', '').split(',') if stage.strip()
+]
+
+
+class FusedPipeline:
+    """
+    Runs extraction, transformation and loading on in-memory DataFrames.
+    """
+
+    def __init__(
+        self,
+        checkpoints: Optional[List[str]] = None,
+        load: bool = True,
+        fit_mode: Optional[str] = None,
+        column_workers: Optional[int] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            checkpoints: Stages whose output is also written to disk ('processed', 'enriched')
+            load: Whether to load the transformed data into the database
+            fit_mode: 'none', 'fit' or 'apply' (see DataTransformer.transform_data)
+            column_workers: Number of threads transforming columns (see ColumnExecutor)
+
+        Raises:
+            ValueError: If an unknown checkpoint stage is requested
+        """
+        self.checkpoints = set(checkpoints or [])
+        unknown = self.checkpoints - set(CHECKPOINT_STAGES)
+        if unknown:
+            raise ValueError(f"Unknown checkpoint stage(s): {', '.join(sorted(unknown))}")
+
+        self.load = load
+        self.tagging_system = TaggingSystem(TAGS_CONFIG_PATH)
+        self.data_transformer = DataTransformer(self.tagging_system, fit_mode, column_workers)
+        self.db_manager = DatabaseManager() if load else None
+
+    def process_file(self, file_path: str) -> bool:
+        """
+        Run a raw file through all pipeline stages.
+
+        Args:
+            file_path: Path to the raw file
+
+        Returns:
+            True if the file was processed successfully, False otherwise
+        """
+        filename = os.path.basename(file_path)
+        logger.info(f"Running fused pipeline on: {file_path}")
+
+        try:
+            # Large files are transformed and loaded in two passes over chunks
+            if DataExtractor.should_stream(file_path):
+                result = self.process_stream(file_path)
+                if result is not None:
+                    table_name, row_count = result
+                    if self.load:
+                        logger.info(f"File processed successfully: {file_path} -> {table_name} ({row_count} rows)")
+                    else:
+                        logger.info(f"File processed successfully: {file_path} ({row_count} rows, not loaded)")
+                    return True
+
+            df, metadata = self.extract(file_path)
+            transformed_df, enriched_metadata = self.transform(df, metadata, file_path)
+
+            if self.load:
+                table_name, row_count = self.load_frame(
+                    transformed_df, filename, checkpoint_key=FileManifest.hash_file(file_path)
+                )
+                logger.info(f"File processed successfully: {file_path} -> {table_name} ({row_count} rows)")
+            else:
+                logger.info(f"File processed successfully: {file_path} ({len(transformed_df)} rows, not loaded)")
+
+            return True
+        except Exception as e:
+            logger.error(f"Error processing file {file_path}: {e}")
+            return False
+
+    def process_stream(self, file_path: str) -> Optional[Tuple[str, int]]:
+        """
+        Run a large raw file through all pipeline stages without loading it whole.
+
+        The first pass normalizes the chunks, writing the processed checkpoint if
+        requested, and collects the statistics of the whole dataset. The second pass
+        transforms the chunks with them and loads each one as it is produced. The
+        second pass reads the processed checkpoint when it is columnar and
+        re-extracts the raw file otherwise.
+
+        Args:
+            file_path: Path to the raw file
+
+        Returns:
+            tuple: (table name, number of rows), or None if the chunks do not share
+            one set of columns and the file has to be processed whole
+        """
+        filename = os.path.basename(file_path)
+        chunks, source_format = DataExtractor.extract_chunks_from_file(file_path)
+        incremental_metadata = IncrementalMetadata(filename, source_format)
+
+        def chunk_source() -> Iterator[pd.DataFrame]:
+            return self._normalized_chunks(DataExtractor.extract_chunks_from_file(file_path)[0])
+
+        # First pass: normalize and collect statistics
+        try:
+            if 'processed' in self.checkpoints:
+                checkpoint_path, metadata = ProcessedForwarder.forward_stream_to_processed(
+                    self._normalized_chunks(chunks, incremental_metadata),
+                    incremental_metadata,
+                    resolve_output_format(file_path, streaming=True)
+                )
+                if os.path.splitext(checkpoint_path)[1].lower() in COLUMNAR_EXTENSIONS:
+                    chunk_source = partial(ChunkedTransformation.iter_chunks, checkpoint_path)
+                statistics = self.data_transformer.fit_statistics(chunk_source())
+            else:
+                def counted_chunks() -> Iterator[pd.DataFrame]:
+                    for chunk in self._normalized_chunks(chunks, incremental_metadata):
+                        incremental_metadata.update(chunk)
+                        yield chunk
+
+                statistics = self.data_transformer.fit_statistics(counted_chunks())
+                metadata = incremental_metadata.to_metadata()
+        except ValueError as e:
+            logger.warning(f"Cannot transform {file_path} in chunks ({e}); processing it whole")
+            return None
+
+        if not statistics.columns:
+            return None
+
+        dataset = ProcessedDataLoader.dataset_name(file_path, metadata)
+        self.data_transformer.save_fitted_state(dataset, statistics)
+
+        # Second pass: transform and load one chunk at a time
+        transformation_metadata = {}
+        output_columns = []
+
+        def transformed_chunks() -> Iterator[pd.DataFrame]:
+            for transformed in ChunkedTransformation(self.data_transformer).transform_chunks(
+                chunk_source(),
+                statistics,
+                transformation_metadata,
+                dataset
+            ):
+                if not output_columns:
+                    output_columns.extend(transformed.columns)
+                yield transformed
+
+        chunks = transformed_chunks()
+        writer = None
+        if 'enriched' in self.checkpoints:
+            os.makedirs(ENRICHED_DATA_DIR, exist_ok=True)
+            writer = PayloadWriter(
+                os.path.join(ENRICHED_DATA_DIR, source_stem(file_path)),
+                resolve_output_format(file_path, streaming=True)
+            )
+            chunks = self._write_through(chunks, writer)
+
+        with writer if writer is not None else nullcontext():
+            table_name = source_stem(filename)
+            if self.load:
+                table_name, row_count = self.load_chunks(
+                    chunks, filename, checkpoint_key=FileManifest.hash_file(file_path)
+                )
+            else:
+                row_count = sum(len(chunk) for chunk in chunks)
+
+            enriched_metadata = EnrichmentMetadataManager.build_enriched_metadata(
+                pd.DataFrame(columns=output_columns),
+                metadata,
+                statistics.field_tags,
+                transformation_metadata,
+                row_count=statistics.row_count
+            )
+            output_path = writer.close(enriched_metadata) if writer is not None else ''
+
+        # Log the transformation
+        TransformationLogger.log_transformation(
+            filename,
+            metadata.get('source_format', 'unknown'),
+            statistics.row_count,
+            len(statistics.columns),
+            statistics.field_tags,
+            transformation_metadata,
+            'success',
+            output_path
+        )
+
+        return table_name, row_count
+
+    def extract(self, file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Extract and normalize a raw file.
+
+        Large files whose chunks cannot be transformed one at a time (see
+        process_stream) are read and normalized chunk by chunk, then combined.
+
+        Args:
+            file_path: Path to the raw file
+
+        Returns:
+            tuple: (normalized DataFrame, processed metadata)
+        """
+        filename = os.path.basename(file_path)
+
+        if not DataExtractor.should_stream(file_path):
+            df, source_format = DataExtractor.extract_from_file(file_path)
+            normalized_df, flatten_report = DataNormalizer.normalize_with_report(df)
+            metadata = ExtractionMetadataManager.create_metadata(
+                normalized_df,
+                filename,
+                source_format,
+                flatten_report
+            )
+
+            if 'processed' in self.checkpoints:
+                self._checkpoint_processed(normalized_df, metadata, file_path)
+
+            return normalized_df, metadata
+
+        chunks, source_format = DataExtractor.extract_chunks_from_file(file_path)
+        incremental_metadata = IncrementalMetadata(filename, source_format)
+        normalized_chunks = []
+
+        def normalize_chunks():
+            for chunk in chunks:
+                normalized_chunk, flatten_report = DataNormalizer.normalize_with_report(chunk)
+                incremental_metadata.add_flatten_report(flatten_report)
+                normalized_chunks.append(normalized_chunk)
+                yield normalized_chunk
+
+        if 'processed' in self.checkpoints:
+            # The checkpoint is written as the chunks are normalized
+            _, metadata = ProcessedForwarder.forward_stream_to_processed(
+                normalize_chunks(),
+                incremental_metadata,
+                resolve_output_format(file_path, streaming=True)
+            )
+        else:
+            for normalized_chunk in normalize_chunks():
+                incremental_metadata.update(normalized_chunk)
+            metadata = incremental_metadata.to_metadata()
+
+        if not normalized_chunks:
+            return pd.DataFrame(), metadata
+
+        return pd.concat(normalized_chunks, ignore_index=True), metadata
+
+    def transform(
+        self,
+        df: pd.DataFrame,
+        metadata: Dict[str, Any],
+        file_path: str
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Tag and transform a normalized DataFrame.
+
+        Args:
+            df: Normalized DataFrame
+            metadata: Processed metadata of the dataset
+            file_path: Path to the raw file
+
+        Returns:
+            tuple: (transformed DataFrame, enriched metadata)
+        """
+        # Inspect data types and apply semantic tags
+        datatypes = ProcessedDataLoader.inspect_datatypes(df)
+        field_tags = self.tagging_system.tag_fields(df, datatypes)
+
+        # Apply transformations
+        transformed_df, transformation_metadata = self.data_transformer.transform_data(
+            df,
+            field_tags,
+            ProcessedDataLoader.dataset_name(file_path, metadata)
+        )
+
+        enriched_metadata = EnrichmentMetadataManager.build_enriched_metadata(
+            transformed_df,
+            metadata,
+            field_tags,
+            transformation_metadata
+        )
+
+        output_path = ''
+        if 'enriched' in self.checkpoints:
+            output_path = self._checkpoint_enriched(transformed_df, enriched_metadata, file_path)
+
+        # Log the transformation
+        TransformationLogger.log_transformation(
+            os.path.basename(file_path),
+            metadata.get('source_format', 'unknown'),
+            len(df),
+            len(df.columns),
+            field_tags,
+            transformation_metadata,
+            'success',
+            output_path
+        )
+
+        return transformed_df, enriched_metadata
+
+    def load_frame(self, df: pd.DataFrame, filename: str, checkpoint_key: Optional[str] = None) -> Tuple[str, int]:
+        """
+        Load a transformed DataFrame into the table named after the source file.
+
+        Args:
+            df: Transformed DataFrame
+            filename: Name of the raw source file
+            checkpoint_key: Key identifying the load across retries (see load_chunks)
+
+        Returns:
+            tuple: (table name, number of rows loaded)
+        """
+        return self.load_chunks([df], filename, checkpoint_key)
+
+    def load_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        filename: str,
+        checkpoint_key: Optional[str] = None
+    ) -> Tuple[str, int]:
+        """
+        Load transformed DataFrame chunks into the table named after the source file.
+
+        Each chunk is loaded as a whole (see DatabaseManager.load_data). With a
+        checkpoint key, typically the hash of the raw file, rows are committed in
+        checkpointed chunks and a retry of the same file skips the rows already
+        committed. A missing table is created from the schema of the first chunk.
+
+        Args:
+            chunks: Transformed DataFrame chunks
+            filename: Name of the raw source file
+            checkpoint_key: Key identifying the load across retries, or None to load
+                each chunk in one transaction
+
+        Returns:
+            tuple: (table name, number of rows loaded)
+        """
+        table_name = source_stem(filename)
+        row_count = 0
+
+        try:
+            self.db_manager.connect()
+            table_ready = False
+
+            for df in chunks:
+                # Create the table if it doesn't exist yet
+                if not table_ready:
+                    if not self.db_manager.table_exists(table_name):
+                        schema = SchemaInferrer.infer_schema(df)
+                        self.db_manager.create_table(table_name, schema)
+                    table_ready = True
+
+                row_count += self.db_manager.load_data(
+                    table_name, df, checkpoint_key=checkpoint_key, row_offset=row_count, complete=False
+                )
+
+            if checkpoint_key is not None:
+                self.db_manager.clear_checkpoints(table_name, checkpoint_key)
+
+            LoadingLogger.log_loading(filename, table_name, row_count, 'success', '')
+            return table_name, row_count
+        except Exception as e:
+            try:
+                LoadingLogger.log_loading(filename, table_name, row_count, f'error: {str(e)}', '')
+            except Exception as log_error:
+                logger.error(f"Error logging loading operation: {log_error}")
+            raise
+        finally:
+            self.db_manager.disconnect()
+
+    @staticmethod
+    def _normalized_chunks(
+        chunks: Iterable[pd.DataFrame],
+        metadata: Optional[IncrementalMetadata] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Normalize extracted chunks one at a time.
+
+        Args:
+            chunks: Raw DataFrame chunks
+            metadata: Accumulator receiving the flattening reports of the chunks
+
+        Yields:
+            Normalized DataFrame chunks
+        """
+        for chunk in chunks:
+            normalized_chunk, flatten_report = DataNormalizer.normalize_with_report(chunk)
+            if metadata is not None:
+                metadata.add_flatten_report(flatten_report)
+            yield normalized_chunk
+
+    @staticmethod
+    def _write_through(chunks: Iterable[pd.DataFrame], writer: PayloadWriter) -> Iterator[pd.DataFrame]:
+        """
+        Append chunks to a checkpoint payload as they pass through.
+
+        Args:
+            chunks: Transformed DataFrame chunks
+            writer: Open writer of the enriched checkpoint
+
+        Yields:
+            The same chunks, after they are written
+        """
+        for chunk in chunks:
+            writer.write_chunk(chunk)
+            yield chunk
+
+    def _checkpoint_processed(self, df: pd.DataFrame, metadata: Dict[str, Any], file_path: str) -> str:
+        """
+        Write the normalized data to data/processed, as the extraction agent would.
+
+        Args:
+            df: Normalized DataFrame
+            metadata: Processed metadata of the dataset
+            file_path: Path to the raw file
+
+        Returns:
+            Path to the checkpoint file
+        """
+        filename = os.path.basename(file_path)
+        output_format = resolve_output_format(file_path)
+
+        if output_format == 'json':
+            payload = {'metadata': metadata, 'data': df.to_dict(orient='records')}
+            return ProcessedForwarder.forward_to_processed(payload, filename)
+
+        return ProcessedForwarder.forward_frame_to_processed(df, metadata, filename, output_format)
+
+    def _checkpoint_enriched(self, df: pd.DataFrame, metadata: Dict[str, Any], file_path: str) -> str:
+        """
+        Write the transformed data to data/enriched, as the transformation agent would.
+
+        Args:
+            df: Transformed DataFrame
+            metadata: Enriched metadata of the dataset
+            file_path: Path to the raw file
+
+        Returns:
+            Path to the checkpoint file
+        """
+        output_name = f"{source_stem(file_path)}.json"
+        output_format = resolve_output_format(file_path)
+
+        if output_format == 'json':
+            payload = {'metadata': metadata, 'data': df.to_dict(orient='records')}
+            return EnrichedForwarder.forward_to_enriched(payload, output_name)
+
+        return EnrichedForwarder.forward_frame_to_enriched(df, metadata, output_name, output_format)
+
+
+def run_file(
+    file_path: str,
+    checkpoints: Optional[List[str]] = None,
+    load: bool = True,
+    fit_mode: Optional[str] = None,
+    column_workers: Optional[int] = None
+) -> bool:
+    """
+    Run one raw file through the fused pipeline.
+
+    Args:
+        file_path: Path to the raw file
+        checkpoints: Stages whose output is also written to disk
+        load: Whether to load the transformed data into the database
+        fit_mode: 'none', 'fit' or 'apply' (see DataTransformer.transform_data)
+        column_workers: Number of threads transforming columns (see ColumnExecutor)
+
+    Returns:
+        True if the file was processed successfully, False otherwise
+    """
+    return FusedPipeline(checkpoints, load, fit_mode, column_workers).process_file(file_path)
+
+
+def main():
+    """Run the fused pipeline on the given files or on all raw files."""
+    parser = argparse.ArgumentParser(description='Run extraction, transformation and loading in one process')
+    parser.add_argument('files', nargs='*',
+                        help='Raw files to process (default: all supported files in data/raw)')
+    parser.add_argument('--checkpoint', choices=CHECKPOINT_STAGES + ['all'], action='append',
+                        help='Also write the output of a stage to disk (can be repeated)')
+    parser.add_argument('--no-load', action='store_true',
+                        help='Stop after the transformation stage')
+    parser.add_argument('--fit-mode', choices=FIT_MODES, default=FIT_MODE,
+                        help="Store ('fit') or reuse ('apply') normalization parameters and categories per dataset")
+    parser.add_argument('--column-workers', type=int, default=COLUMN_WORKERS,
+                        help='Number of threads transforming the columns of a file (0: share the CPUs between workers, 1: serial)')
+    add_worker_argument(parser)
+    args = parser.parse_args()
+
+    checkpoints = args.checkpoint if args.checkpoint is not None else DEFAULT_CHECKPOINTS
+    if 'all' in checkpoints:
+        checkpoints = list(CHECKPOINT_STAGES)
+
+    # Initialize the logs written by the transformation and loading stages
+    TransformationLogger.initialize_log()
+    if not args.no_load:
+        LoadingLogger.initialize_log()
+
+    files_to_process = args.files
+    if not files_to_process:
+        logger.info(f"Looking for files in: {RAW_DATA_DIR}")
+        os.makedirs(RAW_DATA_DIR, exist_ok=True)
+
+        for filename in os.listdir(RAW_DATA_DIR):
+            file_path = os.path.join(RAW_DATA_DIR, filename)
+
+            # Only process CSV and JSON files, optionally compressed
+            if os.path.isfile(file_path) and data_extension(file_path) in SUPPORTED_EXTENSIONS:
+                files_to_process.append(file_path)
+
+    if not files_to_process:
+        logger.info(f"No CSV or JSON files found in {RAW_DATA_DIR}")
+        return
+
+    logger.info(f"Found {len(files_to_process)} files to process")
+
+    # Worker processes each get their share of the CPUs for column threads
+    column_workers = args.column_workers or ColumnExecutor.cpu_budget(args.workers)
+
+    worker_fn = partial(
+        run_file,
+        checkpoints=checkpoints,
+        load=not args.no_load,
+        fit_mode=args.fit_mode,
+        column_workers=column_workers
+    )
+    success_count = run_batch(worker_fn, files_to_process, workers=args.workers)
+
+    logger.info(f"Processing complete. {success_count}/{len(files_to_process)} files processed successfully.")
+
+    # Worker processes keep their own registries, so only in-process runs are reported
+    if args.workers <= 1:
+        TAG_CONFIG_REGISTRY.log_metrics()
+        if not args.no_load:
+            log_database_metrics()
+            ENGINE_REGISTRY.dispose()
+
+
+if __name__ == "__main__":
+    main()
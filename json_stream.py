@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Incremental JSON Parsing for the Extraction Agent
+
+This module parses JSON inputs into DataFrame batches without decoding the whole
+document at once. It is shared by the extraction agent and the standalone processor.
+Top-level arrays of records, newline-delimited JSON, dicts of dicts and single-record
+documents are supported; compressed inputs are opened through compressed_input.
+"""
+
+import os
+import json
+import itertools
+from typing import Any, Dict, Iterator, Optional
+
+import pandas as pd
+
+from compressed_input import open_input
+
+# Default number of records per batch
+CHUNK_SIZE = int(os.getenv('ETL_CHUNK_SIZE', '50000'))
+
+
+class JSONRecordStream:
+    """
+    Incrementally parses a JSON file into DataFrame batches.
+
+    Top-level arrays and newline-delimited JSON are decoded one record at a time,
+    so only the current batch of records is held as Python objects. Dict-of-dicts
+    and single-record documents have to be inspected as a whole to detect their
+    shape, so they are decoded in full and yielded as a single batch.
+    """
+
+    READ_SIZE = 1024 * 1024
+    WHITESPACE = ' \t\r\n'
+
+    def __init__(self, file_path: str, batch_size: int = CHUNK_SIZE):
+        """
+        Initialize the stream.
+
+        Args:
+            file_path: Path to the JSON file
+            batch_size: Maximum number of records per DataFrame batch
+        """
+        self.file_path = file_path
+        self.batch_size = batch_size
+        self.structure = None
+        self._decoder = json.JSONDecoder()
+        self._file = None
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def iter_batches(self) -> Iterator[pd.DataFrame]:
+        """
+        Parse the file and yield its records as DataFrame batches.
+
+        Yields:
+            DataFrame batches of at most batch_size records
+
+        Raises:
+            ValueError: If the JSON structure is not supported
+        """
+        with open_input(self.file_path, text=True) as f:
+            self._file = f
+            self._buffer = ''
+            self._pos = 0
+            self._eof = False
+
+            first_char = self._peek_char()
+            if first_char == '[':
+                # Top-level array of records
+                self.structure = 'array'
+                self._pos += 1
+                records = self._iter_array_records()
+            elif first_char == '{':
+                first_value = self._decode_value()
+                if self._peek_char() is None:
+                    # A single document: dict of dicts or a single record
+                    yield self._frame_from_document(first_value)
+                    return
+
+                # More values follow the first object: newline-delimited JSON
+                self.structure = 'ndjson'
+                records = itertools.chain([first_value], self._iter_ndjson_records())
+            else:
+                raise ValueError(f"Unsupported JSON structure in {self.file_path}")
+
+            batch = []
+            for record in records:
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    yield pd.DataFrame(batch)
+                    batch = []
+            if batch:
+                yield pd.DataFrame(batch)
+
+    def _frame_from_document(self, data: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Build a DataFrame from a fully decoded top-level JSON object.
+
+        Args:
+            data: Decoded JSON object
+
+        Returns:
+            DataFrame containing the document's records
+        """
+        if all(isinstance(data[key], dict) for key in data):
+            # Dictionary of dictionaries
+            self.structure = 'dict_of_dicts'
+            return pd.DataFrame.from_dict(data, orient='index')
+
+        # Single record
+        self.structure = 'single_record'
+        return pd.DataFrame([data])
+
+    def _iter_array_records(self) -> Iterator[Any]:
+        """
+        Yield the elements of a top-level array, one at a time.
+
+        Raises:
+            ValueError: If the array is truncated, its elements are not separated by
+                exactly one comma, or anything but whitespace follows it
+        """
+        char = self._peek_char()
+        if char != ']':
+            while True:
+                if char is None:
+                    raise ValueError(f"Unexpected end of JSON array in {self.file_path}")
+                if char in ',]':
+                    raise ValueError(f"Expected a value before '{char}' in JSON array in {self.file_path}")
+                yield self._decode_value()
+
+                char = self._peek_char()
+                if char == ']':
+                    break
+                if char is None:
+                    raise ValueError(f"Unexpected end of JSON array in {self.file_path}")
+                if char != ',':
+                    raise ValueError(f"Expected ',' or ']' after an element of JSON array in {self.file_path}")
+                self._pos += 1
+                char = self._peek_char()
+
+        self._pos += 1
+        if self._peek_char() is not None:
+            raise ValueError(f"Unexpected content after JSON array in {self.file_path}")
+
+    def _iter_ndjson_records(self) -> Iterator[Any]:
+        """Yield the remaining values of a newline-delimited JSON file."""
+        while self._peek_char() is not None:
+            yield self._decode_value()
+
+    def _fill(self) -> bool:
+        """
+        Read more of the file into the buffer, discarding consumed input.
+
+        The read size grows with the buffer, so a single large value is re-scanned
+        a logarithmic rather than linear number of times.
+
+        Returns:
+            bool: False if the end of the file was reached
+        """
+        if self._eof:
+            return False
+
+        data = self._file.read(max(self.READ_SIZE, len(self._buffer) - self._pos))
+        if not data:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _peek_char(self) -> Optional[str]:
+        """
+        Skip whitespace and return the next character without consuming it.
+
+        Returns:
+            The next non-whitespace character, or None at the end of the file
+        """
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in self.WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return None
+
+    def _decode_value(self) -> Any:
+        """
+        Decode the next JSON value from the buffer, reading more input as needed.
+
+        Returns:
+            The decoded value
+        """
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+                # A value ending exactly at the buffer edge may be a truncated number
+                if end < len(self._buffer) or not self._fill():
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
@@ -19,13 +19,17 @@ The code is designed to be modular with clear separation between:
 """
 
 import os
+import io
 import json
 import csv
 import time
 import logging
+import argparse
+import threading
 import datetime
 import re
 import shutil
+from contextlib import contextmanager
 import pandas as pd
 from pathlib import Path
 from typing import Dict, List, Any, Union, Optional, Tuple
@@ -38,8 +42,15 @@ try:
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler, FileCreatedEvent
     import sqlalchemy
-    from sqlalchemy import create_engine, MetaData, Table, Column, String, DateTime, inspect
-    from sqlalchemy.types import Integer, Float, Boolean, Text, Date
+    import yaml
+    from sqlalchemy import (
+        create_engine, event, MetaData, Table, Column, String, DateTime, Index, UniqueConstraint,
+        inspect, select, func, true
+    )
+    from sqlalchemy.dialects import postgresql, sqlite
+    from sqlalchemy.engine import make_url
+    from sqlalchemy.schema import CreateTable, DropTable
+    from sqlalchemy.types import Integer, BigInteger, Float, Boolean, Text, Date
     from dotenv import load_dotenv
 except ImportError as e:
     print(f"Error: Required package not found: {e}")
@@ -48,12 +59,17 @@ except ImportError as e:
     print("  - watchdog: For file monitoring")
     print("  - sqlalchemy: For database interactions")
     print("  - python-dotenv: For loading environment variables")
+    print("  - pyyaml: For the loading configuration")
     print("\nPlease install them using:")
-    print("  pip install pandas watchdog sqlalchemy python-dotenv")
+    print("  pip install pandas watchdog sqlalchemy python-dotenv pyyaml")
     print("  or")
-    print("  pip3 install pandas watchdog sqlalchemy python-dotenv")
+    print("  pip3 install pandas watchdog sqlalchemy python-dotenv pyyaml")
     exit(1)
 
+from payload_store import PayloadReader, COLUMNAR_EXTENSIONS
+from file_manifest import FileManifest, process_and_record
+from file_queue import FileWorkQueue, add_queue_arguments, run_with_metrics, QUEUE_WORKERS, QUEUE_MAX_SIZE, DEBOUNCE_SECONDS
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -67,14 +83,449 @@ ENRICHED_DATA_DIR = os.path.join(SCRIPT_DIR, 'data', 'enriched')
 ARCHIVED_DATA_DIR = os.path.join(SCRIPT_DIR, 'data', 'archived')
 LOGS_DIR = os.path.join(SCRIPT_DIR, 'logs')
 LOADING_LOG_PATH = os.path.join(LOGS_DIR, 'loading_log.csv')
+LOADING_CONFIG_PATH = os.getenv('ETL_LOADING_CONFIG', os.path.join(SCRIPT_DIR, 'config', 'loading.yaml'))
+SUPPORTED_EXTENSIONS = ['.csv', '.json'] + COLUMNAR_EXTENSIONS
+
+# Number of rows written per COPY buffer or INSERT batch
+LOAD_BATCH_ROWS = int(os.getenv('ETL_LOAD_BATCH_ROWS', '50000'))
+
+# Marker for missing values in COPY buffers
+COPY_NULL = r'\N'
+
+# Number of rows committed per transaction when a load is checkpointed (0 = whole load)
+LOAD_CHUNK_ROWS = int(os.getenv('ETL_LOAD_CHUNK_ROWS', '500000'))
+
+# Table recording the committed chunks of checkpointed loads
+LOAD_CHECKPOINT_TABLE = os.getenv('ETL_LOAD_CHECKPOINT_TABLE', 'etl_load_checkpoints')
+
+# INSERT constructs with ON CONFLICT support and the schema of temporary tables, by dialect
+MERGE_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+TEMP_SCHEMAS = {'postgresql': 'pg_temp', 'sqlite': 'temp'}
+
+# Connection pool of the shared database engine: connections kept open, extra connections
+# allowed under load, seconds to wait for a free connection, seconds after which a
+# connection is replaced, and whether connections are checked before each use
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_TIMEOUT = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
 
 # Load environment variables
 load_dotenv()
 
 
+class LoadingConfig:
+    """
+    Per-table load settings from the loading configuration (config/loading.yaml).
+    
+    The file maps table names to their settings; a table with merge_keys is loaded in
+    merge mode, upserting rows on those columns:
+    
+        tables:
+          customers:
+            merge_keys: [customer_id]
+    
+    The file is read again when its modification time changes. A missing file means
+    every table is loaded with plain inserts; a changed file that fails to parse or
+    validate is reported and the previous settings stay in use.
+    """
+    
+    def __init__(self, path: str = LOADING_CONFIG_PATH):
+        """
+        Initialize the configuration; the file is read on first use.
+        
+        Args:
+            path: Path to the loading configuration file
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime_ns = -1
+        self._merge_keys: Dict[str, List[str]] = {}
+    
+    @staticmethod
+    def parse(path: str) -> Dict[str, List[str]]:
+        """
+        Parse a loading configuration file.
+        
+        Args:
+            path: Path to the file
+            
+        Returns:
+            Dictionary mapping table names to their merge key columns
+            
+        Raises:
+            ValueError: If the configuration is invalid
+        """
+        with open(path, 'r') as f:
+            config = yaml.safe_load(f) or {}
+        if not isinstance(config, dict):
+            raise ValueError(f"Configuration must be a mapping, got {type(config).__name__}")
+        
+        tables = config.get('tables') or {}
+        if not isinstance(tables, dict):
+            raise ValueError("tables must be a mapping of table names to table settings")
+        
+        merge_keys = {}
+        for table_name, settings in tables.items():
+            if not isinstance(settings, dict):
+                raise ValueError(f"tables.{table_name} must be a mapping")
+            keys = settings.get('merge_keys')
+            if keys is None:
+                continue
+            if not isinstance(keys, list) or not keys or not all(isinstance(key, str) for key in keys):
+                raise ValueError(f"tables.{table_name}.merge_keys must be a non-empty list of column names")
+            merge_keys[str(table_name)] = keys
+        return merge_keys
+    
+    def _refresh(self):
+        """Read the file again if it changed since it was last read."""
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            mtime_ns = None
+        if mtime_ns == self._mtime_ns:
+            return
+        
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                return
+            try:
+                merge_keys = self.parse(self.path) if mtime_ns is not None else {}
+            except Exception as e:
+                logger.error(f"Error reading loading configuration {self.path}, keeping the previous settings: {e}")
+            else:
+                self._merge_keys = merge_keys
+                if mtime_ns is not None:
+                    logger.info(f"Loaded loading configuration: {self.path} ({len(merge_keys)} merge tables)")
+            self._mtime_ns = mtime_ns
+    
+    def merge_keys(self, table_name: str) -> Optional[List[str]]:
+        """
+        Get the key columns of a table loaded in merge mode.
+        
+        Args:
+            table_name: Name of the table
+            
+        Returns:
+            The key columns, or None if the table is loaded with plain inserts
+        """
+        self._refresh()
+        keys = self._merge_keys.get(table_name)
+        return list(keys) if keys else None
+
+
+# Load settings shared by everything in the process
+LOADING_CONFIG = LoadingConfig()
+
+
+class EngineRegistry:
+    """
+    Process-wide database engines, one per database URL, shared by all database managers.
+    
+    Each engine keeps a connection pool, so files loaded one after another (or by
+    several worker threads) borrow open connections instead of connecting again.
+    """
+    
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._engines = {}
+        self._lock = threading.Lock()
+        
+        # Pool events fire while _lock is held (the test connection of a new engine)
+        self._metrics_lock = threading.Lock()
+        
+        self._connects = 0
+        self._checkouts = 0
+        self._checked_out = 0
+        self._invalidations = 0
+        self._waits = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+    
+    def get(self, db_url: str):
+        """
+        Get the engine of a database, creating and testing it on first use.
+        
+        Args:
+            db_url: Database connection URL
+            
+        Returns:
+            SQLAlchemy engine
+            
+        Raises:
+            Exception: If a new engine cannot connect
+        """
+        entry = self._engines.get(db_url)
+        if entry is not None and entry[0] == os.getpid():
+            return entry[1]
+        
+        with self._lock:
+            entry = self._engines.get(db_url)
+            if entry is not None and entry[0] == os.getpid():
+                return entry[1]
+            
+            if entry is not None:
+                # Pooled connections inherited from the parent process must not be reused
+                entry[1].dispose(close=False)
+            
+            engine = create_engine(db_url, **self._pool_options(db_url))
+            self._instrument(engine)
+            
+            # Test the connection
+            with engine.connect():
+                logger.info("Database connection successful")
+            
+            self._engines[db_url] = (os.getpid(), engine)
+            return engine
+    
+    @staticmethod
+    def _pool_options(db_url: str) -> Dict[str, Any]:
+        """Get the create_engine pool arguments for a database URL."""
+        options = {'pool_pre_ping': DB_POOL_PRE_PING}
+        
+        # In-memory SQLite databases live in a single connection and have no queue pool
+        url = make_url(db_url)
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            return options
+        
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE
+        )
+        return options
+    
+    def _instrument(self, engine):
+        """Count the connections opened, checked out and invalidated by an engine's pool."""
+        def on_connect(dbapi_connection, connection_record):
+            with self._metrics_lock:
+                self._connects += 1
+        
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._metrics_lock:
+                self._checkouts += 1
+                self._checked_out += 1
+        
+        def on_checkin(dbapi_connection, connection_record):
+            with self._metrics_lock:
+                self._checked_out -= 1
+        
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            with self._metrics_lock:
+                self._invalidations += 1
+        
+        event.listen(engine.pool, 'connect', on_connect)
+        event.listen(engine.pool, 'checkout', on_checkout)
+        event.listen(engine.pool, 'checkin', on_checkin)
+        event.listen(engine.pool, 'invalidate', on_invalidate)
+    
+    def record_wait(self, seconds: float):
+        """
+        Record the time spent waiting for a pooled connection.
+        
+        Args:
+            seconds: Time between requesting and getting the connection
+        """
+        with self._metrics_lock:
+            self._waits += 1
+            self._total_wait_seconds += seconds
+            self._max_wait_seconds = max(self._max_wait_seconds, seconds)
+    
+    def dispose(self):
+        """Close every pooled connection; engines are created again on next use."""
+        with self._lock:
+            engines, self._engines = self._engines, {}
+        for pid, engine in engines.values():
+            if pid == os.getpid():
+                engine.dispose()
+        if engines:
+            logger.info("Database connection closed")
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the connection pool metrics.
+        
+        Returns:
+            Dictionary with the number of engines, connections opened, checkouts,
+            connections currently checked out, invalidated connections, and the
+            average and maximum wait for a connection in seconds
+        """
+        with self._metrics_lock:
+            return {
+                'engines': len(self._engines),
+                'connects': self._connects,
+                'checkouts': self._checkouts,
+                'checked_out': self._checked_out,
+                'invalidations': self._invalidations,
+                'avg_wait_seconds': self._total_wait_seconds / self._waits if self._waits else 0.0,
+                'max_wait_seconds': self._max_wait_seconds
+            }
+    
+    def log_metrics(self):
+        """Log the connection pool metrics."""
+        metrics = self.metrics()
+        logger.info(
+            f"db pool: connects={metrics['connects']} checkouts={metrics['checkouts']} "
+            f"checked_out={metrics['checked_out']} invalidations={metrics['invalidations']} "
+            f"avg_wait={metrics['avg_wait_seconds'] * 1000:.1f}ms max_wait={metrics['max_wait_seconds'] * 1000:.1f}ms"
+        )
+
+
+# Engines shared by everything in the process
+ENGINE_REGISTRY = EngineRegistry()
+
+
+class TableMetadataCache:
+    """
+    Process-wide cache of reflected table definitions, keyed by database URL and table name.
+    
+    A table is reflected from the database catalog the first time it is looked up and
+    served from memory afterwards, so steady-state loads into known tables make no
+    catalog queries. Tables created through DatabaseManager.create_table are cached
+    directly. An entry is invalidated when a load fails in a way that may come from
+    schema drift (e.g. a column added or the table dropped by someone else) and is
+    reflected again on next use.
+    
+    Missing tables are not cached: a table created outside the process is found on the
+    next lookup.
+    """
+    
+    def __init__(self):
+        """Initialize an empty cache."""
+        # Tables of one database share a MetaData so foreign keys resolve
+        self._metadata: Dict[str, MetaData] = {}
+        self._tables: Dict[Tuple[str, str], Table] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._reflections = 0
+        self._invalidations = 0
+    
+    def _get_metadata(self, db_url: str) -> MetaData:
+        """Get the MetaData holding the cached tables of a database (caller holds the lock)."""
+        metadata = self._metadata.get(db_url)
+        if metadata is None:
+            metadata = self._metadata[db_url] = MetaData()
+        return metadata
+    
+    def _discard(self, db_url: str, table_name: str) -> bool:
+        """Drop a cached table (caller holds the lock)."""
+        table = self._tables.pop((db_url, table_name), None)
+        if table is None:
+            return False
+        self._metadata[db_url].remove(table)
+        return True
+    
+    def get(self, db_url: str, engine, table_name: str) -> Optional[Table]:
+        """
+        Get the definition of a table, reflecting it on first use.
+        
+        Args:
+            db_url: URL of the database the engine is bound to
+            engine: Engine used to reflect the table
+            table_name: Name of the table
+            
+        Returns:
+            The table, or None if it does not exist
+        """
+        key = (db_url, table_name)
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._hits += 1
+                return table
+            
+            if not inspect(engine).has_table(table_name):
+                return None
+            
+            table = Table(table_name, self._get_metadata(db_url), autoload_with=engine)
+            self._tables[key] = table
+            self._reflections += 1
+            logger.debug(f"Reflected table {table_name}")
+            return table
+    
+    def define(self, db_url: str, table_name: str, columns: List[Any]) -> Table:
+        """
+        Cache the definition of a table about to be created or altered.
+        
+        Any cached definition of the table is replaced.
+        
+        Args:
+            db_url: URL of the database
+            table_name: Name of the table
+            columns: Columns (and constraints) of the table
+            
+        Returns:
+            The new table definition
+        """
+        with self._lock:
+            self._discard(db_url, table_name)
+            table = Table(table_name, self._get_metadata(db_url), *columns)
+            self._tables[(db_url, table_name)] = table
+            return table
+    
+    def invalidate(self, db_url: str, table_name: str):
+        """
+        Forget a table so that it is reflected again on next use.
+        
+        Args:
+            db_url: URL of the database
+            table_name: Name of the table
+        """
+        with self._lock:
+            if self._discard(db_url, table_name):
+                self._invalidations += 1
+                logger.info(f"Invalidated cached definition of table {table_name}")
+    
+    def clear(self):
+        """Forget every cached table."""
+        with self._lock:
+            self._metadata = {}
+            self._tables = {}
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the cache metrics.
+        
+        Returns:
+            Dictionary with the number of cached tables, cache hits, reflections and
+            invalidations
+        """
+        with self._lock:
+            return {
+                'tables': len(self._tables),
+                'hits': self._hits,
+                'reflections': self._reflections,
+                'invalidations': self._invalidations
+            }
+    
+    def log_metrics(self):
+        """Log the cache metrics."""
+        metrics = self.metrics()
+        logger.info(
+            f"table cache: tables={metrics['tables']} hits={metrics['hits']} "
+            f"reflections={metrics['reflections']} invalidations={metrics['invalidations']}"
+        )
+
+
+# Reflected tables shared by every database manager in the process
+TABLE_CACHE = TableMetadataCache()
+
+
+def log_database_metrics():
+    """Log the connection pool and table cache metrics."""
+    ENGINE_REGISTRY.log_metrics()
+    TABLE_CACHE.log_metrics()
+
+
 class DatabaseManager:
     """
     Handles database connections and operations.
+    
+    The engine and its connection pool are shared by every database manager of the
+    process (see EngineRegistry), and so are the reflected table definitions (see
+    TableMetadataCache).
     """
     
     def __init__(self):
@@ -83,18 +534,26 @@ class DatabaseManager:
         """
         self.db_url = self._get_database_url()
         self.engine = None
-        self.metadata = None
     
     def _get_database_url(self) -> str:
         """
         Construct the database URL from environment variables.
         
+        DATABASE_URL, if set, is used as is (e.g. sqlite:///local.db to test locally);
+        otherwise a PostgreSQL URL is built from DB_HOST, DB_PORT, DB_NAME, DB_USER and
+        DB_PASSWORD.
+        
         Returns:
             str: Database connection URL
         
         Raises:
             ValueError: If required environment variables are missing
         """
+        # A complete URL overrides the individual settings
+        database_url = os.getenv('DATABASE_URL')
+        if database_url:
+            return database_url
+        
         # Get database connection details from environment variables
         db_host = os.getenv('DB_HOST')
         db_port = os.getenv('DB_PORT', '5432')
@@ -117,46 +576,88 @@ class DatabaseManager:
     
     def connect(self):
         """
-        Establish a connection to the database.
+        Attach to the shared engine of the database, creating it on first use.
         
         Raises:
             Exception: If connection fails
         """
-        logger.info("Connecting to database")
+        if self.engine is not None:
+            return
+        
         try:
-            self.engine = create_engine(self.db_url)
-            self.metadata = MetaData()
-            self.metadata.bind = self.engine
-            
-            # Test the connection
-            with self.engine.connect() as conn:
-                logger.info("Database connection successful")
+            self.engine = ENGINE_REGISTRY.get(self.db_url)
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
     
     def disconnect(self):
         """
-        Close the database connection.
+        Detach from the shared engine.
+        
+        Pooled connections stay open for the next file; ENGINE_REGISTRY.dispose()
+        closes them.
         """
-        if self.engine:
-            self.engine.dispose()
-            logger.info("Database connection closed")
+        self.engine = None
+    
+    @contextmanager
+    def begin(self):
+        """
+        Borrow a pooled connection for one transaction.
+        
+        The transaction is committed when the block completes and rolled back if it
+        raises. The time spent waiting for the connection is recorded in the pool
+        metrics.
+        
+        Yields:
+            SQLAlchemy connection
+        """
+        if self.engine is None:
+            self.connect()
+        
+        started_at = time.perf_counter()
+        with self.engine.connect() as conn:
+            ENGINE_REGISTRY.record_wait(time.perf_counter() - started_at)
+            with conn.begin():
+                yield conn
     
     def table_exists(self, table_name: str) -> bool:
         """
         Check if a table exists in the database.
         
+        Known tables are answered from the table cache; an unknown table is looked up
+        (and reflected if it exists) in the database catalog.
+        
         Args:
             table_name: Name of the table to check
             
         Returns:
             bool: True if the table exists, False otherwise
         """
+        return self.get_table(table_name) is not None
+    
+    def get_table(self, table_name: str) -> Optional[Table]:
+        """
+        Get the definition of a table from the table cache.
+        
+        Args:
+            table_name: Name of the table
+            
+        Returns:
+            The table, or None if it does not exist
+        """
         if not self.engine:
             self.connect()
         
-        return inspect(self.engine).has_table(table_name)
+        return TABLE_CACHE.get(self.db_url, self.engine, table_name)
+    
+    def invalidate_table(self, table_name: str):
+        """
+        Forget the cached definition of a table, e.g. after altering it outside create_table.
+        
+        Args:
+            table_name: Name of the table
+        """
+        TABLE_CACHE.invalidate(self.db_url, table_name)
     
     def create_table(self, table_name: str, columns: Dict[str, Any]):
         """
@@ -180,22 +681,62 @@ class DatabaseManager:
             column_list.append(Column('load_status', String(50)))
             column_list.append(Column('load_timestamp', DateTime))
             
-            # Create the table
-            table = Table(table_name, self.metadata, *column_list)
+            # Tables loaded in merge mode need a unique key to merge on
+            merge_keys = LOADING_CONFIG.merge_keys(table_name)
+            if merge_keys and set(merge_keys) <= set(columns):
+                column_list.append(UniqueConstraint(*merge_keys, name=self._merge_key_name(table_name, merge_keys)))
+            
+            # Create the table, caching its definition for the loads that follow
+            if not self.engine:
+                self.connect()
+            table = TABLE_CACHE.define(self.db_url, table_name, column_list)
             table.create(self.engine)
             
             logger.info(f"Table {table_name} created successfully")
         except Exception as e:
             logger.error(f"Error creating table {table_name}: {e}")
+            self.invalidate_table(table_name)
             raise
     
-    def load_data(self, table_name: str, data: List[Dict[str, Any]]) -> int:
+    @property
+    def supports_copy(self) -> bool:
+        """Whether rows can be streamed with COPY ... FROM STDIN (PostgreSQL through psycopg2)."""
+        return self.engine.dialect.name == 'postgresql' and self.engine.dialect.driver == 'psycopg2'
+    
+    def load_data(
+        self,
+        table_name: str,
+        data: Union[pd.DataFrame, List[Dict[str, Any]]],
+        checkpoint_key: Optional[str] = None,
+        row_offset: int = 0,
+        complete: bool = True
+    ) -> int:
         """
         Load data into a table.
         
+        The rows are written LOAD_BATCH_ROWS at a time: streamed with COPY ... FROM STDIN
+        from an in-memory CSV buffer on PostgreSQL, and as batched INSERTs on databases
+        without COPY.
+        
+        Without a checkpoint key the whole load is one transaction. With one (e.g. the
+        hash of the source file), each LOAD_CHUNK_ROWS rows are committed in their own
+        transaction together with a row in the checkpoint table, and a retry of the same
+        load skips the chunks already committed.
+        
+        Tables with merge keys in the loading configuration are loaded in merge mode: the
+        rows of each transaction are bulk-loaded into a temporary staging table and
+        upserted into the table with one INSERT ... SELECT ... ON CONFLICT statement, so
+        loading the same rows again updates them instead of duplicating them.
+        
         Args:
             table_name: Name of the table to load data into
-            data: List of dictionaries containing the data to load
+            data: DataFrame (or list of row dictionaries) containing the data to load
+            checkpoint_key: Key identifying the load across retries, or None to load in
+                one transaction
+            row_offset: Position of the first row within the checkpointed load, when it is
+                loaded in several calls
+            complete: Whether these are the last rows of the checkpointed load, whose
+                checkpoints are then removed
             
         Returns:
             int: Number of rows loaded
@@ -205,24 +746,356 @@ class DatabaseManager:
         """
         logger.info(f"Loading data into table: {table_name}")
         try:
+            df = data if isinstance(data, pd.DataFrame) else pd.DataFrame.from_records(data)
+            
             # Add load_status and load_timestamp to each row
-            now = datetime.now()
-            for row in data:
-                row['load_status'] = 'loaded'
-                row['load_timestamp'] = now
+            df = df.assign(load_status='loaded', load_timestamp=datetime.now())
+            
+            table = self.get_table(table_name)
+            
+            # Columns unknown to the cached definition may have been added since it was
+            # reflected
+            if table is not None and not set(df.columns) <= set(table.columns.keys()):
+                self.invalidate_table(table_name)
+                table = self.get_table(table_name)
+            if table is None:
+                raise sqlalchemy.exc.NoSuchTableError(table_name)
+            
+            merge_keys = LOADING_CONFIG.merge_keys(table_name)
+            if merge_keys:
+                df = self._prepare_merge(table, df, merge_keys)
             
             # Load the data
-            with self.engine.connect() as conn:
-                result = conn.execute(
-                    Table(table_name, self.metadata, autoload_with=self.engine).insert(),
-                    data
-                )
-                
-                logger.info(f"Loaded {len(data)} rows into table {table_name}")
-                return len(data)
+            if checkpoint_key is None:
+                with self.begin() as conn:
+                    self._write_rows(conn, table, df, merge_keys)
+            else:
+                self._load_chunks(table, df, checkpoint_key, row_offset, complete, merge_keys)
+            
+            logger.info(f"Loaded {len(df)} rows into table {table_name}")
+            return len(df)
         except Exception as e:
             logger.error(f"Error loading data into table {table_name}: {e}")
+            
+            # The cached definition may no longer match the table; reflect it again next time
+            if self._is_database_error(e):
+                self.invalidate_table(table_name)
+            raise
+    
+    def _is_database_error(self, error: Exception) -> bool:
+        """
+        Check whether an error was raised by the database (as opposed to the data or the code).
+        
+        COPY runs on the raw driver cursor, so driver errors are checked as well as
+        SQLAlchemy's.
+        """
+        if isinstance(error, sqlalchemy.exc.SQLAlchemyError):
+            return True
+        dbapi = getattr(self.engine.dialect, 'loaded_dbapi', None) if self.engine else None
+        return dbapi is not None and isinstance(error, dbapi.Error)
+    
+    def _write_rows(self, conn, table: Table, df: pd.DataFrame, merge_keys: Optional[List[str]] = None):
+        """
+        Write rows with COPY where the database supports it, otherwise with batched INSERTs.
+        
+        With merge keys, the rows are written to a staging table and merged into the table.
+        """
+        if merge_keys:
+            self._merge_rows(conn, table, df, merge_keys)
+        elif self.supports_copy:
+            self._copy_rows(conn, table, df)
+        else:
+            self._insert_rows(conn, table, df)
+    
+    @staticmethod
+    def _merge_key_name(table_name: str, merge_keys: List[str]) -> str:
+        """Name of the unique constraint or index on the merge keys of a table."""
+        return f"uq_{table_name}_{'_'.join(merge_keys)}"
+    
+    def _prepare_merge(self, table: Table, df: pd.DataFrame, merge_keys: List[str]) -> pd.DataFrame:
+        """
+        Check that rows can be merged into a table on its merge keys.
+        
+        ON CONFLICT needs a unique constraint or index on exactly the key columns, which
+        is created if the table has none (this fails if the table already holds
+        duplicate keys). Within the rows, only the last row of each key is kept, since
+        one statement cannot update the same row twice.
+        
+        Args:
+            table: Target table
+            df: Rows to load
+            merge_keys: Key columns of the table
+            
+        Returns:
+            The rows to merge
+            
+        Raises:
+            ValueError: If the database has no ON CONFLICT support or a key column is missing
+        """
+        if self.engine.dialect.name not in MERGE_INSERTS:
+            raise ValueError(f"Merge loads are not supported on {self.engine.dialect.name} databases")
+        
+        missing = [key for key in merge_keys if key not in df.columns or key not in table.c]
+        if missing:
+            raise ValueError(f"Merge key columns missing for table {table.name}: {', '.join(missing)}")
+        
+        key_set = set(merge_keys)
+        unique_keys = [set(table.primary_key.columns.keys())]
+        unique_keys += [set(column.name for column in index.columns) for index in table.indexes if index.unique]
+        unique_keys += [
+            set(constraint.columns.keys())
+            for constraint in table.constraints
+            if isinstance(constraint, UniqueConstraint)
+        ]
+        if key_set not in unique_keys:
+            logger.info(f"Creating unique index on {', '.join(merge_keys)} of table {table.name}")
+            index = Index(self._merge_key_name(table.name, merge_keys), *(table.c[key] for key in merge_keys), unique=True)
+            index.create(self.engine, checkfirst=True)
+        
+        # Rows without a complete key never conflict, so they are always inserted
+        missing_keys = int(df[merge_keys].isna().any(axis=1).sum())
+        if missing_keys:
+            logger.warning(f"{missing_keys} rows for table {table.name} have no value in a merge key column and are inserted as new rows")
+        
+        duplicated = df.duplicated(subset=merge_keys, keep='last') & df[merge_keys].notna().all(axis=1)
+        if duplicated.any():
+            logger.info(f"Dropping {int(duplicated.sum())} rows for table {table.name} whose merge key appears again later")
+            df = df[~duplicated]
+        return df
+    
+    def _merge_rows(self, conn, table: Table, df: pd.DataFrame, merge_keys: List[str]):
+        """
+        Merge rows into a table: bulk-load them into a temporary staging table, then
+        upsert the staging table into the table with one set-based statement.
+        
+        Args:
+            conn: Connection of the load transaction
+            table: Target table
+            df: Rows to merge, with at most one row per key
+            merge_keys: Key columns of the table
+        """
+        dialect = self.engine.dialect.name
+        
+        # The staging table lives in the session's temporary schema, so it never
+        # shadows or replaces a permanent table of the same name. A staging table left
+        # on a pooled connection by a failed load is dropped first.
+        staging = Table(
+            f"{table.name}_staging",
+            MetaData(),
+            *(Column(column, table.c[column].type) for column in df.columns),
+            schema=TEMP_SCHEMAS[dialect],
+            prefixes=['TEMPORARY']
+        )
+        conn.execute(DropTable(staging, if_exists=True))
+        conn.execute(CreateTable(staging))
+        self._write_rows(conn, staging, df)
+        
+        # SQLite checks ON CONFLICT against the schema the connection last read, which
+        # misses a unique index created on another pooled connection; reading the
+        # table first makes it load the current schema
+        if dialect == 'sqlite':
+            conn.execute(select(table.c[merge_keys[0]]).limit(0)).fetchall()
+        
+        # WHERE true keeps SQLite from parsing ON CONFLICT as part of the SELECT's join
+        statement = MERGE_INSERTS[dialect](table).from_select(
+            list(df.columns),
+            select(*staging.columns).where(true())
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=merge_keys,
+            set_={
+                column: statement.excluded[column]
+                for column in df.columns
+                if column not in merge_keys
+            }
+        )
+        conn.execute(statement)
+        conn.execute(DropTable(staging))
+    
+    def _load_chunks(
+        self,
+        table: Table,
+        df: pd.DataFrame,
+        checkpoint_key: str,
+        row_offset: int,
+        complete: bool,
+        merge_keys: Optional[List[str]] = None
+    ):
+        """
+        Load rows in chunks that are committed one at a time, resuming after the chunks
+        committed by earlier attempts.
+        
+        Chunks are committed in order, so the committed rows of a load are always its
+        first rows; each chunk is committed together with its checkpoint row.
+        
+        Args:
+            table: Target table
+            df: Rows to load
+            checkpoint_key: Key identifying the load across retries
+            row_offset: Position of the first row of df within the load
+            complete: Whether df ends the load
+            merge_keys: Key columns to merge the rows on, or None to insert them
+        """
+        checkpoints = self._checkpoint_table()
+        key_filter = (
+            (checkpoints.c.checkpoint_key == checkpoint_key)
+            & (checkpoints.c.table_name == table.name)
+        )
+        
+        with self.begin() as conn:
+            chunk_index, committed_rows = conn.execute(
+                select(func.count(), func.coalesce(func.max(checkpoints.c.end_row), 0)).where(key_filter)
+            ).one()
+        
+        # Skip the rows an earlier attempt committed
+        start = min(max(committed_rows - row_offset, 0), len(df))
+        if start:
+            logger.info(f"Resuming load into {table.name} after {committed_rows} committed rows")
+        
+        chunk_rows = LOAD_CHUNK_ROWS if LOAD_CHUNK_ROWS > 0 else max(len(df), 1)
+        for chunk_start in range(start, len(df), chunk_rows):
+            chunk = df.iloc[chunk_start:chunk_start + chunk_rows]
+            last = chunk_start + chunk_rows >= len(df)
+            
+            with self.begin() as conn:
+                self._write_rows(conn, table, chunk, merge_keys)
+                
+                # The checkpoints of a finished load are no longer needed
+                if complete and last:
+                    conn.execute(checkpoints.delete().where(key_filter))
+                else:
+                    conn.execute(checkpoints.insert(), {
+                        'checkpoint_key': checkpoint_key,
+                        'table_name': table.name,
+                        'chunk_index': chunk_index,
+                        'start_row': row_offset + chunk_start,
+                        'end_row': row_offset + chunk_start + len(chunk),
+                        'committed_at': datetime.now()
+                    })
+            chunk_index += 1
+        
+        # Every row was committed by earlier attempts
+        if complete and start >= len(df) and chunk_index:
+            self.clear_checkpoints(table.name, checkpoint_key)
+    
+    def _checkpoint_table(self) -> Table:
+        """Get the checkpoint table, creating it on first use."""
+        table = self.get_table(LOAD_CHECKPOINT_TABLE)
+        if table is not None:
+            return table
+        
+        try:
+            table = TABLE_CACHE.define(self.db_url, LOAD_CHECKPOINT_TABLE, [
+                Column('checkpoint_key', String(128), primary_key=True),
+                Column('table_name', String(255), primary_key=True),
+                Column('chunk_index', Integer, primary_key=True),
+                Column('start_row', BigInteger, nullable=False),
+                Column('end_row', BigInteger, nullable=False),
+                Column('committed_at', DateTime, nullable=False)
+            ])
+            
+            # Another worker may be creating it too
+            table.create(self.engine, checkfirst=True)
+            return table
+        except Exception as e:
+            logger.error(f"Error creating checkpoint table {LOAD_CHECKPOINT_TABLE}: {e}")
+            self.invalidate_table(LOAD_CHECKPOINT_TABLE)
             raise
+    
+    def clear_checkpoints(self, table_name: str, checkpoint_key: str):
+        """
+        Remove the checkpoints of a load, e.g. once all its rows are committed.
+        
+        Args:
+            table_name: Name of the table the rows were loaded into
+            checkpoint_key: Key identifying the load
+        """
+        checkpoints = self.get_table(LOAD_CHECKPOINT_TABLE)
+        if checkpoints is None:
+            return
+        
+        with self.begin() as conn:
+            conn.execute(checkpoints.delete().where(
+                (checkpoints.c.checkpoint_key == checkpoint_key)
+                & (checkpoints.c.table_name == table_name)
+            ))
+    
+    def _copy_rows(self, conn, table: Table, df: pd.DataFrame):
+        """
+        Stream rows into a table with COPY ... FROM STDIN, one CSV buffer per batch.
+        
+        Args:
+            conn: Connection of the load transaction
+            table: Target table
+            df: Rows to load
+        """
+        # Integer columns arrive as floats when a batch has missing values; COPY
+        # does not accept "1.0" for an integer column
+        for column in table.columns:
+            if (
+                isinstance(column.type, Integer)
+                and column.name in df.columns
+                and pd.api.types.is_float_dtype(df[column.name])
+                and (df[column.name].dropna() % 1 == 0).all()
+            ):
+                df = df.assign(**{column.name: df[column.name].astype('Int64')})
+        
+        preparer = self.engine.dialect.identifier_preparer
+        column_list = ', '.join(preparer.quote(str(column)) for column in df.columns)
+        statement = (
+            f"COPY {preparer.format_table(table)} ({column_list}) "
+            f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')"
+        )
+        
+        cursor = conn.connection.cursor()
+        try:
+            for start in range(0, len(df), LOAD_BATCH_ROWS):
+                buffer = io.StringIO()
+                df.iloc[start:start + LOAD_BATCH_ROWS].to_csv(buffer, header=False, index=False, na_rep=COPY_NULL)
+                buffer.seek(0)
+                cursor.copy_expert(statement, buffer)
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _insert_rows(conn, table: Table, df: pd.DataFrame):
+        """
+        Insert rows in batches of LOAD_BATCH_ROWS.
+        
+        Each batch is one executemany of a single compiled INSERT, which SQLAlchemy
+        sends as multi-row INSERT statements on drivers that support it. Rows are only
+        converted to dictionaries one batch at a time.
+        
+        Args:
+            conn: Connection of the load transaction
+            table: Target table
+            df: Rows to load
+        """
+        statement = table.insert()
+        
+        # Date and time values arrive as ISO strings from CSV and JSON files; drivers
+        # such as SQLite's only bind date and datetime objects to those columns.
+        # Values that are not ISO dates are inserted as NULL
+        for column in table.columns:
+            if (
+                isinstance(column.type, (Date, DateTime))
+                and column.name in df.columns
+                and pd.api.types.is_object_dtype(df[column.name])
+            ):
+                values = pd.to_datetime(df[column.name], format='ISO8601', errors='coerce')
+                coerced = int((values.isna() & df[column.name].notna()).sum())
+                if coerced:
+                    logger.warning(f"Column {column.name} has {coerced} values that are not ISO dates; loading them as NULL")
+                if isinstance(column.type, Date):
+                    values = values.dt.date
+                df = df.assign(**{column.name: values})
+        
+        for start in range(0, len(df), LOAD_BATCH_ROWS):
+            batch = df.iloc[start:start + LOAD_BATCH_ROWS]
+            
+            # Missing values are inserted as NULL
+            records = batch.astype(object).where(batch.notna(), None).to_dict(orient='records')
+            conn.execute(statement, records)
 
 
 class SchemaInferrer:
@@ -305,9 +1178,44 @@ class DataLoader:
             return DataLoader._load_from_json(file_path)
         elif file_extension == '.csv':
             return DataLoader._load_from_csv(file_path)
+        elif file_extension in COLUMNAR_EXTENSIONS:
+            return DataLoader._load_from_columnar(file_path)
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
     
+    @staticmethod
+    def _load_from_columnar(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Load data from a columnar (Parquet or npz) payload.
+        
+        The columns are read straight into the DataFrame; the metadata is stored
+        in the same file.
+        
+        Args:
+            file_path: Path to the columnar file
+            
+        Returns:
+            tuple: (DataFrame containing the data, metadata dictionary)
+        """
+        logger.info(f"Loading data from columnar file: {file_path}")
+        try:
+            df, metadata = PayloadReader.read(file_path)
+            
+            if not metadata:
+                metadata = {
+                    'filename': os.path.basename(file_path),
+                    'timestamp': datetime.now().isoformat(),
+                    'source_format': os.path.splitext(file_path)[1].lower().lstrip('.'),
+                    'row_count': len(df),
+                    'column_count': len(df.columns),
+                    'columns': list(df.columns)
+                }
+            
+            return df, metadata
+        except Exception as e:
+            logger.error(f"Error loading data from columnar file: {e}")
+            raise
+    
     @staticmethod
     def _load_from_json(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
@@ -495,9 +1403,35 @@ class FileEventHandler(FileSystemEventHandler):
     Handles file system events for the watchdog observer.
     """
     
-    def __init__(self):
-        """Initialize the file event handler."""
-        self.db_manager = DatabaseManager()
+    def __init__(self, workers: int = QUEUE_WORKERS, queue_size: int = QUEUE_MAX_SIZE, debounce_seconds: float = DEBOUNCE_SECONDS):
+        """
+        Initialize the file event handler.
+        
+        Args:
+            workers: Number of worker threads processing detected files
+            queue_size: Maximum number of detected files waiting to be processed
+            debounce_seconds: Interval between size checks of a detected file
+        """
+        # Each worker thread gets its own database manager, borrowing connections from
+        # the shared engine's pool; creating one here validates the database
+        # configuration before any file is queued
+        self._thread_state = threading.local()
+        self._thread_state.db_manager = DatabaseManager()
+        self.manifest = FileManifest('loading')
+        self.work_queue = FileWorkQueue(
+            self._process_tracked_file,
+            workers=workers,
+            max_size=queue_size,
+            debounce_seconds=debounce_seconds,
+            name='loading'
+        )
+    
+    @property
+    def db_manager(self) -> DatabaseManager:
+        """Database manager owned by the current worker thread."""
+        if not hasattr(self._thread_state, 'db_manager'):
+            self._thread_state.db_manager = DatabaseManager()
+        return self._thread_state.db_manager
     
     def on_created(self, event):
         """
@@ -507,20 +1441,55 @@ class FileEventHandler(FileSystemEventHandler):
             event: File system event
         """
         if not event.is_directory:
-            file_path = event.src_path
-            file_extension = os.path.splitext(file_path)[1].lower()
+            self._enqueue_file(event.src_path)
+    
+    def on_moved(self, event):
+        """
+        Handle file move events, e.g. files renamed into the directory once fully written.
+        
+        Args:
+            event: File system event
+        """
+        if not event.is_directory:
+            self._enqueue_file(event.dest_path)
+    
+    def _enqueue_file(self, file_path: str):
+        """
+        Queue a supported file for processing by the worker threads.
+        
+        Args:
+            file_path: Path to the detected file
+        """
+        file_extension = os.path.splitext(file_path)[1].lower()
+        
+        # Only process CSV and JSON files
+        if file_extension in SUPPORTED_EXTENSIONS:
+            logger.info(f"New file detected: {file_path}")
+            self.work_queue.submit(file_path)
+    
+    def _process_tracked_file(self, file_path: str) -> bool:
+        """
+        Process a file and record it in the processed-file manifest on success.
+        
+        Args:
+            file_path: Path to the file to process
             
-            # Only process CSV and JSON files
-            if file_extension in ['.csv', '.json']:
-                logger.info(f"New file detected: {file_path}")
-                self._process_file(file_path)
+        Returns:
+            True if the file was processed successfully, False otherwise
+        """
+        return process_and_record(self.manifest, self._process_file, file_path, pass_fingerprint=True)
     
-    def _process_file(self, file_path: str):
+    def _process_file(self, file_path: str, fingerprint: Optional[Dict[str, Any]] = None) -> bool:
         """
         Process a new file.
         
         Args:
             file_path: Path to the file to process
+            fingerprint: Manifest fingerprint taken before processing; its content hash
+                is used as the checkpoint key, otherwise the file is hashed here
+            
+        Returns:
+            True if the file was processed successfully, False otherwise
         """
         try:
             # Connect to the database
@@ -529,8 +1498,10 @@ class FileEventHandler(FileSystemEventHandler):
             # Load data from the file
             df, metadata = DataLoader.load_from_file(file_path)
             
-            # Get the table name from the filename
-            table_name = os.path.splitext(os.path.basename(file_path))[0]
+            # Get the table name from the filename; delta batches of a followed
+            # file are loaded into the table of the file they were appended to
+            source_filename = metadata.get('delta_of') or os.path.basename(file_path)
+            table_name = os.path.splitext(os.path.basename(source_filename))[0]
             
             # Check if the table exists
             if not self.db_manager.table_exists(table_name):
@@ -540,8 +1511,10 @@ class FileEventHandler(FileSystemEventHandler):
                 # Create the table
                 self.db_manager.create_table(table_name, schema)
             
-            # Load the data
-            row_count = self.db_manager.load_data(table_name, df.to_dict(orient='records'))
+            # Load the data, committing it in chunks so that a retry of the same
+            # content resumes after the last committed chunk
+            checkpoint_key = fingerprint['content_hash'] if fingerprint else FileManifest.hash_file(file_path)
+            row_count = self.db_manager.load_data(table_name, df, checkpoint_key=checkpoint_key)
             
             # Archive the file
             archived_path = FileArchiver.archive_file(file_path)
@@ -556,6 +1529,7 @@ class FileEventHandler(FileSystemEventHandler):
             )
             
             logger.info(f"File processed successfully: {file_path} -> {table_name}")
+            return True
             
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
@@ -571,9 +1545,11 @@ class FileEventHandler(FileSystemEventHandler):
                 )
             except Exception as log_error:
                 logger.error(f"Error logging loading operation: {log_error}")
+            
+            return False
         finally:
-            # Disconnect from the database
-            if hasattr(self, 'db_manager'):
+            # Detach from the shared engine; its pooled connections stay open
+            if hasattr(self._thread_state, 'db_manager'):
                 self.db_manager.disconnect()
 
 
@@ -582,8 +1558,22 @@ class LoadingAgent:
     Main class for the Loading Agent.
     """
     
-    def __init__(self):
-        """Initialize the Loading Agent."""
+    def __init__(
+        self,
+        workers: int = QUEUE_WORKERS,
+        queue_size: int = QUEUE_MAX_SIZE,
+        debounce_seconds: float = DEBOUNCE_SECONDS,
+        rebuild_manifest: bool = False
+    ):
+        """
+        Initialize the Loading Agent.
+        
+        Args:
+            workers: Number of worker threads processing detected files
+            queue_size: Maximum number of detected files waiting to be processed
+            debounce_seconds: Interval between size checks of a detected file
+            rebuild_manifest: Forget previously processed files so existing files are all reprocessed
+        """
         # Ensure the necessary directories exist
         os.makedirs(ENRICHED_DATA_DIR, exist_ok=True)
         os.makedirs(ARCHIVED_DATA_DIR, exist_ok=True)
@@ -593,12 +1583,18 @@ class LoadingAgent:
         LoadingLogger.initialize_log()
         
         self.observer = Observer()
-        self.event_handler = FileEventHandler()
+        self.event_handler = FileEventHandler(workers, queue_size, debounce_seconds)
+        
+        if rebuild_manifest:
+            self.event_handler.manifest.clear()
     
     def start(self):
         """Start monitoring the enriched data directory."""
         logger.info(f"Starting to monitor directory: {ENRICHED_DATA_DIR}")
         
+        # Start the workers before the observer and the existing files queue anything
+        self.event_handler.work_queue.start()
+        
         # Schedule the observer to watch the enriched data directory
         self.observer.schedule(self.event_handler, ENRICHED_DATA_DIR, recursive=False)
         self.observer.start()
@@ -607,14 +1603,15 @@ class LoadingAgent:
             # Process any existing files in the directory
             self._process_existing_files()
             
-            # Keep the main thread alive
-            while True:
-                time.sleep(1)
+            # Keep the main thread alive, reporting queue depth, latency, pool and table cache usage
+            run_with_metrics(self.event_handler.work_queue, log_extra_metrics=log_database_metrics)
         except KeyboardInterrupt:
             logger.info("Stopping the observer due to keyboard interrupt")
             self.observer.stop()
+            self.event_handler.work_queue.stop(wait=False)
         
         self.observer.join()
+        ENGINE_REGISTRY.dispose()
     
     def _process_existing_files(self):
         """Process any existing files in the enriched data directory."""
@@ -628,7 +1625,12 @@ class LoadingAgent:
                 file_extension = os.path.splitext(file_path)[1].lower()
                 
                 # Only process CSV and JSON files
-                if file_extension in ['.csv', '.json']:
+                if file_extension in SUPPORTED_EXTENSIONS:
+                    # Skip files already processed in their current state
+                    if self.event_handler.manifest.is_processed(file_path):
+                        logger.info(f"Skipping unchanged file: {file_path}")
+                        continue
+                    
                     logger.info(f"Processing existing file: {file_path}")
                     
                     # Create a file created event and process it
@@ -638,10 +1640,21 @@ class LoadingAgent:
 
 def main():
     """Main entry point for the Loading Agent."""
+    parser = argparse.ArgumentParser(description='Loading Agent')
+    add_queue_arguments(parser)
+    parser.add_argument('--rebuild-manifest', action='store_true',
+                        help='Ignore the processed-file manifest and reprocess all existing files')
+    args = parser.parse_args()
+    
     logger.info("Initializing Loading Agent")
     
     # Create and start the loading agent
-    agent = LoadingAgent()
+    agent = LoadingAgent(
+        workers=args.workers,
+        queue_size=args.queue_size,
+        debounce_seconds=args.debounce,
+        rebuild_manifest=args.rebuild_manifest
+    )
     agent.start()
 
 
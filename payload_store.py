@@ -0,0 +1,577 @@
+#!/usr/bin/env python3
+"""
+Payload Store for ETL Pipeline
+
+This module reads and writes the payloads that the agents hand to each other
+through the data directories. A payload is a DataFrame plus a metadata dictionary.
+Besides the original JSON layout ({'metadata': ..., 'data': [records]}), payloads
+can be stored in a columnar binary format with the metadata embedded in the same file:
+- parquet: Apache Parquet via pyarrow, with the metadata in the file's key-value metadata
+- npz: a zip archive of .npy column arrays plus a JSON manifest, needing only numpy
+
+Columnar payloads are written and read chunk by chunk as column arrays, so neither
+side goes through per-row Python dicts. The output format is selected with the
+ETL_OUTPUT_FORMAT environment variable (auto, json, parquet or npz). In auto mode,
+files of at least ETL_COLUMNAR_THRESHOLD_MB (and inputs that are already columnar)
+are written in a columnar format and smaller files as JSON.
+"""
+
+import os
+import json
+import logging
+import zipfile
+from typing import Dict, List, Any, Optional, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+# pyarrow is optional; without it columnar payloads fall back to npz
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+logger = logging.getLogger('payload_store')
+
+# Define constants
+OUTPUT_FORMAT = os.getenv('ETL_OUTPUT_FORMAT', 'auto').lower()
+COLUMNAR_THRESHOLD_BYTES = int(os.getenv('ETL_COLUMNAR_THRESHOLD_MB', '64')) * 1024 * 1024
+FORMAT_EXTENSIONS = {
+    'json': '.json',
+    'parquet': '.parquet',
+    'npz': '.npz'
+}
+COLUMNAR_EXTENSIONS = ['.parquet', '.npz']
+METADATA_KEY = b'etl_metadata'
+NPZ_MANIFEST = 'manifest.json'
+NPZ_FORMAT_VERSION = 1
+
+# Arrays an npz column may be stored in, by file suffix
+NPZ_ARRAY_SUFFIXES = ('values', 'codes', 'offsets', 'bytes')
+
+
+def available_formats() -> List[str]:
+    """
+    List the payload formats that can be written in this environment.
+
+    Returns:
+        List of format names
+    """
+    formats = ['json', 'npz']
+    if pa is not None:
+        formats.append('parquet')
+    return formats
+
+
+def is_columnar_file(file_path: str) -> bool:
+    """
+    Check whether a file is a columnar payload, based on its extension.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        bool: True if the file is a columnar payload
+    """
+    return os.path.splitext(file_path)[1].lower() in COLUMNAR_EXTENSIONS
+
+
+def resolve_output_format(
+    source_path: Optional[str] = None,
+    requested: Optional[str] = None,
+    streaming: bool = False
+) -> str:
+    """
+    Decide which format to write a payload in.
+
+    In auto mode, large or already-columnar sources get a columnar format. Parquet
+    needs one schema per file, so streamed output defaults to npz, whose chunks are
+    stored independently and may differ in dtype (as pandas CSV chunks often do).
+
+    Args:
+        source_path: Path to the input the payload is derived from
+        requested: Requested format; defaults to ETL_OUTPUT_FORMAT
+        streaming: Whether the payload will be written chunk by chunk
+
+    Returns:
+        Format name: 'json', 'parquet' or 'npz'
+
+    Raises:
+        ValueError: If the requested format is not known
+    """
+    requested = (requested or OUTPUT_FORMAT).lower()
+
+    if requested == 'auto':
+        large = False
+        if source_path is not None:
+            large = is_columnar_file(source_path) or os.path.getsize(source_path) >= COLUMNAR_THRESHOLD_BYTES
+        if not large:
+            return 'json'
+        if streaming or pa is None:
+            return 'npz'
+        return 'parquet'
+
+    if requested not in FORMAT_EXTENSIONS:
+        raise ValueError(f"Unsupported output format: {requested}")
+
+    if requested == 'parquet' and pa is None:
+        logger.warning("pyarrow is not installed, writing npz instead of parquet")
+        return 'npz'
+
+    return requested
+
+
+class PayloadWriter:
+    """
+    Writes a payload chunk by chunk in JSON, Parquet or npz format.
+
+    The metadata is written when the writer is closed, so it can include values
+    such as the row count that are only known after the last chunk.
+    """
+
+    def __init__(self, output_base: str, output_format: str):
+        """
+        Initialize the writer.
+
+        Args:
+            output_base: Output path without extension
+            output_format: Format name: 'json', 'parquet' or 'npz'
+        """
+        self.output_format = output_format
+        self.path = f"{output_base}{FORMAT_EXTENSIONS[output_format]}"
+        self._chunk_count = 0
+        self._npz_chunks = []
+        self._schema = None
+        self._file = None
+        self._parquet_writer = None
+        self._zip = None
+
+        if output_format == 'json':
+            self._file = open(self.path, 'w')
+            self._file.write('{"data": [')
+            self._separator = '\n'
+        elif output_format == 'npz':
+            self._zip = zipfile.ZipFile(self.path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Only release resources on error; a successful write must call close(metadata)
+        if exc_type is not None:
+            self._abort()
+
+    def write_chunk(self, df: pd.DataFrame):
+        """
+        Append a chunk of rows to the payload.
+
+        Args:
+            df: DataFrame chunk to append
+
+        Raises:
+            ValueError: If a Parquet chunk cannot be cast to the schema of the first chunk
+        """
+        if self.output_format != 'json':
+            df = _densify_sparse(df)
+
+        if self.output_format == 'json':
+            for record in df.to_dict(orient='records'):
+                self._file.write(self._separator)
+                self._file.write(json.dumps(record))
+                self._separator = ',\n'
+        elif self.output_format == 'parquet':
+            self._write_parquet_chunk(df)
+        else:
+            self._write_npz_chunk(df)
+
+        self._chunk_count += 1
+
+    def close(self, metadata: Dict[str, Any]) -> str:
+        """
+        Write the metadata and finish the file.
+
+        Args:
+            metadata: Metadata dictionary for the payload
+
+        Returns:
+            Path to the written file
+        """
+        if self.output_format == 'json':
+            self._file.write('\n], "metadata": ')
+            self._file.write(json.dumps(metadata, indent=2))
+            self._file.write('}\n')
+            self._file.close()
+        elif self.output_format == 'parquet':
+            if self._parquet_writer is None:
+                # No chunks were written; store an empty table with the known columns
+                empty = pd.DataFrame(columns=metadata.get('columns', []))
+                self._open_parquet(pa.Table.from_pandas(empty, preserve_index=False).schema)
+            self._parquet_writer.add_key_value_metadata({METADATA_KEY: json.dumps(metadata, default=str)})
+            self._parquet_writer.close()
+        else:
+            manifest = {
+                'format_version': NPZ_FORMAT_VERSION,
+                'metadata': metadata,
+                'chunks': self._npz_chunks
+            }
+            self._zip.writestr(NPZ_MANIFEST, json.dumps(manifest, default=str))
+            self._zip.close()
+
+        return self.path
+
+    def _abort(self):
+        """Close any open handles and remove the partial file after a failed write."""
+        for handle in (self._file, self._parquet_writer, self._zip):
+            if handle is not None:
+                try:
+                    handle.close()
+                except Exception:
+                    pass
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _open_parquet(self, schema):
+        """Open the Parquet writer with the schema of the first chunk."""
+        self._schema = schema
+        self._parquet_writer = pq.ParquetWriter(self.path, schema)
+
+    def _write_parquet_chunk(self, df: pd.DataFrame):
+        """Convert a chunk to an Arrow table and append it as a row group."""
+        df = _prepare_for_arrow(df)
+
+        if self._parquet_writer is None:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+
+            # All-null columns have no type yet; store them as strings
+            schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                for field in table.schema
+            ])
+            self._open_parquet(schema.remove_metadata())
+
+        missing = [name for name in df.columns if name not in self._schema.names]
+        if missing:
+            raise ValueError(
+                f"Columns {missing} first appear after the first chunk; "
+                f"use ETL_OUTPUT_FORMAT=npz for inputs with a varying column set"
+            )
+
+        try:
+            table = pa.Table.from_pandas(
+                df.reindex(columns=self._schema.names),
+                schema=self._schema,
+                preserve_index=False
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(
+                f"Chunk {self._chunk_count} does not match the Parquet schema of the first chunk ({e}); "
+                f"use ETL_OUTPUT_FORMAT=npz for inputs whose column types vary between chunks"
+            )
+
+        self._parquet_writer.write_table(table.replace_schema_metadata(None))
+
+    def _write_npz_chunk(self, df: pd.DataFrame):
+        """Write each column of a chunk as .npy arrays in the archive."""
+        chunk_index = self._chunk_count
+        columns = []
+
+        for position, column in enumerate(df.columns):
+            kind, arrays = _encode_column(df[column])
+            for suffix, array in arrays.items():
+                name = f"chunk{chunk_index}/col{position}.{suffix}.npy"
+                with self._zip.open(name, 'w', force_zip64=True) as f:
+                    np.lib.format.write_array(f, array, allow_pickle=False)
+            columns.append({'name': str(column), 'kind': kind})
+
+        self._npz_chunks.append({'rows': len(df), 'columns': columns})
+
+
+class PayloadReader:
+    """
+    Reads payloads written by PayloadWriter or by the agents' JSON forwarders.
+    """
+
+    @staticmethod
+    def read(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Read a columnar payload into a DataFrame.
+
+        Args:
+            file_path: Path to the .parquet or .npz file
+
+        Returns:
+            tuple: (DataFrame containing the data, metadata dictionary)
+        """
+        metadata = PayloadReader.read_metadata(file_path)
+
+        if os.path.splitext(file_path)[1].lower() == '.parquet':
+            df = pq.read_table(file_path).to_pandas()
+        else:
+            chunks = list(PayloadReader.iter_chunks(file_path))
+            if not chunks:
+                df = pd.DataFrame(columns=metadata.get('columns', []))
+            elif len(chunks) == 1:
+                df = chunks[0]
+            else:
+                df = pd.concat(chunks, ignore_index=True)
+
+        return df, metadata
+
+    @staticmethod
+    def read_metadata(file_path: str) -> Dict[str, Any]:
+        """
+        Read only the metadata of a columnar payload.
+
+        Args:
+            file_path: Path to the .parquet or .npz file
+
+        Returns:
+            Metadata dictionary
+
+        Raises:
+            ValueError: If the file is not a columnar payload, or an npz payload of an
+                unknown format version
+        """
+        file_extension = os.path.splitext(file_path)[1].lower()
+
+        if file_extension == '.parquet':
+            if pq is None:
+                raise ValueError("pyarrow is required to read parquet payloads")
+            key_value_metadata = pq.read_metadata(file_path).metadata or {}
+            raw = key_value_metadata.get(METADATA_KEY)
+            return json.loads(raw) if raw else {}
+        elif file_extension == '.npz':
+            with zipfile.ZipFile(file_path, 'r') as archive:
+                return _read_npz_manifest(archive, file_path).get('metadata', {})
+        else:
+            raise ValueError(f"Unsupported payload format: {file_extension}")
+
+    @staticmethod
+    def iter_chunks(file_path: str, chunk_rows: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Read a columnar payload one stored chunk (npz) or row group (parquet) at a time.
+
+        Args:
+            file_path: Path to the .parquet or .npz file
+            chunk_rows: Read parquet payloads in batches of at most this many rows
+                instead of whole row groups
+
+        Yields:
+            DataFrame chunks of the payload
+        """
+        if os.path.splitext(file_path)[1].lower() == '.parquet':
+            parquet_file = pq.ParquetFile(file_path)
+            if chunk_rows:
+                for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+                    yield batch.to_pandas()
+                return
+            for row_group in range(parquet_file.num_row_groups):
+                yield parquet_file.read_row_group(row_group).to_pandas()
+            return
+
+        with zipfile.ZipFile(file_path, 'r') as archive:
+            manifest = _read_npz_manifest(archive, file_path)
+            names = set(archive.namelist())
+            for chunk_index, chunk in enumerate(manifest['chunks']):
+                data = {}
+                for position, column in enumerate(chunk['columns']):
+                    arrays = {}
+                    for suffix in NPZ_ARRAY_SUFFIXES:
+                        name = f"chunk{chunk_index}/col{position}.{suffix}.npy"
+                        if name in names:
+                            with archive.open(name) as f:
+                                arrays[suffix] = np.lib.format.read_array(f, allow_pickle=False)
+                    data[column['name']] = _decode_column(column['kind'], arrays)
+                yield pd.DataFrame(data, index=pd.RangeIndex(chunk['rows']))
+
+
+def _read_npz_manifest(archive: zipfile.ZipFile, file_path: str) -> Dict[str, Any]:
+    """
+    Read the manifest of an npz payload.
+
+    Args:
+        archive: Open payload archive
+        file_path: Path to the payload, for error messages
+
+    Returns:
+        Manifest dictionary
+
+    Raises:
+        ValueError: If the payload was written in an unknown format version
+    """
+    manifest = json.loads(archive.read(NPZ_MANIFEST))
+    format_version = manifest.get('format_version')
+    if format_version != NPZ_FORMAT_VERSION:
+        raise ValueError(
+            f"Unsupported npz payload format version {format_version} in {file_path} "
+            f"(expected {NPZ_FORMAT_VERSION})"
+        )
+    return manifest
+
+
+def _densify_sparse(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert sparse columns (e.g. sparse one-hot indicators) to dense columns.
+
+    Args:
+        df: DataFrame chunk
+
+    Returns:
+        DataFrame without sparse columns
+    """
+    converted = {
+        column: df[column].sparse.to_dense()
+        for column in df.columns
+        if isinstance(df[column].dtype, pd.SparseDtype)
+    }
+    return df.assign(**converted) if converted else df
+
+
+def _prepare_for_arrow(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Make object columns with mixed value types storable in Arrow.
+
+    Non-string values in a column that also holds strings are stored as JSON text.
+
+    Args:
+        df: DataFrame chunk
+
+    Returns:
+        DataFrame with every object column holding a single value type
+    """
+    converted = {}
+    for column in df.columns:
+        series = df[column]
+        if series.dtype != object:
+            continue
+
+        non_null = series[series.notna()]
+        value_types = set(map(type, non_null))
+        if len(value_types) > 1 and str in value_types:
+            logger.warning(f"Column {column} mixes value types, storing it as strings")
+            converted[column] = series.map(
+                lambda x: x if isinstance(x, str) or _is_null(x) else json.dumps(x, default=str)
+            )
+
+    return df.assign(**converted) if converted else df
+
+
+def _is_null(value: Any) -> bool:
+    """Check whether a scalar value is missing."""
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _encode_column(series: pd.Series) -> Tuple[str, Dict[str, np.ndarray]]:
+    """
+    Encode a column as numpy arrays that can be stored without pickling.
+
+    Text is dictionary-encoded (see _encode_strings) rather than stored as a
+    fixed-width unicode array, which would make every row as wide as the longest value.
+
+    Args:
+        series: Column to encode
+
+    Returns:
+        tuple: (Encoding kind, arrays keyed by file suffix)
+    """
+    dtype = series.dtype
+
+    # Plain numpy dtypes are stored as-is
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        return 'array', {'values': series.to_numpy()}
+
+    values = series.to_numpy(dtype=object)
+    mask = pd.isna(values)
+    present = values[~mask]
+
+    if all(isinstance(value, str) for value in present):
+        return 'dict_str', _encode_strings(values)
+
+    # Mixed or non-string objects round-trip through JSON text
+    encoded = values.copy()
+    encoded[~mask] = [json.dumps(value, default=str) for value in present]
+    return 'dict_json', _encode_strings(encoded)
+
+
+def _encode_strings(values: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Dictionary-encode strings as codes into their distinct values.
+
+    The distinct values are stored back to back as one UTF-8 byte buffer with the
+    offsets of their boundaries, so storage grows with the total text length.
+
+    Args:
+        values: Object array of strings and missing values
+
+    Returns:
+        Arrays keyed by file suffix: codes (-1 for missing values), offsets and bytes
+    """
+    codes, uniques = pd.factorize(values)
+    encoded = [value.encode('utf-8', 'surrogatepass') for value in uniques]
+
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+
+    return {
+        'codes': codes.astype(np.int32 if len(uniques) < 2 ** 31 else np.int64),
+        'offsets': offsets,
+        'bytes': np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    }
+
+
+def _decode_strings(arrays: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Decode strings stored by _encode_strings.
+
+    Args:
+        arrays: Arrays keyed by file suffix
+
+    Returns:
+        Object array of strings, with NaN for missing values
+    """
+    buffer = arrays['bytes'].tobytes()
+    offsets = arrays['offsets']
+    uniques = np.array(
+        [buffer[start:end].decode('utf-8', 'surrogatepass') for start, end in zip(offsets[:-1], offsets[1:])],
+        dtype=object
+    )
+
+    codes = arrays['codes']
+    present = codes >= 0
+    decoded = np.full(len(codes), np.nan, dtype=object)
+    decoded[present] = uniques[codes[present]]
+    return decoded
+
+
+def _decode_column(kind: str, arrays: Dict[str, np.ndarray]) -> np.ndarray:
+    """
+    Decode a column stored by _encode_column.
+
+    Args:
+        kind: Encoding kind
+        arrays: Arrays keyed by file suffix
+
+    Returns:
+        Column values as a numpy array
+
+    Raises:
+        ValueError: If the encoding kind is unknown
+    """
+    if kind == 'array':
+        return arrays['values']
+
+    if kind == 'dict_str':
+        return _decode_strings(arrays)
+
+    if kind == 'dict_json':
+        decoded = _decode_strings(arrays)
+
+        # Element by element, so that list values are not broadcast into the array
+        for index in np.flatnonzero(arrays['codes'] >= 0):
+            decoded[index] = json.loads(decoded[index])
+        return decoded
+
+    raise ValueError(f"Unknown npz column encoding: {kind}")
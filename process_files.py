@@ -9,7 +9,9 @@ It's useful for testing the ETL agent's functionality without having to install
 import os
 import sys
 import logging
+import argparse
 from pathlib import Path
+from typing import Optional
 
 # Configure logging
 logging.basicConfig(
@@ -32,9 +34,14 @@ try:
         DataNormalizer, 
         MetadataManager, 
         DataForwarder,
+        process_file_streaming,
+        SUPPORTED_EXTENSIONS,
         RAW_DATA_DIR,
         PROCESSED_DATA_DIR
     )
+    from payload_store import resolve_output_format
+    from compressed_input import data_extension
+    from batch_runner import run_batch, add_worker_argument, resolve_workers
 except ImportError as e:
     logger.error(f"Error importing from etl_agent: {e}")
     logger.error("Make sure you're running this script from the etl_agent directory")
@@ -50,17 +57,42 @@ def process_file(file_path):
     try:
         logger.info(f"Processing file: {file_path}")
         
+        # Large files are streamed through the pipeline chunk by chunk
+        if DataExtractor.should_stream(file_path):
+            output_path = process_file_streaming(file_path)
+            logger.info(f"File processed successfully: {file_path} -> {output_path}")
+            return True
+        
         # Extract data from the file
         df, source_format = DataExtractor.extract_from_file(file_path)
         
         # Normalize the data
-        normalized_df = DataNormalizer.normalize(df)
+        normalized_df, flatten_report = DataNormalizer.normalize_with_report(df)
+        
+        # Large outputs are written in a columnar format without building records
+        output_format = resolve_output_format(file_path)
+        if output_format != 'json':
+            metadata = MetadataManager.create_metadata(
+                normalized_df,
+                os.path.basename(file_path),
+                source_format,
+                flatten_report
+            )
+            output_path = DataForwarder.forward_frame_to_processed(
+                normalized_df,
+                metadata,
+                os.path.basename(file_path),
+                output_format
+            )
+            logger.info(f"File processed successfully: {file_path} -> {output_path}")
+            return True
         
         # Attach metadata
         payload = MetadataManager.attach_metadata(
             normalized_df, 
             os.path.basename(file_path),
-            source_format
+            source_format,
+            flatten_report
         )
         
         # Prepare for message passing (future integration)
@@ -79,8 +111,15 @@ def process_file(file_path):
         logger.error(f"Error processing file {file_path}: {e}")
         return False
 
-def main():
-    """Process all CSV and JSON files in the raw data directory."""
+def main(workers: Optional[int] = None):
+    """
+    Process all CSV and JSON files in the raw data directory.
+    
+    Args:
+        workers: Number of worker processes; defaults to ETL_BATCH_WORKERS
+    """
+    workers = resolve_workers(workers)
+    
     logger.info(f"Looking for files in: {RAW_DATA_DIR}")
     
     # Ensure the raw and processed directories exist
@@ -94,10 +133,10 @@ def main():
         
         # Only process files (not directories)
         if os.path.isfile(file_path):
-            file_extension = os.path.splitext(file_path)[1].lower()
+            file_extension = data_extension(file_path)
             
-            # Only process CSV and JSON files
-            if file_extension in ['.csv', '.json']:
+            # Only process CSV and JSON files, optionally compressed
+            if file_extension in SUPPORTED_EXTENSIONS:
                 files_to_process.append(file_path)
     
     if not files_to_process:
@@ -106,11 +145,8 @@ def main():
     
     logger.info(f"Found {len(files_to_process)} files to process")
     
-    # Process each file
-    success_count = 0
-    for file_path in files_to_process:
-        if process_file(file_path):
-            success_count += 1
+    # Process each file, optionally across a process pool
+    success_count = run_batch(process_file, files_to_process, workers=workers)
     
     logger.info(f"Processing complete. {success_count}/{len(files_to_process)} files processed successfully.")
     
@@ -122,4 +158,8 @@ def main():
             logger.info(f"  - {filename}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Process raw data files with the ETL extraction agent')
+    add_worker_argument(parser)
+    args = parser.parse_args()
+    
+    main(workers=args.workers)
@@ -19,10 +19,11 @@ import sys
 import json
 import csv
 import logging
+import argparse
 import datetime
 import shutil
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 # Configure logging
@@ -56,6 +57,13 @@ ARCHIVED_DATA_DIR = os.path.join(SCRIPT_DIR, 'data', 'archived')
 LOGS_DIR = os.path.join(SCRIPT_DIR, 'logs')
 LOADING_LOG_PATH = os.path.join(LOGS_DIR, 'loading_log.csv')
 
+# Import the payload format helpers
+from payload_store import COLUMNAR_EXTENSIONS
+from batch_runner import run_batch, add_worker_argument, resolve_workers
+from file_manifest import FileManifest
+
+SUPPORTED_EXTENSIONS = ['.csv', '.json'] + COLUMNAR_EXTENSIONS
+
 # Load environment variables
 load_dotenv()
 
@@ -66,7 +74,9 @@ try:
         SchemaInferrer,
         DataLoader,
         FileArchiver,
-        LoadingLogger
+        LoadingLogger,
+        ENGINE_REGISTRY,
+        log_database_metrics
     )
 except ImportError as e:
     logger.error(f"Error importing from loading_agent: {e}")
@@ -75,6 +85,9 @@ except ImportError as e:
     # Define the classes here if the import fails
     # This makes the script self-contained and able to run without loading_agent.py
     
+    # Shared pooled engines are only available with loading_agent.py
+    ENGINE_REGISTRY = None
+    
     class DatabaseManager:
         """
         Handles database connections and operations.
@@ -192,13 +205,15 @@ except ImportError as e:
                 logger.error(f"Error creating table {table_name}: {e}")
                 raise
         
-        def load_data(self, table_name: str, data: List[Dict[str, Any]]) -> int:
+        def load_data(self, table_name: str, data: List[Dict[str, Any]], checkpoint_key: Optional[str] = None) -> int:
             """
             Load data into a table.
             
             Args:
                 table_name: Name of the table to load data into
                 data: List of dictionaries containing the data to load
+                checkpoint_key: Ignored; without loading_agent.py the data is loaded
+                    in one go, without checkpoints
                 
             Returns:
                 int: Number of rows loaded
@@ -208,6 +223,9 @@ except ImportError as e:
             """
             logger.info(f"Loading data into table: {table_name}")
             try:
+                if isinstance(data, pd.DataFrame):
+                    data = data.to_dict(orient='records')
+                
                 # Add load_status and load_timestamp to each row
                 now = datetime.now()
                 for row in data:
@@ -516,8 +534,10 @@ def process_file(file_path: str) -> bool:
             # Load data from the file
             df, metadata = DataLoader.load_from_file(file_path)
             
-            # Get the table name from the filename
-            table_name = os.path.splitext(os.path.basename(file_path))[0]
+            # Get the table name from the filename; delta batches of a followed
+            # file are loaded into the table of the file they were appended to
+            source_filename = metadata.get('delta_of') or os.path.basename(file_path)
+            table_name = os.path.splitext(os.path.basename(source_filename))[0]
             
             # Check if the table exists
             if not db_manager.table_exists(table_name):
@@ -527,8 +547,9 @@ def process_file(file_path: str) -> bool:
                 # Create the table
                 db_manager.create_table(table_name, schema)
             
-            # Load the data
-            row_count = db_manager.load_data(table_name, df.to_dict(orient='records'))
+            # Load the data, committing it in chunks so that a retry of the same
+            # content resumes after the last committed chunk
+            row_count = db_manager.load_data(table_name, df, checkpoint_key=FileManifest.hash_file(file_path))
             
             # Archive the file
             archived_path = FileArchiver.archive_file(file_path)
@@ -571,8 +592,15 @@ def process_file(file_path: str) -> bool:
         return False
 
 
-def main():
-    """Process all CSV and JSON files in the enriched data directory."""
+def main(workers: Optional[int] = None):
+    """
+    Process all CSV and JSON files in the enriched data directory.
+    
+    Args:
+        workers: Number of worker processes; defaults to ETL_BATCH_WORKERS
+    """
+    workers = resolve_workers(workers)
+    
     logger.info(f"Looking for files in: {ENRICHED_DATA_DIR}")
     
     # Ensure the necessary directories exist
@@ -592,8 +620,8 @@ def main():
         if os.path.isfile(file_path):
             file_extension = os.path.splitext(file_path)[1].lower()
             
-            # Only process CSV and JSON files
-            if file_extension in ['.csv', '.json']:
+            # Only process CSV, JSON and columnar payload files
+            if file_extension in SUPPORTED_EXTENSIONS:
                 files_to_process.append(file_path)
     
     if not files_to_process:
@@ -602,14 +630,16 @@ def main():
     
     logger.info(f"Found {len(files_to_process)} files to process")
     
-    # Process each file
-    success_count = 0
-    for file_path in files_to_process:
-        if process_file(file_path):
-            success_count += 1
+    # Process each file, optionally across a process pool
+    success_count = run_batch(process_file, files_to_process, workers=workers)
     
     logger.info(f"Processing complete. {success_count}/{len(files_to_process)} files processed successfully.")
     
+    # Worker processes keep their own engines and table caches, so only in-process runs are reported
+    if ENGINE_REGISTRY is not None and workers <= 1:
+        log_database_metrics()
+        ENGINE_REGISTRY.dispose()
+    
     # Show the archived files
     archived_files = os.listdir(ARCHIVED_DATA_DIR)
     if archived_files:
@@ -619,4 +649,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Load enriched data files into the database')
+    add_worker_argument(parser)
+    args = parser.parse_args()
+    
+    main(workers=args.workers)
@@ -15,7 +15,7 @@ import logging
 import datetime
 import re
 from pathlib import Path
-from typing import Dict, List, Any, Union, Optional
+from typing import Dict, List, Any, Union, Optional, Iterator, Tuple
 
 # Configure logging
 logging.basicConfig(
@@ -27,14 +27,26 @@ logger = logging.getLogger('standalone_processor')
 # Try to import pandas
 try:
     import pandas as pd
+    import numpy as np
 except ImportError:
     logger.error("Error: pandas package not found. Please install it using 'pip install pandas'")
     sys.exit(1)
 
+from compressed_input import open_input, data_extension, source_stem
+from json_stream import JSONRecordStream
+
 # Define constants
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 RAW_DATA_DIR = os.path.join(SCRIPT_DIR, 'data', 'raw')
 PROCESSED_DATA_DIR = os.path.join(SCRIPT_DIR, 'data', 'processed')
+CHUNK_SIZE = int(os.getenv('ETL_CHUNK_SIZE', '50000'))
+
+# Dicts nested deeper than this many levels are kept as JSON strings (unset = no limit)
+FLATTEN_MAX_DEPTH = int(os.getenv('ETL_FLATTEN_MAX_DEPTH', '0')) or None
+
+# Newline-delimited JSON is detected from the content, so these all parse as JSON
+JSON_EXTENSIONS = ['.json', '.jsonl', '.ndjson']
+SUPPORTED_EXTENSIONS = ['.csv'] + JSON_EXTENSIONS
 
 
 class DataExtractor:
@@ -56,11 +68,11 @@ class DataExtractor:
         Raises:
             ValueError: If the file format is not supported
         """
-        file_extension = os.path.splitext(file_path)[1].lower()
+        file_extension = data_extension(file_path)
         
         if file_extension == '.csv':
             return DataExtractor._extract_from_csv(file_path), 'csv'
-        elif file_extension == '.json':
+        elif file_extension in JSON_EXTENSIONS:
             return DataExtractor._extract_from_json(file_path), 'json'
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
@@ -79,7 +91,8 @@ class DataExtractor:
         logger.info(f"Extracting data from CSV file: {file_path}")
         try:
             # Read CSV file into a pandas DataFrame
-            df = pd.read_csv(file_path)
+            with open_input(file_path) as f:
+                df = pd.read_csv(f)
             return df
         except Exception as e:
             logger.error(f"Error extracting data from CSV file: {e}")
@@ -98,24 +111,17 @@ class DataExtractor:
         """
         logger.info(f"Extracting data from JSON file: {file_path}")
         try:
-            # Read JSON file into a pandas DataFrame
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            # Parse the JSON file incrementally, one batch of records at a time
+            batches = list(JSONRecordStream(file_path).iter_batches())
             
-            # Handle different JSON structures
-            if isinstance(data, list):
-                # List of records
-                df = pd.DataFrame(data)
-            elif isinstance(data, dict):
-                if all(isinstance(data[key], dict) for key in data):
-                    # Dictionary of dictionaries
-                    df = pd.DataFrame.from_dict(data, orient='index')
-                else:
-                    # Single record
-                    df = pd.DataFrame([data])
+            if not batches:
+                # Empty array
+                df = pd.DataFrame()
+            elif len(batches) == 1:
+                df = batches[0]
             else:
-                raise ValueError(f"Unsupported JSON structure in {file_path}")
-                
+                df = pd.concat(batches, ignore_index=True)
+            
             return df
         except Exception as e:
             logger.error(f"Error extracting data from JSON file: {e}")
@@ -175,46 +181,148 @@ class DataNormalizer:
         return df_copy
     
     @staticmethod
-    def _flatten_nested_structures(df: pd.DataFrame) -> pd.DataFrame:
+    def _flatten_nested_structures(df: pd.DataFrame, max_depth: Optional[int] = FLATTEN_MAX_DEPTH) -> pd.DataFrame:
         """
         Flatten nested structures (dicts, lists) in the DataFrame.
         
         Args:
             df: DataFrame with potentially nested structures
+            max_depth: Maximum number of dict levels to expand into columns
             
         Returns:
             Flattened DataFrame
         """
-        # Check for columns with nested structures
-        nested_columns = []
-        for col in df.columns:
-            if df[col].apply(lambda x: isinstance(x, (dict, list))).any():
-                nested_columns.append(col)
+        flattened_df, _ = NestedFlattener(max_depth).flatten(df)
+        return flattened_df
+
+
+class NestedFlattener:
+    """
+    Flattens nested dict and list values in a single pass over the object columns.
+    
+    Each object column is scanned once to collect the full nested key schema, and
+    all of its flattened columns are then filled in one more pass over its values,
+    so nesting depth does not cause repeated passes over the whole DataFrame.
+    Nested keys are joined with '.' and prefixed with the source column name,
+    matching the column names pd.json_normalize produced previously.
+    """
+    
+    def __init__(self, max_depth: Optional[int] = None):
+        """
+        Initialize the flattener.
         
-        # If no nested structures, return the original DataFrame
-        if not nested_columns:
-            return df
+        Args:
+            max_depth: Maximum number of dict levels to expand into columns.
+                Dicts nested deeper are stored as JSON strings. None expands all levels.
+        """
+        self.max_depth = max_depth
+    
+    def flatten(self, df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Flatten nested structures (dicts, lists) in the DataFrame.
         
-        # Process each column with nested structures
-        df_copy = df.copy()
-        for col in nested_columns:
-            # For columns with dictionaries
-            if df[col].apply(lambda x: isinstance(x, dict)).any():
-                # Convert the column to a DataFrame and add prefix
-                nested_df = pd.json_normalize(df_copy[col].tolist())
-                nested_df.columns = [f"{col}_{subcol}" for subcol in nested_df.columns]
+        Args:
+            df: DataFrame with potentially nested structures
+            
+        Returns:
+            tuple: (Flattened DataFrame, report of expanded and JSON-stringified columns)
+        """
+        report = {
+            'expanded_columns': [],
+            'stringified_columns': [],
+            'max_depth': self.max_depth
+        }
+        replaced_columns = {}
+        new_columns = {}
+        
+        for col in df.columns:
+            if df[col].dtype != object:
+                continue
+            
+            values = df[col].tolist()
+            has_dict = False
+            has_list = False
+            paths = {}
+            
+            # Scan the column once to find its nested key schema
+            for value in values:
+                if isinstance(value, dict):
+                    has_dict = True
+                    self._collect_paths(value, (), 1, paths)
+                elif isinstance(value, list):
+                    has_list = True
+            
+            if has_dict:
+                # Build all flattened columns for this source column in one pass
+                flat_values = {path: [np.nan] * len(values) for path in paths}
+                stringified_paths = set()
+                for row, value in enumerate(values):
+                    if isinstance(value, dict):
+                        self._fill_row(value, (), 1, row, flat_values, stringified_paths)
                 
-                # Drop the original column and join with the new columns
-                df_copy = df_copy.drop(columns=[col])
-                df_copy = pd.concat([df_copy.reset_index(drop=True), nested_df], axis=1)
+                for path, column_values in flat_values.items():
+                    name = f"{col}_{'.'.join(path)}"
+                    new_columns[name] = column_values
+                    if path in stringified_paths:
+                        report['stringified_columns'].append(name)
+                report['expanded_columns'].append(col)
             
-            # For columns with lists
-            elif df[col].apply(lambda x: isinstance(x, list)).any():
+            elif has_list:
                 # Convert lists to string representation
-                df_copy[col] = df_copy[col].apply(lambda x: json.dumps(x) if isinstance(x, list) else x)
+                replaced_columns[col] = [json.dumps(x) if isinstance(x, list) else x for x in values]
+                report['stringified_columns'].append(col)
         
-        # Recursively flatten any newly created nested structures
-        return DataNormalizer._flatten_nested_structures(df_copy)
+        # If no nested structures, return the original DataFrame
+        if not replaced_columns and not new_columns:
+            return df, report
+        
+        # Assemble the output frame in a single allocation; expanded columns are
+        # dropped and their flattened columns appended at the end
+        expanded = set(report['expanded_columns'])
+        data = {}
+        for col in df.columns:
+            if col not in expanded:
+                data[col] = replaced_columns.get(col, df[col])
+        data.update(new_columns)
+        
+        return pd.DataFrame(data, index=df.index), report
+    
+    def _collect_paths(self, value: Dict[str, Any], prefix: Tuple[str, ...], depth: int, paths: Dict[Tuple[str, ...], None]):
+        """Record the leaf key paths of a nested dict, in first-seen order."""
+        for key, sub_value in value.items():
+            path = prefix + (str(key),)
+            if self._expands(sub_value, depth):
+                self._collect_paths(sub_value, path, depth + 1, paths)
+            else:
+                paths.setdefault(path, None)
+    
+    def _fill_row(
+        self,
+        value: Dict[str, Any],
+        prefix: Tuple[str, ...],
+        depth: int,
+        row: int,
+        flat_values: Dict[Tuple[str, ...], List[Any]],
+        stringified_paths: set
+    ):
+        """Write the leaf values of one row's nested dict into the flattened columns."""
+        for key, sub_value in value.items():
+            path = prefix + (str(key),)
+            if self._expands(sub_value, depth):
+                self._fill_row(sub_value, path, depth + 1, row, flat_values, stringified_paths)
+            elif isinstance(sub_value, (dict, list)):
+                flat_values[path][row] = json.dumps(sub_value)
+                stringified_paths.add(path)
+            else:
+                flat_values[path][row] = sub_value
+    
+    def _expands(self, value: Any, depth: int) -> bool:
+        """Check whether a nested value is expanded into further columns."""
+        return (
+            isinstance(value, dict)
+            and bool(value)
+            and (self.max_depth is None or depth < self.max_depth)
+        )
 
 
 class MetadataManager:
@@ -276,8 +384,8 @@ class DataForwarder:
         # Ensure the processed directory exists
         os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
         
-        # Get the base filename without extension
-        base_filename = os.path.splitext(os.path.basename(original_filename))[0]
+        # Get the base filename without data and compression extensions
+        base_filename = source_stem(original_filename)
         
         # Create the output filename
         output_filename = os.path.join(PROCESSED_DATA_DIR, f"{base_filename}.json")
@@ -343,10 +451,10 @@ def main():
         
         # Only process files (not directories)
         if os.path.isfile(file_path):
-            file_extension = os.path.splitext(file_path)[1].lower()
+            file_extension = data_extension(file_path)
             
-            # Only process CSV and JSON files
-            if file_extension in ['.csv', '.json']:
+            # Only process CSV and JSON files, optionally compressed
+            if file_extension in SUPPORTED_EXTENSIONS:
                 files_to_process.append(file_path)
     
     if not files_to_process:
@@ -17,13 +17,14 @@ It allows users to:
 import os
 import sys
 import json
-import yaml
 import csv
 import logging
+import argparse
 import datetime
 from pathlib import Path
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
+from functools import partial
 
 # Configure logging
 logging.basicConfig(
@@ -56,6 +57,14 @@ CONFIG_DIR = os.path.join(SCRIPT_DIR, 'config')
 TAGS_CONFIG_PATH = os.path.join(CONFIG_DIR, 'tags.yaml')
 TRANSFORMATION_LOG_PATH = os.path.join(LOGS_DIR, 'transformation_log.csv')
 
+# Import the payload format helpers
+from payload_store import resolve_output_format, COLUMNAR_EXTENSIONS
+from compressed_input import source_stem
+from batch_runner import run_batch, add_worker_argument, resolve_workers
+from tag_config import get_tag_config, TAG_CONFIG_REGISTRY
+
+SUPPORTED_EXTENSIONS = ['.csv', '.json'] + COLUMNAR_EXTENSIONS
+
 # Import the transformation agent modules
 try:
     from transformation_agent import (
@@ -64,7 +73,10 @@ try:
         DataTransformer,
         MetadataManager,
         DataForwarder,
-        TransformationLogger
+        TransformationLogger,
+        ChunkedTransformation,
+        ColumnExecutor,
+        COLUMN_WORKERS
     )
 except ImportError as e:
     logger.error(f"Error importing from transformation_agent: {e}")
@@ -73,6 +85,11 @@ except ImportError as e:
     # Define the classes here if the import fails
     # This makes the script self-contained and able to run without transformation_agent.py
     
+    # Chunked transformation and column threads are only available with transformation_agent.py
+    ChunkedTransformation = None
+    ColumnExecutor = None
+    COLUMN_WORKERS = 1
+    
     class DataLoader:
         """
         Handles loading data from processed files and inspecting their structure.
@@ -198,6 +215,20 @@ except ImportError as e:
                     datatypes[column] = str(df[column].dtype)
             
             return datatypes
+        
+        @staticmethod
+        def dataset_name(file_path: str, metadata: Dict[str, Any]) -> str:
+            """
+            Get the name of the dataset a processed file belongs to.
+            
+            Args:
+                file_path: Path to the file
+                metadata: Metadata of the file
+                
+            Returns:
+                Dataset name
+            """
+            return source_stem(metadata.get('delta_of') or metadata.get('filename') or file_path)
     
     
     class TaggingSystem:
@@ -212,38 +243,11 @@ except ImportError as e:
             Args:
                 config_path: Path to the tags configuration file
             """
-            self.config = self._load_config(config_path)
-            self.semantic_tags = self.config.get('semantic_tags', {})
-            self.transformations = self.config.get('transformations', {})
-        
-        def _load_config(self, config_path: str) -> Dict[str, Any]:
-            """
-            Load the tagging configuration from a YAML or JSON file.
-            
-            Args:
-                config_path: Path to the configuration file
-                
-            Returns:
-                Dictionary containing the configuration
-            """
-            logger.info(f"Loading tagging configuration from {config_path}")
-            
-            file_extension = os.path.splitext(config_path)[1].lower()
-            
-            try:
-                if file_extension == '.yaml' or file_extension == '.yml':
-                    with open(config_path, 'r') as f:
-                        config = yaml.safe_load(f)
-                elif file_extension == '.json':
-                    with open(config_path, 'r') as f:
-                        config = json.load(f)
-                else:
-                    raise ValueError(f"Unsupported configuration file format: {file_extension}")
-                
-                return config
-            except Exception as e:
-                logger.error(f"Error loading tagging configuration: {e}")
-                raise
+            # Parsed once per process and shared (see tag_config)
+            tag_config = get_tag_config(config_path)
+            self.config = tag_config.config
+            self.semantic_tags = tag_config.semantic_tags
+            self.transformations = tag_config.transformations
         
         def tag_fields(self, df: pd.DataFrame, datatypes: Dict[str, str]) -> Dict[str, List[str]]:
             """
@@ -295,13 +299,19 @@ except ImportError as e:
             self.tagging_system = tagging_system
             self.transformations = tagging_system.transformations
         
-        def transform_data(self, df: pd.DataFrame, field_tags: Dict[str, List[str]]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        def transform_data(
+            self,
+            df: pd.DataFrame,
+            field_tags: Dict[str, List[str]],
+            dataset: Optional[str] = None
+        ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
             """
             Apply transformations to the data based on field tags.
             
             Args:
                 df: DataFrame containing the data
                 field_tags: Dictionary mapping column names to lists of assigned tags
+                dataset: Name of the dataset (category vocabularies are not persisted by this fallback)
                 
             Returns:
                 tuple: (Transformed DataFrame, transformation metadata)
@@ -597,12 +607,7 @@ except ImportError as e:
             enriched_metadata['transformations'] = transformation_metadata
             
             # Add tag descriptions
-            tag_descriptions = {}
-            for tag_name, tag_info in TaggingSystem(TAGS_CONFIG_PATH).semantic_tags.items():
-                if 'description' in tag_info:
-                    tag_descriptions[tag_name] = tag_info['description']
-            
-            enriched_metadata['tag_descriptions'] = tag_descriptions
+            enriched_metadata['tag_descriptions'] = dict(get_tag_config(TAGS_CONFIG_PATH).tag_descriptions)
             
             # Create payload with data and metadata
             payload = {
@@ -733,12 +738,13 @@ except ImportError as e:
                 ])
 
 
-def process_file(file_path: str) -> bool:
+def process_file(file_path: str, column_workers: Optional[int] = None) -> bool:
     """
     Process a single file using the transformation components.
     
     Args:
         file_path: Path to the file to process
+        column_workers: Number of threads transforming columns (see ColumnExecutor)
         
     Returns:
         bool: True if processing was successful, False otherwise
@@ -748,7 +754,31 @@ def process_file(file_path: str) -> bool:
         
         # Initialize the tagging system
         tagging_system = TaggingSystem(TAGS_CONFIG_PATH)
-        data_transformer = DataTransformer(tagging_system)
+        if ColumnExecutor is not None:
+            data_transformer = DataTransformer(tagging_system, column_workers=column_workers)
+        else:
+            data_transformer = DataTransformer(tagging_system)
+        
+        # Large files are transformed in two passes over chunks
+        if ChunkedTransformation is not None and ChunkedTransformation.should_chunk(file_path):
+            result = ChunkedTransformation(data_transformer).transform_file(file_path)
+            if result is not None:
+                output_path, enriched_metadata, statistics = result
+                
+                # Log the transformation
+                TransformationLogger.log_transformation(
+                    os.path.basename(file_path),
+                    enriched_metadata.get('source_format', 'unknown'),
+                    statistics.row_count,
+                    len(statistics.columns),
+                    statistics.field_tags,
+                    enriched_metadata['transformations'],
+                    'success',
+                    output_path
+                )
+                
+                logger.info(f"File processed successfully: {file_path} -> {output_path}")
+                return True
         
         # Load data from the file
         df, metadata = DataLoader.load_from_file(file_path)
@@ -760,21 +790,41 @@ def process_file(file_path: str) -> bool:
         field_tags = tagging_system.tag_fields(df, datatypes)
         
         # Apply transformations
-        transformed_df, transformation_metadata = data_transformer.transform_data(df, field_tags)
-        
-        # Attach metadata
-        payload = MetadataManager.attach_metadata(
-            transformed_df,
-            metadata,
+        transformed_df, transformation_metadata = data_transformer.transform_data(
+            df,
             field_tags,
-            transformation_metadata
+            DataLoader.dataset_name(file_path, metadata)
         )
         
-        # Forward to enriched directory
-        output_path = DataForwarder.forward_to_enriched(
-            payload,
-            os.path.basename(file_path)
-        )
+        output_format = resolve_output_format(file_path)
+        if output_format == 'json':
+            # Attach metadata
+            payload = MetadataManager.attach_metadata(
+                transformed_df,
+                metadata,
+                field_tags,
+                transformation_metadata
+            )
+            
+            # Forward to enriched directory
+            output_path = DataForwarder.forward_to_enriched(
+                payload,
+                os.path.basename(file_path)
+            )
+        else:
+            # Large outputs are written in a columnar format without building records
+            enriched_metadata = MetadataManager.build_enriched_metadata(
+                transformed_df,
+                metadata,
+                field_tags,
+                transformation_metadata
+            )
+            output_path = DataForwarder.forward_frame_to_enriched(
+                transformed_df,
+                enriched_metadata,
+                os.path.basename(file_path),
+                output_format
+            )
         
         # Log the transformation
         TransformationLogger.log_transformation(
@@ -812,8 +862,15 @@ def process_file(file_path: str) -> bool:
         return False
 
 
-def main():
-    """Process all CSV and JSON files in the processed data directory."""
+def main(workers: Optional[int] = None):
+    """
+    Process all CSV and JSON files in the processed data directory.
+    
+    Args:
+        workers: Number of worker processes; defaults to ETL_BATCH_WORKERS
+    """
+    workers = resolve_workers(workers)
+    
     logger.info(f"Looking for files in: {PROCESSED_DATA_DIR}")
     
     # Ensure the necessary directories exist
@@ -834,8 +891,8 @@ def main():
         if os.path.isfile(file_path):
             file_extension = os.path.splitext(file_path)[1].lower()
             
-            # Only process CSV and JSON files
-            if file_extension in ['.csv', '.json']:
+            # Only process CSV, JSON and columnar payload files
+            if file_extension in SUPPORTED_EXTENSIONS:
                 files_to_process.append(file_path)
     
     if not files_to_process:
@@ -844,14 +901,20 @@ def main():
     
     logger.info(f"Found {len(files_to_process)} files to process")
     
-    # Process each file
-    success_count = 0
-    for file_path in files_to_process:
-        if process_file(file_path):
-            success_count += 1
+    # Worker processes each get their share of the CPUs for column threads
+    worker_fn = process_file
+    if ColumnExecutor is not None and workers > 1:
+        worker_fn = partial(process_file, column_workers=COLUMN_WORKERS or ColumnExecutor.cpu_budget(workers))
+    
+    # Process each file, optionally across a process pool
+    success_count = run_batch(worker_fn, files_to_process, workers=workers)
     
     logger.info(f"Processing complete. {success_count}/{len(files_to_process)} files processed successfully.")
     
+    # Worker processes keep their own registry, so only in-process runs are reported
+    if workers <= 1:
+        TAG_CONFIG_REGISTRY.log_metrics()
+    
     # Show the enriched files
     enriched_files = os.listdir(ENRICHED_DATA_DIR)
     if enriched_files:
@@ -861,4 +924,8 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='Process processed data files with the transformation agent')
+    add_worker_argument(parser)
+    args = parser.parse_args()
+    
+    main(workers=args.workers)
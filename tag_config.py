@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Tag Configuration Registry for the Transformation Stage
+
+This module parses the tagging configuration (config/tags.yaml) once per process and
+shares the parsed object between the TaggingSystem, DataTransformer and MetadataManager
+instances that use it. Each lookup only checks the file's modification time; the file is
+parsed and validated again only when it changed. A changed file that fails to parse or
+validate is reported and the previously loaded configuration stays in use.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from custom_transforms import validate_transforms
+
+# Configure logging
+logger = logging.getLogger('tag_config')
+
+# Normalization methods understood by the transformation stage
+NORMALIZATION_METHODS = ('min-max', 'z-score')
+
+
+class TagConfig:
+    """
+    One parsed and validated version of a tagging configuration file.
+    """
+
+    def __init__(self, path: str, config: Dict[str, Any], mtime_ns: Optional[int], version: int):
+        """
+        Initialize the parsed configuration.
+
+        Args:
+            path: Absolute path of the configuration file
+            config: Parsed configuration
+            mtime_ns: Modification time of the file when it was parsed
+            version: Number of times the file has been loaded in this process
+        """
+        self.path = path
+        self.config = config
+        self.semantic_tags = config.get('semantic_tags') or {}
+        self.transformations = config.get('transformations') or {}
+        self.mtime_ns = mtime_ns
+        self.version = version
+
+        # Objects derived from this version by its consumers (e.g. compiled keyword
+        # matchers), shared between them and dropped with it on reload
+        self.derived = {}
+
+    @property
+    def tag_descriptions(self) -> Dict[str, str]:
+        """Descriptions of the semantic tags that have one."""
+        descriptions = self.derived.get('tag_descriptions')
+        if descriptions is None:
+            descriptions = {
+                tag_name: tag_info['description']
+                for tag_name, tag_info in self.semantic_tags.items()
+                if 'description' in tag_info
+            }
+            self.derived['tag_descriptions'] = descriptions
+        return descriptions
+
+
+def parse_config_file(config_path: str) -> Dict[str, Any]:
+    """
+    Parse a YAML or JSON tagging configuration file.
+
+    Args:
+        config_path: Path to the configuration file
+
+    Returns:
+        Dictionary containing the configuration
+
+    Raises:
+        ValueError: If the file format is not supported or the file is not a mapping
+    """
+    file_extension = os.path.splitext(config_path)[1].lower()
+
+    if file_extension == '.yaml' or file_extension == '.yml':
+        with open(config_path, 'r') as f:
+            config = yaml.safe_load(f)
+    elif file_extension == '.json':
+        with open(config_path, 'r') as f:
+            config = json.load(f)
+    else:
+        raise ValueError(f"Unsupported configuration file format: {file_extension}")
+
+    if config is None:
+        return {}
+    if not isinstance(config, dict):
+        raise ValueError(f"Configuration must be a mapping, got {type(config).__name__}")
+    return config
+
+
+def validate_config(config: Dict[str, Any]) -> List[str]:
+    """
+    Check the semantic_tags and transformations sections of a tagging configuration,
+    including the settings of user-defined transformations (see custom_transforms).
+
+    Other top-level sections are left alone. Transformations referring to tags that are
+    not defined are only logged, since they simply never apply.
+
+    Args:
+        config: Parsed configuration
+
+    Returns:
+        List of problems found (empty if the configuration is valid)
+    """
+    errors = []
+
+    def check_list(value: Any, where: str):
+        if value is not None and not isinstance(value, list):
+            errors.append(f"{where} must be a list")
+
+    semantic_tags = config.get('semantic_tags') or {}
+    if not isinstance(semantic_tags, dict):
+        errors.append("semantic_tags must be a mapping of tag names to tag settings")
+        semantic_tags = {}
+
+    for tag_name, tag_config in semantic_tags.items():
+        if not isinstance(tag_config, dict):
+            errors.append(f"semantic_tags.{tag_name} must be a mapping")
+            continue
+        check_list(tag_config.get('keywords'), f"semantic_tags.{tag_name}.keywords")
+        check_list(tag_config.get('data_types'), f"semantic_tags.{tag_name}.data_types")
+
+    transformations = config.get('transformations') or {}
+    if not isinstance(transformations, dict):
+        errors.append("transformations must be a mapping of transformation names to settings")
+        transformations = {}
+
+    for name, settings in transformations.items():
+        if not isinstance(settings, dict):
+            errors.append(f"transformations.{name} must be a mapping")
+            continue
+
+        applies_to_tags = settings.get('applies_to_tags')
+        check_list(applies_to_tags, f"transformations.{name}.applies_to_tags")
+        if isinstance(applies_to_tags, list):
+            undefined = [tag for tag in applies_to_tags if tag not in semantic_tags]
+            if undefined:
+                logger.warning(f"transformations.{name} applies to undefined tag(s): {', '.join(map(str, undefined))}")
+
+    max_categories = (transformations.get('one_hot_encoding') or {}).get('max_categories')
+    if max_categories is not None and (not isinstance(max_categories, int) or max_categories < 0):
+        errors.append("transformations.one_hot_encoding.max_categories must be a non-negative integer")
+
+    normalization = transformations.get('numeric_normalization') or {}
+    if not isinstance(normalization, dict):
+        normalization = {}
+    method = normalization.get('method')
+    if method is not None and method not in NORMALIZATION_METHODS:
+        errors.append(
+            f"transformations.numeric_normalization.method must be one of: {', '.join(NORMALIZATION_METHODS)}"
+        )
+    target_range = normalization.get('range')
+    if target_range is not None and (
+        not isinstance(target_range, list)
+        or len(target_range) != 2
+        or not all(isinstance(bound, (int, float)) for bound in target_range)
+    ):
+        errors.append("transformations.numeric_normalization.range must be a list of two numbers")
+
+    date_format = (transformations.get('date_standardization') or {}).get('format')
+    if date_format is not None and not isinstance(date_format, str):
+        errors.append("transformations.date_standardization.format must be a string")
+
+    # User-defined transformations are compiled once here to check their settings
+    errors.extend(validate_transforms(transformations))
+
+    return errors
+
+
+class TagConfigRegistry:
+    """
+    Process-wide cache of parsed tagging configurations, keyed by file path.
+    """
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._configs = {}
+        self._lock = threading.Lock()
+
+        self._loads = 0
+        self._load_errors = 0
+        self._lookups = 0
+        self._total_load_seconds = 0.0
+        self._last_load_seconds = None
+
+    @staticmethod
+    def _mtime(path: str) -> Optional[int]:
+        """Get the modification time of a file, or None if it cannot be read."""
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, config_path: str) -> TagConfig:
+        """
+        Get the parsed configuration of a file, loading it if it is new or changed.
+
+        Args:
+            config_path: Path to the configuration file
+
+        Returns:
+            TagConfig of the current file contents (or of the last valid contents if
+            the file changed into an invalid configuration)
+
+        Raises:
+            ValueError: If the file has never been loaded and is not a valid configuration
+            OSError: If the file has never been loaded and cannot be read
+        """
+        path = os.path.abspath(config_path)
+        mtime = self._mtime(path)
+
+        tag_config = self._configs.get(path)
+        self._lookups += 1
+        if tag_config is not None and (mtime is None or mtime == tag_config.mtime_ns):
+            return tag_config
+
+        with self._lock:
+            # Another thread may have reloaded the file while this one waited
+            tag_config = self._configs.get(path)
+            if tag_config is not None and (mtime is None or mtime == tag_config.mtime_ns):
+                return tag_config
+
+            try:
+                return self._load(path, mtime)
+            except Exception as e:
+                self._load_errors += 1
+                if tag_config is None:
+                    logger.error(f"Error loading tagging configuration: {e}")
+                    raise
+
+                logger.error(f"Error reloading tagging configuration, keeping the previous version: {e}")
+
+                # Do not retry until the file changes again
+                tag_config.mtime_ns = mtime
+                return tag_config
+
+    def _load(self, path: str, mtime: Optional[int]) -> TagConfig:
+        """Parse, validate and register a configuration file; the caller holds the lock."""
+        previous = self._configs.get(path)
+        action = 'Reloading' if previous is not None else 'Loading'
+        logger.info(f"{action} tagging configuration from {path}")
+
+        started_at = time.perf_counter()
+        config = parse_config_file(path)
+
+        errors = validate_config(config)
+        if errors:
+            raise ValueError(f"Invalid tagging configuration {path}: {'; '.join(errors)}")
+
+        elapsed = time.perf_counter() - started_at
+        self._loads += 1
+        self._total_load_seconds += elapsed
+        self._last_load_seconds = elapsed
+
+        tag_config = TagConfig(path, config, mtime, (previous.version + 1) if previous is not None else 1)
+        self._configs[path] = tag_config
+
+        logger.info(f"Loaded tagging configuration version {tag_config.version} in {elapsed * 1000:.1f} ms")
+        return tag_config
+
+    def clear(self):
+        """Forget every loaded configuration so the next lookup parses the file again."""
+        with self._lock:
+            self._configs.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Get the registry metrics.
+
+        Returns:
+            Dictionary with the number of loaded files, loads, failed loads, lookups and
+            the total and last load time in seconds
+        """
+        with self._lock:
+            return {
+                'configs': len(self._configs),
+                'loads': self._loads,
+                'load_errors': self._load_errors,
+                'lookups': self._lookups,
+                'total_load_seconds': self._total_load_seconds,
+                'last_load_seconds': self._last_load_seconds
+            }
+
+    def log_metrics(self):
+        """Log the registry metrics."""
+        metrics = self.metrics()
+        last_load = f"{metrics['last_load_seconds'] * 1000:.1f}ms" if metrics['last_load_seconds'] is not None else 'n/a'
+        logger.info(
+            f"tag config: loads={metrics['loads']} load_errors={metrics['load_errors']} "
+            f"lookups={metrics['lookups']} total_load_time={metrics['total_load_seconds'] * 1000:.1f}ms "
+            f"last_load_time={last_load}"
+        )
+
+
+# Registry shared by everything in the process
+TAG_CONFIG_REGISTRY = TagConfigRegistry()
+
+
+def get_tag_config(config_path: str) -> TagConfig:
+    """
+    Get the parsed tagging configuration of a file from the process-wide registry.
+
+    Args:
+        config_path: Path to the configuration file
+
+    Returns:
+        TagConfig of the file
+    """
+    return TAG_CONFIG_REGISTRY.get(config_path)
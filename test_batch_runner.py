@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch runner of the ETL batch scripts
+
+Checks that batches give the same results with one or several worker processes, and
+that the batch scripts take their default number of workers from ETL_BATCH_WORKERS.
+
+Usage:
+    python -m pytest test_batch_runner.py
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+# Keep the processed-file manifest out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+import batch_runner
+from batch_runner import BatchRunner, resolve_workers, run_batch
+
+
+def process_even_sizes(file_path):
+    """Worker function that succeeds for files of even size and raises for empty files."""
+    size = os.path.getsize(file_path)
+    if size == 0:
+        raise ValueError("empty file")
+    return size % 2 == 0
+
+
+@pytest.fixture
+def batch_files(tmp_path):
+    """Files of sizes 0 to 9 bytes."""
+    paths = []
+    for size in range(10):
+        path = tmp_path / f'file_{size}.csv'
+        path.write_bytes(b'x' * size)
+        paths.append(str(path))
+    return paths
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_run_collects_results_largest_first(batch_files, workers):
+    """Results cover every file, with failures and errors reported per file."""
+    results = BatchRunner(process_even_sizes, workers=workers).run(batch_files)
+
+    by_path = {result['file_path']: result for result in results}
+    assert set(by_path) == set(batch_files)
+    assert [by_path[path]['success'] for path in batch_files] == [False] + [size % 2 == 0 for size in range(1, 10)]
+    assert by_path[batch_files[0]]['error'] == 'empty file'
+    assert all(result['seconds'] >= 0 for result in results)
+
+    if workers == 1:
+        assert [result['file_path'] for result in results] == batch_files[::-1]
+
+
+def test_run_batch_counts_successes(batch_files):
+    """run_batch returns the same number of successful files for any number of workers."""
+    assert run_batch(process_even_sizes, batch_files, workers=1) == 4
+    assert run_batch(process_even_sizes, batch_files, workers=2) == 4
+
+
+def test_resolve_workers_uses_the_environment_default(monkeypatch):
+    """An unset worker count falls back to ETL_BATCH_WORKERS; explicit counts win."""
+    monkeypatch.setattr(batch_runner, 'BATCH_WORKERS', 3)
+
+    assert resolve_workers() == 3
+    assert resolve_workers(None) == 3
+    assert resolve_workers(2) == 2
+    assert resolve_workers(0) == 1
+
+
+@pytest.mark.parametrize('module_name, input_dir, output_dirs', [
+    ('standalone_transformer', 'PROCESSED_DATA_DIR', ('ENRICHED_DATA_DIR', 'CONFIG_DIR')),
+    ('standalone_loader', 'ENRICHED_DATA_DIR', ('ARCHIVED_DATA_DIR',)),
+])
+def test_main_defaults_to_environment_workers(tmp_path, monkeypatch, module_name, input_dir, output_dirs):
+    """main() without a worker count runs the batch with the ETL_BATCH_WORKERS default."""
+    module = pytest.importorskip(module_name)
+    for constant in (input_dir,) + output_dirs:
+        monkeypatch.setattr(module, constant, str(tmp_path / constant.lower()))
+
+    # The loggers may come from the agent modules, which have their own log paths
+    for log_module in (module, sys.modules.get('transformation_agent'), sys.modules.get('loading_agent')):
+        log_paths = {
+            'LOGS_DIR': tmp_path / 'logs',
+            'TRANSFORMATION_LOG_PATH': tmp_path / 'logs' / 'transformation_log.csv',
+            'LOADING_LOG_PATH': tmp_path / 'logs' / 'loading_log.csv'
+        }
+        for constant, path in log_paths.items():
+            if hasattr(log_module, constant):
+                monkeypatch.setattr(log_module, constant, str(path))
+
+    os.makedirs(tmp_path / input_dir.lower())
+    (tmp_path / input_dir.lower() / 'customers.json').write_text('{"metadata": {}, "data": []}')
+
+    batches = []
+    monkeypatch.setattr(module, 'run_batch', lambda worker_fn, file_paths, workers: batches.append(workers) or 0)
+    monkeypatch.setattr(batch_runner, 'BATCH_WORKERS', 3)
+
+    module.main()
+    module.main(workers=2)
+
+    assert batches == [3, 2]
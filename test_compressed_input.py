@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for compressed input support
+
+Checks that gzip, bzip2 and xz inputs are detected from their content, named after
+their data format, and extracted like the uncompressed files.
+
+Usage:
+    python -m pytest test_compressed_input.py
+"""
+
+import os
+import bz2
+import gzip
+import lzma
+import tempfile
+
+import pandas as pd
+import pytest
+
+# Keep the processed-file manifest out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+import compressed_input
+from compressed_input import data_extension, detect_compression, estimated_size, open_input, source_stem
+
+
+CSV_TEXT = 'id,name,city\n' + ''.join(f'{i},name {i},city {i % 4}\n' for i in range(200))
+
+COMPRESSORS = {
+    'gzip': ('.gz', gzip.compress),
+    'bz2': ('.bz2', bz2.compress),
+    'xz': ('.xz', lzma.compress)
+}
+
+
+@pytest.fixture(params=sorted(COMPRESSORS))
+def compressed_csv(request, tmp_path):
+    """CSV file compressed with each supported format, and its compression name."""
+    extension, compress = COMPRESSORS[request.param]
+    path = tmp_path / f'sales.csv{extension}'
+    path.write_bytes(compress(CSV_TEXT.encode('utf-8')))
+    return path, request.param
+
+
+def test_detects_compression_from_content(compressed_csv, tmp_path):
+    """The compression format comes from the magic bytes, not the extension."""
+    path, compression = compressed_csv
+    assert detect_compression(str(path)) == compression
+
+    # Misnamed files are detected too
+    renamed = tmp_path / 'sales.csv'
+    renamed.write_bytes(path.read_bytes())
+    assert detect_compression(str(renamed)) == compression
+
+    plain = tmp_path / 'plain.csv'
+    plain.write_text(CSV_TEXT)
+    assert detect_compression(str(plain)) is None
+
+
+def test_open_input_decompresses(compressed_csv):
+    """Binary and text streams yield the uncompressed content."""
+    path, _ = compressed_csv
+
+    with open_input(str(path)) as f:
+        assert f.read() == CSV_TEXT.encode('utf-8')
+    with open_input(str(path), text=True) as f:
+        assert f.read() == CSV_TEXT
+
+
+def test_names_ignore_the_compression_extension():
+    """Compression extensions are stripped when deciding the data format and output name."""
+    assert data_extension('raw/sales.csv.gz') == '.csv'
+    assert data_extension('raw/events.JSONL.XZ') == '.jsonl'
+    assert data_extension('raw/sales.csv') == '.csv'
+    assert source_stem('raw/sales.csv.bz2') == 'sales'
+    assert source_stem('raw/sales.json') == 'sales'
+
+
+def test_estimated_size_scales_compressed_files(compressed_csv, tmp_path, monkeypatch):
+    """Compressed files are judged by their estimated uncompressed size."""
+    path, _ = compressed_csv
+    monkeypatch.setattr(compressed_input, 'COMPRESSION_RATIO_ESTIMATE', 5.0)
+
+    assert estimated_size(str(path)) == int(path.stat().st_size * 5.0)
+
+    plain = tmp_path / 'plain.csv'
+    plain.write_text(CSV_TEXT)
+    assert estimated_size(str(plain)) == plain.stat().st_size
+
+
+def test_compressed_files_extract_like_plain_files(compressed_csv, tmp_path):
+    """Whole and chunked extraction of a compressed file give the rows of the plain file."""
+    etl_agent = pytest.importorskip('etl_agent')
+    path, _ = compressed_csv
+    plain = tmp_path / 'plain.csv'
+    plain.write_text(CSV_TEXT)
+    expected, _ = etl_agent.DataExtractor.extract_from_file(str(plain))
+
+    df, source_format = etl_agent.DataExtractor.extract_from_file(str(path))
+    chunks, _ = etl_agent.DataExtractor.extract_chunks_from_file(str(path), chunk_size=64)
+
+    assert source_format == 'csv'
+    pd.testing.assert_frame_equal(df, expected)
+    pd.testing.assert_frame_equal(pd.concat(list(chunks), ignore_index=True), expected)
+
+
+def test_compressed_file_output_is_named_after_the_source(compressed_csv, tmp_path, monkeypatch):
+    """sales.csv.gz is forwarded as sales.json."""
+    etl_agent = pytest.importorskip('etl_agent')
+    path, _ = compressed_csv
+    monkeypatch.setattr(etl_agent, 'PROCESSED_DATA_DIR', str(tmp_path / 'processed'))
+    monkeypatch.setattr(etl_agent, 'resolve_output_format', lambda *args, **kwargs: 'json')
+
+    assert etl_agent.FileEventHandler()._process_file(str(path))
+
+    assert os.listdir(tmp_path / 'processed') == ['sales.json']
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Tests for the user-defined transformations
+
+Checks each transformation type against the equivalent pandas/NumPy operation, the
+validation of their settings, and how DataTransformer applies them.
+
+Usage:
+    python -m pytest test_custom_transforms.py
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Keep the processed-file manifest out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+import custom_transforms
+from custom_transforms import compile_transform, compile_transforms, register_transform_type, validate_transforms
+
+
+def apply(settings, values, columns=None):
+    """Compile a transformation and apply it to a column."""
+    transform = compile_transform('test', settings)
+    return transform.function(values, columns if columns is not None else {})
+
+
+@pytest.mark.parametrize('engine', ['numexpr', 'numpy'])
+def test_expression_matches_numpy(engine, monkeypatch):
+    """Expressions over the column and other columns equal the NumPy computation, with either engine."""
+    if engine == 'numexpr' and custom_transforms.numexpr is None:
+        pytest.skip("numexpr is not installed")
+    if engine == 'numpy':
+        monkeypatch.setattr(custom_transforms, 'numexpr', None)
+
+    price = pd.Series([10.0, 20.0, np.nan, 40.0], name='price')
+    columns = {'quantity': pd.Series([1, 2, 3, 4])}
+
+    result = apply({'type': 'expression', 'expression': 'where(x > 15, x * quantity, sqrt(x))'}, price, columns)
+
+    expected = np.where(price > 15, price * columns['quantity'], np.sqrt(price))
+    pd.testing.assert_series_equal(result, pd.Series(expected, name='price'))
+    assert compile_transform('test', {'type': 'expression', 'expression': 'x'}).metadata['engine'] == engine
+
+
+def test_constant_expression_fills_the_column():
+    """An expression without any column gives its value on every row."""
+    result = apply({'type': 'expression', 'expression': '2 ** 3'}, pd.Series([1.0, 2.0], name='price'))
+
+    assert result.tolist() == [8.0, 8.0]
+
+
+@pytest.mark.parametrize('expression, message', [
+    ("__import__('os')", 'unsupported'),
+    ('x.real', 'unsupported syntax'),
+    ("x + 'a'", 'unsupported constant'),
+    ('min(x, 1)', 'unsupported function call'),
+    ('x +', 'invalid expression'),
+    ('', 'non-empty string')
+])
+def test_unsafe_or_invalid_expressions_are_rejected(expression, message):
+    """Only arithmetic, comparisons and the allowed functions compile."""
+    with pytest.raises(ValueError, match=message):
+        compile_transform('test', {'type': 'expression', 'expression': expression})
+
+
+def test_expression_with_unknown_column_fails():
+    """Referring to a column that does not exist fails when the expression is applied."""
+    with pytest.raises(ValueError, match='unknown column quantity'):
+        apply({'type': 'expression', 'expression': 'x * quantity'}, pd.Series([1.0], name='price'))
+
+
+def test_clip_and_log():
+    """clip and log match Series.clip and np.log, with NaN where there is no logarithm."""
+    values = pd.Series([-5.0, 0.0, 9.0, 99.0, np.nan], name='amount')
+
+    clipped = apply({'type': 'clip', 'lower': 0, 'upper': 50}, values)
+    logged = apply({'type': 'log', 'base': 10, 'offset': 1}, values)
+
+    pd.testing.assert_series_equal(clipped, values.clip(0, 50))
+    np.testing.assert_allclose(logged, [np.nan, 0.0, 1.0, 2.0, np.nan])
+
+
+def test_bucket_matches_pd_cut():
+    """Values get the label of their bin; values outside every bin and missing values become NaN."""
+    values = pd.Series([0, 17, 18, 64, 65, 120, np.nan], name='age')
+    settings = {'type': 'bucket', 'bins': [0, 17, 64, 100], 'labels': ['child', 'adult', 'senior']}
+
+    result = apply(settings, values)
+
+    expected = pd.cut(values, [0, 17, 64, 100], labels=['child', 'adult', 'senior'], include_lowest=True)
+    pd.testing.assert_series_equal(result, expected.astype(object).where(expected.notna(), np.nan))
+    assert result.tolist()[:5] == ['child', 'child', 'adult', 'adult', 'senior']
+
+
+def test_string_normalize():
+    """Text is cleaned once per distinct value and mapped back to the rows."""
+    values = pd.Series(['  Café  Olé ', 'café olé', None, 'Tea-Room', '  Café  Olé '], name='shop')
+    settings = {'type': 'string_normalize', 'remove_accents': True, 'replace': {'-': ' '}}
+
+    result = apply(settings, values)
+
+    assert result.tolist()[:2] == ['cafe ole', 'cafe ole']
+    assert pd.isna(result[2])
+    assert result.tolist()[3:] == ['tea room', 'cafe ole']
+
+
+def test_validate_transforms_reports_invalid_settings():
+    """Invalid user-defined transformations are reported; built-in ones are not checked here."""
+    errors = validate_transforms({
+        'numeric_normalization': {'method': 'min-max'},
+        'cap': {'type': 'clip', 'lower': 10, 'upper': 1},
+        'log_amount': {'type': 'log', 'base': 1},
+        'age_group': {'type': 'bucket', 'bins': [0, 10, 5]},
+        'clean': {'type': 'string_normalize', 'case': 'sentence'},
+        'custom': {'type': 'unknown'},
+        'ok': {'type': 'clip', 'lower': 0}
+    })
+
+    assert errors == [
+        'transformations.cap: lower must not be greater than upper',
+        "transformations.log_amount: base must be 'e' or a positive number other than 1",
+        'transformations.age_group: bins must be strictly increasing',
+        'transformations.clean: case must be one of: lower, upper, title, none',
+        "transformations.custom: unknown type 'unknown', expected one of: "
+        + ', '.join(custom_transforms.TRANSFORM_TYPES)
+    ]
+
+
+def test_compile_transforms_keeps_valid_ones_in_order():
+    """Valid user-defined transformations are compiled in configuration order; invalid ones are skipped."""
+    compiled = compile_transforms({
+        'clean': {'type': 'string_normalize', 'applies_to_tags': ['text']},
+        'one_hot_encoding': {'applies_to_tags': ['entity_type']},
+        'broken': {'type': 'clip'},
+        'cap': {'type': 'clip', 'upper': 1, 'applies_to_tags': ['quantitative']}
+    })
+
+    assert [(transform.name, transform.type, transform.applies_to_tags) for transform in compiled] == [
+        ('clean', 'string_normalize', ('text',)),
+        ('cap', 'clip', ('quantitative',))
+    ]
+
+
+def test_registered_types_can_be_configured(monkeypatch):
+    """New transformation types are available once registered."""
+    monkeypatch.setattr(custom_transforms, 'TRANSFORM_TYPES', dict(custom_transforms.TRANSFORM_TYPES))
+
+    @register_transform_type('negate')
+    def negate(name, settings):
+        return (lambda values, columns: -values), {}
+
+    assert apply({'type': 'negate'}, pd.Series([1, -2])).tolist() == [-1, 2]
+
+
+def test_transformer_applies_custom_transforms_after_built_ins(tmp_path, monkeypatch):
+    """Custom transformations run after the built-in ones, in order, and report their metadata."""
+    transformation_agent = pytest.importorskip('transformation_agent')
+    yaml = pytest.importorskip('yaml')
+    monkeypatch.setattr(transformation_agent, 'FITTED_STATE_DIR', str(tmp_path / 'fitted_state'))
+
+    config_path = tmp_path / 'tags.yaml'
+    config_path.write_text(yaml.safe_dump({
+        'semantic_tags': {'quantitative': {'keywords': ['price']}},
+        'transformations': {
+            'numeric_normalization': {'applies_to_tags': ['quantitative'], 'method': 'min-max', 'range': [0, 1]},
+            'percent': {'type': 'expression', 'expression': 'x * 100', 'applies_to_tags': ['quantitative']},
+            'cap': {'type': 'clip', 'upper': 50, 'applies_to_tags': ['quantitative']}
+        }
+    }, sort_keys=False))
+    tagging_system = transformation_agent.TaggingSystem(str(config_path))
+    df = pd.DataFrame({'price': [10.0, 20.0, 30.0], 'name': ['a', 'b', 'c']})
+
+    result, metadata = transformation_agent.DataTransformer(tagging_system).transform_data(
+        df,
+        {'price': ['quantitative'], 'name': []}
+    )
+
+    assert result['price'].tolist() == [0.0, 50.0, 50.0]
+    assert list(metadata['applied_transformations']) == ['numeric_normalization', 'percent', 'cap']
+    assert metadata['applied_transformations']['cap'] == {
+        'type': 'clip',
+        'transformed_columns': ['price'],
+        'lower': None,
+        'upper': 50
+    }
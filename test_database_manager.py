@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Tests for the database side of the Loading Agent
+
+Runs DatabaseManager against a temporary SQLite database (through DATABASE_URL), so no
+database server is needed.
+
+Usage:
+    python -m pytest test_database_manager.py
+"""
+
+import os
+import json
+import datetime
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+import sqlalchemy
+import yaml
+from sqlalchemy import text
+
+# Keep the processed-file manifest out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+import loading_agent
+from loading_agent import DatabaseManager, EngineRegistry, FileEventHandler, LoadingConfig, SchemaInferrer, TableMetadataCache
+from file_manifest import FileManifest
+
+
+@pytest.fixture
+def db_manager(tmp_path, monkeypatch):
+    """Database manager connected to an empty SQLite database."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'load.db'}")
+    manager = DatabaseManager()
+    manager.connect()
+    yield manager
+    manager.disconnect()
+
+
+def query(db_manager, sql):
+    """Run a query and return all rows."""
+    with db_manager.begin() as conn:
+        return conn.execute(text(sql)).fetchall()
+
+
+def create_and_load(db_manager, table_name, df, **kwargs):
+    """Create the table from the frame's inferred schema if needed and load the frame."""
+    if not db_manager.table_exists(table_name):
+        db_manager.create_table(table_name, SchemaInferrer.infer_schema(df))
+    return db_manager.load_data(table_name, df, **kwargs)
+
+
+def test_load_frame_with_date_columns(db_manager):
+    """ISO date and datetime strings are loaded into Date and DateTime columns."""
+    df = pd.DataFrame({
+        'id': [1, 2, 3],
+        'signup_date': ['2025-01-15', '2025-02-20', None],
+        'created_at': pd.to_datetime(['2025-01-01 10:00', '2025-01-02 11:30', None])
+    })
+
+    assert create_and_load(db_manager, 'customers', df) == 3
+
+    rows = query(db_manager, 'SELECT id, signup_date, created_at, load_status FROM customers ORDER BY id')
+    assert [row[0] for row in rows] == [1, 2, 3]
+    assert rows[0][1] == '2025-01-15'
+    assert rows[1][1] == '2025-02-20'
+    assert rows[2][1] is None
+    assert rows[1][2].startswith('2025-01-02 11:30:00')
+    assert rows[2][2] is None
+    assert {row[3] for row in rows} == {'loaded'}
+
+
+def test_load_datetime_strings_into_existing_datetime_column(db_manager):
+    """Datetime strings are converted for DateTime columns of existing tables too."""
+    with db_manager.begin() as conn:
+        conn.execute(text('CREATE TABLE events (id INTEGER, happened_at DATETIME, load_status VARCHAR(50), load_timestamp DATETIME)'))
+
+    df = pd.DataFrame({'id': [1, 2], 'happened_at': ['2025-03-01 08:00:00', '2025-03-02T09:15:00']})
+    db_manager.load_data('events', df)
+
+    rows = query(db_manager, 'SELECT happened_at FROM events ORDER BY id')
+    assert rows[0][0].startswith('2025-03-01 08:00:00')
+    assert rows[1][0].startswith('2025-03-02 09:15:00')
+
+
+def test_load_date_objects(db_manager):
+    """Python date objects are loaded unchanged."""
+    df = pd.DataFrame({'id': [1], 'signup_date': ['2025-01-15']})
+    create_and_load(db_manager, 'customers', df)
+
+    db_manager.load_data('customers', pd.DataFrame({'id': [2], 'signup_date': [datetime.date(2024, 1, 1)]}))
+
+    assert query(db_manager, 'SELECT signup_date FROM customers ORDER BY id') == [('2025-01-15',), ('2024-01-01',)]
+
+
+def test_non_iso_dates_are_loaded_as_null(db_manager, caplog):
+    """Values of a Date column that are not ISO dates become NULL, with a warning counting them."""
+    df = pd.DataFrame({'id': [1], 'signup_date': ['2025-01-15']})
+    create_and_load(db_manager, 'customers', df)
+
+    batch = pd.DataFrame({'id': [2, 3, 4, 5], 'signup_date': ['N/A', '', '01/15/2023', '2024-02-29']})
+    with caplog.at_level('WARNING', logger='loading_agent'):
+        assert db_manager.load_data('customers', batch) == 4
+
+    rows = query(db_manager, 'SELECT id, signup_date FROM customers ORDER BY id')
+    assert rows == [(1, '2025-01-15'), (2, None), (3, None), (4, None), (5, '2024-02-29')]
+    assert 'Column signup_date has 3 values that are not ISO dates' in caplog.text
+
+
+def test_insert_batches_and_missing_values(db_manager, monkeypatch):
+    """Rows are inserted in several batches, with missing values as NULL."""
+    monkeypatch.setattr(loading_agent, 'LOAD_BATCH_ROWS', 7)
+
+    df = pd.DataFrame({
+        'id': np.arange(50),
+        'score': np.where(np.arange(50) % 5 == 0, np.nan, np.arange(50) / 2),
+        'label': ['a', None] * 25
+    })
+
+    assert create_and_load(db_manager, 'scores', df) == 50
+    assert query(db_manager, 'SELECT COUNT(*), COUNT(score), COUNT(label), SUM(id) FROM scores') == [(50, 40, 25, 1225)]
+
+
+def test_load_records(db_manager):
+    """A list of row dictionaries is loaded like a DataFrame."""
+    df = pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']})
+    create_and_load(db_manager, 'people', df)
+
+    assert db_manager.load_data('people', [{'id': 3, 'name': 'c'}]) == 1
+    assert query(db_manager, 'SELECT COUNT(*) FROM people') == [(3,)]
+
+
+def test_copy_rows_writes_csv_batches(db_manager, monkeypatch):
+    """COPY receives one CSV buffer per batch, with integral floats of integer columns written as integers."""
+    monkeypatch.setattr(loading_agent, 'LOAD_BATCH_ROWS', 2)
+
+    df = pd.DataFrame({'id': [1, 2, 3], 'name': ['a', None, 'c']})
+    db_manager.create_table('people', SchemaInferrer.infer_schema(df))
+    table = db_manager.get_table('people')
+
+    copied = []
+
+    class Cursor:
+        def copy_expert(self, statement, buffer):
+            copied.append((statement, buffer.read()))
+
+        def close(self):
+            pass
+
+    class Connection:
+        class connection:
+            @staticmethod
+            def cursor():
+                return Cursor()
+
+    rows = df.assign(id=[1.0, np.nan, 3.0], load_status='loaded', load_timestamp=pd.Timestamp('2025-01-01'))
+    db_manager._copy_rows(Connection, table, rows)
+
+    assert len(copied) == 2
+    statement = copied[0][0]
+    assert statement.startswith('COPY people (id, name, load_status, load_timestamp) FROM STDIN')
+    assert "NULL '\\N'" in statement
+    assert copied[0][1].splitlines() == ['1,a,loaded,2025-01-01', '\\N,\\N,loaded,2025-01-01']
+    assert copied[1][1].splitlines() == ['3,c,loaded,2025-01-01']
+
+
+def fail_on_write(monkeypatch, failing_call):
+    """Make the given call (1-based) of DatabaseManager._write_rows raise a database error."""
+    write_rows = DatabaseManager._write_rows
+    calls = {'count': 0}
+
+    def flaky_write_rows(self, conn, table, df, merge_keys=None):
+        calls['count'] += 1
+        if calls['count'] == failing_call:
+            raise sqlalchemy.exc.OperationalError('INSERT', {}, Exception('connection lost'))
+        return write_rows(self, conn, table, df, merge_keys)
+
+    monkeypatch.setattr(DatabaseManager, '_write_rows', flaky_write_rows)
+    return calls
+
+
+def test_checkpointed_load_resumes_after_failure(db_manager, monkeypatch):
+    """A retried load skips the chunks committed before the failure and clears its checkpoints."""
+    monkeypatch.setattr(loading_agent, 'LOAD_CHUNK_ROWS', 1000)
+    df = pd.DataFrame({'id': np.arange(5500), 'value': np.arange(5500) / 2})
+    db_manager.create_table('measurements', SchemaInferrer.infer_schema(df))
+
+    calls = fail_on_write(monkeypatch, failing_call=4)
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        db_manager.load_data('measurements', df, checkpoint_key='source-hash')
+
+    assert query(db_manager, 'SELECT COUNT(*) FROM measurements') == [(3000,)]
+    assert query(db_manager, 'SELECT start_row, end_row FROM etl_load_checkpoints ORDER BY chunk_index') == [
+        (0, 1000), (1000, 2000), (2000, 3000)
+    ]
+
+    calls['count'] = 0
+    assert db_manager.load_data('measurements', df, checkpoint_key='source-hash') == 5500
+
+    # Only the three uncommitted chunks were written again
+    assert calls['count'] == 3
+    assert query(db_manager, 'SELECT COUNT(*), COUNT(DISTINCT id), MIN(id), MAX(id) FROM measurements') == [(5500, 5500, 0, 5499)]
+    assert query(db_manager, 'SELECT COUNT(*) FROM etl_load_checkpoints') == [(0,)]
+
+
+def test_checkpointed_load_in_several_calls_resumes(db_manager, monkeypatch):
+    """A load split over several calls resumes by row offset and keeps its checkpoints until cleared."""
+    monkeypatch.setattr(loading_agent, 'LOAD_CHUNK_ROWS', 1000)
+    df = pd.DataFrame({'id': np.arange(5000)})
+    db_manager.create_table('measurements', SchemaInferrer.infer_schema(df))
+
+    def load_pieces():
+        loaded = 0
+        for piece in (df.iloc[:2500], df.iloc[2500:]):
+            loaded += db_manager.load_data('measurements', piece, checkpoint_key='stream', row_offset=loaded, complete=False)
+        db_manager.clear_checkpoints('measurements', 'stream')
+        return loaded
+
+    fail_on_write(monkeypatch, failing_call=5)
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        load_pieces()
+    assert query(db_manager, 'SELECT MAX(end_row) FROM etl_load_checkpoints') == [(3500,)]
+
+    monkeypatch.undo()
+    monkeypatch.setattr(loading_agent, 'LOAD_CHUNK_ROWS', 1000)
+    assert load_pieces() == 5000
+    assert query(db_manager, 'SELECT COUNT(*), COUNT(DISTINCT id) FROM measurements') == [(5000, 5000)]
+    assert query(db_manager, 'SELECT COUNT(*) FROM etl_load_checkpoints') == [(0,)]
+
+
+def test_agent_uses_the_manifest_fingerprint_as_checkpoint_key(tmp_path, monkeypatch):
+    """The loading agent hashes each file once, for the manifest, and reuses the hash for the load."""
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'load.db'}")
+    monkeypatch.setattr(loading_agent, 'ARCHIVED_DATA_DIR', str(tmp_path / 'archived'))
+    monkeypatch.setattr(loading_agent, 'LOGS_DIR', str(tmp_path / 'logs'))
+    monkeypatch.setattr(loading_agent, 'LOADING_LOG_PATH', str(tmp_path / 'logs' / 'loading_log.csv'))
+
+    file_path = tmp_path / 'customers.json'
+    file_path.write_text(json.dumps({'metadata': {}, 'data': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]}))
+    content_hash = FileManifest.hash_file(str(file_path))
+
+    hashed = []
+    hash_file = FileManifest.hash_file
+    monkeypatch.setattr(FileManifest, 'hash_file', staticmethod(lambda path: hashed.append(path) or hash_file(path)))
+
+    checkpoint_keys = []
+    load_data = DatabaseManager.load_data
+    monkeypatch.setattr(
+        DatabaseManager,
+        'load_data',
+        lambda self, table_name, data, **kwargs: checkpoint_keys.append(kwargs.get('checkpoint_key')) or load_data(self, table_name, data, **kwargs)
+    )
+
+    handler = FileEventHandler()
+    handler.manifest = FileManifest('loading', str(tmp_path / 'manifest.db'))
+    assert handler._process_tracked_file(str(file_path))
+
+    assert hashed == [str(file_path)]
+    assert checkpoint_keys == [content_hash]
+    assert (tmp_path / 'archived' / 'customers.json').exists()
+    assert query(handler.db_manager, 'SELECT id, name FROM customers ORDER BY id') == [(1, 'a'), (2, 'b')]
+
+
+def test_database_managers_share_the_engine(tmp_path, monkeypatch):
+    """Managers of the same database share one engine, whose pooled connection serves every load."""
+    registry = EngineRegistry()
+    monkeypatch.setattr(loading_agent, 'ENGINE_REGISTRY', registry)
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'load.db'}")
+
+    for file_index in range(3):
+        manager = DatabaseManager()
+        manager.connect()
+        create_and_load(manager, 'people', pd.DataFrame({'id': [file_index], 'name': ['a']}))
+        manager.disconnect()
+
+    metrics = registry.metrics()
+    assert metrics['engines'] == 1
+    assert metrics['connects'] == 1
+    assert metrics['checkouts'] > 3
+    assert metrics['checked_out'] == 0
+    assert DatabaseManager().engine is None
+    first, second = DatabaseManager(), DatabaseManager()
+    first.connect()
+    second.connect()
+    assert first.engine is second.engine
+
+    registry.dispose()
+    assert registry.metrics()['engines'] == 0
+    third = DatabaseManager()
+    third.connect()
+    assert third.engine is not first.engine
+
+
+def test_engines_inherited_from_another_process_are_replaced(tmp_path):
+    """An engine created before a fork is not reused by the child process."""
+    registry = EngineRegistry()
+    db_url = f"sqlite:///{tmp_path / 'load.db'}"
+    engine = registry.get(db_url)
+    assert registry.get(db_url) is engine
+
+    # Pretend the engine was created by the parent process
+    registry._engines[db_url] = (os.getpid() + 1, engine)
+
+    assert registry.get(db_url) is not engine
+    registry.dispose()
+
+
+@pytest.fixture
+def table_cache(monkeypatch):
+    """Empty table cache used by every database manager."""
+    cache = TableMetadataCache()
+    monkeypatch.setattr(loading_agent, 'TABLE_CACHE', cache)
+    return cache
+
+
+def count_catalog_queries(engine):
+    """Record the catalog queries (sqlite_master and PRAGMA) run on an engine."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if 'sqlite_master' in statement or statement.lstrip().upper().startswith('PRAGMA'):
+            statements.append(statement)
+
+    sqlalchemy.event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    return statements
+
+
+def test_repeated_loads_make_no_catalog_queries(db_manager, table_cache):
+    """Once a table is known, loading into it again does not query the database catalog."""
+    df = pd.DataFrame({'id': [1, 2], 'name': ['a', 'b']})
+    create_and_load(db_manager, 'people', df)
+    with db_manager.begin() as conn:
+        conn.execute(text('CREATE TABLE orders (id INTEGER, load_status VARCHAR(50), load_timestamp DATETIME)'))
+
+    catalog_queries = count_catalog_queries(db_manager.engine)
+    assert db_manager.table_exists('orders')
+    assert catalog_queries
+    del catalog_queries[:]
+
+    for _ in range(3):
+        assert db_manager.table_exists('people')
+        create_and_load(db_manager, 'people', df)
+        create_and_load(db_manager, 'orders', pd.DataFrame({'id': [1]}))
+
+    assert catalog_queries == []
+    metrics = table_cache.metrics()
+    assert (metrics['tables'], metrics['reflections']) == (2, 1)
+    assert metrics['hits'] >= 9
+    assert query(db_manager, 'SELECT COUNT(*) FROM people') == [(8,)]
+
+
+def test_missing_tables_are_looked_up_again(db_manager, table_cache):
+    """A table created outside the process after a failed lookup is found on the next one."""
+    assert not db_manager.table_exists('people')
+
+    with db_manager.begin() as conn:
+        conn.execute(text('CREATE TABLE people (id INTEGER, load_status VARCHAR(50), load_timestamp DATETIME)'))
+
+    assert db_manager.table_exists('people')
+    assert table_cache.metrics()['reflections'] == 1
+
+
+def test_schema_drift_reflects_the_table_again(db_manager, table_cache):
+    """Columns added outside the process are picked up, and failed loads invalidate the cached table."""
+    create_and_load(db_manager, 'people', pd.DataFrame({'id': [1]}))
+    with db_manager.begin() as conn:
+        conn.execute(text('ALTER TABLE people ADD COLUMN name VARCHAR(20)'))
+
+    assert db_manager.load_data('people', pd.DataFrame({'id': [2], 'name': ['b']})) == 1
+    assert query(db_manager, 'SELECT id, name FROM people ORDER BY id') == [(1, None), (2, 'b')]
+    assert table_cache.metrics()['reflections'] == 1
+
+    with db_manager.begin() as conn:
+        conn.execute(text('DROP TABLE people'))
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        db_manager.load_data('people', pd.DataFrame({'id': [3]}))
+
+    assert table_cache.metrics()['invalidations'] == 2
+    assert not db_manager.table_exists('people')
+
+
+def write_loading_config(path, tables, mtime_ns):
+    """Write a loading configuration with a given modification time."""
+    path.write_text(yaml.safe_dump({'tables': tables}))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def merge_config(tmp_path, monkeypatch):
+    """Loading configuration merging the customers table on customer_id."""
+    path = tmp_path / 'loading.yaml'
+    write_loading_config(path, {'customers': {'merge_keys': ['customer_id']}}, 1_000_000_000)
+    config = LoadingConfig(str(path))
+    monkeypatch.setattr(loading_agent, 'LOADING_CONFIG', config)
+    return config
+
+
+def test_merge_loads_upsert_on_the_merge_keys(db_manager, merge_config):
+    """Loading rows again updates them by key; new keys are inserted and other tables are appended to."""
+    first = pd.DataFrame({'customer_id': [1, 2], 'name': ['a', 'b'], 'score': [1.0, 2.0]})
+    create_and_load(db_manager, 'customers', first)
+    create_and_load(db_manager, 'customers', first)
+    create_and_load(db_manager, 'people', first)
+    create_and_load(db_manager, 'people', first)
+
+    second = pd.DataFrame({'customer_id': [2, 3], 'name': ['B', 'c'], 'score': [None, 3.0]})
+    assert db_manager.load_data('customers', second) == 2
+
+    assert query(db_manager, 'SELECT customer_id, name, score FROM customers ORDER BY customer_id') == [
+        (1, 'a', 1.0), (2, 'B', None), (3, 'c', 3.0)
+    ]
+    assert query(db_manager, 'SELECT COUNT(*) FROM people') == [(4,)]
+
+
+def test_merge_into_existing_table_creates_the_unique_index(db_manager, merge_config):
+    """A table created without a key constraint gets a unique index on the merge keys."""
+    with db_manager.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE customers (customer_id INTEGER, name VARCHAR(20), '
+            'load_status VARCHAR(50), load_timestamp DATETIME)'
+        ))
+
+    db_manager.load_data('customers', pd.DataFrame({'customer_id': [1], 'name': ['a']}))
+    db_manager.load_data('customers', pd.DataFrame({'customer_id': [1], 'name': ['b']}))
+
+    assert query(db_manager, 'SELECT customer_id, name FROM customers') == [(1, 'b')]
+    indexes = query(db_manager, "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'customers'")
+    assert ('uq_customers_customer_id',) in indexes
+
+
+def test_merge_keeps_the_last_row_per_key(db_manager, merge_config):
+    """Repeated keys within a load keep their last row; rows without a key are always inserted."""
+    df = pd.DataFrame({'customer_id': [1, 1, None, None], 'name': ['a', 'b', 'c', 'd']})
+
+    create_and_load(db_manager, 'customers', df)
+    create_and_load(db_manager, 'customers', df)
+
+    assert query(db_manager, 'SELECT customer_id, name FROM customers ORDER BY name') == [
+        (1, 'b'), (None, 'c'), (None, 'c'), (None, 'd'), (None, 'd')
+    ]
+
+
+def test_checkpointed_merge_load(db_manager, merge_config, monkeypatch):
+    """Checkpointed loads merge each committed chunk and resume after a failure."""
+    monkeypatch.setattr(loading_agent, 'LOAD_CHUNK_ROWS', 3)
+    df = pd.DataFrame({'customer_id': np.arange(10), 'name': [f'name {i}' for i in range(10)]})
+    create_and_load(db_manager, 'customers', df.iloc[:5])
+
+    # Each merged chunk writes its rows to the staging table within the table write,
+    # so the third write is the second chunk
+    calls = fail_on_write(monkeypatch, 3)
+    with pytest.raises(sqlalchemy.exc.OperationalError):
+        db_manager.load_data('customers', df, checkpoint_key='file-hash')
+    assert query(db_manager, 'SELECT end_row FROM etl_load_checkpoints') == [(3,)]
+
+    # The retry writes only the three remaining chunks
+    assert db_manager.load_data('customers', df, checkpoint_key='file-hash') == 10
+    assert calls['count'] == 3 + 3 * 2
+    assert query(db_manager, 'SELECT COUNT(*), COUNT(DISTINCT customer_id) FROM customers') == [(10, 10)]
+    assert query(db_manager, 'SELECT COUNT(*) FROM etl_load_checkpoints') == [(0,)]
+
+
+def test_loading_config_reloads_and_keeps_valid_settings(tmp_path):
+    """The configuration is read again when it changes, and an invalid change keeps the previous settings."""
+    path = tmp_path / 'loading.yaml'
+    config = LoadingConfig(str(path))
+    assert config.merge_keys('customers') is None
+
+    write_loading_config(path, {'customers': {'merge_keys': ['customer_id', 'region']}}, 1_000_000_000)
+    assert config.merge_keys('customers') == ['customer_id', 'region']
+
+    write_loading_config(path, {'customers': {'merge_keys': 'customer_id'}}, 2_000_000_000)
+    assert config.merge_keys('customers') == ['customer_id', 'region']
+
+    with pytest.raises(ValueError, match='non-empty list'):
+        LoadingConfig.parse(str(path))
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Tests for the Extraction Agent
+
+Runs the extraction of CSV and JSON files against temporary directories, so the
+project's data directories are left untouched.
+
+Usage:
+    python -m pytest test_etl_agent.py
+"""
+
+import os
+import json
+import tempfile
+
+import pandas as pd
+import pytest
+
+# Keep the processed-file manifest and tail offsets out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+import etl_agent
+from etl_agent import CSVTailReader, DataExtractor, DataNormalizer, FileEventHandler, NestedFlattener, process_file_streaming
+from file_manifest import TailOffsetStore
+
+
+@pytest.fixture
+def processed_dir(tmp_path, monkeypatch):
+    """Temporary processed-data directory that the agent forwards its output to."""
+    directory = tmp_path / 'processed'
+    monkeypatch.setattr(etl_agent, 'PROCESSED_DATA_DIR', str(directory))
+    return directory
+
+
+def read_forwarded(path):
+    """Read the rows and metadata of a forwarded JSON payload."""
+    with open(path) as f:
+        payload = json.load(f)
+    return pd.DataFrame(payload['data']), payload['metadata']
+
+
+def write_csv(path, rows=100):
+    """Write a CSV file with mixed column types and missing values."""
+    df = pd.DataFrame({
+        'Customer ID': range(rows),
+        'First Name': [f'name {i}' if i % 7 else None for i in range(rows)],
+        'Total Spent': [i * 1.25 if i % 5 else None for i in range(rows)],
+        'signupDate': pd.date_range('2025-01-01', periods=rows, freq='D').strftime('%Y-%m-%d')
+    })
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_chunked_csv_extraction_matches_full_read(tmp_path):
+    """The chunks of a CSV file hold the same rows as reading it in one go."""
+    file_path = tmp_path / 'customers.csv'
+    write_csv(file_path)
+
+    chunks, source_format = DataExtractor.extract_chunks_from_file(str(file_path), chunk_size=30)
+    chunks = list(chunks)
+    full, _ = DataExtractor.extract_from_file(str(file_path))
+
+    assert source_format == 'csv'
+    assert [len(chunk) for chunk in chunks] == [30, 30, 30, 10]
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), full)
+
+
+def test_should_stream_uses_the_size_threshold(tmp_path, monkeypatch):
+    """Files at or above the streaming threshold are extracted in chunks."""
+    file_path = tmp_path / 'customers.csv'
+    write_csv(file_path)
+    size = file_path.stat().st_size
+
+    monkeypatch.setattr(etl_agent, 'STREAMING_THRESHOLD_BYTES', size)
+    assert DataExtractor.should_stream(str(file_path))
+
+    monkeypatch.setattr(etl_agent, 'STREAMING_THRESHOLD_BYTES', size + 1)
+    assert not DataExtractor.should_stream(str(file_path))
+
+
+def test_streamed_file_matches_in_memory_processing(tmp_path, processed_dir, monkeypatch):
+    """Streaming a file chunk by chunk forwards the same normalized rows as processing it whole."""
+    monkeypatch.setattr(etl_agent, 'resolve_output_format', lambda *args, **kwargs: 'json')
+    file_path = tmp_path / 'customers.csv'
+    write_csv(file_path)
+
+    output_path = process_file_streaming(str(file_path), chunk_size=30)
+
+    rows, metadata = read_forwarded(output_path)
+    expected = DataNormalizer.normalize(DataExtractor.extract_from_file(str(file_path))[0])
+    assert list(rows.columns) == ['customer_id', 'first_name', 'total_spent', 'signup_date']
+    pd.testing.assert_frame_equal(rows, expected, check_dtype=False)
+    assert metadata['row_count'] == 100
+    assert metadata['columns'] == list(expected.columns)
+
+
+def test_flattener_expands_nested_dicts():
+    """Nested dicts become prefixed dotted columns, with missing keys as NaN."""
+    df = pd.DataFrame({
+        'id': [1, 2, 3],
+        'address': [
+            {'city': 'Oslo', 'geo': {'lat': 59.9, 'lon': 10.7}},
+            {'city': 'Bergen'},
+            None
+        ]
+    })
+
+    flattened, report = NestedFlattener().flatten(df)
+
+    assert list(flattened.columns) == ['id', 'address_city', 'address_geo.lat', 'address_geo.lon']
+    assert flattened['address_city'].tolist()[:2] == ['Oslo', 'Bergen']
+    assert pd.isna(flattened['address_city'].iloc[2])
+    assert flattened['address_geo.lat'].iloc[0] == 59.9
+    assert flattened['address_geo.lon'].isna().tolist() == [False, True, True]
+    assert report['expanded_columns'] == ['address']
+    assert report['stringified_columns'] == []
+
+
+def test_flattener_stringifies_lists_and_deep_dicts():
+    """Lists and dicts below max_depth are stored as JSON strings and reported."""
+    df = pd.DataFrame({
+        'tags': [['a', 'b'], 'plain', None],
+        'profile': [{'name': 'a', 'prefs': {'email': True}}, {'name': 'b', 'prefs': {}}, {'name': 'c', 'items': [1]}]
+    })
+
+    flattened, report = NestedFlattener(max_depth=1).flatten(df)
+
+    assert flattened['tags'].tolist()[:2] == ['["a", "b"]', 'plain']
+    assert flattened['profile_prefs'].tolist()[:2] == ['{"email": true}', '{}']
+    assert flattened['profile_items'].iloc[2] == '[1]'
+    assert flattened['profile_name'].tolist() == ['a', 'b', 'c']
+    assert set(report['stringified_columns']) == {'tags', 'profile_prefs', 'profile_items'}
+    assert report['max_depth'] == 1
+
+
+def test_flattener_matches_json_normalize():
+    """Without a depth limit, the expanded columns match pd.json_normalize."""
+    records = [
+        {'id': i, 'meta': {'source': f's{i % 3}', 'stats': {'views': i, 'likes': i * 2}}}
+        for i in range(20)
+    ]
+    df = pd.DataFrame({'id': [record['id'] for record in records], 'meta': [record['meta'] for record in records]})
+
+    flattened, _ = NestedFlattener().flatten(df)
+
+    expected = pd.json_normalize([record['meta'] for record in records]).add_prefix('meta_')
+    pd.testing.assert_frame_equal(flattened.drop(columns='id'), expected)
+
+
+def test_flattener_leaves_flat_frames_unchanged():
+    """A frame without nested values is returned as is."""
+    df = pd.DataFrame({'id': [1, 2], 'name': ['a', None]})
+
+    flattened, report = NestedFlattener().flatten(df)
+
+    assert flattened is df
+    assert report['expanded_columns'] == report['stringified_columns'] == []
+
+
+def test_tail_reader_reads_complete_lines_only(tmp_path):
+    """A trailing line without a newline is left for the next read."""
+    file_path = tmp_path / 'events.csv'
+    file_path.write_bytes(b'id,name\n1,a\n2,b\n3,c')
+
+    df, offset, header = CSVTailReader.read_new_rows(str(file_path), 0, None)
+
+    assert header == 'id,name'
+    assert df['id'].tolist() == [1, 2]
+    assert offset == len(b'id,name\n1,a\n2,b\n')
+
+    with open(file_path, 'ab') as f:
+        f.write(b'\n4,d\n')
+
+    df, offset, header = CSVTailReader.read_new_rows(str(file_path), offset, header)
+
+    assert df['id'].tolist() == [3, 4]
+    assert offset == file_path.stat().st_size
+
+
+def test_tail_reader_bounds_each_read(tmp_path):
+    """A large backlog is read in batches of about max_bytes that end on line boundaries."""
+    file_path = tmp_path / 'events.csv'
+    file_path.write_text('id,name\n' + ''.join(f'{i},name{i}\n' for i in range(1000)))
+
+    offset, header, ids, batches = 0, None, [], 0
+    while True:
+        df, new_offset, header = CSVTailReader.read_new_rows(str(file_path), offset, header, max_bytes=500)
+        if new_offset == offset:
+            break
+        assert new_offset - offset < 500 + 20
+        if df is not None:
+            ids.extend(df['id'].tolist())
+        offset = new_offset
+        batches += 1
+
+    assert batches > 10
+    assert ids == list(range(1000))
+
+
+def test_followed_file_backlog_is_forwarded_in_batches(tmp_path, processed_dir, monkeypatch):
+    """The first read of a followed file is split into batches, each with its offset saved."""
+    monkeypatch.setattr(etl_agent, 'TAIL_READ_BYTES', 2000)
+    monkeypatch.setattr(etl_agent, 'resolve_output_format', lambda *args, **kwargs: 'json')
+
+    file_path = tmp_path / 'events.csv'
+    file_path.write_text('id,value\n' + ''.join(f'{i},{i * 2}\n' for i in range(500)))
+
+    handler = FileEventHandler(tail_follow=True)
+    handler.tail_offsets = TailOffsetStore(str(tmp_path / 'offsets.db'))
+
+    saved = []
+    save = handler.tail_offsets.save
+    monkeypatch.setattr(handler.tail_offsets, 'save', lambda *args: saved.append(args[1]) or save(*args))
+
+    assert handler._process_file(str(file_path))
+
+    # The first batch is the regular output, the rest are numbered deltas
+    outputs = sorted(os.listdir(processed_dir), key=lambda name: (name != 'events.json', name))
+    assert outputs[0] == 'events.json'
+    assert len(outputs) == len(saved) > 1
+    assert saved == sorted(saved)
+    assert handler.tail_offsets.get(str(file_path))['offset'] == file_path.stat().st_size
+
+    rows = pd.concat([read_forwarded(processed_dir / name)[0] for name in outputs], ignore_index=True)
+    assert rows['id'].tolist() == list(range(500))
+
+    # Rows appended later are forwarded as the next delta
+    with open(file_path, 'a') as f:
+        f.write('500,1000\n')
+    assert handler._process_file(str(file_path))
+
+    delta, metadata = read_forwarded(processed_dir / f'events.delta_{len(outputs):06d}.json')
+    assert delta['id'].tolist() == [500]
+    assert metadata['delta_of'] == 'events.csv'
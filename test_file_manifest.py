@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the processed-file manifest
+
+Checks when a recorded file counts as already processed, and that the agents skip
+such files when they scan their directory at startup.
+
+Usage:
+    python -m pytest test_file_manifest.py
+"""
+
+import os
+import tempfile
+
+import pytest
+
+# Keep the processed-file manifest out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+from file_manifest import FileManifest, process_and_record
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    """Empty manifest of the extraction agent."""
+    return FileManifest('extraction', str(tmp_path / 'manifest.db'))
+
+
+@pytest.fixture
+def data_file(tmp_path):
+    """Small CSV file."""
+    path = tmp_path / 'customers.csv'
+    path.write_text('id,name\n1,a\n')
+    return path
+
+
+def set_mtime(path, mtime_ns):
+    """Give a file a new modification time without changing its contents."""
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_recorded_file_is_processed(manifest, data_file):
+    """A recorded file is processed; unknown and deleted files are not."""
+    assert not manifest.is_processed(str(data_file))
+
+    manifest.record(str(data_file))
+
+    assert manifest.is_processed(str(data_file))
+    os.remove(data_file)
+    assert not manifest.is_processed(str(data_file))
+
+
+def test_unchanged_size_and_mtime_skip_hashing(manifest, data_file, monkeypatch):
+    """A file with its recorded size and modification time is not read again."""
+    manifest.record(str(data_file))
+    monkeypatch.setattr(FileManifest, 'hash_file', staticmethod(lambda path: pytest.fail("file was hashed")))
+
+    assert manifest.is_processed(str(data_file))
+
+
+def test_touched_file_is_compared_by_content(manifest, data_file, monkeypatch):
+    """A new modification time with the same content still counts as processed, and is stored."""
+    manifest.record(str(data_file))
+    set_mtime(data_file, data_file.stat().st_mtime_ns + 10 ** 9)
+
+    assert manifest.is_processed(str(data_file))
+
+    # The new modification time was recorded, so the next check does not hash the file
+    monkeypatch.setattr(FileManifest, 'hash_file', staticmethod(lambda path: pytest.fail("file was hashed")))
+    assert manifest.is_processed(str(data_file))
+
+
+def test_changed_content_is_not_processed(manifest, data_file):
+    """Changing the content (even at the same size) makes the file unprocessed."""
+    manifest.record(str(data_file))
+    mtime_ns = data_file.stat().st_mtime_ns
+
+    data_file.write_text('id,name\n2,b\n')
+    set_mtime(data_file, mtime_ns + 10 ** 9)
+    assert not manifest.is_processed(str(data_file))
+
+    data_file.write_text('id,name\n2,bb\n')
+    assert not manifest.is_processed(str(data_file))
+
+
+def test_entries_are_kept_per_agent_and_cleared(manifest, data_file):
+    """Each agent has its own entries, and clearing removes only that agent's."""
+    other = FileManifest('loading', manifest.db_path)
+    manifest.record(str(data_file))
+
+    assert not other.is_processed(str(data_file))
+    assert other.clear() == 0
+    assert manifest.is_processed(str(data_file))
+    assert manifest.clear() == 1
+    assert not manifest.is_processed(str(data_file))
+
+
+def test_process_and_record_records_successes_only(manifest, data_file):
+    """Files are recorded only when processing succeeds, with the fingerprint taken before it."""
+    fingerprint = FileManifest.fingerprint(str(data_file))
+    assert not process_and_record(manifest, lambda path: False, str(data_file))
+    assert not manifest.is_processed(str(data_file))
+
+    def process_and_rewrite(path, received):
+        assert received == fingerprint
+        data_file.write_text('id,name\n1,a\n2,b\n')
+        return True
+
+    assert process_and_record(manifest, process_and_rewrite, str(data_file), pass_fingerprint=True)
+
+    # The recorded fingerprint describes the content that was processed
+    assert not manifest.is_processed(str(data_file))
+    data_file.write_text('id,name\n1,a\n')
+    set_mtime(data_file, fingerprint['mtime_ns'])
+    assert manifest.is_processed(str(data_file))
+
+
+def test_agent_skips_processed_files_at_startup(tmp_path, monkeypatch):
+    """Only new or changed files in the watched directory are queued at startup."""
+    etl_agent = pytest.importorskip('etl_agent')
+    monkeypatch.setattr(etl_agent, 'RAW_DATA_DIR', str(tmp_path / 'raw'))
+    monkeypatch.setattr(etl_agent, 'PROCESSED_DATA_DIR', str(tmp_path / 'processed'))
+
+    agent = etl_agent.ExtractionAgent(rebuild_manifest=True)
+    agent.event_handler.manifest = FileManifest('extraction', str(tmp_path / 'manifest.db'))
+
+    done_path = tmp_path / 'raw' / 'done.csv'
+    new_path = tmp_path / 'raw' / 'new.csv'
+    done_path.write_text('id\n1\n')
+    new_path.write_text('id\n2\n')
+    (tmp_path / 'raw' / 'notes.txt').write_text('not data')
+    agent.event_handler.manifest.record(str(done_path))
+
+    queued = []
+    monkeypatch.setattr(agent.event_handler.work_queue, 'submit', lambda path, **kwargs: queued.append(path))
+
+    agent._process_existing_files()
+
+    assert queued == [str(new_path)]
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for the file work queue and its use by the watchdog agents
+
+Checks that files submitted to a FileWorkQueue are processed by its worker threads,
+and that each agent starts its workers so that files found in the watched directory
+are processed.
+
+Usage:
+    python -m pytest test_file_queue.py
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+# Keep the processed-file manifests of the agents out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+from file_queue import FileWorkQueue
+
+
+def wait_for(condition, timeout=10.0):
+    """Wait until condition() is true, failing the test after the timeout."""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() >= deadline:
+            pytest.fail("Timed out waiting for the work queue")
+        time.sleep(0.01)
+
+
+def test_submitted_file_is_processed(tmp_path):
+    """A submitted file is handed to process_fn by a worker thread."""
+    file_path = tmp_path / 'data.csv'
+    file_path.write_text('id\n1\n')
+
+    processed = []
+    work_queue = FileWorkQueue(processed.append, workers=2, debounce_seconds=0.01)
+    work_queue.start()
+    try:
+        assert work_queue.submit(str(file_path))
+        wait_for(lambda: work_queue.metrics()['processed'] == 1)
+    finally:
+        work_queue.stop()
+
+    assert processed == [str(file_path)]
+    metrics = work_queue.metrics()
+    assert metrics['queue_depth'] == 0
+    assert metrics['failed'] == 0
+
+
+def test_duplicate_submissions_are_processed_once(tmp_path):
+    """A path already waiting in the queue is not queued again."""
+    file_path = tmp_path / 'data.csv'
+    file_path.write_text('id\n1\n')
+
+    processed = []
+    work_queue = FileWorkQueue(processed.append, debounce_seconds=0.01)
+    assert work_queue.submit(str(file_path))
+    assert not work_queue.submit(str(file_path))
+
+    work_queue.start()
+    try:
+        wait_for(lambda: work_queue.metrics()['processed'] == 1)
+    finally:
+        work_queue.stop()
+
+    assert processed == [str(file_path)]
+
+
+def test_failures_are_counted(tmp_path):
+    """Files whose processing returns False or raises count as failed."""
+    ok_path = tmp_path / 'ok.csv'
+    bad_path = tmp_path / 'bad.csv'
+    error_path = tmp_path / 'error.csv'
+    for path in (ok_path, bad_path, error_path):
+        path.write_text('id\n1\n')
+
+    def process(file_path):
+        if file_path.endswith('error.csv'):
+            raise ValueError("broken file")
+        return not file_path.endswith('bad.csv')
+
+    work_queue = FileWorkQueue(process, debounce_seconds=0.01)
+    work_queue.start()
+    try:
+        for path in (ok_path, bad_path, error_path):
+            work_queue.submit(str(path))
+        wait_for(lambda: work_queue.metrics()['processed'] + work_queue.metrics()['failed'] == 3)
+    finally:
+        work_queue.stop()
+
+    assert work_queue.metrics()['processed'] == 1
+    assert work_queue.metrics()['failed'] == 2
+
+
+def test_missing_file_is_skipped(tmp_path):
+    """A file deleted before a worker gets to it is not processed."""
+    processed = []
+    work_queue = FileWorkQueue(processed.append, debounce_seconds=0.01)
+    work_queue.submit(str(tmp_path / 'gone.csv'))
+    work_queue.start()
+    try:
+        work_queue.join()
+    finally:
+        work_queue.stop()
+
+    assert processed == []
+
+
+@pytest.mark.parametrize('module_name, agent_class, directory', [
+    ('etl_agent', 'ExtractionAgent', 'RAW_DATA_DIR'),
+    ('transformation_agent', 'TransformationAgent', 'PROCESSED_DATA_DIR'),
+    ('loading_agent', 'LoadingAgent', 'ENRICHED_DATA_DIR'),
+])
+def test_agent_processes_existing_files(tmp_path, monkeypatch, module_name, agent_class, directory):
+    """Starting an agent starts its workers, which process the files already in its directory."""
+    module = pytest.importorskip(module_name)
+    monkeypatch.setattr(module, directory, str(tmp_path))
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'agent.db'}")
+    log_paths = {
+        'LOGS_DIR': tmp_path / 'logs',
+        'TRANSFORMATION_LOG_PATH': tmp_path / 'logs' / 'transformation_log.csv',
+        'LOADING_LOG_PATH': tmp_path / 'logs' / 'loading_log.csv'
+    }
+    for constant, path in log_paths.items():
+        if hasattr(module, constant):
+            monkeypatch.setattr(module, constant, str(path))
+
+    file_path = tmp_path / 'existing.csv'
+    file_path.write_text('id,name\n1,a\n')
+
+    agent = getattr(module, agent_class)(debounce_seconds=0.01, rebuild_manifest=True)
+    processed = []
+    agent.event_handler.work_queue.process_fn = processed.append
+
+    # Stop the agent once the queue has drained instead of running forever
+    def run_until_processed(work_queue, *args, **kwargs):
+        wait_for(lambda: work_queue.metrics()['processed'] == 1)
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(module, 'run_with_metrics', run_until_processed)
+
+    runner = threading.Thread(target=agent.start, daemon=True)
+    runner.start()
+    runner.join(timeout=15)
+
+    assert not runner.is_alive()
+    assert processed == [str(file_path)]
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for the fused extract-transform-load pipeline
+
+Runs raw files through the in-memory pipeline into a temporary SQLite database, with
+every data and log directory redirected to a temporary directory.
+
+Usage:
+    python -m pytest test_fused_pipeline.py
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+from sqlalchemy import create_engine, text
+
+# Keep the processed-file manifest out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+fused_pipeline = pytest.importorskip('fused_pipeline')
+
+import etl_agent
+import loading_agent
+import transformation_agent
+from fused_pipeline import FusedPipeline
+
+
+# Tagging configuration that normalizes, one-hot encodes and standardizes the sample columns
+TAGS_CONFIG = {
+    'semantic_tags': {
+        'identity': {'keywords': ['id']},
+        'temporal_reference': {'keywords': ['date']},
+        'entity_type': {'keywords': ['status']},
+        'quantitative': {'keywords': ['price', 'age'], 'data_types': ['int', 'float', 'int64', 'float64']}
+    },
+    'transformations': {
+        'date_standardization': {'applies_to_tags': ['temporal_reference'], 'format': '%Y-%m-%d'},
+        'one_hot_encoding': {'applies_to_tags': ['entity_type'], 'max_categories': 5},
+        'numeric_normalization': {'applies_to_tags': ['quantitative'], 'method': 'min-max', 'range': [0, 1]}
+    }
+}
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    """Temporary data, log and database locations for all pipeline stages."""
+    logs_dir = tmp_path / 'logs'
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'pipeline.db'}")
+
+    monkeypatch.setattr(etl_agent, 'PROCESSED_DATA_DIR', str(tmp_path / 'processed'))
+    for module in (transformation_agent, fused_pipeline):
+        monkeypatch.setattr(module, 'ENRICHED_DATA_DIR', str(tmp_path / 'enriched'))
+    monkeypatch.setattr(transformation_agent, 'LOGS_DIR', str(logs_dir))
+    monkeypatch.setattr(transformation_agent, 'TRANSFORMATION_LOG_PATH', str(logs_dir / 'transformation_log.csv'))
+    monkeypatch.setattr(transformation_agent, 'VOCABULARY_DIR', str(logs_dir / 'vocabularies'))
+    monkeypatch.setattr(transformation_agent, 'FITTED_STATE_DIR', str(logs_dir / 'fitted_state'))
+    monkeypatch.setattr(loading_agent, 'LOGS_DIR', str(logs_dir))
+    monkeypatch.setattr(loading_agent, 'LOADING_LOG_PATH', str(logs_dir / 'loading_log.csv'))
+
+    tags_path = tmp_path / 'tags.yaml'
+    tags_path.write_text(yaml.safe_dump(TAGS_CONFIG))
+    for module in (transformation_agent, fused_pipeline):
+        monkeypatch.setattr(module, 'TAGS_CONFIG_PATH', str(tags_path))
+    return tmp_path
+
+
+def write_raw_csv(path, rows=60):
+    """Write a raw customer file with numeric, categorical, date and text columns."""
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        'id': np.arange(rows),
+        'firstName': [f'name {i}' for i in range(rows)],
+        'status': rng.choice(['active', 'inactive', 'pending'], rows),
+        'price': np.round(rng.random(rows) * 100, 2),
+        'age': rng.integers(18, 90, rows),
+        'signupDate': pd.date_range('2025-01-01', periods=rows, freq='D').strftime('%Y-%m-%d')
+    }).to_csv(path, index=False)
+    return path
+
+
+def table_rows(db_path, table_name):
+    """Read a loaded table without the load bookkeeping columns, ordered by id."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        with engine.connect() as conn:
+            df = pd.read_sql(text(f'SELECT * FROM {table_name}'), conn)
+    finally:
+        engine.dispose()
+    return df.drop(columns=['load_status', 'load_timestamp']).sort_values('id').reset_index(drop=True)
+
+
+def test_file_is_loaded_without_intermediate_files(workspace):
+    """A raw file is extracted, transformed and loaded with no processed or enriched files."""
+    raw_path = write_raw_csv(workspace / 'customers.csv')
+
+    assert FusedPipeline().process_file(str(raw_path))
+
+    rows = table_rows(workspace / 'pipeline.db', 'customers')
+    assert len(rows) == 60
+    assert 'first_name' in rows.columns and 'signup_date' in rows.columns
+    assert rows['price'].min() == 0 and rows['price'].max() == 1
+    assert {'status_active', 'status_inactive', 'status_pending'} <= set(rows.columns)
+    assert not (workspace / 'processed').exists() or not os.listdir(workspace / 'processed')
+    assert not (workspace / 'enriched').exists() or not os.listdir(workspace / 'enriched')
+
+
+def test_checkpoints_write_the_stage_outputs(workspace):
+    """Requested checkpoints are written where the agents would write them."""
+    raw_path = write_raw_csv(workspace / 'customers.csv')
+
+    assert FusedPipeline(checkpoints=['processed', 'enriched'], load=False).process_file(str(raw_path))
+
+    assert os.listdir(workspace / 'processed') == ['customers.json']
+    assert os.listdir(workspace / 'enriched') == ['customers.json']
+    assert not (workspace / 'pipeline.db').exists()
+
+
+def test_unknown_checkpoint_stage_is_rejected(workspace):
+    """Only the processed and enriched stages can be checkpointed."""
+    with pytest.raises(ValueError, match='loaded'):
+        FusedPipeline(checkpoints=['loaded'], load=False)
+
+
+def test_streamed_file_loads_the_same_rows(workspace, monkeypatch):
+    """A file processed in chunks loads the same rows as the file processed whole."""
+    raw_path = write_raw_csv(workspace / 'customers.csv', rows=95)
+    assert FusedPipeline().process_file(str(raw_path))
+    whole = table_rows(workspace / 'pipeline.db', 'customers')
+
+    # Stream the same file in chunks of 20 rows into a second database
+    monkeypatch.setenv('DATABASE_URL', f"sqlite:///{workspace / 'streamed.db'}")
+    monkeypatch.setattr(etl_agent, 'STREAMING_THRESHOLD_BYTES', 0)
+    extract_chunks = etl_agent.DataExtractor.extract_chunks_from_file
+    monkeypatch.setattr(
+        etl_agent.DataExtractor,
+        'extract_chunks_from_file',
+        staticmethod(lambda file_path, chunk_size=20: extract_chunks(file_path, 20))
+    )
+
+    pipeline = FusedPipeline()
+    assert pipeline.process_stream(str(raw_path)) == ('customers', 95)
+
+    streamed = table_rows(workspace / 'streamed.db', 'customers')
+    pd.testing.assert_frame_equal(streamed, whole, check_dtype=False)
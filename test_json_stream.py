@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental JSON parser
+
+Checks that JSONRecordStream yields the same records as decoding the whole file
+with json.load, for each supported JSON structure.
+
+Usage:
+    python -m pytest test_json_stream.py
+"""
+
+import os
+import gzip
+import json
+import tempfile
+
+import pandas as pd
+import pytest
+
+# Keep the processed-file manifest out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+from json_stream import JSONRecordStream
+
+
+RECORDS = [{'id': i, 'name': f'name {i}', 'tags': ['a', 'b'][:i % 3], 'score': i / 4} for i in range(25)]
+
+
+def read_all(file_path, batch_size=10):
+    """Parse a file and return the stream and its concatenated batches."""
+    stream = JSONRecordStream(str(file_path), batch_size)
+    batches = list(stream.iter_batches())
+    assert all(len(batch) <= batch_size for batch in batches)
+    return stream, batches
+
+
+def test_array_of_records(tmp_path):
+    """A top-level array is yielded in batches of at most batch_size records."""
+    file_path = tmp_path / 'records.json'
+    file_path.write_text(json.dumps(RECORDS, indent=2))
+
+    stream, batches = read_all(file_path)
+
+    assert stream.structure == 'array'
+    assert [len(batch) for batch in batches] == [10, 10, 5]
+    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), pd.DataFrame(RECORDS))
+
+
+def test_newline_delimited_json(tmp_path):
+    """Newline-delimited records are detected from the content."""
+    file_path = tmp_path / 'records.jsonl'
+    file_path.write_text('\n'.join(json.dumps(record) for record in RECORDS) + '\n')
+
+    stream, batches = read_all(file_path)
+
+    assert stream.structure == 'ndjson'
+    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), pd.DataFrame(RECORDS))
+
+
+def test_dict_of_dicts_and_single_record(tmp_path):
+    """Whole-document structures are yielded as one batch."""
+    dict_path = tmp_path / 'by_key.json'
+    dict_path.write_text(json.dumps({'a': {'x': 1}, 'b': {'x': 2}}))
+    stream, batches = read_all(dict_path)
+    assert stream.structure == 'dict_of_dicts'
+    assert batches[0]['x'].tolist() == [1, 2]
+    assert batches[0].index.tolist() == ['a', 'b']
+
+    record_path = tmp_path / 'record.json'
+    record_path.write_text(json.dumps({'id': 1, 'nested': {'x': 1}}))
+    stream, batches = read_all(record_path)
+    assert stream.structure == 'single_record'
+    assert len(batches) == 1 and batches[0]['id'].tolist() == [1]
+
+
+def test_values_spanning_reads(tmp_path, monkeypatch):
+    """Values larger than the read size, and numbers split across reads, decode intact."""
+    monkeypatch.setattr(JSONRecordStream, 'READ_SIZE', 16)
+    records = [{'text': 'x' * 500, 'number': 1234567890123}, {'text': 'é' * 40, 'number': -0.5}]
+    file_path = tmp_path / 'records.json'
+    file_path.write_text(json.dumps(records, ensure_ascii=False), encoding='utf-8')
+
+    _, batches = read_all(file_path)
+
+    assert batches[0].to_dict(orient='records') == records
+
+
+def test_empty_array_and_compressed_input(tmp_path):
+    """An empty array yields no batches and gzip inputs are decompressed while parsing."""
+    empty_path = tmp_path / 'empty.json'
+    empty_path.write_text('[ ]')
+    assert read_all(empty_path)[1] == []
+
+    gz_path = tmp_path / 'records.json.gz'
+    with gzip.open(gz_path, 'wt') as f:
+        json.dump(RECORDS, f)
+    _, batches = read_all(gz_path)
+    assert sum(len(batch) for batch in batches) == len(RECORDS)
+
+
+def test_unsupported_and_truncated_documents(tmp_path):
+    """Scalars at the top level and truncated arrays raise ValueError."""
+    scalar_path = tmp_path / 'scalar.json'
+    scalar_path.write_text('42')
+    with pytest.raises(ValueError):
+        read_all(scalar_path)
+
+    truncated_path = tmp_path / 'truncated.json'
+    truncated_path.write_text(json.dumps(RECORDS)[:-1])
+    with pytest.raises(ValueError):
+        read_all(truncated_path)
+
+
+@pytest.mark.parametrize('content, message', [
+    ('[1,,2]', "Expected a value before ','"),
+    ('[,{"a": 1}]', "Expected a value before ','"),
+    ('[{"a": 1},]', "Expected a value before ']'"),
+    ('[{"a": 1} {"a": 2}]', "Expected ',' or ']'"),
+    ('[{"a": 1}] {"a": 2}', 'Unexpected content after JSON array'),
+    ('[]]', 'Unexpected content after JSON array'),
+])
+def test_malformed_arrays(tmp_path, content, message):
+    """Array elements need exactly one comma between them, and nothing may follow the array."""
+    file_path = tmp_path / 'malformed.json'
+    file_path.write_text(content)
+
+    with pytest.raises(ValueError, match=message):
+        read_all(file_path)
+
+
+def test_agents_share_the_parser():
+    """The extraction agent and the standalone processor use the same parser."""
+    standalone_processor = pytest.importorskip('standalone_processor')
+    etl_agent = pytest.importorskip('etl_agent')
+
+    assert standalone_processor.JSONRecordStream is JSONRecordStream
+    assert etl_agent.JSONRecordStream is JSONRecordStream
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for the columnar payload store
+
+Writes payloads with PayloadWriter and checks that PayloadReader returns the same
+rows and metadata, for each available format.
+
+Usage:
+    python -m pytest test_payload_store.py
+"""
+
+import json
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import payload_store
+from payload_store import PayloadReader, PayloadWriter, available_formats
+
+
+def sample_frame(rows=20):
+    """DataFrame with numeric, boolean, datetime and text columns, including missing values."""
+    return pd.DataFrame({
+        'id': np.arange(rows),
+        'price': np.where(np.arange(rows) % 4 == 0, np.nan, np.arange(rows) * 1.5),
+        'active': np.arange(rows) % 2 == 0,
+        'created_at': pd.date_range('2025-01-01', periods=rows, freq='h'),
+        'status': pd.Series(['open', 'closed', None, 'pending'] * (rows // 4)),
+        'note': [f'note {i}' if i % 3 else None for i in range(rows)]
+    })
+
+
+def assert_same_rows(result, expected):
+    """Compare frames, treating None and NaN as the same missing value."""
+    def normalize(df):
+        return df.reset_index(drop=True).astype(object).where(df.notna().to_numpy(), None)
+
+    pd.testing.assert_frame_equal(normalize(result), normalize(expected))
+
+
+def write_payload(tmp_path, output_format, chunks, metadata=None):
+    """Write the chunks as one payload and return its path."""
+    with PayloadWriter(str(tmp_path / 'payload'), output_format) as writer:
+        for chunk in chunks:
+            writer.write_chunk(chunk)
+        return writer.close(metadata or {'source': 'test'})
+
+
+@pytest.mark.parametrize('output_format', [name for name in available_formats() if name != 'json'])
+def test_columnar_round_trip(tmp_path, output_format):
+    """Chunks written to a columnar payload are read back as the same rows and metadata."""
+    df = sample_frame()
+    path = write_payload(tmp_path, output_format, [df.iloc[:8], df.iloc[8:]], {'source': 'test', 'rows': 20})
+
+    result, metadata = PayloadReader.read(path)
+
+    assert metadata == {'source': 'test', 'rows': 20}
+    assert_same_rows(result, df)
+    assert PayloadReader.read_metadata(path) == metadata
+
+
+@pytest.mark.parametrize('output_format', [name for name in available_formats() if name != 'json'])
+def test_iter_chunks_returns_all_rows(tmp_path, output_format):
+    """Reading a payload in chunks returns every row once, in order."""
+    df = sample_frame(40)
+    path = write_payload(tmp_path, output_format, [df.iloc[:25], df.iloc[25:]])
+
+    chunks = list(PayloadReader.iter_chunks(path, chunk_rows=10))
+
+    combined = pd.concat(chunks, ignore_index=True)
+    assert_same_rows(combined, df)
+
+
+def test_npz_text_is_dictionary_encoded(tmp_path):
+    """One long value does not widen the other rows of an npz text column."""
+    long_value = 'x' * 100000
+    df = pd.DataFrame({'text': [long_value] + ['short', 'value', None] * 1000})
+    path = write_payload(tmp_path, 'npz', [df])
+
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        assert 'chunk0/col0.values.npy' not in names
+        with archive.open('chunk0/col0.codes.npy') as f:
+            codes = np.lib.format.read_array(f)
+        with archive.open('chunk0/col0.bytes.npy') as f:
+            buffer = np.lib.format.read_array(f)
+
+    assert codes.dtype == np.int32
+    assert len(buffer) == len(long_value) + len('short') + len('value')
+
+    result, _ = PayloadReader.read(path)
+    assert result['text'].iloc[0] == long_value
+    assert result['text'].iloc[1:4].tolist()[:2] == ['short', 'value']
+    assert result['text'].isna().sum() == 1000
+
+
+def test_npz_non_ascii_and_empty_strings(tmp_path):
+    """Multi-byte characters, empty strings and lone surrogates survive the UTF-8 buffer."""
+    values = ['café', '', '日本語', 'a\ud800b', None, 'café']
+    path = write_payload(tmp_path, 'npz', [pd.DataFrame({'text': values})])
+
+    result, _ = PayloadReader.read(path)
+
+    assert result['text'].iloc[[0, 1, 2, 3, 5]].tolist() == ['café', '', '日本語', 'a\ud800b', 'café']
+    assert pd.isna(result['text'].iloc[4])
+
+
+def test_npz_mixed_objects_round_trip_through_json(tmp_path):
+    """Lists, dicts and mixed scalars in one column are read back as the same values."""
+    values = [[1, 2], {'key': 'value'}, None, 3, 'text', [1, 2]]
+    path = write_payload(tmp_path, 'npz', [pd.DataFrame({'mixed': values})])
+
+    result, _ = PayloadReader.read(path)
+
+    decoded = result['mixed'].tolist()
+    assert decoded[0] == [1, 2]
+    assert decoded[1] == {'key': 'value'}
+    assert pd.isna(decoded[2])
+    assert decoded[3:] == [3, 'text', [1, 2]]
+
+
+def test_npz_empty_chunk_and_empty_payload(tmp_path):
+    """Empty chunks add no rows, and a payload without rows reads as an empty frame."""
+    df = sample_frame(4)
+    path = write_payload(tmp_path, 'npz', [df, df.iloc[:0]])
+    result, _ = PayloadReader.read(path)
+    assert len(result) == 4
+
+    (tmp_path / 'empty').mkdir()
+    empty_path = write_payload(tmp_path / 'empty', 'npz', [])
+    empty, metadata = PayloadReader.read(empty_path)
+    assert len(empty) == 0
+    assert metadata == {'source': 'test'}
+
+
+@pytest.mark.parametrize('format_version', [None, 0, payload_store.NPZ_FORMAT_VERSION + 1])
+def test_npz_rejects_unknown_format_versions(tmp_path, format_version):
+    """Payloads without the current format version are not read."""
+    path = write_payload(tmp_path, 'npz', [sample_frame()])
+    with zipfile.ZipFile(path, 'r') as archive:
+        members = {name: archive.read(name) for name in archive.namelist()}
+
+    manifest = json.loads(members.pop(payload_store.NPZ_MANIFEST))
+    if format_version is None:
+        del manifest['format_version']
+    else:
+        manifest['format_version'] = format_version
+    with zipfile.ZipFile(path, 'w') as archive:
+        for name, content in members.items():
+            archive.writestr(name, content)
+        archive.writestr(payload_store.NPZ_MANIFEST, json.dumps(manifest))
+
+    with pytest.raises(ValueError, match='format version'):
+        PayloadReader.read_metadata(path)
+    with pytest.raises(ValueError, match='format version'):
+        list(PayloadReader.iter_chunks(path))
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the tagging configuration registry
+
+Checks that a configuration file is parsed once per process, reloaded when it
+changes, and kept at its last valid version when it changes into an invalid one.
+
+Usage:
+    python -m pytest test_tag_config.py
+"""
+
+import os
+import tempfile
+
+import pytest
+import yaml
+
+# Keep the processed-file manifest out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+from tag_config import TagConfigRegistry, validate_config
+
+
+CONFIG = {
+    'semantic_tags': {
+        'identifier': {'description': 'Unique identifiers', 'keywords': ['id'], 'data_types': ['int']},
+        'monetary': {'keywords': ['price', 'amount'], 'data_types': ['float']}
+    },
+    'transformations': {
+        'numeric_normalization': {'applies_to_tags': ['monetary'], 'method': 'min-max', 'range': [0, 1]}
+    }
+}
+
+
+def write_config(path, config, mtime_ns):
+    """Write a configuration file with a given modification time."""
+    path.write_text(yaml.safe_dump(config))
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def config_path(tmp_path):
+    """Valid tagging configuration file."""
+    path = tmp_path / 'tags.yaml'
+    write_config(path, CONFIG, 1_000_000_000)
+    return path
+
+
+def test_lookups_reuse_the_parsed_configuration(config_path):
+    """Repeated lookups of an unchanged file return the same object without parsing it again."""
+    registry = TagConfigRegistry()
+
+    first = registry.get(str(config_path))
+    second = registry.get(str(config_path))
+
+    assert first is second
+    assert first.version == 1
+    assert first.tag_descriptions == {'identifier': 'Unique identifiers'}
+    metrics = registry.metrics()
+    assert (metrics['loads'], metrics['lookups'], metrics['configs']) == (1, 2, 1)
+
+
+def test_changed_file_is_reloaded(config_path):
+    """A new modification time loads the new contents as the next version."""
+    registry = TagConfigRegistry()
+    first = registry.get(str(config_path))
+
+    changed = dict(CONFIG, semantic_tags={'identifier': {'keywords': ['key']}})
+    write_config(config_path, changed, 2_000_000_000)
+    second = registry.get(str(config_path))
+
+    assert second is not first
+    assert second.version == 2
+    assert list(second.semantic_tags) == ['identifier']
+    assert registry.metrics()['loads'] == 2
+
+
+def test_invalid_change_keeps_previous_version(config_path):
+    """A file that changes into an invalid configuration is reported once and the last valid version stays in use."""
+    registry = TagConfigRegistry()
+    first = registry.get(str(config_path))
+
+    write_config(config_path, {'semantic_tags': ['not', 'a', 'mapping']}, 2_000_000_000)
+
+    assert registry.get(str(config_path)) is first
+    assert registry.get(str(config_path)) is first
+    assert registry.metrics()['load_errors'] == 1
+
+
+def test_invalid_first_load_raises(tmp_path):
+    """A configuration that was never loaded successfully raises."""
+    path = tmp_path / 'tags.yaml'
+    write_config(path, {'transformations': {'one_hot_encoding': {'max_categories': -1}}}, 1_000_000_000)
+
+    with pytest.raises(ValueError, match='max_categories'):
+        TagConfigRegistry().get(str(path))
+
+
+def test_validate_config_reports_problems():
+    """Each malformed setting is reported; valid configurations have no problems."""
+    assert validate_config(CONFIG) == []
+
+    errors = validate_config({
+        'semantic_tags': {'identifier': {'keywords': 'id'}},
+        'transformations': {
+            'numeric_normalization': {'method': 'log', 'range': [0]},
+            'date_standardization': {'format': 5}
+        }
+    })
+
+    assert len(errors) == 4
+    assert any('keywords must be a list' in error for error in errors)
+    assert any('method must be one of' in error for error in errors)
+    assert any('range must be a list of two numbers' in error for error in errors)
+    assert any('format must be a string' in error for error in errors)
+
+
+def test_tagging_systems_share_the_configuration(config_path):
+    """Tagging systems of the same file share one parsed configuration and keyword matcher."""
+    transformation_agent = pytest.importorskip('transformation_agent')
+
+    first = transformation_agent.TaggingSystem(str(config_path))
+    second = transformation_agent.TaggingSystem(str(config_path))
+
+    assert first.config is second.config
+    assert first._matcher is second._matcher
+    assert not first.reload_if_changed()
+
+    write_config(config_path, dict(CONFIG, semantic_tags={'identifier': {'keywords': ['key']}}), 3_000_000_000)
+
+    assert first.reload_if_changed()
+    assert list(first.semantic_tags) == ['identifier']
@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+Tests for the Transformation Agent
+
+Runs tagging and transformations with a tagging configuration written to a temporary
+directory, with the persisted vocabularies and fitted state kept there as well.
+
+Usage:
+    python -m pytest test_transformation_agent.py
+"""
+
+import os
+import json
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+# Keep the processed-file manifest out of the project's logs directory
+os.environ.setdefault('ETL_MANIFEST_PATH', os.path.join(tempfile.mkdtemp(), 'file_manifest.db'))
+
+transformation_agent = pytest.importorskip('transformation_agent')
+
+from transformation_agent import ChunkedTransformation, ColumnExecutor, ColumnStatistics, DataLoader, DataTransformer, KeywordMatcher, TaggingSystem, TypeProfiler
+
+
+# Tagging configuration exercising date standardization, one-hot encoding and normalization
+TAGS_CONFIG = {
+    'semantic_tags': {
+        'identity': {'keywords': ['id', 'uuid'], 'description': 'Unique identifiers'},
+        'temporal_reference': {'keywords': ['date', 'timestamp']},
+        'entity_type': {'keywords': ['status', 'type', 'category']},
+        'quantitative': {'keywords': ['price', 'amount', 'age'], 'data_types': ['int', 'float', 'int64', 'float64']}
+    },
+    'transformations': {
+        'date_standardization': {'applies_to_tags': ['temporal_reference'], 'format': '%Y-%m-%d'},
+        'one_hot_encoding': {'applies_to_tags': ['entity_type'], 'max_categories': 5},
+        'numeric_normalization': {'applies_to_tags': ['quantitative'], 'method': 'min-max', 'range': [0, 1]}
+    }
+}
+
+
+@pytest.fixture
+def tags_path(tmp_path, monkeypatch):
+    """Tagging configuration file, with the agent's state directories in the temporary directory."""
+    monkeypatch.setattr(transformation_agent, 'VOCABULARY_DIR', str(tmp_path / 'vocabularies'))
+    monkeypatch.setattr(transformation_agent, 'FITTED_STATE_DIR', str(tmp_path / 'fitted_state'))
+
+    path = tmp_path / 'tags.yaml'
+    path.write_text(yaml.safe_dump(TAGS_CONFIG))
+    return path
+
+
+@pytest.fixture
+def tagging_system(tags_path):
+    """Tagging system using the test configuration."""
+    return TaggingSystem(str(tags_path))
+
+
+def test_keyword_matcher_matches_substrings():
+    """The matcher reports every keyword contained in the text, including overlapping ones."""
+    matcher = KeywordMatcher([('he', 'he'), ('she', 'she'), ('his', 'his'), ('hers', 'hers'), ('', 'empty')])
+
+    assert matcher.find('ushers') == {'she', 'he', 'hers', 'empty'}
+    assert matcher.find('this') == {'his', 'empty'}
+    assert matcher.find('xyz') == {'empty'}
+
+
+def test_keyword_matcher_agrees_with_substring_search():
+    """Matches equal a naive substring search over many random keywords and texts."""
+    rng = np.random.default_rng(0)
+    alphabet = list('abcd_')
+    keywords = [''.join(rng.choice(alphabet, rng.integers(1, 4))) for _ in range(40)]
+    matcher = KeywordMatcher([(keyword, index) for index, keyword in enumerate(keywords)])
+
+    for _ in range(200):
+        text = ''.join(rng.choice(alphabet, rng.integers(0, 12)))
+        expected = {index for index, keyword in enumerate(keywords) if keyword in text}
+        assert matcher.find(text) == expected
+
+
+def test_tag_fields_uses_keywords_and_data_types(tagging_system):
+    """Tags come from case-insensitive keyword matches, filtered by the allowed data types."""
+    df = pd.DataFrame(columns=['customer_id', 'signup_date', 'Status', 'price', 'price_label', 'notes'])
+    datatypes = {
+        'customer_id': 'int',
+        'signup_date': 'str',
+        'Status': 'str',
+        'price': 'float',
+        'price_label': 'str',
+        'notes': 'str'
+    }
+
+    tags = tagging_system.tag_fields(df, datatypes)
+
+    assert tags == {
+        'customer_id': ['identity'],
+        'signup_date': ['temporal_reference'],
+        'Status': ['entity_type'],
+        'price': ['quantitative'],
+        'price_label': [],
+        'notes': []
+    }
+
+
+def test_tag_fields_caches_by_column_and_type(tagging_system, monkeypatch):
+    """Repeated (column, type) pairs are tagged from the cache without matching keywords again."""
+    df = pd.DataFrame(columns=['customer_id', 'price'])
+    datatypes = {'customer_id': 'int', 'price': 'float'}
+    first = tagging_system.tag_fields(df, datatypes)
+
+    monkeypatch.setattr(tagging_system, '_match_tags', lambda column, column_type: pytest.fail("tags were matched again"))
+    assert tagging_system.tag_fields(df, datatypes) == first
+    monkeypatch.undo()
+
+    # A different data type is a different cache entry
+    assert tagging_system.tag_fields(df, {'customer_id': 'int', 'price': 'str'})['price'] == []
+
+
+def customer_frame(rows=50, seed=0):
+    """Customer data with identifier, date, categorical and numeric columns."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'customer_id': np.arange(rows),
+        'signup_date': pd.date_range('2025-01-01', periods=rows, freq='D').strftime('%Y-%m-%d'),
+        'status': rng.choice(['active', 'inactive', 'pending'], rows),
+        'price': np.round(rng.random(rows) * 100, 2),
+        'age': rng.integers(18, 90, rows)
+    })
+
+
+def tag_frame(tagging_system, df):
+    """Tag the columns of a DataFrame from its inferred data types."""
+    return tagging_system.tag_fields(df, DataLoader.inspect_datatypes(df))
+
+
+def test_plan_is_compiled_once_per_schema(tagging_system, monkeypatch):
+    """Batches with the same schema, tags and configuration reuse the compiled plan."""
+    transformer = DataTransformer(tagging_system)
+    df = customer_frame()
+    field_tags = tag_frame(tagging_system, df)
+
+    plan = transformer.get_plan(df, field_tags)
+    assert plan.date_columns == ('signup_date',)
+    assert plan.onehot_columns == ('status',)
+    assert plan.normalize_columns == ('price', 'age')
+
+    monkeypatch.setattr(DataTransformer, 'compile_plan', staticmethod(lambda *args: pytest.fail("plan was compiled again")))
+    assert transformer.get_plan(customer_frame(rows=10, seed=1), field_tags) is plan
+
+
+def test_new_schema_or_configuration_compiles_a_new_plan(tagging_system):
+    """Changed dtypes, tags or transformation rules each get their own plan."""
+    transformer = DataTransformer(tagging_system)
+    df = customer_frame()
+    field_tags = tag_frame(tagging_system, df)
+    plan = transformer.get_plan(df, field_tags)
+
+    assert transformer.get_plan(df.astype({'age': 'float64'}), field_tags) is not plan
+    assert transformer.get_plan(df, dict(field_tags, age=[])).normalize_columns == ('price',)
+
+    tagging_system.transformations['one_hot_encoding']['max_categories'] = 2
+    assert transformer.get_plan(df, field_tags).max_categories == 2
+    assert len(transformer._plan_cache) == 4
+
+
+def test_plan_cache_is_bounded(tagging_system, monkeypatch):
+    """The least recently used plan is evicted when the cache is full."""
+    monkeypatch.setattr(DataTransformer, 'PLAN_CACHE_SIZE', 2)
+    transformer = DataTransformer(tagging_system)
+    frames = [pd.DataFrame({f'price_{i}': [1.0, 2.0]}) for i in range(3)]
+    field_tags = [{f'price_{i}': ['quantitative']} for i in range(3)]
+
+    first = transformer.get_plan(frames[0], field_tags[0])
+    transformer.get_plan(frames[1], field_tags[1])
+    assert transformer.get_plan(frames[0], field_tags[0]) is first
+    transformer.get_plan(frames[2], field_tags[2])
+
+    assert len(transformer._plan_cache) == 2
+    assert transformer.get_plan(frames[0], field_tags[0]) is first
+    assert transformer.get_plan(frames[1], field_tags[1]) is not None
+    assert len(transformer._plan_cache) == 2
+
+
+def test_one_hot_columns_match_get_dummies(tagging_system):
+    """Indicator columns equal pd.get_dummies, with missing values on all-zero rows."""
+    df = customer_frame()
+    df.loc[[3, 7], 'status'] = None
+    field_tags = tag_frame(tagging_system, df)
+
+    result, metadata = DataTransformer(tagging_system).transform_data(df, field_tags)
+
+    expected = pd.get_dummies(df['status'], prefix='status')
+    assert metadata['applied_transformations']['one_hot_encoding']['dropped_columns'] == ['status']
+    assert 'status' not in result.columns
+    pd.testing.assert_frame_equal(result[list(expected.columns)], expected)
+
+
+@pytest.mark.parametrize('output, dtype', [('uint8', np.dtype(np.uint8)), ('sparse', pd.SparseDtype(np.uint8, 0))])
+def test_one_hot_output_types(tagging_system, output, dtype):
+    """uint8 and sparse outputs hold the same indicators as the boolean ones."""
+    df = customer_frame()
+    field_tags = tag_frame(tagging_system, df)
+    expected, _ = DataTransformer(tagging_system).transform_data(df, field_tags)
+
+    tagging_system.transformations['one_hot_encoding']['output'] = output
+    result, metadata = DataTransformer(tagging_system).transform_data(df, field_tags)
+
+    indicators = [column for column in result.columns if column.startswith('status_')]
+    assert indicators == [column for column in expected.columns if column.startswith('status_')]
+    assert metadata['applied_transformations']['one_hot_encoding']['output'] == output
+    for column in indicators:
+        assert result[column].dtype == dtype
+        np.testing.assert_array_equal(np.asarray(result[column]), expected[column].to_numpy().astype(np.uint8))
+
+
+def test_columns_with_too_many_categories_are_kept(tagging_system):
+    """Columns with more categories than max_categories are left as they are."""
+    df = pd.DataFrame({'category': [f'c{i % 6}' for i in range(30)], 'type': ['a', 'b', 'c'] * 10})
+    field_tags = {'category': ['entity_type'], 'type': ['entity_type']}
+
+    result, metadata = DataTransformer(tagging_system).transform_data(df, field_tags)
+
+    assert metadata['applied_transformations']['one_hot_encoding']['transformed_columns'] == ['type']
+    pd.testing.assert_series_equal(result['category'], df['category'])
+    assert list(result.columns) == ['category', 'type_a', 'type_b', 'type_c']
+
+
+def test_persisted_vocabulary_keeps_the_columns_of_later_batches(tagging_system):
+    """Later batches of a dataset get the stored categories; unseen values get all-zero rows."""
+    tagging_system.transformations['one_hot_encoding']['persist_vocabulary'] = True
+    field_tags = {'status': ['entity_type']}
+    transformer = DataTransformer(tagging_system)
+
+    transformer.transform_data(pd.DataFrame({'status': ['active', 'pending', 'inactive']}), field_tags, 'customers')
+    result, metadata = transformer.transform_data(pd.DataFrame({'status': ['pending', 'closed']}), field_tags, 'customers')
+
+    assert transformer.vocabulary_store.get('customers') == {'status': ['active', 'inactive', 'pending']}
+    assert list(result.columns) == ['status_active', 'status_inactive', 'status_pending']
+    assert result.to_numpy().tolist() == [[False, False, True], [False, False, False]]
+    assert metadata['applied_transformations']['one_hot_encoding']['vocabulary'] == {
+        'dataset': 'customers',
+        'fitted_columns': [],
+        'unseen_values': {'status': 1}
+    }
+
+
+def test_dates_match_per_value_parsing(tagging_system):
+    """Dates parsed once per distinct value with the inferred format equal per-value parsing."""
+    days = pd.date_range('2024-01-01', periods=40, freq='7D')
+    values = [day.strftime('%d %b %Y') for day in days] * 3 + ['2024-12-25', '2024-12-31', None]
+    df = pd.DataFrame({'signup_date': values})
+
+    result, metadata = DataTransformer(tagging_system).transform_data(df, {'signup_date': ['temporal_reference']})
+
+    expected = [pd.to_datetime(value).strftime('%Y-%m-%d') if value else np.nan for value in values]
+    pd.testing.assert_series_equal(result['signup_date'], pd.Series(expected, name='signup_date'))
+    assert metadata['applied_transformations']['date_standardization']['parse_stats']['signup_date'] == {
+        'inferred_format': '%d %b %Y',
+        'unique_values': 42,
+        'fallback_values': 2,
+        'fallback_rows': 2,
+        'parse_rate': 1.0
+    }
+
+
+def test_date_format_is_inferred_from_a_sample(monkeypatch):
+    """The format that parses most of the sampled distinct values wins."""
+    monkeypatch.setattr(transformation_agent, 'DATE_FORMAT_SAMPLE_SIZE', 10)
+    uniques = np.array(['2024-01-31'] + [f'2024/02/{day:02d}' for day in range(1, 29)], dtype=object)
+
+    assert DataTransformer._infer_date_format(uniques) == '%Y/%m/%d'
+    assert DataTransformer._infer_date_format(np.array(['not a date', 'nor this'], dtype=object)) is None
+
+
+def test_unparseable_dates_are_left_unchanged(tagging_system):
+    """A column with values that are not dates is not standardized."""
+    df = pd.DataFrame({'signup_date': ['2024-01-01', 'sometime', '2024-01-03']})
+
+    result, metadata = DataTransformer(tagging_system).transform_data(df, {'signup_date': ['temporal_reference']})
+
+    assert 'date_standardization' not in metadata['applied_transformations']
+    pd.testing.assert_frame_equal(result, df)
+
+
+def chunks_of(df, rows):
+    """Split a DataFrame into chunks of a number of rows."""
+    return [df.iloc[start:start + rows] for start in range(0, len(df), rows)]
+
+
+def test_merged_statistics_match_the_whole_column():
+    """Statistics merged chunk by chunk equal the statistics of the whole column."""
+    rng = np.random.default_rng(0)
+    values = pd.Series(rng.normal(1e6, 25.0, 1000))
+    values[rng.choice(1000, 50, replace=False)] = np.nan
+
+    whole = ColumnStatistics.from_chunk(values, numeric=True)
+    merged = ColumnStatistics()
+    for chunk in chunks_of(values, 137):
+        merged.merge(ColumnStatistics.from_chunk(chunk, numeric=True))
+
+    assert merged.count == whole.count == 950
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert merged.std == pytest.approx(values.std(), rel=1e-9)
+    assert whole.std == pytest.approx(values.std(), rel=1e-9)
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+
+def test_merged_categories_match_the_whole_column():
+    """Categories merged chunk by chunk are ordered like those of the whole column, until they overflow."""
+    values = pd.Series(['pending', 'active', None, 'inactive', 'active', 'closed'] * 5)
+
+    merged = ColumnStatistics(max_categories=4)
+    for chunk in chunks_of(values, 4):
+        merged.merge(ColumnStatistics.from_chunk(chunk, max_categories=4, categories=True))
+    assert list(merged.category_index()) == list(pd.Categorical(values).categories)
+    assert not merged.category_overflow
+
+    overflowing = ColumnStatistics(max_categories=3)
+    for chunk in chunks_of(values, 4):
+        overflowing.merge(ColumnStatistics.from_chunk(chunk, max_categories=3, categories=True))
+    assert overflowing.category_overflow
+    assert overflowing.category_count > 3
+
+
+def test_chunked_transformation_matches_in_memory(tagging_system):
+    """Transforming chunks with the statistics of the whole dataset gives the in-memory result."""
+    df = customer_frame(rows=95)
+    # A category that only appears in the last chunk still gets its indicator column in every chunk
+    df.loc[94, 'status'] = 'closed'
+    transformer = DataTransformer(tagging_system)
+    expected, _ = transformer.transform_data(df, tag_frame(tagging_system, df))
+
+    statistics = transformer.fit_statistics(chunks_of(df, 20))
+    metadata = {}
+    chunks = list(ChunkedTransformation(transformer).transform_chunks(chunks_of(df, 20), statistics, metadata))
+
+    assert statistics.row_count == 95
+    assert [len(chunk) for chunk in chunks] == [20, 20, 20, 20, 15]
+    pd.testing.assert_frame_equal(pd.concat(chunks), expected)
+    assert metadata['new_columns'] == ['status_active', 'status_closed', 'status_inactive', 'status_pending']
+
+
+def test_applied_state_scales_batches_like_the_fitted_data(tagging_system):
+    """Batches transformed in 'apply' mode use the normalization and categories of the fitted batch."""
+    fitted = customer_frame(rows=60, seed=0)
+    batch = customer_frame(rows=10, seed=1)
+    batch.loc[0, 'status'] = 'closed'
+    field_tags = tag_frame(tagging_system, fitted)
+
+    _, fit_metadata = DataTransformer(tagging_system, fit_mode='fit').transform_data(fitted, field_tags, 'customers')
+    result, metadata = DataTransformer(tagging_system, fit_mode='apply').transform_data(batch, field_tags, 'customers')
+
+    assert fit_metadata['fitted_state'] == {'mode': 'fit', 'dataset': 'customers', 'columns': ['price', 'age', 'status']}
+    assert metadata['fitted_state'] == {'mode': 'apply', 'dataset': 'customers', 'columns': ['price', 'age', 'status']}
+    price = fitted['price']
+    expected_price = (batch['price'] - price.min()) / (price.max() - price.min())
+    pd.testing.assert_series_equal(result['price'], expected_price)
+    assert [column for column in result.columns if column.startswith('status_')] == [
+        'status_active', 'status_inactive', 'status_pending'
+    ]
+    assert not result.loc[0, ['status_active', 'status_inactive', 'status_pending']].any()
+    assert metadata['applied_transformations']['one_hot_encoding']['unseen_values'] == {'status': 1}
+
+
+def test_fit_replaces_the_persisted_vocabulary(tagging_system):
+    """With persist_vocabulary on, a fit stores its categories as the vocabulary that later batches use."""
+    tagging_system.transformations['one_hot_encoding']['persist_vocabulary'] = True
+    field_tags = {'status': ['entity_type'], 'price': ['quantitative']}
+
+    # A stale vocabulary from before the fit
+    DataTransformer(tagging_system).transform_data(pd.DataFrame({'status': ['active', 'pending'], 'price': [1.0, 2.0]}), field_tags, 'customers')
+
+    fitted = pd.DataFrame({'status': ['active', 'closed', 'inactive'], 'price': [10.0, 20.0, 30.0]})
+    fit_transformer = DataTransformer(tagging_system, fit_mode='fit')
+    fit_result, _ = fit_transformer.transform_data(fitted, field_tags, 'customers')
+
+    fitted_columns = ['status_active', 'status_closed', 'status_inactive']
+    assert [column for column in fit_result.columns if column.startswith('status_')] == fitted_columns
+    assert fit_transformer.vocabulary_store.get('customers') == {'status': ['active', 'closed', 'inactive']}
+    assert fit_transformer.fitted_state_store.get('customers')['status']['categories'] == ['active', 'closed', 'inactive']
+    with open(os.path.join(transformation_agent.FITTED_STATE_DIR, 'customers.json')) as f:
+        assert 'categories' not in json.load(f)['columns']['status']
+
+    batch = pd.DataFrame({'status': ['closed', 'pending'], 'price': [15.0, 25.0]})
+    result, metadata = DataTransformer(tagging_system, fit_mode='apply').transform_data(batch, field_tags, 'customers')
+
+    assert [column for column in result.columns if column.startswith('status_')] == fitted_columns
+    assert result[fitted_columns].to_numpy().tolist() == [[False, True, False], [False, False, False]]
+    assert result['price'].tolist() == [0.25, 0.75]
+    assert metadata['applied_transformations']['one_hot_encoding']['vocabulary']['unseen_values'] == {'status': 1}
+
+
+def test_apply_without_fitted_state_fits_the_batch(tagging_system):
+    """A dataset without stored state is transformed with the statistics of the batch itself."""
+    df = customer_frame()
+    field_tags = tag_frame(tagging_system, df)
+    expected, _ = DataTransformer(tagging_system).transform_data(df, field_tags)
+
+    result, metadata = DataTransformer(tagging_system, fit_mode='apply').transform_data(df, field_tags, 'customers')
+
+    assert metadata['fitted_state']['columns'] == []
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_fitted_state_round_trips():
+    """Stored column state restores the same normalization parameters and categories."""
+    values = pd.Series(['b', 'a', None, 'c'])
+    stats = ColumnStatistics.from_chunk(pd.Series([3, 1, np.nan, 7]), numeric=True)
+    stats.merge(ColumnStatistics.from_chunk(values, categories=True))
+
+    restored = ColumnStatistics()
+    restored.load_state(json.loads(json.dumps(stats.to_state())))
+
+    assert restored.to_state() == stats.to_state()
+    assert (restored.min, restored.max, restored.std) == (1, 7, stats.std)
+    assert list(restored.category_index()) == ['a', 'b', 'c']
+
+
+def test_unknown_fit_mode_is_rejected(tagging_system):
+    """Only the known fit modes are accepted."""
+    with pytest.raises(ValueError, match='Unknown fit mode'):
+        DataTransformer(tagging_system, fit_mode='refit')
+
+
+@pytest.fixture
+def profiler_cache(monkeypatch):
+    """Empty profile cache of the type profiler."""
+    monkeypatch.setattr(TypeProfiler, '_cache', OrderedDict())
+    return TypeProfiler._cache
+
+
+def test_types_are_inferred_from_a_bounded_sample(profiler_cache, monkeypatch):
+    """Only TYPE_SAMPLE_SIZE rows of large columns are profiled."""
+    monkeypatch.setattr(transformation_agent, 'TYPE_SAMPLE_SIZE', 100)
+    df = pd.DataFrame({'amount': np.arange(1000), 'name': [f'name {i}' for i in range(1000)]})
+    df.loc[::4, 'name'] = None
+
+    profiles = DataLoader.profile_datatypes(df)
+
+    assert profiles['amount'][:4] == ('int64', 1.0, 100, 0.0)
+    assert profiles['name'].type == 'str'
+    assert profiles['name'].sample_size + round(profiles['name'].null_rate * 100) == 100
+    assert 0 < profiles['name'].null_rate < 0.5
+
+
+def test_mixed_columns_are_coerced_to_what_their_values_read_as(profiler_cache):
+    """Columns of mixed Python types get the type most of their values read as."""
+    df = pd.DataFrame({
+        'count': ['1', 2, '3', 4.0, '5'] * 4,
+        'ratio': ['1.5', 2, '3', 4, '5'] * 4,
+        'flag': ['yes', 'no', True, False, 'y'] * 4,
+        'seen': ['2024-01-02', date(2024, 1, 3), '2024-01-04', '2024-01-05', '2024-01-06'] * 4,
+        'note': ['a', 1, 'b', 2.5, None] * 4
+    })
+
+    profiles = DataLoader.profile_datatypes(df)
+
+    assert {column: profile.type for column, profile in profiles.items()} == {
+        'count': 'int',
+        'ratio': 'float',
+        'flag': 'bool',
+        'seen': 'Timestamp',
+        'note': 'str'
+    }
+    assert profiles['count'].confidence == 1.0
+    assert profiles['seen'].date_rate == 1.0
+    assert profiles['note'].confidence == 0.5
+    assert profiles['note'].null_rate == pytest.approx(0.2)
+
+
+def test_mostly_empty_columns_use_their_first_values(profiler_cache, monkeypatch):
+    """A column with no value in the sample is typed from its first values; an empty one by its dtype."""
+    monkeypatch.setattr(transformation_agent, 'TYPE_SAMPLE_SIZE', 10)
+    sparse = pd.Series([None] * 1000, dtype=object)
+    sparse[999] = 'late'
+    df = pd.DataFrame({'sparse': sparse, 'empty': pd.Series([np.nan] * 1000)})
+
+    profiles = TypeProfiler.profile(df)
+
+    assert (profiles['sparse'].type, profiles['sparse'].sample_size) == ('str', 1)
+    assert profiles['empty'][:4] == ('float64', 0.0, 0, 1.0)
+    # Columns without values may have some in the next file, so the profile is not cached
+    assert not profiler_cache
+
+
+def test_profiles_are_cached_by_schema(profiler_cache, monkeypatch):
+    """Files with the same column names and dtypes reuse the profiles of the first one."""
+    first = TypeProfiler.profile(customer_frame(seed=0))
+    assert len(profiler_cache) == 1
+
+    monkeypatch.setattr(TypeProfiler, 'profile_column', staticmethod(lambda *args: pytest.fail("column was profiled")))
+    assert TypeProfiler.profile(customer_frame(rows=10, seed=1)) == first
+
+
+def wide_frame(rows=200):
+    """Customer data with several columns for each transformation."""
+    df = customer_frame(rows=rows)
+    for i in range(4):
+        df[f'amount_{i}'] = df['price'] * (i + 1)
+        df[f'type_{i}'] = df['status'].str[:i + 1]
+        df[f'date_{i}'] = df['signup_date']
+    return df
+
+
+def test_parallel_columns_match_serial(tagging_system, monkeypatch):
+    """Transforming the columns on several threads gives the serial result."""
+    monkeypatch.setattr(transformation_agent, 'COLUMN_PARALLEL_MIN_ROWS', 0)
+    df = wide_frame()
+    field_tags = tag_frame(tagging_system, df)
+
+    expected, expected_metadata = DataTransformer(tagging_system, column_workers=1).transform_data(df, field_tags)
+    parallel = DataTransformer(tagging_system, column_workers=4)
+    result, metadata = parallel.transform_data(df, field_tags)
+    parallel.executor.shutdown()
+
+    pd.testing.assert_frame_equal(result, expected)
+    assert metadata == expected_metadata
+    assert len(metadata['applied_transformations']['numeric_normalization']['transformed_columns']) == 6
+
+
+def test_executor_keeps_the_column_order(monkeypatch):
+    """Results come back in item order, from pool threads unless the frame is small or the executor serial."""
+    monkeypatch.setattr(transformation_agent, 'COLUMN_PARALLEL_MIN_ROWS', 100)
+    executor = ColumnExecutor(4)
+
+    def square(item):
+        return item * item, threading.current_thread().name
+
+    try:
+        results = executor.map(square, range(20), row_count=100)
+        assert [value for value, _ in results] == [item * item for item in range(20)]
+        assert all(name.startswith('column') for _, name in results)
+
+        small = executor.map(square, range(5), row_count=99)
+        assert {name for _, name in small} == {threading.current_thread().name}
+    finally:
+        executor.shutdown()
+
+    assert ColumnExecutor(1).serial
+    assert {name for _, name in ColumnExecutor(1).map(square, range(5))} == {threading.current_thread().name}
+
+
+def test_executor_workers_default_to_the_cpu_budget(monkeypatch):
+    """Zero workers means one thread per available CPU, shared by the processes running at once."""
+    monkeypatch.setattr(transformation_agent.os, 'sched_getaffinity', lambda pid: set(range(8)), raising=False)
+
+    assert ColumnExecutor(0).workers == 8
+    assert ColumnExecutor.cpu_budget(3) == 2
+    assert ColumnExecutor.cpu_budget(16) == 1
+    assert ColumnExecutor(2).workers == 2
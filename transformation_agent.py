@@ -24,16 +24,20 @@ The code is designed to be modular with clear separation between:
 
 import os
 import json
-import yaml
 import csv
 import time
 import logging
+import argparse
 import datetime
 import re
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict, deque
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from typing import Dict, List, Any, Union, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 from datetime import datetime
 
 # Check for required packages
@@ -41,6 +45,7 @@ try:
     import pandas as pd
     import numpy as np
     import yaml
+    from pandas.tseries.api import guess_datetime_format
     from watchdog.observers import Observer
     from watchdog.events import FileSystemEventHandler, FileCreatedEvent
 except ImportError as e:
@@ -56,6 +61,13 @@ except ImportError as e:
     print("  pip3 install pandas numpy pyyaml watchdog")
     exit(1)
 
+from payload_store import PayloadReader, PayloadWriter, resolve_output_format, COLUMNAR_EXTENSIONS
+from file_manifest import FileManifest, process_and_record
+from compressed_input import source_stem
+from custom_transforms import CustomTransform, compile_transforms
+from tag_config import TagConfig, get_tag_config, TAG_CONFIG_REGISTRY
+from file_queue import FileWorkQueue, add_queue_arguments, run_with_metrics, QUEUE_WORKERS, QUEUE_MAX_SIZE, DEBOUNCE_SECONDS
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -71,6 +83,44 @@ LOGS_DIR = os.path.join(SCRIPT_DIR, 'logs')
 CONFIG_DIR = os.path.join(SCRIPT_DIR, 'config')
 TAGS_CONFIG_PATH = os.path.join(CONFIG_DIR, 'tags.yaml')
 TRANSFORMATION_LOG_PATH = os.path.join(LOGS_DIR, 'transformation_log.csv')
+SUPPORTED_EXTENSIONS = ['.csv', '.json'] + COLUMNAR_EXTENSIONS
+VOCABULARY_DIR = os.path.join(LOGS_DIR, 'vocabularies')
+FITTED_STATE_DIR = os.path.join(LOGS_DIR, 'fitted_state')
+
+# Processed CSV, Parquet and npz files of at least this size are transformed in two
+# passes over chunks instead of being loaded whole (0 disables chunking)
+CHUNKED_TRANSFORM_THRESHOLD_BYTES = int(float(os.getenv('ETL_CHUNKED_TRANSFORM_MB', '256')) * 1024 * 1024)
+
+# Rows per chunk in chunked transformation
+CHUNKED_TRANSFORM_ROWS = int(os.getenv('ETL_CHUNKED_TRANSFORM_ROWS', '100000'))
+
+# Number of distinct values sampled to infer the format of a date column, and
+# number of them whose format is guessed
+DATE_FORMAT_SAMPLE_SIZE = int(os.getenv('ETL_DATE_FORMAT_SAMPLE_SIZE', '1000'))
+DATE_FORMAT_GUESSES = int(os.getenv('ETL_DATE_FORMAT_GUESSES', '10'))
+
+# Number of rows sampled per column to infer its type, and share of sampled values that
+# must agree for a mixed column to be typed as numbers, booleans or dates
+TYPE_SAMPLE_SIZE = int(os.getenv('ETL_TYPE_SAMPLE_SIZE', '1000'))
+TYPE_COERCION_THRESHOLD = float(os.getenv('ETL_TYPE_COERCION_THRESHOLD', '0.9'))
+
+# Text values read as booleans when profiling column types
+BOOL_STRINGS = ['true', 'false', 'yes', 'no', 't', 'f', 'y', 'n']
+
+# Number of threads transforming the columns of a file (0 uses one per available CPU, 1
+# transforms the columns serially), and the number of rows below which columns are always
+# transformed serially because the thread handoff would cost more than it saves
+COLUMN_WORKERS = int(os.getenv('ETL_COLUMN_WORKERS', '0'))
+COLUMN_PARALLEL_MIN_ROWS = int(os.getenv('ETL_COLUMN_PARALLEL_MIN_ROWS', '10000'))
+
+# Value types of one-hot indicator columns ('sparse' stores uint8 indicators sparsely)
+ONE_HOT_OUTPUTS = ('bool', 'uint8', 'sparse')
+
+# Handling of fitted transformation state per dataset: 'none' fits every file on its own,
+# 'fit' also stores the normalization parameters and categories of each file, and
+# 'apply' transforms files with the stored state of their dataset
+FIT_MODES = ('none', 'fit', 'apply')
+FIT_MODE = os.getenv('ETL_FIT_MODE', 'none').lower()
 
 
 class DataLoader:
@@ -98,9 +148,44 @@ class DataLoader:
             return DataLoader._load_from_json(file_path)
         elif file_extension == '.csv':
             return DataLoader._load_from_csv(file_path)
+        elif file_extension in COLUMNAR_EXTENSIONS:
+            return DataLoader._load_from_columnar(file_path)
         else:
             raise ValueError(f"Unsupported file format: {file_extension}")
     
+    @staticmethod
+    def _load_from_columnar(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """
+        Load data from a columnar (Parquet or npz) payload.
+        
+        The columns are read straight into the DataFrame; the metadata is stored
+        in the same file.
+        
+        Args:
+            file_path: Path to the columnar file
+            
+        Returns:
+            tuple: (DataFrame containing the data, metadata dictionary)
+        """
+        logger.info(f"Loading data from columnar file: {file_path}")
+        try:
+            df, metadata = PayloadReader.read(file_path)
+            
+            if not metadata:
+                metadata = {
+                    'filename': os.path.basename(file_path),
+                    'timestamp': datetime.now().isoformat(),
+                    'source_format': os.path.splitext(file_path)[1].lower().lstrip('.'),
+                    'row_count': len(df),
+                    'column_count': len(df.columns),
+                    'columns': list(df.columns)
+                }
+            
+            return df, metadata
+        except Exception as e:
+            logger.error(f"Error loading data from columnar file: {e}")
+            raise
+    
     @staticmethod
     def _load_from_json(file_path: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
@@ -177,6 +262,9 @@ class DataLoader:
         """
         Inspect the data types of each column in the DataFrame.
         
+        Types are inferred from a sample of each column (see TypeProfiler); columns
+        without any value get their pandas dtype.
+        
         Args:
             df: DataFrame to inspect
             
@@ -185,19 +273,269 @@ class DataLoader:
         """
         logger.info("Inspecting data types")
         
-        # Get the Python data type for each column
-        datatypes = {}
-        for column in df.columns:
-            # Get a non-null value to determine the actual Python type
-            sample_values = df[column].dropna()
-            if len(sample_values) > 0:
-                sample_value = sample_values.iloc[0]
-                datatypes[column] = type(sample_value).__name__
-            else:
-                # If all values are null, use the pandas dtype
-                datatypes[column] = str(df[column].dtype)
+        return {column: profile.type for column, profile in DataLoader.profile_datatypes(df).items()}
+    
+    @staticmethod
+    def profile_datatypes(df: pd.DataFrame) -> Dict[str, 'ColumnProfile']:
+        """
+        Infer the type of each column with its confidence.
+        
+        Args:
+            df: DataFrame to inspect
+            
+        Returns:
+            Dictionary mapping column names to their ColumnProfile
+        """
+        profiles = TypeProfiler.profile(df)
+        
+        for column, profile in profiles.items():
+            if profile.sample_size and profile.confidence < TYPE_COERCION_THRESHOLD:
+                logger.warning(
+                    f"Column {column} has mixed value types; typed as {profile.type} "
+                    f"with confidence {profile.confidence:.2f}"
+                )
+        
+        return profiles
+    
+    @staticmethod
+    def dataset_name(file_path: str, metadata: Dict[str, Any]) -> str:
+        """
+        Get the name of the dataset a processed file belongs to.
+        
+        Delta batches of a followed file belong to the dataset of that file, and
+        compression extensions are ignored (sales.csv.gz belongs to 'sales').
+        
+        Args:
+            file_path: Path to the file
+            metadata: Metadata of the file
+            
+        Returns:
+            Dataset name
+        """
+        return source_stem(metadata.get('delta_of') or metadata.get('filename') or file_path)
+
+
+class ColumnProfile(NamedTuple):
+    """
+    Type of one column inferred from a sample of its values.
+    
+    The rates are shares of the non-null sampled values, and are only measured for
+    columns of Python objects.
+    """
+    
+    type: str
+    confidence: float
+    sample_size: int
+    null_rate: float
+    numeric_rate: Optional[float] = None
+    bool_rate: Optional[float] = None
+    date_rate: Optional[float] = None
+
+
+class TypeProfiler:
+    """
+    Infers column types from a bounded random sample of each column.
+    
+    Columns with a numeric, boolean, datetime or other typed dtype get the type of their
+    values. Columns of Python objects get the most common type among the sampled values,
+    with its share as confidence; when no type dominates, a column whose values mostly
+    read as booleans, numbers or dates gets that type instead. Profiles are cached by
+    schema fingerprint (column names and dtypes).
+    """
+    
+    # Maximum number of schema fingerprints kept in the cache
+    CACHE_SIZE = 256
+    
+    _cache = OrderedDict()
+    _lock = threading.Lock()
+    
+    @classmethod
+    def profile(cls, df: pd.DataFrame) -> Dict[str, ColumnProfile]:
+        """
+        Profile every column of a DataFrame.
+        
+        Args:
+            df: DataFrame to profile
+            
+        Returns:
+            Dictionary mapping column names to their ColumnProfile
+        """
+        key = (tuple(df.columns), tuple(str(dtype) for dtype in df.dtypes))
+        
+        with cls._lock:
+            profiles = cls._cache.get(key)
+            if profiles is not None:
+                cls._cache.move_to_end(key)
+                return dict(profiles)
+        
+        positions = cls._sample_positions(len(df))
+        profiles = {}
+        for index, column in enumerate(df.columns):
+            profiles[column] = cls.profile_column(df.iloc[:, index], positions)
+        
+        # Columns without values in this file may have some in the next one
+        if all(profile.sample_size for profile in profiles.values()):
+            with cls._lock:
+                cls._cache[key] = profiles
+                if len(cls._cache) > cls.CACHE_SIZE:
+                    cls._cache.popitem(last=False)
+        
+        return dict(profiles)
+    
+    @staticmethod
+    def _sample_positions(row_count: int) -> Optional[np.ndarray]:
+        """
+        Pick the rows to sample, the same ones for every column.
+        
+        Args:
+            row_count: Number of rows
+            
+        Returns:
+            Sorted row positions, or None to use every row
+        """
+        if row_count <= TYPE_SAMPLE_SIZE:
+            return None
+        
+        # A fixed seed keeps the inferred types reproducible
+        rng = np.random.default_rng(0)
+        return np.sort(rng.choice(row_count, size=TYPE_SAMPLE_SIZE, replace=False))
+    
+    @staticmethod
+    def profile_column(values: pd.Series, positions: Optional[np.ndarray] = None) -> ColumnProfile:
+        """
+        Infer the type of one column.
+        
+        Args:
+            values: Column to profile
+            positions: Row positions to sample (see _sample_positions), or None for all rows
+            
+        Returns:
+            ColumnProfile of the column
+        """
+        sample = values if positions is None else values.iloc[positions]
+        present = sample[sample.notna()]
+        null_rate = 1 - len(present) / len(sample) if len(sample) else 1.0
+        
+        if present.empty and positions is not None:
+            # Mostly empty column: use its first values instead of the sample
+            present = values[values.notna()].iloc[:TYPE_SAMPLE_SIZE]
+        
+        if present.empty:
+            return ColumnProfile(str(values.dtype), 0.0, 0, null_rate)
+        
+        if isinstance(present.dtype, pd.CategoricalDtype):
+            present = present.astype(object)
+        
+        if not pd.api.types.is_object_dtype(present.dtype):
+            # All values of a typed column have the same type
+            return ColumnProfile(type(present.iloc[0]).__name__, 1.0, len(present), null_rate)
+        
+        type_counts = present.map(lambda value: type(value).__name__).value_counts()
+        type_name = type_counts.index[0]
+        confidence = float(type_counts.iloc[0]) / len(present)
+        
+        text = present.astype(str).str.strip()
+        numbers = pd.to_numeric(text, errors='coerce')
+        numeric_rate = float(numbers.notna().mean())
+        bool_rate = float(text.str.lower().isin(BOOL_STRINGS).mean())
+        
+        date_rate = 0.0
+        date_format = DataTransformer._infer_date_format(text.unique())
+        if date_format is not None:
+            date_rate = float(pd.to_datetime(text, format=date_format, errors='coerce').notna().mean())
+        
+        if confidence < 1.0:
+            # No single type: fall back to what the values read as
+            if bool_rate >= TYPE_COERCION_THRESHOLD:
+                type_name, confidence = 'bool', bool_rate
+            elif numeric_rate >= TYPE_COERCION_THRESHOLD:
+                numbers = numbers.dropna()
+                type_name = 'int' if (numbers == np.floor(numbers)).all() else 'float'
+                confidence = numeric_rate
+            elif date_rate >= TYPE_COERCION_THRESHOLD:
+                type_name, confidence = 'Timestamp', date_rate
+        
+        return ColumnProfile(type_name, confidence, len(present), null_rate, numeric_rate, bool_rate, date_rate)
+
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton that finds all keywords contained in a string in one pass.
+    
+    Each keyword carries a label; matching a string returns the labels of every
+    keyword that occurs in it as a substring.
+    """
+    
+    def __init__(self, keywords: List[Tuple[str, Any]]):
+        """
+        Build the automaton.
+        
+        Args:
+            keywords: List of (keyword, label) pairs
+        """
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [set()]
+        
+        # The empty keyword is contained in every string
+        self._always = set()
+        
+        for keyword, label in keywords:
+            if keyword == '':
+                self._always.add(label)
+                continue
+            
+            node = 0
+            for char in keyword:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(set())
+                    self._goto[node][char] = next_node
+                node = next_node
+            self._output[node].add(label)
+        
+        # Compute failure links breadth-first; depth-one nodes fail to the root
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] |= self._output[self._fail[child]]
+    
+    def find(self, text: str) -> set:
+        """
+        Find the labels of all keywords contained in the text.
+        
+        Args:
+            text: String to search
+            
+        Returns:
+            Set of matched labels
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        
+        found = set(self._always)
+        node = 0
         
-        return datatypes
+        for char in text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if output[node]:
+                found |= output[node]
+        
+        return found
 
 
 class TaggingSystem:
@@ -205,50 +543,75 @@ class TaggingSystem:
     Handles the application of the BIM-inspired tagging system to data fields.
     """
     
+    # Maximum number of (column, type) entries kept in the tag cache
+    TAG_CACHE_SIZE = 100000
+    
     def __init__(self, config_path: str):
         """
         Initialize the tagging system with the configuration file.
         
+        The parsed configuration comes from the process-wide registry (see tag_config),
+        so creating a tagging system does not parse the file again.
+        
         Args:
             config_path: Path to the tags configuration file
         """
-        self.config = self._load_config(config_path)
-        self.semantic_tags = self.config.get('semantic_tags', {})
-        self.transformations = self.config.get('transformations', {})
+        self.config_path = config_path
+        self._tag_config = None
+        self._apply(get_tag_config(config_path))
     
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
+    def _apply(self, tag_config: TagConfig):
         """
-        Load the tagging configuration from a YAML or JSON file.
+        Use a parsed configuration and its keyword matcher.
         
         Args:
-            config_path: Path to the configuration file
-            
-        Returns:
-            Dictionary containing the configuration
+            tag_config: Parsed configuration from the registry
+        """
+        self.config = tag_config.config
+        self.semantic_tags = tag_config.semantic_tags
+        self.transformations = tag_config.transformations
+        
+        # Every keyword of every tag is compiled into one matcher labelled by tag position,
+        # so matched tags can be reported in configuration order. The matcher is shared by
+        # all tagging systems using this version of the configuration.
+        compiled = tag_config.derived.get('tag_matcher')
+        if compiled is None:
+            tag_rules = []
+            keywords = []
+            for index, (tag_name, tag_settings) in enumerate(self.semantic_tags.items()):
+                tag_rules.append((tag_name, tag_settings.get('data_types', [])))
+                for keyword in tag_settings.get('keywords', []):
+                    keywords.append((str(keyword), index))
+            compiled = (tag_rules, KeywordMatcher(keywords))
+            tag_config.derived['tag_matcher'] = compiled
+        
+        self._tag_rules, self._matcher = compiled
+        self._tag_cache = {}
+        self._tag_config = tag_config
+    
+    def reload_if_changed(self) -> bool:
         """
-        logger.info(f"Loading tagging configuration from {config_path}")
+        Switch to the current configuration if the file changed since it was loaded.
         
-        file_extension = os.path.splitext(config_path)[1].lower()
+        Returns:
+            True if the configuration was reloaded
+        """
+        tag_config = get_tag_config(self.config_path)
+        if tag_config is self._tag_config:
+            return False
         
-        try:
-            if file_extension == '.yaml' or file_extension == '.yml':
-                with open(config_path, 'r') as f:
-                    config = yaml.safe_load(f)
-            elif file_extension == '.json':
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-            else:
-                raise ValueError(f"Unsupported configuration file format: {file_extension}")
-            
-            return config
-        except Exception as e:
-            logger.error(f"Error loading tagging configuration: {e}")
-            raise
+        logger.info(f"Tagging configuration changed, using version {tag_config.version}: {self.config_path}")
+        self._apply(tag_config)
+        return True
     
     def tag_fields(self, df: pd.DataFrame, datatypes: Dict[str, str]) -> Dict[str, List[str]]:
         """
         Apply semantic tags to each field in the DataFrame based on keywords and data types.
         
+        Tags are memoized by (column name, data type), so repeated schemas are tagged
+        without matching keywords again. The cache is dropped when the configuration
+        file changes.
+        
         Args:
             df: DataFrame containing the data
             datatypes: Dictionary mapping column names to their Python data types
@@ -258,26 +621,47 @@ class TaggingSystem:
         """
         logger.info("Applying semantic tags to fields")
         
+        self.reload_if_changed()
+        
+        tag_cache = self._tag_cache
+        if len(tag_cache) > self.TAG_CACHE_SIZE:
+            tag_cache.clear()
+        
         field_tags = {}
         
         for column in df.columns:
-            column_tags = []
             column_type = datatypes.get(column, 'unknown')
             
-            # Check each semantic tag
-            for tag_name, tag_config in self.semantic_tags.items():
-                keywords = tag_config.get('keywords', [])
-                allowed_types = tag_config.get('data_types', [])
-                
-                # Check if the column name contains any of the keywords
-                if any(keyword in column.lower() for keyword in keywords):
-                    # Check if the column type is allowed for this tag
-                    if not allowed_types or column_type in allowed_types:
-                        column_tags.append(tag_name)
+            key = (column, column_type)
+            column_tags = tag_cache.get(key)
+            if column_tags is None:
+                column_tags = self._match_tags(column, column_type)
+                tag_cache[key] = column_tags
             
-            field_tags[column] = column_tags
+            field_tags[column] = list(column_tags)
         
         return field_tags
+    
+    def _match_tags(self, column: str, column_type: str) -> Tuple[str, ...]:
+        """
+        Find the tags whose keywords occur in the column name and whose data types allow the column type.
+        
+        Args:
+            column: Column name
+            column_type: Data type of the column
+            
+        Returns:
+            Tuple of tag names in configuration order
+        """
+        matched = self._matcher.find(str(column).lower())
+        if not matched:
+            return ()
+        
+        return tuple(
+            tag_name
+            for index, (tag_name, allowed_types) in enumerate(self._tag_rules)
+            if index in matched and (not allowed_types or column_type in allowed_types)
+        )
 
 
 class DataTransformer:
@@ -285,31 +669,93 @@ class DataTransformer:
     Handles the application of transformations to data based on tags.
     """
     
-    def __init__(self, tagging_system: TaggingSystem):
+    # Maximum number of compiled transformation plans kept in the cache
+    PLAN_CACHE_SIZE = 256
+    
+    def __init__(
+        self,
+        tagging_system: TaggingSystem,
+        fit_mode: Optional[str] = None,
+        column_workers: Optional[int] = None
+    ):
         """
         Initialize the data transformer with the tagging system.
         
         Args:
             tagging_system: TaggingSystem instance containing transformation rules
+            fit_mode: 'none', 'fit' or 'apply' (see transform_data); defaults to ETL_FIT_MODE
+            column_workers: Number of threads transforming columns (see ColumnExecutor);
+                defaults to ETL_COLUMN_WORKERS
+            
+        Raises:
+            ValueError: If the fit mode is not known
         """
+        self.fit_mode = (fit_mode or FIT_MODE).lower()
+        if self.fit_mode not in FIT_MODES:
+            raise ValueError(f"Unknown fit mode '{self.fit_mode}', expected one of: {', '.join(FIT_MODES)}")
+        
         self.tagging_system = tagging_system
-        self.transformations = tagging_system.transformations
+        self.executor = ColumnExecutor(column_workers)
+        self._plan_cache = OrderedDict()
+        self._plan_lock = threading.Lock()
+        self._vocabulary_store = None
+        self._fitted_state_store = None
+    
+    @property
+    def transformations(self) -> Dict[str, Any]:
+        """Transformation rules of the current tagging configuration."""
+        return self.tagging_system.transformations
+    
+    @property
+    def vocabulary_store(self) -> 'CategoryVocabularyStore':
+        """Store of the persisted one-hot category vocabularies, created on first use."""
+        if self._vocabulary_store is None:
+            self._vocabulary_store = CategoryVocabularyStore()
+        return self._vocabulary_store
     
-    def transform_data(self, df: pd.DataFrame, field_tags: Dict[str, List[str]]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    @property
+    def fitted_state_store(self) -> 'FittedStateStore':
+        """Store of the fitted transformation state of each dataset, created on first use."""
+        if self._fitted_state_store is None:
+            self._fitted_state_store = FittedStateStore(vocabulary_store=self.vocabulary_store)
+        return self._fitted_state_store
+    
+    def transform_data(
+        self,
+        df: pd.DataFrame,
+        field_tags: Dict[str, List[str]],
+        dataset: Optional[str] = None,
+        statistics: Optional['DatasetStatistics'] = None
+    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
         Apply transformations to the data based on field tags.
         
+        The built-in transformations are applied first, then the user-defined ones (see
+        custom_transforms), from a compiled plan (see compile_plan). Within
+        each transformation the columns are transformed concurrently (see ColumnExecutor),
+        and the transformed DataFrame is assembled in a single allocation at the end.
+        
+        Normalization parameters and categories come from df itself unless the
+        transformer has a fit mode: in 'fit' mode the ones of df are also stored as the
+        fitted state of the dataset and df is encoded with the stored categories, and in
+        'apply' mode the stored ones are used, so incremental batches get the same scale
+        and indicator columns as the data the state was fitted on. Dates are always
+        parsed per batch.
+        
         Args:
             df: DataFrame containing the data
             field_tags: Dictionary mapping column names to lists of assigned tags
+            dataset: Name of the dataset (see dataset_name), used to look up persisted
+                category vocabularies and fitted state
+            statistics: Statistics of the whole dataset when df is one chunk of it
+                (see fit_statistics); computed from df if omitted
             
         Returns:
             tuple: (Transformed DataFrame, transformation metadata)
         """
         logger.info("Applying transformations based on field tags")
         
-        # Create a copy of the DataFrame to avoid modifying the original
-        transformed_df = df.copy()
+        plan = self.get_plan(df, field_tags)
         
         # Track transformation metadata
         transformation_metadata = {
@@ -318,241 +764,1423 @@ class DataTransformer:
             'dropped_columns': []
         }
         
+        if plan.is_empty:
+            return df.copy(), transformation_metadata
+        
+        # Statistics whose categories the one-hot encoding uses
+        category_statistics = statistics
+        
+        if dataset is not None and self.fit_mode == 'fit':
+            if statistics is None:
+                # Encode with the stored categories, so the fitted state matches the columns produced
+                category_statistics = self._batch_statistics(df, plan)
+                fitted_columns = self.save_fitted_state(dataset, category_statistics)
+            else:
+                # Chunked transformations store the state of the whole dataset once (see save_fitted_state)
+                fitted_columns = list(self._fitted_columns(statistics))
+            transformation_metadata['fitted_state'] = {'mode': 'fit', 'dataset': dataset, 'columns': fitted_columns}
+        elif dataset is not None and self.fit_mode == 'apply':
+            statistics, fitted_columns = self._apply_fitted_state(dataset, statistics, plan)
+            category_statistics = statistics
+            transformation_metadata['fitted_state'] = {'mode': 'apply', 'dataset': dataset, 'columns': fitted_columns}
+        
+        # Output columns keyed by name; the Series are only referenced until the end
+        columns = _OutputColumns(df)
+        
         # Apply date standardization
-        if 'date_standardization' in self.transformations:
-            transformed_df, date_meta = self._standardize_dates(
-                transformed_df, 
-                field_tags, 
-                self.transformations['date_standardization']
-            )
-            if date_meta:
-                transformation_metadata['applied_transformations']['date_standardization'] = date_meta
+        date_meta = self._standardize_dates(columns, plan, statistics)
+        if date_meta:
+            transformation_metadata['applied_transformations']['date_standardization'] = date_meta
         
         # Apply one-hot encoding
-        if 'one_hot_encoding' in self.transformations:
-            transformed_df, onehot_meta = self._one_hot_encode(
-                transformed_df, 
-                field_tags, 
-                self.transformations['one_hot_encoding']
-            )
-            if onehot_meta:
-                transformation_metadata['applied_transformations']['one_hot_encoding'] = onehot_meta
-                transformation_metadata['new_columns'].extend(onehot_meta.get('new_columns', []))
-                transformation_metadata['dropped_columns'].extend(onehot_meta.get('dropped_columns', []))
+        onehot_meta = self._one_hot_encode(columns, plan, dataset, category_statistics)
+        if onehot_meta:
+            transformation_metadata['applied_transformations']['one_hot_encoding'] = onehot_meta
+            transformation_metadata['new_columns'].extend(onehot_meta.get('new_columns', []))
+            transformation_metadata['dropped_columns'].extend(onehot_meta.get('dropped_columns', []))
         
         # Apply numeric normalization
-        if 'numeric_normalization' in self.transformations:
-            transformed_df, norm_meta = self._normalize_numeric(
-                transformed_df, 
-                field_tags, 
-                self.transformations['numeric_normalization']
+        norm_meta = self._normalize_numeric(columns, plan, statistics)
+        if norm_meta:
+            transformation_metadata['applied_transformations']['numeric_normalization'] = norm_meta
+        
+        # Apply user-defined transformations, in configuration order
+        transformation_metadata['applied_transformations'].update(self._apply_custom_transforms(columns, plan))
+        
+        return columns.to_frame(), transformation_metadata
+    
+    def get_plan(self, df: pd.DataFrame, field_tags: Dict[str, List[str]]) -> 'TransformationPlan':
+        """
+        Get the execution plan for a dataset, compiling it on the first use of its layout.
+        
+        Plans are cached by schema fingerprint (column names and dtypes), field tags and
+        transformation configuration.
+        
+        Args:
+            df: DataFrame containing the data
+            field_tags: Dictionary mapping column names to lists of assigned tags
+            
+        Returns:
+            TransformationPlan for the dataset
+        """
+        key = (
+            tuple(df.columns),
+            tuple(str(dtype) for dtype in df.dtypes),
+            tuple((column, tuple(tags)) for column, tags in field_tags.items()),
+            json.dumps(self.transformations, sort_keys=True, default=str)
+        )
+        
+        with self._plan_lock:
+            plan = self._plan_cache.get(key)
+            if plan is not None:
+                self._plan_cache.move_to_end(key)
+                return plan
+        
+        plan = self.compile_plan(df.columns, field_tags, self.transformations)
+        
+        with self._plan_lock:
+            self._plan_cache[key] = plan
+            if len(self._plan_cache) > self.PLAN_CACHE_SIZE:
+                self._plan_cache.popitem(last=False)
+        
+        return plan
+    
+    @staticmethod
+    def compile_plan(
+        columns: List[str],
+        field_tags: Dict[str, List[str]],
+        transformations: Dict[str, Any]
+    ) -> 'TransformationPlan':
+        """
+        Work out which columns each transformation applies to.
+        
+        Args:
+            columns: Column names of the dataset
+            field_tags: Dictionary mapping column names to lists of assigned tags
+            transformations: Transformation rules from the tagging configuration
+            
+        Returns:
+            Immutable TransformationPlan
+        """
+        # Columns with duplicated names cannot be addressed by name and are left as they are
+        column_counts = pd.Series(list(columns), dtype=object).value_counts()
+        addressable = set(column_counts[column_counts == 1].index)
+        
+        def tagged_columns(name: str) -> Tuple[str, ...]:
+            if name not in transformations:
+                return ()
+            applies_to_tags = transformations[name].get('applies_to_tags', [])
+            return tuple(
+                column for column, tags in field_tags.items()
+                if column in addressable and any(tag in applies_to_tags for tag in tags)
+            )
+        
+        date_config = transformations.get('date_standardization', {})
+        onehot_config = transformations.get('one_hot_encoding', {})
+        norm_config = transformations.get('numeric_normalization', {})
+        custom_transforms = compile_transforms(transformations)
+        
+        onehot_output = onehot_config.get('output', 'bool')
+        if onehot_output not in ONE_HOT_OUTPUTS:
+            logger.warning(f"Unknown one-hot output '{onehot_output}', using 'bool'")
+            onehot_output = 'bool'
+        
+        return TransformationPlan(
+            date_columns=tagged_columns('date_standardization'),
+            date_format=date_config.get('format', '%Y-%m-%d'),
+            onehot_columns=tagged_columns('one_hot_encoding'),
+            max_categories=onehot_config.get('max_categories', 20),
+            onehot_output=onehot_output,
+            persist_vocabulary=bool(onehot_config.get('persist_vocabulary', False)),
+            normalize_columns=tagged_columns('numeric_normalization'),
+            normalize_method=norm_config.get('method', 'min-max'),
+            target_range=tuple(norm_config.get('range', [0, 1])),
+            custom_transforms=tuple((transform, tagged_columns(transform.name)) for transform in custom_transforms)
+        )
+    
+    def fit_statistics(self, chunks: Iterable[pd.DataFrame]) -> 'DatasetStatistics':
+        """
+        Collect the statistics of a dataset from its chunks (first pass of a chunked transformation).
+        
+        Each column is typed from the first chunk in which it has values (see
+        TypeProfiler) and tagged as soon as that type is known, so only the statistics
+        needed by the transformations that apply to it are collected.
+        
+        Args:
+            chunks: DataFrame chunks of the dataset
+            
+        Returns:
+            DatasetStatistics of the dataset
+            
+        Raises:
+            ValueError: If the column names are not unique or differ between chunks
+        """
+        transformations = self.transformations
+        max_categories = transformations.get('one_hot_encoding', {}).get('max_categories', 20)
+        
+        statistics = DatasetStatistics()
+        first_dtypes = {}
+        plan = self.compile_plan([], {}, transformations)
+        
+        for chunk_index, chunk in enumerate(chunks):
+            if chunk_index == 0:
+                if chunk.columns.duplicated().any():
+                    raise ValueError("Chunked transformation needs unique column names")
+                statistics.columns = list(chunk.columns)
+                statistics.column_stats = {column: ColumnStatistics(max_categories) for column in statistics.columns}
+                first_dtypes = {column: str(dtype) for column, dtype in chunk.dtypes.items()}
+            elif list(chunk.columns) != statistics.columns:
+                raise ValueError(f"Columns of chunk {chunk_index} differ from the first chunk")
+            
+            statistics.row_count += len(chunk)
+            
+            # Type and tag the columns whose first non-null values are in this chunk
+            new_types = {}
+            positions = TypeProfiler._sample_positions(len(chunk))
+            for column in statistics.columns:
+                if column not in statistics.datatypes:
+                    profile = TypeProfiler.profile_column(chunk[column], positions)
+                    if profile.sample_size:
+                        new_types[column] = profile.type
+            
+            if new_types:
+                statistics.datatypes.update(new_types)
+                statistics.field_tags.update(
+                    self.tagging_system.tag_fields(pd.DataFrame(columns=list(new_types)), new_types)
+                )
+                plan = self.compile_plan(statistics.columns, statistics.field_tags, transformations)
+            
+            for column in statistics.columns:
+                column_stats = statistics.column_stats[column]
+                column_stats.merge(ColumnStatistics.from_chunk(
+                    chunk[column],
+                    max_categories,
+                    numeric=column in plan.normalize_columns,
+                    categories=column in plan.onehot_columns,
+                    dates=column in plan.date_columns,
+                    input_format=column_stats.input_format,
+                    target_format=plan.date_format
+                ))
+        
+        # Columns without any non-null value are typed by their dtype
+        untyped = {column: first_dtypes[column] for column in statistics.columns if column not in statistics.datatypes}
+        if untyped:
+            statistics.datatypes.update(untyped)
+            statistics.field_tags.update(
+                self.tagging_system.tag_fields(pd.DataFrame(columns=list(untyped)), untyped)
+            )
+        
+        # Keep the column order of the dataset
+        statistics.datatypes = {column: statistics.datatypes[column] for column in statistics.columns}
+        statistics.field_tags = {column: statistics.field_tags[column] for column in statistics.columns}
+        
+        return statistics
+    
+    def save_fitted_state(self, dataset: str, statistics: 'DatasetStatistics') -> List[str]:
+        """
+        Store the normalization parameters and categories of a dataset in 'fit' mode.
+        
+        The stored state replaces any state fitted earlier for the dataset, including its
+        category vocabulary (see FittedStateStore).
+        
+        Args:
+            dataset: Name of the dataset
+            statistics: Statistics of the whole dataset
+            
+        Returns:
+            Names of the columns whose state was stored (empty outside 'fit' mode)
+        """
+        if self.fit_mode != 'fit':
+            return []
+        
+        fitted_columns = self._fitted_columns(statistics)
+        self.fitted_state_store.save(dataset, fitted_columns, statistics.row_count)
+        return list(fitted_columns)
+    
+    @staticmethod
+    def _batch_statistics(df: pd.DataFrame, plan: 'TransformationPlan') -> 'DatasetStatistics':
+        """
+        Collect the statistics of the columns a plan normalizes or one-hot encodes.
+        
+        Args:
+            df: DataFrame containing the data
+            plan: Execution plan of the dataset
+            
+        Returns:
+            DatasetStatistics of df
+        """
+        statistics = DatasetStatistics()
+        statistics.columns = list(df.columns)
+        statistics.row_count = len(df)
+        
+        for column in dict.fromkeys(plan.normalize_columns + plan.onehot_columns):
+            statistics.column_stats[column] = ColumnStatistics.from_chunk(
+                df[column],
+                plan.max_categories,
+                numeric=column in plan.normalize_columns,
+                categories=column in plan.onehot_columns,
+                # Date columns are one-hot encoded with their standardized values
+                dates=column in plan.onehot_columns and column in plan.date_columns,
+                target_format=plan.date_format
             )
-            if norm_meta:
-                transformation_metadata['applied_transformations']['numeric_normalization'] = norm_meta
         
-        return transformed_df, transformation_metadata
+        return statistics
+    
+    @staticmethod
+    def _fitted_columns(statistics: 'DatasetStatistics') -> Dict[str, Dict[str, Any]]:
+        """Get the state of every column with normalization parameters or categories."""
+        return {
+            column: column_stats.to_state()
+            for column, column_stats in statistics.column_stats.items()
+            if column_stats.is_fitted
+        }
+    
+    def _apply_fitted_state(
+        self,
+        dataset: str,
+        statistics: Optional['DatasetStatistics'],
+        plan: 'TransformationPlan'
+    ) -> Tuple[Optional['DatasetStatistics'], List[str]]:
+        """
+        Replace the normalization parameters and categories of a batch with the stored ones.
+        
+        Columns without stored state keep the statistics of the batch.
+        
+        Args:
+            dataset: Name of the dataset
+            statistics: Statistics of the whole batch, if the transformed data is one chunk of it
+            plan: Execution plan of the batch
+            
+        Returns:
+            tuple: (statistics to transform with, names of the columns using stored state)
+        """
+        state = self.fitted_state_store.get(dataset)
+        if not state:
+            logger.warning(f"No fitted state stored for {dataset}; fitting on this batch")
+            return statistics, []
+        
+        applied = DatasetStatistics()
+        if statistics is not None:
+            applied.columns = statistics.columns
+            applied.datatypes = statistics.datatypes
+            applied.field_tags = statistics.field_tags
+            applied.column_stats = dict(statistics.column_stats)
+            applied.row_count = statistics.row_count
+        
+        fitted_columns = []
+        for column in dict.fromkeys(plan.normalize_columns + plan.onehot_columns):
+            if column not in state:
+                continue
+            
+            # Keep the date parse results of the batch
+            column_stats = copy.copy(applied.column_stats.get(column)) or ColumnStatistics(plan.max_categories)
+            column_stats.load_state(state[column])
+            applied.column_stats[column] = column_stats
+            fitted_columns.append(column)
+        
+        return applied, fitted_columns
     
     def _standardize_dates(
-        self, 
-        df: pd.DataFrame, 
-        field_tags: Dict[str, List[str]], 
-        config: Dict[str, Any]
-    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        self,
+        columns: '_OutputColumns',
+        plan: 'TransformationPlan',
+        statistics: Optional['DatasetStatistics'] = None
+    ) -> Dict[str, Any]:
         """
         Standardize date fields to a consistent format.
         
         Args:
-            df: DataFrame containing the data
-            field_tags: Dictionary mapping column names to lists of assigned tags
-            config: Configuration for date standardization
+            columns: Output columns being assembled
+            plan: Execution plan of the dataset
+            statistics: Statistics of the whole dataset, if the columns are one chunk of it
             
         Returns:
-            tuple: (DataFrame with standardized dates, transformation metadata)
+            Transformation metadata, or an empty dict if no column was transformed
         """
-        logger.info("Standardizing date fields")
+        if not plan.date_columns:
+            return {}
         
-        # Get the target format
-        date_format = config.get('format', '%Y-%m-%d')
-        applies_to_tags = config.get('applies_to_tags', [])
+        logger.info("Standardizing date fields")
         
         # Track which columns were transformed
         transformed_columns = []
+        parse_stats = {}
         
-        # Create a copy of the DataFrame
-        result_df = df.copy()
-        
-        # Find columns with temporal tags
-        for column, tags in field_tags.items():
-            if any(tag in applies_to_tags for tag in tags):
-                try:
+        def standardize(column: str) -> Optional[Tuple[pd.Series, Dict[str, Any]]]:
+            try:
+                column_stats = statistics.column_stats.get(column) if statistics else None
+                
+                if column_stats is None or not column_stats.dates:
                     # Try to convert to datetime and then to the target format
-                    result_df[column] = pd.to_datetime(df[column]).dt.strftime(date_format)
-                    transformed_columns.append(column)
-                except Exception as e:
-                    logger.warning(f"Could not standardize date format for column {column}: {e}")
+                    return self._format_dates(columns[column], plan.date_format)
+                
+                # The whole column was parsed in the first pass; use the format found there
+                if column_stats.date_error is not None:
+                    raise ValueError(column_stats.date_error)
+                formatted, _ = self._format_dates(columns[column], plan.date_format, column_stats.input_format)
+                return formatted, column_stats.parse_stats()
+            except Exception as e:
+                logger.warning(f"Could not standardize date format for column {column}: {e}")
+                return None
+        
+        results = self.executor.map(standardize, plan.date_columns, len(columns.index))
+        for column, result in zip(plan.date_columns, results):
+            if result is not None:
+                columns[column], parse_stats[column] = result
+                transformed_columns.append(column)
         
         # Create transformation metadata
         metadata = {
             'transformed_columns': transformed_columns,
-            'target_format': date_format
+            'target_format': plan.date_format,
+            'parse_stats': parse_stats
         }
         
-        return result_df, metadata if transformed_columns else {}
+        return metadata if transformed_columns else {}
+    
+    @staticmethod
+    def _format_dates(
+        values: pd.Series,
+        date_format: str,
+        input_format: Optional[str] = None
+    ) -> Tuple[pd.Series, Dict[str, Any]]:
+        """
+        Parse a date column and format it with the target format.
+        
+        Each distinct value is parsed once. For text columns the input format is inferred
+        from a sample of the distinct values and applied to all of them at once; values
+        that do not match it are parsed individually. The formatted dates are then mapped
+        back to the rows by their factorized codes.
+        
+        Args:
+            values: Column to standardize
+            date_format: Target date format
+            input_format: Input format of text dates; inferred from the values if omitted
+            
+        Returns:
+            tuple: (Formatted column, parse statistics)
+            
+        Raises:
+            ValueError: If a value cannot be parsed as a date
+        """
+        codes, uniques = pd.factorize(values)
+        inferred_format = None
+        fallback_values = np.zeros(len(uniques), dtype=bool)
+        
+        if uniques.dtype == object:
+            inferred_format = input_format or DataTransformer._infer_date_format(uniques)
+            
+            if inferred_format is not None:
+                parsed = pd.Series(pd.to_datetime(uniques, format=inferred_format, errors='coerce'))
+                fallback_values = parsed.isna().to_numpy()
+                if fallback_values.any():
+                    parsed[fallback_values] = pd.to_datetime(uniques[fallback_values], format='mixed')
+            else:
+                fallback_values[:] = True
+                parsed = pd.Series(pd.to_datetime(uniques, format='mixed'))
+        else:
+            # Numeric and datetime columns are converted as a whole
+            parsed = pd.Series(pd.to_datetime(uniques))
+        
+        # Missing values have code -1, which selects the trailing NaN
+        lookup = np.append(parsed.dt.strftime(date_format).to_numpy(dtype=object), np.nan)
+        formatted = pd.Series(lookup[codes], index=values.index, name=values.name)
+        
+        present_rows = codes[codes >= 0]
+        parsed_rows = int(parsed.notna().to_numpy()[present_rows].sum())
+        stats = {
+            'inferred_format': inferred_format,
+            'unique_values': len(uniques),
+            'fallback_values': int(fallback_values.sum()),
+            'fallback_rows': int(fallback_values[present_rows].sum()),
+            'parse_rate': parsed_rows / len(present_rows) if len(present_rows) else None
+        }
+        
+        return formatted, stats
+    
+    @staticmethod
+    def _infer_date_format(uniques: np.ndarray) -> Optional[str]:
+        """
+        Infer the format of text dates from a sample of their distinct values.
+        
+        Formats are guessed from the first values of the sample, and the guess that
+        parses most of the sample wins (the earliest guess on ties).
+        
+        Args:
+            uniques: Distinct values of the column
+            
+        Returns:
+            strftime-style format, or None if no format could be inferred
+        """
+        step = max(1, len(uniques) // DATE_FORMAT_SAMPLE_SIZE)
+        sample = [value for value in uniques[::step][:DATE_FORMAT_SAMPLE_SIZE] if isinstance(value, str)]
+        
+        candidates = []
+        for value in sample[:DATE_FORMAT_GUESSES]:
+            guess = guess_datetime_format(value)
+            if guess is not None and guess not in candidates:
+                candidates.append(guess)
+        
+        best_format = None
+        best_count = 0
+        for candidate in candidates:
+            count = int(pd.to_datetime(pd.Index(sample), format=candidate, errors='coerce').notna().sum())
+            if count > best_count:
+                best_format = candidate
+                best_count = count
+        
+        return best_format
+    
+    def _one_hot_encode(
+        self,
+        columns: '_OutputColumns',
+        plan: 'TransformationPlan',
+        dataset: Optional[str] = None,
+        statistics: Optional['DatasetStatistics'] = None
+    ) -> Dict[str, Any]:
+        """
+        Apply one-hot encoding to categorical fields.
+        
+        The indicator columns of all encoded fields are built together from categorical
+        codes (see _indicator_columns), appended after the existing columns, and the
+        encoded columns are dropped. With persist_vocabulary enabled, the categories of
+        each column are stored per dataset on first use and reused for later batches,
+        so they produce the same columns; values outside the vocabulary get all-zero rows.
+        In 'fit' mode the stored vocabulary is not reused: the fitted categories replace
+        it (see save_fitted_state).
+        
+        Args:
+            columns: Output columns being assembled
+            plan: Execution plan of the dataset
+            dataset: Name of the dataset owning the persisted vocabularies
+            statistics: Statistics of the whole dataset, if the columns are one chunk of it
+            
+        Returns:
+            Transformation metadata, or an empty dict if no column was transformed
+        """
+        if not plan.onehot_columns:
+            return {}
+        
+        logger.info("One-hot encoding categorical fields")
+        
+        max_categories = plan.max_categories
+        persist_vocabulary = plan.persist_vocabulary and dataset is not None
+        reuse_vocabulary = persist_vocabulary and self.fit_mode != 'fit'
+        vocabularies = self.vocabulary_store.get(dataset) if reuse_vocabulary else {}
+        
+        # Track transformation metadata
+        transformed_columns = []
+        new_columns = []
+        dropped_columns = []
+        fitted_vocabularies = {}
+        unseen_values = {}
+        
+        # Categorical codes of a column, whether its categories were fitted here, and its unseen values
+        def categorize(column: str) -> Optional[Tuple[pd.Categorical, bool, int]]:
+            try:
+                values = columns[column]
+                unseen = 0
+                
+                if column in vocabularies:
+                    # Reuse the stored categories without scanning for new ones
+                    categorical = pd.Categorical(values, categories=vocabularies[column])
+                    unseen = int(((categorical.codes == -1) & values.notna().to_numpy()).sum())
+                    if unseen:
+                        logger.warning(f"Column {column} has {unseen} values outside its category vocabulary")
+                    return categorical, False, unseen
+                
+                column_stats = statistics.column_stats.get(column) if statistics else None
+                if column_stats is not None and column_stats.categories is None and not column_stats.category_overflow:
+                    column_stats = None
+                
+                if column_stats is None:
+                    categorical = pd.Categorical(values)
+                    
+                    # Check if the column has a reasonable number of categories
+                    if isinstance(values.dtype, pd.CategoricalDtype):
+                        unique_values = len(np.unique(categorical.codes[categorical.codes >= 0]))
+                    else:
+                        unique_values = len(categorical.categories)
+                else:
+                    # Use the categories of the whole column, collected in the first pass
+                    unique_values = column_stats.category_count
+                    if unique_values <= max_categories:
+                        categorical = pd.Categorical(values, categories=column_stats.category_index())
+                        
+                        # Only possible with categories fitted on other data
+                        unseen = int(((categorical.codes == -1) & values.notna().to_numpy()).sum())
+                        if unseen:
+                            logger.warning(f"Column {column} has {unseen} values outside its fitted categories")
+                
+                if unique_values > max_categories:
+                    logger.warning(f"Column {column} has too many categories ({unique_values}) for one-hot encoding")
+                    return None
+                
+                return categorical, True, unseen
+            except Exception as e:
+                logger.warning(f"Could not one-hot encode column {column}: {e}")
+                return None
+        
+        # Categorical codes of every column to encode
+        encoded = []
+        results = self.executor.map(categorize, plan.onehot_columns, len(columns.index))
+        for column, result in zip(plan.onehot_columns, results):
+            if result is None:
+                continue
+            
+            categorical, fitted, unseen = result
+            if unseen:
+                unseen_values[column] = unseen
+            if fitted:
+                fitted_vocabularies[column] = categorical.categories.tolist()
+            encoded.append((column, categorical))
+        
+        indicators = self._indicator_columns(encoded, columns.index, plan.onehot_output, self.executor)
+        for column, dummies in indicators:
+            # Add the new columns to the output
+            for dummy_col, indicator in dummies:
+                columns[dummy_col] = indicator
+                new_columns.append(dummy_col)
+            
+            # Drop the original column
+            columns.drop(column)
+            dropped_columns.append(column)
+            
+            transformed_columns.append(column)
+        
+        if reuse_vocabulary and fitted_vocabularies:
+            self.vocabulary_store.update(dataset, fitted_vocabularies)
+        
+        # Create transformation metadata
+        metadata = {
+            'transformed_columns': transformed_columns,
+            'new_columns': new_columns,
+            'dropped_columns': dropped_columns,
+            'max_categories': max_categories
+        }
+        
+        if plan.onehot_output != 'bool':
+            metadata['output'] = plan.onehot_output
+        
+        if persist_vocabulary:
+            metadata['vocabulary'] = {
+                'dataset': dataset,
+                'fitted_columns': list(fitted_vocabularies),
+                'unseen_values': unseen_values
+            }
+        elif unseen_values:
+            metadata['unseen_values'] = unseen_values
+        
+        return metadata if transformed_columns else {}
+    
+    @staticmethod
+    def _indicator_columns(
+        encoded: List[Tuple[str, pd.Categorical]],
+        index: pd.Index,
+        output: str,
+        executor: Optional['ColumnExecutor'] = None
+    ) -> List[Tuple[str, List[Tuple[str, pd.Series]]]]:
+        """
+        Build the indicator columns of several categorical columns.
+        
+        Dense indicators of all columns share a single (columns x rows) array, so no
+        per-column frames are allocated. Column names follow pd.get_dummies
+        (<column>_<category>).
+        
+        Args:
+            encoded: (column name, Categorical) pairs
+            index: Row index of the output
+            output: 'bool', 'uint8' or 'sparse' (sparse uint8 with fill value 0)
+            executor: Executor building the indicators of the columns concurrently;
+                they are built serially if omitted
+            
+        Returns:
+            List of (column name, list of (indicator name, indicator Series)) pairs
+        """
+        executor = executor or ColumnExecutor(1)
+        
+        if output == 'sparse':
+            def sparse_dummies(item: Tuple[str, pd.Categorical]) -> Tuple[str, List[Tuple[str, pd.Series]]]:
+                column, categorical = item
+                codes = categorical.codes
+                dummies = [
+                    (
+                        f"{column}_{category}",
+                        pd.Series(pd.arrays.SparseArray((codes == code).astype(np.uint8), fill_value=0), index=index)
+                    )
+                    for code, category in enumerate(categorical.categories)
+                ]
+                return column, dummies
+            
+            return executor.map(sparse_dummies, encoded, len(index))
+        
+        # Each column fills its own rows of the block
+        offsets = np.cumsum([0] + [len(categorical.categories) for _, categorical in encoded])
+        block = np.zeros((offsets[-1], len(index)), dtype=bool if output == 'bool' else np.uint8)
+        
+        def dense_dummies(position: int) -> Tuple[str, List[Tuple[str, pd.Series]]]:
+            column, categorical = encoded[position]
+            offset = offsets[position]
+            codes = categorical.codes
+            rows = np.flatnonzero(codes >= 0)
+            block[offset + codes[rows], rows] = 1
+            
+            dummies = [
+                (f"{column}_{category}", pd.Series(block[offset + code], index=index))
+                for code, category in enumerate(categorical.categories)
+            ]
+            return column, dummies
+        
+        return executor.map(dense_dummies, range(len(encoded)), len(index))
+    
+    def _normalize_numeric(
+        self,
+        columns: '_OutputColumns',
+        plan: 'TransformationPlan',
+        statistics: Optional['DatasetStatistics'] = None
+    ) -> Dict[str, Any]:
+        """
+        Normalize numeric fields to a specified range.
+        
+        Args:
+            columns: Output columns being assembled
+            plan: Execution plan of the dataset
+            statistics: Statistics of the whole dataset, if the columns are one chunk of it
+            
+        Returns:
+            Transformation metadata, or an empty dict if no column was transformed
+        """
+        if not plan.normalize_columns:
+            return {}
+        
+        logger.info("Normalizing numeric fields")
+        
+        method = plan.normalize_method
+        target_range = list(plan.target_range)
+        
+        # Track which columns were transformed
+        transformed_columns = []
+        normalization_ranges = {}
+        
+        def normalize(column: str) -> Optional[Tuple[pd.Series, Dict[str, Any]]]:
+            try:
+                values = columns[column]
+                column_stats = statistics.column_stats.get(column) if statistics else None
+                
+                # Check if the column is numeric (in every chunk)
+                is_numeric = pd.api.types.is_numeric_dtype(values)
+                if column_stats is not None:
+                    is_numeric = is_numeric and column_stats.numeric
+                    
+                    # Without collected values the parameters come from the data itself
+                    if not column_stats.count:
+                        column_stats = None
+                
+                if is_numeric:
+                    if method == 'min-max':
+                        # Min-max normalization
+                        if column_stats is None:
+                            min_val = values.min()
+                            max_val = values.max()
+                        else:
+                            min_val = column_stats.min
+                            max_val = column_stats.max
+                        
+                        # Avoid division by zero
+                        if min_val != max_val:
+                            normalized = (values - min_val) / (max_val - min_val)
+                            
+                            # Scale to target range if different from [0, 1]
+                            if target_range != [0, 1]:
+                                normalized = normalized * (target_range[1] - target_range[0]) + target_range[0]
+                            
+                            return normalized, {
+                                'original_range': [float(min_val), float(max_val)],
+                                'target_range': target_range
+                            }
+                        
+                        logger.warning(f"Column {column} has constant value, skipping normalization")
+                    
+                    elif method == 'z-score':
+                        # Z-score normalization
+                        if column_stats is None:
+                            mean_val = values.mean()
+                            std_val = values.std()
+                        else:
+                            mean_val = column_stats.mean
+                            std_val = column_stats.std
+                        
+                        # Avoid division by zero
+                        if std_val > 0:
+                            return (values - mean_val) / std_val, {
+                                'mean': float(mean_val),
+                                'std': float(std_val)
+                            }
+                        
+                        logger.warning(f"Column {column} has zero standard deviation, skipping normalization")
+                else:
+                    logger.warning(f"Column {column} is not numeric, skipping normalization")
+            except Exception as e:
+                logger.warning(f"Could not normalize column {column}: {e}")
+            
+            return None
+        
+        results = self.executor.map(normalize, plan.normalize_columns, len(columns.index))
+        for column, result in zip(plan.normalize_columns, results):
+            if result is not None:
+                columns[column], normalization_ranges[column] = result
+                transformed_columns.append(column)
+        
+        # Create transformation metadata
+        metadata = {
+            'transformed_columns': transformed_columns,
+            'method': method,
+            'target_range': target_range,
+            'normalization_ranges': normalization_ranges
+        }
+        
+        return metadata if transformed_columns else {}
+    
+    def _apply_custom_transforms(self, columns: '_OutputColumns', plan: 'TransformationPlan') -> Dict[str, Any]:
+        """
+        Apply the user-defined transformations of the plan.
+        
+        Each transformation replaces its columns; expressions referring to other columns
+        see them as they were before the transformation.
+        
+        Args:
+            columns: Output columns being assembled
+            plan: Execution plan of the dataset
+            
+        Returns:
+            Transformation metadata keyed by transformation name, for the
+            transformations that transformed at least one column
+        """
+        applied = {}
+        
+        for transform, transform_columns in plan.custom_transforms:
+            if not transform_columns:
+                continue
+            
+            logger.info(f"Applying {transform.type} transformation {transform.name}")
+            
+            def apply(column: str) -> Optional[pd.Series]:
+                try:
+                    return transform.function(columns[column], columns)
+                except Exception as e:
+                    logger.warning(f"Could not apply transformation {transform.name} to column {column}: {e}")
+                    return None
+            
+            transformed_columns = []
+            results = self.executor.map(apply, transform_columns, len(columns.index))
+            for column, result in zip(transform_columns, results):
+                if result is not None:
+                    columns[column] = result
+                    transformed_columns.append(column)
+            
+            if transformed_columns:
+                applied[transform.name] = {
+                    'type': transform.type,
+                    'transformed_columns': transformed_columns,
+                    **transform.metadata
+                }
+        
+        return applied
+
+
+class TransformationPlan(NamedTuple):
+    """
+    Immutable execution plan for one combination of schema, field tags and
+    transformation configuration.
+    """
+    
+    date_columns: Tuple[str, ...]
+    date_format: str
+    onehot_columns: Tuple[str, ...]
+    max_categories: int
+    onehot_output: str
+    persist_vocabulary: bool
+    normalize_columns: Tuple[str, ...]
+    normalize_method: str
+    target_range: Tuple[Any, ...]
+    # User-defined transformations with the columns they apply to
+    custom_transforms: Tuple[Tuple[CustomTransform, Tuple[str, ...]], ...] = ()
+    
+    @property
+    def is_empty(self) -> bool:
+        """Whether the plan transforms no column at all."""
+        return not (
+            self.date_columns
+            or self.onehot_columns
+            or self.normalize_columns
+            or any(transform_columns for _, transform_columns in self.custom_transforms)
+        )
+
+
+class _OutputColumns:
+    """
+    Ordered set of output columns assembled by a transformation plan.
+    
+    Columns are held as references to Series, so replacing, appending or dropping
+    a column does not copy the frame; to_frame() allocates the result once.
+    """
+    
+    def __init__(self, df: pd.DataFrame):
+        """
+        Start from the columns of the input DataFrame.
+        
+        Args:
+            df: Input DataFrame
+        """
+        self.index = df.index
+        self._columns = {}
+        for position, (name, values) in enumerate(df.items()):
+            # Duplicated names are kept under a positional key so none is lost
+            key = name if name not in self._columns else ('__duplicate__', position)
+            self._columns[key] = (name, values)
+    
+    def __getitem__(self, name: str) -> pd.Series:
+        if name not in self._columns:
+            raise KeyError(name)
+        return self._columns[name][1]
+    
+    def __setitem__(self, name: str, values: pd.Series):
+        # Existing columns are replaced in place; new ones are appended
+        self._columns[name] = (name, values)
+    
+    def drop(self, name: str):
+        """
+        Drop a column.
+        
+        Args:
+            name: Name of the column to drop
+        """
+        del self._columns[name]
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Build the output DataFrame.
+        
+        Returns:
+            DataFrame with the output columns in order
+        """
+        entries = list(self._columns.values())
+        result = pd.DataFrame({position: values for position, (_, values) in enumerate(entries)}, index=self.index)
+        result.columns = pd.Index([name for name, _ in entries])
+        return result
+
+
+class ColumnExecutor:
+    """
+    Runs the per-column steps of a transformation on a thread pool.
+    
+    The columns of a plan are transformed independently, and NumPy and pandas release
+    the GIL for most of that work (parsing, factorizing, arithmetic), so the columns of
+    a wide table are spread over threads. Results come back in the order of the columns.
+    With a single worker every step runs in the calling thread, which keeps log output
+    and tracebacks in column order for debugging.
+    """
+    
+    def __init__(self, workers: Optional[int] = None):
+        """
+        Initialize the executor; the thread pool is created on first use.
+        
+        Args:
+            workers: Number of threads, 0 for one per available CPU and 1 for serial
+                execution; defaults to ETL_COLUMN_WORKERS
+        """
+        workers = COLUMN_WORKERS if workers is None else workers
+        self.workers = workers if workers > 0 else self.cpu_budget()
+        self._pool = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def cpu_budget(processes: int = 1) -> int:
+        """
+        Get the number of column threads per process that fits the available CPUs.
+        
+        Args:
+            processes: Number of processes transforming files at the same time
+            
+        Returns:
+            Number of threads (at least 1)
+        """
+        try:
+            cpus = len(os.sched_getaffinity(0))
+        except AttributeError:
+            cpus = os.cpu_count() or 1
+        return max(1, cpus // max(1, processes))
+    
+    @property
+    def serial(self) -> bool:
+        """Whether columns are transformed in the calling thread."""
+        return self.workers <= 1
+    
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any], row_count: Optional[int] = None) -> List[Any]:
+        """
+        Apply a function to every item.
+        
+        Args:
+            fn: Function transforming one column; must not share mutable state with
+                other calls
+            items: Items to process, usually column names
+            row_count: Number of rows of the columns; small frames are processed serially
+            
+        Returns:
+            Results in the order of the items
+        """
+        items = list(items)
+        if self.serial or len(items) <= 1 or (row_count is not None and row_count < COLUMN_PARALLEL_MIN_ROWS):
+            return [fn(item) for item in items]
+        
+        return list(self._get_pool().map(fn, items))
+    
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Get the thread pool, creating it on first use."""
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='column')
+        return self._pool
+    
+    def shutdown(self):
+        """Stop the thread pool; it is created again if the executor is used afterwards."""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+class ColumnStatistics:
+    """
+    Mergeable statistics of one column, accumulated chunk by chunk.
+    
+    Numeric columns keep their min/max and the Welford count, mean and sum of squared
+    deviations; categorical columns keep their distinct values, up to max_categories;
+    date columns keep their input format and the outcome of parsing their values.
+    Statistics of different chunks of a column are combined with merge(). The numeric
+    and categorical part is the fitted state stored per dataset (see to_state).
+    """
+    
+    def __init__(self, max_categories: int = 20):
+        """
+        Initialize empty statistics.
+        
+        Args:
+            max_categories: Number of distinct values above which categories are no longer collected
+        """
+        self.max_categories = max_categories
+        self.numeric = True
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.nan
+        self.max = np.nan
+        self.categories = None
+        self.category_overflow = False
+        self.dates = False
+        self.input_format = None
+        self.date_error = None
+        self.date_counts = {'unique_values': 0, 'fallback_values': 0, 'fallback_rows': 0, 'rows': 0, 'parsed_rows': 0}
+    
+    @classmethod
+    def from_chunk(
+        cls,
+        values: pd.Series,
+        max_categories: int = 20,
+        numeric: bool = False,
+        categories: bool = False,
+        dates: bool = False,
+        input_format: Optional[str] = None,
+        target_format: str = '%Y-%m-%d'
+    ) -> 'ColumnStatistics':
+        """
+        Compute the statistics of one chunk of a column.
+        
+        Args:
+            values: Chunk of the column
+            max_categories: Number of distinct values above which categories are no longer collected
+            numeric: Whether to collect min/max, mean and variance
+            categories: Whether to collect the distinct values
+            dates: Whether to parse the values as dates
+            input_format: Input format of text dates found in earlier chunks
+            target_format: Format date columns are standardized to
+            
+        Returns:
+            ColumnStatistics of the chunk
+        """
+        stats = cls(max_categories)
+        stats.numeric = pd.api.types.is_numeric_dtype(values)
+        
+        if numeric and stats.numeric:
+            present = values.dropna()
+            if len(present):
+                array = present.to_numpy(dtype=np.float64)
+                stats.count = len(array)
+                stats.mean = float(array.mean())
+                stats.m2 = float(((array - stats.mean) ** 2).sum())
+                stats.min = present.min()
+                stats.max = present.max()
+        
+        if dates:
+            stats.dates = True
+            try:
+                formatted, parse_stats = DataTransformer._format_dates(values, target_format, input_format)
+                rows = int(values.notna().sum())
+                stats.input_format = input_format or parse_stats['inferred_format']
+                stats.date_counts = {
+                    'unique_values': parse_stats['unique_values'],
+                    'fallback_values': parse_stats['fallback_values'],
+                    'fallback_rows': parse_stats['fallback_rows'],
+                    'rows': rows,
+                    'parsed_rows': round(parse_stats['parse_rate'] * rows) if rows else 0
+                }
+                
+                # Date columns are one-hot encoded after they have been standardized
+                values = formatted
+            except Exception as e:
+                stats.date_error = str(e)
+        
+        if categories:
+            stats.categories = pd.Categorical(values).categories
+            stats.category_overflow = len(stats.categories) > max_categories
+        
+        return stats
+    
+    def merge(self, other: 'ColumnStatistics') -> 'ColumnStatistics':
+        """
+        Combine the statistics of another chunk of the column into these statistics.
+        
+        Args:
+            other: Statistics of another chunk
+            
+        Returns:
+            These statistics, updated in place
+        """
+        self.numeric = self.numeric and other.numeric
+        
+        # Parallel Welford update (Chan et al.)
+        if other.count:
+            if self.count:
+                count = self.count + other.count
+                delta = other.mean - self.mean
+                self.mean += delta * other.count / count
+                self.m2 += other.m2 + delta * delta * self.count * other.count / count
+                self.count = count
+            else:
+                self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+        
+        if not pd.isna(other.min):
+            self.min = other.min if pd.isna(self.min) else min(self.min, other.min)
+        if not pd.isna(other.max):
+            self.max = other.max if pd.isna(self.max) else max(self.max, other.max)
+        
+        if other.categories is not None:
+            if self.categories is None:
+                self.categories = other.categories
+            elif not self.category_overflow:
+                self.categories = self.categories.append(other.categories).unique()
+            self.category_overflow = (
+                self.category_overflow or other.category_overflow or len(self.categories) > self.max_categories
+            )
+        
+        self.dates = self.dates or other.dates
+        self.input_format = self.input_format or other.input_format
+        self.date_error = self.date_error or other.date_error
+        for key, value in other.date_counts.items():
+            self.date_counts[key] += value
+        
+        return self
+    
+    @property
+    def std(self) -> float:
+        """Sample standard deviation (ddof=1, as pandas computes it)."""
+        return float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan
+    
+    @property
+    def category_count(self) -> int:
+        """Number of distinct values collected (more than max_categories once it overflowed)."""
+        if self.categories is not None:
+            return len(self.categories)
+        return self.max_categories + 1 if self.category_overflow else 0
+    
+    @property
+    def is_fitted(self) -> bool:
+        """Whether normalization parameters or categories were collected."""
+        return bool(self.count) or self.categories is not None or self.category_overflow
+    
+    def to_state(self) -> Dict[str, Any]:
+        """
+        Get the normalization parameters and categories in JSON-serializable form.
+        
+        Categories are left out once they overflowed max_categories.
+        
+        Returns:
+            Dictionary with numeric, count, mean, m2, min, max, categories and category_overflow
+        """
+        def scalar(value):
+            if pd.isna(value):
+                return None
+            return value.item() if isinstance(value, np.generic) else value
+        
+        categories = None
+        if self.categories is not None and not self.category_overflow:
+            categories = [scalar(value) for value in self.category_index()]
+        
+        return {
+            'numeric': bool(self.numeric),
+            'count': int(self.count),
+            'mean': float(self.mean),
+            'm2': float(self.m2),
+            'min': scalar(self.min),
+            'max': scalar(self.max),
+            'categories': categories,
+            'category_overflow': bool(self.category_overflow)
+        }
+    
+    def load_state(self, state: Dict[str, Any]):
+        """
+        Replace the normalization parameters and categories with stored ones.
+        
+        Date parse results are kept.
+        
+        Args:
+            state: Dictionary returned by to_state
+        """
+        self.numeric = state['numeric']
+        self.count = state['count']
+        self.mean = state['mean']
+        self.m2 = state['m2']
+        self.min = np.nan if state['min'] is None else state['min']
+        self.max = np.nan if state['max'] is None else state['max']
+        self.categories = None if state['categories'] is None else pd.Index(state['categories'])
+        self.category_overflow = state['category_overflow']
+    
+    def category_index(self) -> pd.Index:
+        """
+        Get the categories in the order pd.Categorical gives them for the whole column.
+        
+        Returns:
+            Sorted categories
+        """
+        if self.categories is None:
+            return pd.Index([])
+        return pd.Categorical(self.categories).categories
+    
+    def parse_stats(self) -> Dict[str, Any]:
+        """
+        Get the date parse statistics in the form of the in-memory transformation metadata.
+        
+        Distinct values are counted per chunk.
+        
+        Returns:
+            Dictionary with inferred_format, unique_values, fallback_values, fallback_rows and parse_rate
+        """
+        counts = self.date_counts
+        return {
+            'inferred_format': self.input_format,
+            'unique_values': counts['unique_values'],
+            'fallback_values': counts['fallback_values'],
+            'fallback_rows': counts['fallback_rows'],
+            'parse_rate': counts['parsed_rows'] / counts['rows'] if counts['rows'] else None
+        }
+
+
+class DatasetStatistics:
+    """
+    Statistics of a whole dataset, collected chunk by chunk by DataTransformer.fit_statistics.
+    """
+    
+    def __init__(self):
+        """Initialize empty statistics."""
+        self.columns = []
+        self.datatypes = {}
+        self.field_tags = {}
+        self.column_stats = {}
+        self.row_count = 0
+
+
+class DatasetStateStore:
+    """
+    Persisted per-dataset state, stored as one JSON file per dataset.
+    """
+    
+    _lock = threading.Lock()
+    
+    # Description of the stored state used in log messages
+    description = 'dataset state'
+    
+    def __init__(self, directory: str):
+        """
+        Initialize the store.
+        
+        Args:
+            directory: Directory of the state files
+        """
+        self.directory = directory
+    
+    def _path(self, dataset: str) -> str:
+        """Get the path of the state file of a dataset."""
+        safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', dataset)
+        return os.path.join(self.directory, f"{safe_name}.json")
+    
+    def _read(self, path: str) -> Dict[str, Any]:
+        """Read a state file; the caller holds the lock."""
+        if not os.path.exists(path):
+            return {}
+        
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error reading {self.description} {path}: {e}")
+            raise
+    
+    def _write(self, path: str, dataset: str, content: Dict[str, Any]):
+        """Write a state file atomically; the caller holds the lock."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            
+            # Write to a temporary file first so readers never see a partial file
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump({
+                    'dataset': dataset,
+                    'updated_at': datetime.now().isoformat(),
+                    **content
+                }, f, indent=2, default=str)
+            os.replace(temp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing {self.description} {path}: {e}")
+            raise
+
+
+class CategoryVocabularyStore(DatasetStateStore):
+    """
+    Persisted one-hot category vocabularies, stored as one JSON file per dataset.
+    """
+    
+    description = 'category vocabulary'
+    
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize the store.
+        
+        Args:
+            directory: Directory of the vocabulary files (defaults to VOCABULARY_DIR)
+        """
+        super().__init__(directory or VOCABULARY_DIR)
+    
+    def get(self, dataset: str) -> Dict[str, List[Any]]:
+        """
+        Get the stored vocabularies of a dataset.
+        
+        Args:
+            dataset: Name of the dataset
+            
+        Returns:
+            Dictionary mapping column names to their ordered list of categories
+        """
+        with self._lock:
+            return self._read(self._path(dataset)).get('columns', {})
+    
+    def update(self, dataset: str, vocabularies: Dict[str, List[Any]]):
+        """
+        Add column vocabularies to the stored vocabularies of a dataset.
+        
+        Args:
+            dataset: Name of the dataset
+            vocabularies: Dictionary mapping column names to their ordered list of categories
+        """
+        path = self._path(dataset)
+        
+        with self._lock:
+            columns = self._read(path).get('columns', {})
+            columns.update(vocabularies)
+            self._write(path, dataset, {'columns': columns})
+        
+        logger.info(f"Stored category vocabulary for {dataset}: {', '.join(vocabularies)}")
+    
+    def replace(self, dataset: str, vocabularies: Dict[str, List[Any]]):
+        """
+        Replace all stored vocabularies of a dataset.
+        
+        Args:
+            dataset: Name of the dataset
+            vocabularies: Dictionary mapping column names to their ordered list of categories
+        """
+        with self._lock:
+            self._write(self._path(dataset), dataset, {'columns': vocabularies})
+
+
+class FittedStateStore(DatasetStateStore):
+    """
+    Persisted normalization parameters and categories of each dataset (see ColumnStatistics.to_state).
+    
+    The category lists are kept in the dataset's category vocabulary, so one-hot encoding with
+    persist_vocabulary and the fit modes always agree on the categories of a column.
+    """
+    
+    description = 'fitted state'
+    
+    def __init__(self, directory: Optional[str] = None, vocabulary_store: Optional[CategoryVocabularyStore] = None):
+        """
+        Initialize the store.
+        
+        Args:
+            directory: Directory of the state files (defaults to FITTED_STATE_DIR)
+            vocabulary_store: Store of the fitted categories (defaults to one in VOCABULARY_DIR)
+        """
+        super().__init__(directory or FITTED_STATE_DIR)
+        self.vocabulary_store = vocabulary_store or CategoryVocabularyStore()
     
-    def _one_hot_encode(
-        self, 
-        df: pd.DataFrame, 
-        field_tags: Dict[str, List[str]], 
-        config: Dict[str, Any]
-    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    def get(self, dataset: str) -> Dict[str, Dict[str, Any]]:
         """
-        Apply one-hot encoding to categorical fields.
+        Get the fitted state of a dataset.
         
         Args:
-            df: DataFrame containing the data
-            field_tags: Dictionary mapping column names to lists of assigned tags
-            config: Configuration for one-hot encoding
+            dataset: Name of the dataset
             
         Returns:
-            tuple: (DataFrame with one-hot encoded columns, transformation metadata)
+            Dictionary mapping column names to their state, empty if nothing was fitted
         """
-        logger.info("One-hot encoding categorical fields")
-        
-        # Get configuration
-        applies_to_tags = config.get('applies_to_tags', [])
-        max_categories = config.get('max_categories', 20)
-        
-        # Track transformation metadata
-        transformed_columns = []
-        new_columns = []
-        dropped_columns = []
-        
-        # Create a copy of the DataFrame
-        result_df = df.copy()
-        
-        # Find columns with entity type tags
-        for column, tags in field_tags.items():
-            if any(tag in applies_to_tags for tag in tags):
-                # Check if the column has a reasonable number of categories
-                unique_values = df[column].nunique()
-                if unique_values <= max_categories:
-                    try:
-                        # Apply one-hot encoding
-                        dummies = pd.get_dummies(df[column], prefix=column)
-                        
-                        # Add the new columns to the result DataFrame
-                        for dummy_col in dummies.columns:
-                            result_df[dummy_col] = dummies[dummy_col]
-                            new_columns.append(dummy_col)
-                        
-                        # Drop the original column
-                        result_df = result_df.drop(columns=[column])
-                        dropped_columns.append(column)
-                        
-                        transformed_columns.append(column)
-                    except Exception as e:
-                        logger.warning(f"Could not one-hot encode column {column}: {e}")
-                else:
-                    logger.warning(f"Column {column} has too many categories ({unique_values}) for one-hot encoding")
-        
-        # Create transformation metadata
-        metadata = {
-            'transformed_columns': transformed_columns,
-            'new_columns': new_columns,
-            'dropped_columns': dropped_columns,
-            'max_categories': max_categories
+        with self._lock:
+            columns = self._read(self._path(dataset)).get('columns', {})
+        
+        # The lock is shared with the vocabulary store, so read it afterwards
+        vocabularies = self.vocabulary_store.get(dataset) if columns else {}
+        return {
+            column: {
+                **state,
+                'categories': None if state['category_overflow'] else vocabularies.get(column)
+            }
+            for column, state in columns.items()
         }
-        
-        return result_df, metadata if transformed_columns else {}
     
-    def _normalize_numeric(
-        self, 
-        df: pd.DataFrame, 
-        field_tags: Dict[str, List[str]], 
-        config: Dict[str, Any]
-    ) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    def save(self, dataset: str, columns: Dict[str, Dict[str, Any]], row_count: int):
         """
-        Normalize numeric fields to a specified range.
+        Replace the fitted state of a dataset, including its category vocabulary.
         
         Args:
-            df: DataFrame containing the data
-            field_tags: Dictionary mapping column names to lists of assigned tags
-            config: Configuration for numeric normalization
-            
-        Returns:
-            tuple: (DataFrame with normalized numeric columns, transformation metadata)
+            dataset: Name of the dataset
+            columns: Dictionary mapping column names to their state
+            row_count: Number of rows the state was fitted on
         """
-        logger.info("Normalizing numeric fields")
-        
-        # Get configuration
-        applies_to_tags = config.get('applies_to_tags', [])
-        method = config.get('method', 'min-max')
-        target_range = config.get('range', [0, 1])
-        
-        # Track which columns were transformed
-        transformed_columns = []
-        normalization_ranges = {}
-        
-        # Create a copy of the DataFrame
-        result_df = df.copy()
-        
-        # Find columns with quantitative tags
-        for column, tags in field_tags.items():
-            if any(tag in applies_to_tags for tag in tags):
-                try:
-                    # Check if the column is numeric
-                    if pd.api.types.is_numeric_dtype(df[column]):
-                        if method == 'min-max':
-                            # Min-max normalization
-                            min_val = df[column].min()
-                            max_val = df[column].max()
-                            
-                            # Avoid division by zero
-                            if min_val != max_val:
-                                result_df[column] = (df[column] - min_val) / (max_val - min_val)
-                                
-                                # Scale to target range if different from [0, 1]
-                                if target_range != [0, 1]:
-                                    result_df[column] = result_df[column] * (target_range[1] - target_range[0]) + target_range[0]
-                                
-                                transformed_columns.append(column)
-                                normalization_ranges[column] = {
-                                    'original_range': [float(min_val), float(max_val)],
-                                    'target_range': target_range
-                                }
-                            else:
-                                logger.warning(f"Column {column} has constant value, skipping normalization")
-                        
-                        elif method == 'z-score':
-                            # Z-score normalization
-                            mean_val = df[column].mean()
-                            std_val = df[column].std()
-                            
-                            # Avoid division by zero
-                            if std_val > 0:
-                                result_df[column] = (df[column] - mean_val) / std_val
-                                
-                                transformed_columns.append(column)
-                                normalization_ranges[column] = {
-                                    'mean': float(mean_val),
-                                    'std': float(std_val)
-                                }
-                            else:
-                                logger.warning(f"Column {column} has zero standard deviation, skipping normalization")
-                    else:
-                        logger.warning(f"Column {column} is not numeric, skipping normalization")
-                except Exception as e:
-                    logger.warning(f"Could not normalize column {column}: {e}")
-        
-        # Create transformation metadata
-        metadata = {
-            'transformed_columns': transformed_columns,
-            'method': method,
-            'target_range': target_range,
-            'normalization_ranges': normalization_ranges
+        vocabularies = {
+            column: state['categories']
+            for column, state in columns.items()
+            if state['categories'] is not None
         }
+        parameters = {
+            column: {key: value for key, value in state.items() if key != 'categories'}
+            for column, state in columns.items()
+        }
+        
+        self.vocabulary_store.replace(dataset, vocabularies)
+        with self._lock:
+            self._write(self._path(dataset), dataset, {'row_count': row_count, 'columns': parameters})
         
-        return result_df, metadata if transformed_columns else {}
+        logger.info(f"Stored fitted state for {dataset} ({row_count} rows): {', '.join(columns)}")
 
 
 class MetadataManager:
@@ -581,13 +2209,50 @@ class MetadataManager:
         """
         logger.info("Attaching metadata to transformed dataset")
         
+        # Create enriched metadata
+        enriched_metadata = MetadataManager.build_enriched_metadata(
+            df,
+            original_metadata,
+            field_tags,
+            transformation_metadata
+        )
+        
+        # Create payload with data and metadata
+        payload = {
+            'metadata': enriched_metadata,
+            'data': df.to_dict(orient='records')
+        }
+        
+        return payload
+    
+    @staticmethod
+    def build_enriched_metadata(
+        df: pd.DataFrame, 
+        original_metadata: Dict[str, Any],
+        field_tags: Dict[str, List[str]],
+        transformation_metadata: Dict[str, Any],
+        row_count: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the enriched metadata for a transformed dataset without building a payload.
+        
+        Args:
+            df: DataFrame containing the transformed data
+            original_metadata: Original metadata from the processed file
+            field_tags: Dictionary mapping column names to lists of assigned tags
+            transformation_metadata: Metadata about the applied transformations
+            row_count: Number of rows of the dataset, if df only holds part of it
+            
+        Returns:
+            Dictionary containing the enriched metadata
+        """
         # Create enriched metadata
         enriched_metadata = original_metadata.copy()
         
         # Update basic metadata
         enriched_metadata.update({
             'transformation_timestamp': datetime.now().isoformat(),
-            'row_count': len(df),
+            'row_count': len(df) if row_count is None else row_count,
             'column_count': len(df.columns),
             'columns': list(df.columns)
         })
@@ -597,20 +2262,9 @@ class MetadataManager:
         enriched_metadata['transformations'] = transformation_metadata
         
         # Add tag descriptions
-        tag_descriptions = {}
-        for tag_name, tag_info in TaggingSystem(TAGS_CONFIG_PATH).semantic_tags.items():
-            if 'description' in tag_info:
-                tag_descriptions[tag_name] = tag_info['description']
-        
-        enriched_metadata['tag_descriptions'] = tag_descriptions
-        
-        # Create payload with data and metadata
-        payload = {
-            'metadata': enriched_metadata,
-            'data': df.to_dict(orient='records')
-        }
+        enriched_metadata['tag_descriptions'] = dict(get_tag_config(TAGS_CONFIG_PATH).tag_descriptions)
         
-        return payload
+        return enriched_metadata
 
 
 class DataForwarder:
@@ -646,6 +2300,283 @@ class DataForwarder:
             json.dump(payload, f, indent=2)
         
         return output_filename
+    
+    @staticmethod
+    def forward_frame_to_enriched(
+        df: pd.DataFrame,
+        metadata: Dict[str, Any],
+        original_filename: str,
+        output_format: str
+    ) -> str:
+        """
+        Forward transformed data to the enriched directory in a columnar format.
+        
+        Args:
+            df: DataFrame containing the transformed data
+            metadata: Enriched metadata dictionary
+            original_filename: Name of the original source file
+            output_format: Payload format, e.g. 'parquet' or 'npz'
+            
+        Returns:
+            Path to the saved file
+        """
+        # Ensure the enriched directory exists
+        os.makedirs(ENRICHED_DATA_DIR, exist_ok=True)
+        
+        # Get the base filename without extension
+        base_filename = os.path.splitext(os.path.basename(original_filename))[0]
+        
+        with PayloadWriter(os.path.join(ENRICHED_DATA_DIR, base_filename), output_format) as writer:
+            logger.info(f"Forwarding transformed data to {writer.path}")
+            writer.write_chunk(df)
+            return writer.close(metadata)
+    
+    @staticmethod
+    def forward_chunks_to_enriched(
+        chunks: Iterable[pd.DataFrame],
+        build_metadata: Callable[[], Dict[str, Any]],
+        original_filename: str,
+        output_format: str
+    ) -> str:
+        """
+        Forward transformed chunks to the enriched directory as they are produced.
+        
+        Args:
+            chunks: Transformed DataFrame chunks
+            build_metadata: Function returning the enriched metadata once all chunks are written
+            original_filename: Name of the original source file
+            output_format: Payload format: 'json', 'parquet' or 'npz'
+            
+        Returns:
+            Path to the saved file
+        """
+        # Ensure the enriched directory exists
+        os.makedirs(ENRICHED_DATA_DIR, exist_ok=True)
+        
+        # Get the base filename without extension
+        base_filename = os.path.splitext(os.path.basename(original_filename))[0]
+        
+        with PayloadWriter(os.path.join(ENRICHED_DATA_DIR, base_filename), output_format) as writer:
+            logger.info(f"Streaming transformed data to {writer.path}")
+            for chunk in chunks:
+                writer.write_chunk(chunk)
+            return writer.close(build_metadata())
+
+
+class ChunkedTransformation:
+    """
+    Two-pass transformation of datasets too large to load at once.
+    
+    The first pass collects the statistics of the whole dataset (see
+    DataTransformer.fit_statistics); the second transforms one chunk at a time with
+    them and streams the result to the enriched directory. The output matches the
+    in-memory transformation.
+    """
+    
+    def __init__(self, data_transformer: DataTransformer):
+        """
+        Initialize the chunked transformation.
+        
+        Args:
+            data_transformer: DataTransformer applying the transformations
+        """
+        self.data_transformer = data_transformer
+    
+    @staticmethod
+    def should_chunk(file_path: str) -> bool:
+        """
+        Check whether a processed file should be transformed in chunks.
+        
+        JSON payloads cannot be read in chunks and are always loaded whole.
+        
+        Args:
+            file_path: Path to the processed file
+            
+        Returns:
+            True for CSV, Parquet and npz files of at least CHUNKED_TRANSFORM_THRESHOLD_BYTES
+        """
+        if CHUNKED_TRANSFORM_THRESHOLD_BYTES <= 0:
+            return False
+        
+        file_extension = os.path.splitext(file_path)[1].lower()
+        if file_extension not in ['.csv'] + COLUMNAR_EXTENSIONS:
+            return False
+        
+        return os.path.getsize(file_path) >= CHUNKED_TRANSFORM_THRESHOLD_BYTES
+    
+    @staticmethod
+    def iter_chunks(file_path: str, chunk_rows: int = CHUNKED_TRANSFORM_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Read a processed CSV, Parquet or npz file chunk by chunk.
+        
+        Args:
+            file_path: Path to the processed file
+            chunk_rows: Rows per chunk (npz files are read one stored chunk at a time)
+            
+        Yields:
+            DataFrame chunks of the file
+        """
+        if os.path.splitext(file_path)[1].lower() == '.csv':
+            with pd.read_csv(file_path, chunksize=chunk_rows) as reader:
+                yield from reader
+        else:
+            yield from PayloadReader.iter_chunks(file_path, chunk_rows)
+    
+    def transform_file(self, file_path: str) -> Optional[Tuple[str, Dict[str, Any], 'DatasetStatistics']]:
+        """
+        Transform a processed file in chunks and forward it to the enriched directory.
+        
+        Args:
+            file_path: Path to the processed file
+            
+        Returns:
+            tuple: (output path, enriched metadata, dataset statistics), or None if the
+            file cannot be transformed in chunks and has to be loaded whole
+        """
+        logger.info(f"Transforming file in chunks: {file_path}")
+        
+        try:
+            statistics = self.data_transformer.fit_statistics(self.iter_chunks(file_path))
+        except ValueError as e:
+            logger.warning(f"Cannot transform {file_path} in chunks ({e}); loading it whole")
+            return None
+        
+        if not statistics.columns:
+            return None
+        
+        metadata = {}
+        if os.path.splitext(file_path)[1].lower() in COLUMNAR_EXTENSIONS:
+            metadata = PayloadReader.read_metadata(file_path)
+        if not metadata:
+            metadata = {
+                'filename': os.path.basename(file_path),
+                'timestamp': datetime.now().isoformat(),
+                'source_format': os.path.splitext(file_path)[1].lower().lstrip('.'),
+                'row_count': statistics.row_count,
+                'column_count': len(statistics.columns),
+                'columns': list(statistics.columns)
+            }
+        
+        dataset = DataLoader.dataset_name(file_path, metadata)
+        self.data_transformer.save_fitted_state(dataset, statistics)
+        
+        output_path, enriched_metadata = self.write_transformed(
+            self.iter_chunks(file_path),
+            statistics,
+            metadata,
+            os.path.basename(file_path),
+            resolve_output_format(file_path, streaming=True),
+            dataset
+        )
+        return output_path, enriched_metadata, statistics
+    
+    def transform_chunks(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        statistics: 'DatasetStatistics',
+        transformation_metadata: Dict[str, Any],
+        dataset: Optional[str] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Transform chunks with the statistics of the whole dataset (second pass).
+        
+        Args:
+            chunks: DataFrame chunks of the dataset, in the order they were fitted
+            statistics: Statistics returned by DataTransformer.fit_statistics
+            transformation_metadata: Dictionary receiving the transformation metadata
+            dataset: Name of the dataset owning persisted category vocabularies
+            
+        Yields:
+            Transformed DataFrame chunks
+        """
+        for chunk in chunks:
+            transformed, chunk_metadata = self.data_transformer.transform_data(
+                chunk,
+                statistics.field_tags,
+                dataset,
+                statistics
+            )
+            
+            if not transformation_metadata:
+                transformation_metadata.update(chunk_metadata)
+            else:
+                self._add_unseen_values(transformation_metadata, chunk_metadata)
+            
+            yield transformed
+    
+    def write_transformed(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        statistics: 'DatasetStatistics',
+        metadata: Dict[str, Any],
+        original_filename: str,
+        output_format: str,
+        dataset: Optional[str] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Transform chunks and stream them to the enriched directory.
+        
+        Args:
+            chunks: DataFrame chunks of the dataset, in the order they were fitted
+            statistics: Statistics returned by DataTransformer.fit_statistics
+            metadata: Original metadata of the dataset
+            original_filename: Name of the original source file
+            output_format: Payload format: 'json', 'parquet' or 'npz'
+            dataset: Name of the dataset owning persisted category vocabularies
+            
+        Returns:
+            tuple: (output path, enriched metadata)
+        """
+        transformation_metadata = {}
+        output_columns = []
+        enriched_metadata = {}
+        
+        def transformed_chunks():
+            for transformed in self.transform_chunks(chunks, statistics, transformation_metadata, dataset):
+                if not output_columns:
+                    output_columns.extend(transformed.columns)
+                yield transformed
+        
+        def build_metadata():
+            enriched_metadata.update(MetadataManager.build_enriched_metadata(
+                pd.DataFrame(columns=output_columns),
+                metadata,
+                statistics.field_tags,
+                transformation_metadata,
+                row_count=statistics.row_count
+            ))
+            return enriched_metadata
+        
+        output_path = DataForwarder.forward_chunks_to_enriched(
+            transformed_chunks(),
+            build_metadata,
+            original_filename,
+            output_format
+        )
+        return output_path, enriched_metadata
+    
+    @staticmethod
+    def _add_unseen_values(transformation_metadata: Dict[str, Any], chunk_metadata: Dict[str, Any]):
+        """Add the out-of-vocabulary counts of a chunk to the transformation metadata."""
+        chunk_onehot = chunk_metadata['applied_transformations'].get('one_hot_encoding', {})
+        if 'vocabulary' in chunk_onehot:
+            unseen_values = chunk_onehot['vocabulary']['unseen_values']
+        else:
+            unseen_values = chunk_onehot.get('unseen_values', {})
+        if not unseen_values:
+            return
+        
+        onehot = transformation_metadata['applied_transformations'].get('one_hot_encoding')
+        if onehot is None:
+            return
+        
+        if 'vocabulary' in onehot:
+            totals = onehot['vocabulary']['unseen_values']
+        else:
+            totals = onehot.setdefault('unseen_values', {})
+        
+        for column, count in unseen_values.items():
+            totals[column] = totals.get(column, 0) + count
 
 
 class TransformationLogger:
@@ -738,10 +2669,35 @@ class FileEventHandler(FileSystemEventHandler):
     Handles file system events for the watchdog observer.
     """
     
-    def __init__(self):
-        """Initialize the file event handler."""
+    def __init__(
+        self,
+        workers: int = QUEUE_WORKERS,
+        queue_size: int = QUEUE_MAX_SIZE,
+        debounce_seconds: float = DEBOUNCE_SECONDS,
+        fit_mode: Optional[str] = None,
+        column_workers: Optional[int] = None
+    ):
+        """
+        Initialize the file event handler.
+        
+        Args:
+            workers: Number of worker threads processing detected files
+            queue_size: Maximum number of detected files waiting to be processed
+            debounce_seconds: Interval between size checks of a detected file
+            fit_mode: 'none', 'fit' or 'apply' (see DataTransformer.transform_data)
+            column_workers: Number of threads transforming columns, shared by all
+                worker threads (see ColumnExecutor)
+        """
         self.tagging_system = TaggingSystem(TAGS_CONFIG_PATH)
-        self.data_transformer = DataTransformer(self.tagging_system)
+        self.data_transformer = DataTransformer(self.tagging_system, fit_mode, column_workers)
+        self.manifest = FileManifest('transformation')
+        self.work_queue = FileWorkQueue(
+            self._process_tracked_file,
+            workers=workers,
+            max_size=queue_size,
+            debounce_seconds=debounce_seconds,
+            name='transformation'
+        )
     
     def on_created(self, event):
         """
@@ -751,22 +2707,76 @@ class FileEventHandler(FileSystemEventHandler):
             event: File system event
         """
         if not event.is_directory:
-            file_path = event.src_path
-            file_extension = os.path.splitext(file_path)[1].lower()
+            self._enqueue_file(event.src_path)
+    
+    def on_moved(self, event):
+        """
+        Handle file move events, e.g. files renamed into the directory once fully written.
+        
+        Args:
+            event: File system event
+        """
+        if not event.is_directory:
+            self._enqueue_file(event.dest_path)
+    
+    def _enqueue_file(self, file_path: str):
+        """
+        Queue a supported file for processing by the worker threads.
+        
+        Args:
+            file_path: Path to the detected file
+        """
+        file_extension = os.path.splitext(file_path)[1].lower()
+        
+        # Only process CSV and JSON files
+        if file_extension in SUPPORTED_EXTENSIONS:
+            logger.info(f"New file detected: {file_path}")
+            self.work_queue.submit(file_path)
+    
+    def _process_tracked_file(self, file_path: str) -> bool:
+        """
+        Process a file and record it in the processed-file manifest on success.
+        
+        Args:
+            file_path: Path to the file to process
             
-            # Only process CSV and JSON files
-            if file_extension in ['.csv', '.json']:
-                logger.info(f"New file detected: {file_path}")
-                self._process_file(file_path)
+        Returns:
+            True if the file was processed successfully, False otherwise
+        """
+        return process_and_record(self.manifest, self._process_file, file_path)
     
-    def _process_file(self, file_path: str):
+    def _process_file(self, file_path: str) -> bool:
         """
         Process a new file.
         
         Args:
             file_path: Path to the file to process
+            
+        Returns:
+            True if the file was processed successfully, False otherwise
         """
         try:
+            # Large files are transformed in two passes over chunks
+            if ChunkedTransformation.should_chunk(file_path):
+                result = ChunkedTransformation(self.data_transformer).transform_file(file_path)
+                if result is not None:
+                    output_path, enriched_metadata, statistics = result
+                    
+                    # Log the transformation
+                    TransformationLogger.log_transformation(
+                        os.path.basename(file_path),
+                        enriched_metadata.get('source_format', 'unknown'),
+                        statistics.row_count,
+                        len(statistics.columns),
+                        statistics.field_tags,
+                        enriched_metadata['transformations'],
+                        'success',
+                        output_path
+                    )
+                    
+                    logger.info(f"File processed successfully: {file_path} -> {output_path}")
+                    return True
+            
             # Load data from the file
             df, metadata = DataLoader.load_from_file(file_path)
             
@@ -777,21 +2787,41 @@ class FileEventHandler(FileSystemEventHandler):
             field_tags = self.tagging_system.tag_fields(df, datatypes)
             
             # Apply transformations
-            transformed_df, transformation_metadata = self.data_transformer.transform_data(df, field_tags)
-            
-            # Attach metadata
-            payload = MetadataManager.attach_metadata(
-                transformed_df,
-                metadata,
+            transformed_df, transformation_metadata = self.data_transformer.transform_data(
+                df,
                 field_tags,
-                transformation_metadata
+                DataLoader.dataset_name(file_path, metadata)
             )
             
-            # Forward to enriched directory
-            output_path = DataForwarder.forward_to_enriched(
-                payload,
-                os.path.basename(file_path)
-            )
+            output_format = resolve_output_format(file_path)
+            if output_format == 'json':
+                # Attach metadata
+                payload = MetadataManager.attach_metadata(
+                    transformed_df,
+                    metadata,
+                    field_tags,
+                    transformation_metadata
+                )
+                
+                # Forward to enriched directory
+                output_path = DataForwarder.forward_to_enriched(
+                    payload,
+                    os.path.basename(file_path)
+                )
+            else:
+                # Large outputs are written in a columnar format without building records
+                enriched_metadata = MetadataManager.build_enriched_metadata(
+                    transformed_df,
+                    metadata,
+                    field_tags,
+                    transformation_metadata
+                )
+                output_path = DataForwarder.forward_frame_to_enriched(
+                    transformed_df,
+                    enriched_metadata,
+                    os.path.basename(file_path),
+                    output_format
+                )
             
             # Log the transformation
             TransformationLogger.log_transformation(
@@ -806,6 +2836,7 @@ class FileEventHandler(FileSystemEventHandler):
             )
             
             logger.info(f"File processed successfully: {file_path} -> {output_path}")
+            return True
             
         except Exception as e:
             logger.error(f"Error processing file {file_path}: {e}")
@@ -824,6 +2855,8 @@ class FileEventHandler(FileSystemEventHandler):
                 )
             except Exception as log_error:
                 logger.error(f"Error logging transformation: {log_error}")
+            
+            return False
 
 
 class TransformationAgent:
@@ -831,8 +2864,26 @@ class TransformationAgent:
     Main class for the Transformation Agent.
     """
     
-    def __init__(self):
-        """Initialize the Transformation Agent."""
+    def __init__(
+        self,
+        workers: int = QUEUE_WORKERS,
+        queue_size: int = QUEUE_MAX_SIZE,
+        debounce_seconds: float = DEBOUNCE_SECONDS,
+        rebuild_manifest: bool = False,
+        fit_mode: Optional[str] = None,
+        column_workers: Optional[int] = None
+    ):
+        """
+        Initialize the Transformation Agent.
+        
+        Args:
+            workers: Number of worker threads processing detected files
+            queue_size: Maximum number of detected files waiting to be processed
+            debounce_seconds: Interval between size checks of a detected file
+            rebuild_manifest: Forget previously processed files so existing files are all reprocessed
+            fit_mode: 'none', 'fit' or 'apply' (see DataTransformer.transform_data)
+            column_workers: Number of threads transforming columns (see ColumnExecutor)
+        """
         # Ensure the necessary directories exist
         os.makedirs(PROCESSED_DATA_DIR, exist_ok=True)
         os.makedirs(ENRICHED_DATA_DIR, exist_ok=True)
@@ -843,12 +2894,18 @@ class TransformationAgent:
         TransformationLogger.initialize_log()
         
         self.observer = Observer()
-        self.event_handler = FileEventHandler()
+        self.event_handler = FileEventHandler(workers, queue_size, debounce_seconds, fit_mode, column_workers)
+        
+        if rebuild_manifest:
+            self.event_handler.manifest.clear()
     
     def start(self):
         """Start monitoring the processed data directory."""
         logger.info(f"Starting to monitor directory: {PROCESSED_DATA_DIR}")
         
+        # Start the workers before the observer and the existing files queue anything
+        self.event_handler.work_queue.start()
+        
         # Schedule the observer to watch the processed data directory
         self.observer.schedule(self.event_handler, PROCESSED_DATA_DIR, recursive=False)
         self.observer.start()
@@ -857,12 +2914,12 @@ class TransformationAgent:
             # Process any existing files in the directory
             self._process_existing_files()
             
-            # Keep the main thread alive
-            while True:
-                time.sleep(1)
+            # Keep the main thread alive, reporting queue depth, latency and config loads
+            run_with_metrics(self.event_handler.work_queue, log_extra_metrics=TAG_CONFIG_REGISTRY.log_metrics)
         except KeyboardInterrupt:
             logger.info("Stopping the observer due to keyboard interrupt")
             self.observer.stop()
+            self.event_handler.work_queue.stop(wait=False)
         
         self.observer.join()
     
@@ -878,7 +2935,12 @@ class TransformationAgent:
                 file_extension = os.path.splitext(file_path)[1].lower()
                 
                 # Only process CSV and JSON files
-                if file_extension in ['.csv', '.json']:
+                if file_extension in SUPPORTED_EXTENSIONS:
+                    # Skip files already processed in their current state
+                    if self.event_handler.manifest.is_processed(file_path):
+                        logger.info(f"Skipping unchanged file: {file_path}")
+                        continue
+                    
                     logger.info(f"Processing existing file: {file_path}")
                     
                     # Create a file created event and process it
@@ -888,10 +2950,27 @@ class TransformationAgent:
 
 def main():
     """Main entry point for the Transformation Agent."""
+    parser = argparse.ArgumentParser(description='Transformation Agent')
+    add_queue_arguments(parser)
+    parser.add_argument('--rebuild-manifest', action='store_true',
+                        help='Ignore the processed-file manifest and reprocess all existing files')
+    parser.add_argument('--fit-mode', choices=FIT_MODES, default=FIT_MODE,
+                        help="Store ('fit') or reuse ('apply') normalization parameters and categories per dataset")
+    parser.add_argument('--column-workers', type=int, default=COLUMN_WORKERS,
+                        help='Number of threads transforming the columns of a file (0: one per CPU, 1: serial)')
+    args = parser.parse_args()
+    
     logger.info("Initializing Transformation Agent")
     
     # Create and start the transformation agent
-    agent = TransformationAgent()
+    agent = TransformationAgent(
+        workers=args.workers,
+        queue_size=args.queue_size,
+        debounce_seconds=args.debounce,
+        rebuild_manifest=args.rebuild_manifest,
+        fit_mode=args.fit_mode,
+        column_workers=args.column_workers
+    )
     agent.start()
 
 